@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Streaming ElevenLabs Alignment Loader for Audio Learning App Preprocessing Pipeline
+
+A raw ElevenLabs "with timestamps" response holds the whole MP3 as a base64
+string next to three parallel per-character arrays:
+
+    {
+        "audio_base64": "SUQzBAAAAAAA...",
+        "alignment": {
+            "characters": ["H", "e", ...],
+            "character_start_times_seconds": [0.0, 0.093, ...],
+            "character_end_times_seconds": [0.093, 0.163, ...]
+        },
+        "normalized_alignment": {...}
+    }
+
+json.load() materializes all of it as Python objects (hundreds of MB for
+long-form audio). load_alignment() instead reads the file in chunks:
+- character strings are collected into a single str (a list only if some
+  entry is longer than one character)
+- timing arrays go straight into array('d') buffers, which NumPy can view
+  without copying (numpy.frombuffer)
+- audio_base64 is skipped, or decoded to disk in chunks when an audio
+  output path is given
+- every other value (e.g. normalized_alignment) is skipped without being
+  stored
+
+Speechify /v1/audio/speech responses go through the same pass: their
+"audio_data" is decoded like audio_base64 and their "speech_marks" are read
+into plain Python objects. The source may also be an open text stream (e.g.
+an HTTP response being received), so nothing needs to be buffered whole.
+
+No external dependencies.
+"""
+
+import base64
+import json
+import re
+from array import array
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, TextIO, Union
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # characters per read
+SCAN_WINDOW = 1 << 16  # characters per regex run (bounds the regex engine's backtracking stack)
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_STRING_BODY = r'[^"\\]*(?:\\.[^"\\]*)*'
+_STRING = re.compile(rf'"({_STRING_BODY})"')
+# A run of complete `"item",` entries, and a single entry with its separator
+_STRING_ITEMS = re.compile(rf'(?:[ \t\n\r]*"{_STRING_BODY}"[ \t\n\r]*,)*')
+_STRING_ITEM = re.compile(rf'[ \t\n\r]*"({_STRING_BODY})"[ \t\n\r]*([,\]])')
+# Anything but brackets, with complete strings skipped whole
+_SKIP_RUN = re.compile(rf'(?:[^"\[\]{{}}]+|"{_STRING_BODY}")*')
+_SCALAR = re.compile(r'[^,\]}\s]+')
+
+
+@dataclass
+class Alignment:
+    """Per-character alignment held in compact buffers"""
+    characters: Union[str, List[str]] = ''
+    start_times: array = field(default_factory=lambda: array('d'))
+    end_times: array = field(default_factory=lambda: array('d'))
+    audio_path: Optional[str] = None
+    audio_bytes: int = 0
+    speech_marks: Optional[List[Dict]] = None
+
+
+class _JsonStream:
+    """Minimal pull parser over a text file, reading one chunk at a time"""
+
+    def __init__(self, f, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        """Append the next chunk, dropping consumed text; False at end of file"""
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _error(self, message: str):
+        # JSONDecodeError (a ValueError) so callers see the same error type as json.load
+        raise json.JSONDecodeError(f"Invalid alignment JSON: {message}", self.buf, self.pos)
+
+    def peek(self) -> str:
+        """Next non-whitespace character (not consumed)"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                self._error("unexpected end of file")
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            self._error(f"expected '{char}', found '{self.buf[self.pos]}'")
+        self.pos += 1
+
+    def _find_closing_quote(self, start: int) -> int:
+        """Index of the unescaped quote ending a string, or -1 if not buffered yet"""
+        index = self.buf.find('"', start)
+        while index != -1:
+            backslashes = 0
+            while index - 1 - backslashes >= self.pos and self.buf[index - 1 - backslashes] == '\\':
+                backslashes += 1
+            if backslashes % 2 == 0:
+                return index
+            index = self.buf.find('"', index + 1)
+        return -1
+
+    @staticmethod
+    def _decode(raw: str) -> str:
+        return json.loads(f'"{raw}"') if '\\' in raw else raw
+
+    def read_string(self) -> str:
+        """Read a (small) string value, e.g. an object key"""
+        self.expect('"')
+        end = self._find_closing_quote(self.pos)
+        while end == -1:
+            searched = len(self.buf) - self.pos
+            if not self._fill():
+                self._error("unterminated string")
+            end = self._find_closing_quote(self.pos + searched)
+        raw = self.buf[self.pos:end]
+        self.pos = end + 1
+        return self._decode(raw)
+
+    def stream_string(self, write: Optional[Callable[[str], None]] = None):
+        """Pass a (large) string value to write() in decoded pieces, or skip it"""
+        self.expect('"')
+        while True:
+            end = self._find_closing_quote(self.pos)
+            if end != -1:
+                if write:
+                    write(self._decode(self.buf[self.pos:end]))
+                self.pos = end + 1
+                return
+
+            # Emit what we have, but never split an escape sequence
+            cut = max(self.pos, len(self.buf) - 6)
+            backslash = self.buf.rfind('\\', self.pos, cut)
+            if backslash != -1 and backslash >= cut - 6:
+                run_start = backslash
+                while run_start > self.pos and self.buf[run_start - 1] == '\\':
+                    run_start -= 1
+                if (backslash - run_start + 1) % 2 == 1:
+                    cut = backslash
+            if write and cut > self.pos:
+                write(self._decode(self.buf[self.pos:cut]))
+            self.pos = cut
+            if not self._fill():
+                self._error("unterminated string")
+
+    def read_number_array(self) -> array:
+        """Read an array of numbers into array('d')"""
+        values = array('d')
+        self.expect('[')
+        while True:
+            close = self.buf.find(']', self.pos)
+            if close != -1:
+                segment = self.buf[self.pos:close]
+                if segment.strip():
+                    values.extend(map(float, segment.split(',')))
+                self.pos = close + 1
+                return values
+
+            comma = self.buf.rfind(',', self.pos)
+            if comma != -1:
+                values.extend(map(float, self.buf[self.pos:comma].split(',')))
+                self.pos = comma + 1
+            if not self._fill():
+                self._error("unterminated number array")
+
+    def read_string_array(self) -> Union[str, List[str]]:
+        """Read an array of strings; single characters are joined into one str"""
+        items = []
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return ''
+
+        while True:
+            # Take the complete items in the next window in one pass
+            run = _STRING_ITEMS.match(self.buf, self.pos, self.pos + SCAN_WINDOW)
+            if run.end() > self.pos:
+                raw_items = _STRING.findall(self.buf, self.pos, run.end())
+                if '\\' in self.buf[self.pos:run.end()]:
+                    raw_items = [self._decode(item) for item in raw_items]
+                items.extend(raw_items)
+                self.pos = run.end()
+                continue
+
+            # The item closing the array, or one longer than the window
+            item = _STRING_ITEM.match(self.buf, self.pos)
+            if item:
+                items.append(self._decode(item.group(1)))
+                self.pos = item.end()
+                if item.group(2) == ']':
+                    break
+                continue
+            if not self._fill():
+                self._error("malformed string array")
+
+        if all(len(item) == 1 for item in items):
+            return ''.join(items)
+        return items
+
+    def skip_value(self):
+        """Consume any JSON value without keeping it"""
+        char = self.peek()
+        if char == '"':
+            self.stream_string()
+            return
+        if char not in '[{':
+            # Number, true, false or null
+            while True:
+                match = _SCALAR.match(self.buf, self.pos)
+                if match and match.end() < len(self.buf):
+                    self.pos = match.end()
+                    return
+                if not self._fill():
+                    if not match:
+                        self._error("unexpected end of file")
+                    self.pos = match.end()
+                    return
+
+        depth = 0
+        while True:
+            window_end = self.pos + SCAN_WINDOW
+            self.pos = _SKIP_RUN.match(self.buf, self.pos, window_end).end()
+            if self.pos == window_end and self.pos < len(self.buf):
+                continue
+            if self.pos >= len(self.buf):
+                if not self._fill():
+                    self._error("unterminated container")
+                continue
+            char = self.buf[self.pos]
+            if char == '"':
+                # String running past the buffer
+                self.stream_string()
+                continue
+            self.pos += 1
+            depth += 1 if char in '[{' else -1
+            if depth == 0:
+                return
+
+    def read_value(self):
+        """Read a (small) JSON value of any type into Python objects"""
+        char = self.peek()
+        if char == '{':
+            return {key: self.read_value() for key in self.object_keys()}
+        if char == '[':
+            return list(self.array_items())
+        if char == '"':
+            return self.read_string()
+        while True:
+            match = _SCALAR.match(self.buf, self.pos)
+            if (match and match.end() < len(self.buf)) or not self._fill():
+                break
+        if not match:
+            self._error("unexpected end of file")
+        self.pos = match.end()
+        return json.loads(match.group())
+
+    def array_items(self):
+        """Iterate over the items of an array, reading each with read_value()"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.read_value()
+            char = self.peek()
+            self.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                self._error(f"expected ',' or ']', found '{char}'")
+
+    def object_keys(self):
+        """Iterate over the keys of an object, leaving each value for the caller"""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.read_string()
+            self.expect(':')
+            yield key
+            char = self.peek()
+            self.pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                self._error(f"expected ',' or '}}', found '{char}'")
+
+
+class _Base64Writer:
+    """Decode base64 text arriving in arbitrary pieces straight to a file"""
+
+    def __init__(self, f):
+        self.f = f
+        self.pending = ''
+        self.bytes_written = 0
+
+    def write(self, text: str):
+        self.pending += text
+        usable = len(self.pending) - len(self.pending) % 4
+        if usable:
+            self.bytes_written += self.f.write(base64.b64decode(self.pending[:usable]))
+            self.pending = self.pending[usable:]
+
+    def close(self):
+        if self.pending:
+            self.bytes_written += self.f.write(base64.b64decode(self.pending + '=' * (-len(self.pending) % 4)))
+            self.pending = ''
+
+
+def load_alignment(source: Union[str, TextIO], audio_output_path: Optional[str] = None, key: str = 'alignment',
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> Alignment:
+    """
+    Stream an ElevenLabs alignment JSON into compact buffers
+
+    Args:
+        source: ElevenLabs JSON (raw response or alignment-only file) or a
+                Speechify response, as a path or an open text stream
+        audio_output_path: If given, decode audio_base64 / audio_data to this file; otherwise skip it
+        key: Alignment object to read ('alignment' or 'normalized_alignment')
+        chunk_size: Characters read per chunk
+
+    Returns:
+        Alignment with characters, start/end times, speech marks and audio info
+    """
+    if isinstance(source, str):
+        with open(source, 'r', encoding='utf-8') as f:
+            return load_alignment(f, audio_output_path, key, chunk_size)
+
+    alignment = Alignment()
+    stream = _JsonStream(source, chunk_size)
+    for top_key in stream.object_keys():
+        if top_key == key and stream.peek() == '{':
+            for field_name in stream.object_keys():
+                if field_name == 'characters':
+                    alignment.characters = stream.read_string_array()
+                elif field_name == 'character_start_times_seconds':
+                    alignment.start_times = stream.read_number_array()
+                elif field_name == 'character_end_times_seconds':
+                    alignment.end_times = stream.read_number_array()
+                else:
+                    stream.skip_value()
+        elif top_key in ('audio_base64', 'audio_data') and audio_output_path and stream.peek() == '"':
+            with open(audio_output_path, 'wb') as audio_file:
+                writer = _Base64Writer(audio_file)
+                stream.stream_string(writer.write)
+                writer.close()
+            alignment.audio_path = audio_output_path
+            alignment.audio_bytes = writer.bytes_written
+        elif top_key == 'speech_marks':
+            alignment.speech_marks = stream.read_value()
+        else:
+            stream.skip_value()
+
+    return alignment
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Stream an ElevenLabs alignment JSON and report its size')
+    parser.add_argument('input', help='ElevenLabs JSON file (or a Speechify response)')
+    parser.add_argument('--audio', help='Write the decoded audio_base64 / audio_data payload to this file')
+    args = parser.parse_args()
+
+    alignment = load_alignment(args.input, args.audio)
+    print(f"📊 Loaded ElevenLabs alignment:")
+    print(f"   Characters: {len(alignment.characters)}")
+    print(f"   Start times: {len(alignment.start_times)}")
+    print(f"   End times: {len(alignment.end_times)}")
+    if alignment.speech_marks is not None:
+        print(f"   Speech marks: {len(alignment.speech_marks)}")
+    if alignment.audio_path:
+        print(f"✅ Saved audio to: {alignment.audio_path} ({alignment.audio_bytes:,} bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Batch-process a whole course of ElevenLabs lessons
+
+Discovers lessons in a directory tree and runs
+ElevenLabsCompleteProcessorWithParagraphs over a process pool, so a course
+rebuild costs one interpreter start instead of one per lesson.
+
+A lesson is an ElevenLabs alignment JSON `X.json` with its original content
+next to it as `X.md` (or `X_original.json`), plus an optional `X.mp3`.
+Outputs mirror the input tree and a `batch_manifest.json` summary records
+per-lesson timings (including a per-stage breakdown), cache hits and
+failures. Lessons whose inputs are unchanged since the last run are served
+from the build cache.
+"""
+
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Dict, Optional
+
+from process_elevenlabs_complete_with_paragraphs import ElevenLabsCompleteProcessorWithParagraphs, PROCESSOR_VERSION
+from build_cache import BuildCache, DEFAULT_CACHE_DIR
+from precompress import add_output_arguments, apply_output_arguments
+from timing_shards import (SHARD_INDEX_FILE, shard_directory, shard_ms_from_config, add_shard_arguments,
+                           apply_shard_arguments)
+from instrumentation import Instrumentation, add_instrumentation_arguments, configure_logging
+
+MANIFEST_NAME = 'batch_manifest.json'
+MANIFEST_VERSION = "1.0"
+
+# Files written by the pipeline itself, never treated as alignment input
+OUTPUT_SUFFIXES = ('_enhanced', '_lookup', '_original', '_complete_with_paragraphs')
+
+
+@dataclass
+class Lesson:
+    """One lesson's input files"""
+    name: str
+    alignment_path: str
+    original_path: str
+    audio_path: Optional[str] = None
+
+
+def discover_lessons(root: str) -> List[Lesson]:
+    """
+    Find (alignment JSON, original .md/.json, optional .mp3) triples
+
+    Args:
+        root: Directory to search recursively
+
+    Returns:
+        Lessons sorted by path
+    """
+    lessons = []
+    for alignment in sorted(Path(root).rglob('*.json')):
+        if alignment.stem.endswith(OUTPUT_SUFFIXES) or alignment.name == MANIFEST_NAME:
+            continue
+
+        original = alignment.with_suffix('.md')
+        if not original.exists():
+            original = alignment.with_name(f"{alignment.stem}_original.json")
+        if not original.exists():
+            continue
+
+        audio = alignment.with_suffix('.mp3')
+        lessons.append(Lesson(
+            name=str(alignment.relative_to(root).with_suffix('')),
+            alignment_path=str(alignment),
+            original_path=str(original),
+            audio_path=str(audio) if audio.exists() else None
+        ))
+
+    return lessons
+
+
+def process_lesson(lesson: Lesson, output_path: str, config: Dict, verbose: bool = False,
+                   cache_dir: Optional[str] = None, trace_memory: bool = False,
+                   profile_dir: Optional[str] = None) -> Dict:
+    """
+    Process and save a single lesson, capturing timing and failures
+
+    Runs inside worker processes, so it never raises; errors are reported
+    in the returned result instead.
+    """
+    result = {
+        'lesson': lesson.name,
+        'alignment': lesson.alignment_path,
+        'original': lesson.original_path,
+        'audio': lesson.audio_path,
+        'output': output_path,
+        'status': 'ok'
+    }
+
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    configure_logging(verbose)
+    instrumentation = Instrumentation(lesson.name, trace_memory, profile_dir)
+    try:
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        cache = BuildCache(PROCESSOR_VERSION, cache_dir) if cache_dir else None
+        processor = ElevenLabsCompleteProcessorWithParagraphs(
+            lesson.alignment_path, lesson.original_path, config, cache, instrumentation
+        )
+        content = processor.process()
+        processor.save(content, output_path)
+        result['cache'] = processor.cache_status
+        if shard_ms_from_config(config):
+            result['shard_index'] = str(shard_directory(output_path) / SHARD_INDEX_FILE)
+
+        result.update({
+            'lookup': output_path.replace('.json', '_lookup.json'),
+            'lookup_bin': output_path.replace('.json', '_lookup.bin'),
+            'word_count': content['metadata']['word_count'],
+            'sentence_count': len(content['timing']['sentences']),
+            'duration_ms': content['timing']['total_duration_ms']
+        })
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = f"{type(e).__name__}: {e}"
+        result['traceback'] = traceback.format_exc()
+    finally:
+        instrumentation.close()
+
+    result['stages'] = instrumentation.report()
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    result['cpu_seconds'] = round(time.process_time() - cpu_start, 3)
+    return result
+
+
+def output_path_for(lesson: Lesson, input_root: str, output_root: str) -> str:
+    """Mirror the lesson's location under the output directory"""
+    relative = Path(lesson.alignment_path).relative_to(input_root)
+    return str(Path(output_root) / relative.parent / f"{relative.stem}_enhanced.json")
+
+
+def run_batch(input_root: str, output_root: str, config: Dict, workers: Optional[int] = None,
+              verbose: bool = False, cache_dir: Optional[str] = None, timing_report: Optional[str] = None,
+              trace_memory: bool = False, profile_dir: Optional[str] = None) -> Dict:
+    """
+    Process every discovered lesson and write the summary manifest
+
+    Args:
+        input_root: Directory tree containing lessons
+        output_root: Directory for enhanced JSON, lookup tables and the manifest
+        config: Processing configuration shared by all lessons
+        workers: Process pool size (default: CPU count, 1 runs in-process)
+        verbose: Show processor progress messages, not just warnings
+        cache_dir: Build cache directory, or None to reprocess everything
+        timing_report: Append every lesson's per-stage records here as JSON lines
+        trace_memory: Record per-stage allocations with tracemalloc
+        profile_dir: Directory for per-stage cProfile stats
+
+    Returns:
+        The manifest dictionary
+    """
+    lessons = discover_lessons(input_root)
+    workers = workers or os.cpu_count() or 1
+    print(f"📚 Found {len(lessons)} lessons in {input_root}")
+    print(f"   Workers: {workers}")
+
+    batch_start = time.perf_counter()
+    results = []
+
+    def report(result: Dict):
+        results.append(result)
+        icon = "✅" if result['status'] == 'ok' else "❌"
+        cached = " [cached]" if result.get('cache') == 'hit' else ""
+        print(f"{icon} [{len(results)}/{len(lessons)}] {result['lesson']} ({result['seconds']:.2f}s){cached}")
+        if result['status'] != 'ok':
+            print(f"   {result['error']}")
+
+    jobs = [(lesson, output_path_for(lesson, input_root, output_root)) for lesson in lessons]
+    options = (config, verbose, cache_dir, trace_memory, profile_dir)
+    if workers == 1:
+        for lesson, output_path in jobs:
+            report(process_lesson(lesson, output_path, *options))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(process_lesson, lesson, output_path, *options)
+                       for lesson, output_path in jobs]
+            for future in as_completed(futures):
+                report(future.result())
+
+    results.sort(key=lambda r: r['lesson'])
+    failures = [r for r in results if r['status'] != 'ok']
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'input_root': str(input_root),
+        'output_root': str(output_root),
+        'workers': workers,
+        'total_seconds': round(time.perf_counter() - batch_start, 3),
+        'lesson_count': len(results),
+        'failure_count': len(failures),
+        'processor_version': PROCESSOR_VERSION,
+        'cache_dir': str(cache_dir) if cache_dir else None,
+        'cache_hits': sum(1 for r in results if r.get('cache') == 'hit'),
+        'cache_misses': sum(1 for r in results if r.get('cache') == 'miss'),
+        'lessons': results
+    }
+
+    Path(output_root).mkdir(parents=True, exist_ok=True)
+    manifest_path = Path(output_root) / MANIFEST_NAME
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    if timing_report:
+        with open(timing_report, 'a', encoding='utf-8') as f:
+            for result in results:
+                for stage in result['stages']:
+                    f.write(json.dumps(stage) + '\n')
+
+    print(f"\n📊 Batch summary:")
+    print(f"   Lessons: {len(results)}")
+    print(f"   Failures: {len(failures)}")
+    if cache_dir:
+        print(f"   Cache: {manifest['cache_hits']} hits, {manifest['cache_misses']} misses")
+    print(f"   Wall time: {manifest['total_seconds']:.2f}s")
+    print(f"   Lesson time: {sum(r['seconds'] for r in results):.2f}s")
+    print(f"✅ Saved manifest to: {manifest_path}")
+    if timing_report:
+        print(f"⏱️ Appended stage timings to: {timing_report}")
+
+    return manifest
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Process every lesson in a directory tree in parallel')
+    parser.add_argument('input_dir', help='Directory containing ElevenLabs JSON + original content lessons')
+    parser.add_argument('-o', '--output-dir', default='../processed', help='Output directory (default: ../processed)')
+    parser.add_argument('-j', '--workers', type=int, help='Number of worker processes (default: CPU count)')
+    parser.add_argument('--config', help='Path to configuration file for edge case handling (default: config.json)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Show per-lesson processor output')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Build cache directory (default: ../.build_cache)')
+    parser.add_argument('--no-cache', action='store_true', help='Reprocess every lesson, ignoring the build cache')
+    parser.add_argument('--prune-cache', action='store_true',
+                        help=f'Delete cache entries from processor versions other than {PROCESSOR_VERSION}')
+    add_output_arguments(parser)
+    add_shard_arguments(parser)
+    add_instrumentation_arguments(parser)
+
+    args = parser.parse_args()
+
+    # Load configuration
+    config = {}
+    config_path = args.config or 'config.json'
+    if Path(config_path).exists():
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+        print(f"📋 Loaded configuration from: {config_path}")
+    try:
+        config = apply_shard_arguments(apply_output_arguments(config, args), args)
+    except ValueError as e:
+        parser.error(str(e))
+
+    cache_dir = None if args.no_cache else args.cache_dir
+    if cache_dir and args.prune_cache:
+        removed = BuildCache(PROCESSOR_VERSION, cache_dir).prune()
+        print(f"🧹 Pruned {removed} stale processor version(s) from {cache_dir}")
+
+    manifest = run_batch(args.input_dir, args.output_dir, config, args.workers, args.verbose, cache_dir,
+                         args.timing_report, args.trace_memory, args.profile_dir)
+    return 1 if manifest['failure_count'] else 0
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Compare compression codecs for the saved lesson outputs
+
+For every lesson found by batch_process.discover_lessons() this script
+processes and saves the lesson, then reports for each output (enhanced JSON
+and lookup JSON, indented and minified, and the binary lookup table) and
+each codec in precompress.CODECS: compressed size, ratio, and median
+compress and decompress time. Codecs whose package is not installed
+(brotli, zstandard) are listed as skipped. Every codec must round-trip.
+"""
+
+import io
+import json
+import statistics
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict, List
+
+from process_elevenlabs_complete_with_paragraphs import ElevenLabsCompleteProcessorWithParagraphs
+from precompress import CODECS, CODEC_SUFFIXES
+from batch_process import discover_lessons
+
+DEFAULT_CONTENT_DIR = Path(__file__).parent.parent / 'tests' / 'test_content'
+
+
+def saved_artifacts(alignment_path: Path, original_path: Path) -> Dict[str, bytes]:
+    """Process and save a lesson; returns each output's bytes, plus minified JSON"""
+    with redirect_stdout(io.StringIO()), tempfile.TemporaryDirectory() as tmp:
+        processor = ElevenLabsCompleteProcessorWithParagraphs(str(alignment_path), str(original_path))
+        output_path = processor.save(processor.process(), str(Path(tmp) / 'lesson.json'))
+        lookup_path = output_path.replace('.json', '_lookup.json')
+        artifacts = {}
+        for name, path in (('content', output_path), ('lookup', lookup_path),
+                           ('lookup.bin', lookup_path.replace('.json', '.bin'))):
+            artifacts[name] = Path(path).read_bytes()
+
+    for name in ('content', 'lookup'):
+        data = json.loads(artifacts[name])
+        artifacts[f'{name} (minified)'] = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return artifacts
+
+
+def _median_ms(function, data: bytes, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function(data)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def benchmark_artifact(data: bytes, repeats: int = 5) -> List[Dict]:
+    """Size and median compress/decompress time of one output under every installed codec"""
+    results = []
+    for codec in CODECS.values():
+        packed = codec.compress(data)
+        if codec.decompress(packed) != data:
+            raise AssertionError(f"{codec.name} did not round-trip")
+        results.append({
+            'codec': codec.name,
+            'bytes': len(packed),
+            'ratio': round(len(data) / len(packed), 2) if packed else 0,
+            'compress_ms': round(_median_ms(codec.compress, data, repeats), 3),
+            'decompress_ms': round(_median_ms(codec.decompress, packed, repeats), 3)
+        })
+    return results
+
+
+def benchmark_lesson(alignment_path: Path, original_path: Path, repeats: int = 5) -> Dict:
+    """Process a lesson and measure every codec on each of its outputs"""
+    artifacts = saved_artifacts(alignment_path, original_path)
+    return {
+        'lesson': alignment_path.stem,
+        'artifacts': [{'artifact': name, 'bytes': len(data), 'codecs': benchmark_artifact(data, repeats)}
+                      for name, data in artifacts.items()]
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare compression codecs for saved lesson outputs')
+    parser.add_argument('content_dir', nargs='?', default=str(DEFAULT_CONTENT_DIR),
+                        help='Directory containing ElevenLabs JSON + markdown lessons')
+    parser.add_argument('--repeats', type=int, default=5, help='Timed runs per codec and output (median is reported)')
+    parser.add_argument('--json', help='Optional path to write results as JSON')
+    args = parser.parse_args()
+
+    skipped = [name for name in CODEC_SUFFIXES if name not in CODECS]
+    if skipped:
+        print(f"⚠️ Skipping codecs without their package installed: {', '.join(skipped)}")
+
+    results = [benchmark_lesson(Path(lesson.alignment_path), Path(lesson.original_path), args.repeats)
+               for lesson in discover_lessons(args.content_dir)]
+
+    totals: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for r in results:
+        print(f"\n📄 {r['lesson']}")
+        print(f"   {'Output':<20} {'Codec':<6} {'Plain':>11} {'Compressed':>11} {'Ratio':>7} "
+              f"{'Compress ms':>12} {'Decompress ms':>14}")
+        for artifact in r['artifacts']:
+            for c in artifact['codecs']:
+                print(f"   {artifact['artifact']:<20} {c['codec']:<6} {artifact['bytes']:>11,} {c['bytes']:>11,} "
+                      f"{c['ratio']:>6.1f}x {c['compress_ms']:>12.2f} {c['decompress_ms']:>14.2f}")
+                total = totals.setdefault(artifact['artifact'], {}).setdefault(
+                    c['codec'], {'plain': 0, 'bytes': 0, 'compress_ms': 0.0, 'decompress_ms': 0.0})
+                total['plain'] += artifact['bytes']
+                for key in ('bytes', 'compress_ms', 'decompress_ms'):
+                    total[key] += c[key]
+
+    print(f"\n📊 All lessons:")
+    for artifact, codecs in totals.items():
+        for codec, total in codecs.items():
+            ratio = total['plain'] / total['bytes'] if total['bytes'] else 0
+            print(f"   {artifact:<20} {codec:<6} {total['plain']:>11,} {total['bytes']:>11,} {ratio:>6.1f}x "
+                  f"{total['compress_ms']:>12.2f} {total['decompress_ms']:>14.2f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Saved results to: {args.json}")
+
+
+if __name__ == '__main__':
+    main()
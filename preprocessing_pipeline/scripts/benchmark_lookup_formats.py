@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Compare the legacy 10ms lookup table with the interval lookup encoding
+
+For every lesson found by batch_process.discover_lessons() this script
+processes the lesson, then reports serialized size and average query latency
+for both formats. It also checks that both formats agree at every tick.
+"""
+
+import io
+import json
+import random
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict
+
+from process_elevenlabs_complete_with_paragraphs import ElevenLabsCompleteProcessorWithParagraphs
+from lookup_table import encode_intervals, find_interval
+from batch_process import discover_lessons
+
+DEFAULT_CONTENT_DIR = Path(__file__).parent.parent / 'tests' / 'test_content'
+
+
+def benchmark_lesson(alignment_path: Path, original_path: Path, queries: int = 100000) -> Dict:
+    """Process a lesson and measure both lookup encodings"""
+    with redirect_stdout(io.StringIO()):
+        processor = ElevenLabsCompleteProcessorWithParagraphs(str(alignment_path), str(original_path))
+        content = processor.process()
+
+    interval_ms = 10
+    total_duration_ms = content['timing']['total_duration_ms']
+    lookup = content['timing']['lookup_table']
+    intervals = encode_intervals(lookup, interval_ms)
+
+    legacy_json = json.dumps({"version": "1.0", "interval": interval_ms,
+                              "totalDurationMs": total_duration_ms, "lookup": lookup})
+    interval_json = json.dumps({"version": "2.0", "interval": interval_ms,
+                                "totalDurationMs": total_duration_ms, "intervals": intervals})
+
+    # Both encodings must agree at every tick and between ticks
+    mismatches = sum(
+        1 for t in range(0, total_duration_ms + 1)
+        if find_interval(intervals, t) != tuple(lookup[t // interval_ms])
+    )
+
+    rng = random.Random(42)
+    positions = [rng.randint(0, total_duration_ms) for _ in range(queries)]
+
+    start = time.perf_counter()
+    for t in positions:
+        entry = lookup[t // interval_ms]
+    legacy_ns = (time.perf_counter() - start) / queries * 1e9
+
+    start = time.perf_counter()
+    for t in positions:
+        entry = find_interval(intervals, t)
+    interval_ns = (time.perf_counter() - start) / queries * 1e9
+
+    return {
+        'lesson': alignment_path.stem,
+        'duration_ms': total_duration_ms,
+        'legacy_entries': len(lookup),
+        'interval_entries': len(intervals['start_ms']),
+        'legacy_bytes': len(legacy_json.encode('utf-8')),
+        'interval_bytes': len(interval_json.encode('utf-8')),
+        'legacy_query_ns': round(legacy_ns, 1),
+        'interval_query_ns': round(interval_ns, 1),
+        'mismatches': mismatches
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare legacy and interval lookup table formats')
+    parser.add_argument('content_dir', nargs='?', default=str(DEFAULT_CONTENT_DIR),
+                        help='Directory containing ElevenLabs JSON + markdown lessons')
+    parser.add_argument('--queries', type=int, default=100000, help='Random lookups per lesson')
+    parser.add_argument('--json', help='Optional path to write results as JSON')
+    args = parser.parse_args()
+
+    results = [benchmark_lesson(Path(lesson.alignment_path), Path(lesson.original_path), args.queries)
+               for lesson in discover_lessons(args.content_dir)]
+
+    print(f"{'Lesson':<52} {'Legacy':>10} {'Intervals':>10} {'Ratio':>7} {'Legacy ns':>10} {'Bisect ns':>10}")
+    for r in results:
+        ratio = r['legacy_bytes'] / r['interval_bytes'] if r['interval_bytes'] else 0
+        print(f"{r['lesson'][:52]:<52} {r['legacy_bytes']:>10,} {r['interval_bytes']:>10,} "
+              f"{ratio:>6.1f}x {r['legacy_query_ns']:>10} {r['interval_query_ns']:>10}")
+        if r['mismatches']:
+            print(f"   ⚠️ {r['mismatches']} positions disagree between formats")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Saved results to: {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark paragraph reconstruction in reconstruct_text_with_paragraphs
+
+Generates synthetic markdown (headers, emphasis, bullets, paragraphs of
+Zipf-distributed words) and the text a narrator would return for it: markup
+dropped, words joined by single spaces, plus a configurable rate of
+substituted, deleted and inserted words. The true paragraph break offsets
+are known, so both the old equal-length splitting and the alignment in
+paragraph_alignment.py are scored on how many breaks they place exactly, and
+timed at several input sizes.
+"""
+
+import json
+import random
+import time
+from typing import Dict, List, Tuple
+
+from paragraph_alignment import paragraph_breaks
+
+DEFAULT_SIZES = [2000, 20000, 200000]
+
+
+def generate_lesson(word_count: int, noise: float = 0.02, seed: int = 42) -> Tuple[List[str], str, List[int]]:
+    """
+    Synthetic original paragraphs, narrated text, and the true break offsets
+
+    Args:
+        word_count: Approximate number of words in the original
+        noise: Fraction of words substituted, and separately of words deleted
+            and inserted, in the narrated text
+        seed: Random seed
+
+    Returns:
+        (markdown paragraphs, narrated text, offsets where paragraphs after the first begin)
+    """
+    rng = random.Random(seed)
+    vocabulary = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(2, 9)))
+                  for _ in range(5000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+
+    def words(n: int) -> List[str]:
+        return rng.choices(vocabulary, weights, k=n)
+
+    paragraphs: List[str] = []
+    spoken: List[List[str]] = []
+    total = 0
+    while total < word_count:
+        kind = rng.random()
+        if kind < 0.1:
+            heading = words(rng.randint(1, 5))
+            paragraphs.append('#' * rng.randint(1, 3) + ' ' + ' '.join(heading).title())
+            spoken.append([w.title() for w in heading])
+        else:
+            sentences = [words(rng.randint(5, 25)) for _ in range(rng.randint(1, 6))]
+            text = ' '.join(' '.join(s).capitalize() + '.' for s in sentences)
+            emphasized = ' '.join(f'**{w}**' if rng.random() < 0.02 else w for w in text.split(' '))
+            paragraphs.append(('- ' if kind < 0.2 else '') + emphasized)
+            spoken.append(text.split(' '))
+        total += len(spoken[-1])
+
+    # Narrate: drop markup, join with spaces, then add noise (never before a paragraph's first word)
+    narrated: List[str] = []
+    breaks = []
+    length = 0  # len(' '.join(narrated))
+    for tokens in spoken:
+        if narrated:
+            breaks.append(length + 1)
+        for position, word in enumerate(tokens):
+            roll = rng.random()
+            if position and roll < noise:
+                continue  # Deleted
+            if roll < 2 * noise:
+                word = rng.choice(vocabulary) + ('.' if word.endswith('.') else '')
+            inserted = [rng.choice(vocabulary)] if rng.random() < noise else []
+            for w in [word] + inserted:
+                length += len(w) + (1 if narrated else 0)
+                narrated.append(w)
+    return paragraphs, ' '.join(narrated), breaks
+
+
+def split_equal_lengths(text: str, paragraph_count: int) -> List[int]:
+    """The old splitting: the sentence end nearest each equal-length share of the text"""
+    sentence_ends = [i + 1 for i in range(1, len(text) - 1) if text[i] in '.!?' and text[i + 1].isspace()]
+    if not sentence_ends:
+        return []
+
+    ideal_length = len(text) / paragraph_count
+    breaks = []
+    current_start = 0
+    for index in range(paragraph_count - 1):
+        target_end = int((index + 1) * ideal_length)
+        best_boundary = None
+        min_distance = float('inf')
+        for boundary in sentence_ends:
+            if boundary > current_start:
+                if abs(boundary - target_end) < min_distance:
+                    min_distance = abs(boundary - target_end)
+                    best_boundary = boundary
+                if boundary > target_end + ideal_length / 2:
+                    break
+        if best_boundary and text[current_start:best_boundary].strip():
+            current_start = best_boundary
+            while current_start < len(text) and text[current_start].isspace():
+                current_start += 1
+            breaks.append(current_start)
+    return breaks
+
+
+def score(found: List[int], truth: List[int]) -> Dict:
+    """How many true breaks were placed exactly, and how many placed breaks are wrong"""
+    exact = len(set(found) & set(truth))
+    return {'breaks': len(found), 'exact': exact, 'wrong': len(found) - exact,
+            'accuracy': round(exact / len(truth), 4) if truth else 1.0}
+
+
+def run_benchmark(word_count: int, noise: float = 0.02, seed: int = 42) -> Dict:
+    """Time and score both reconstruction strategies on the same synthetic lesson"""
+    paragraphs, text, truth = generate_lesson(word_count, noise, seed)
+    result = {'words': word_count, 'characters': len(text), 'paragraphs': len(paragraphs)}
+
+    start = time.perf_counter()
+    aligned = paragraph_breaks(text, paragraphs)
+    result['aligned'] = dict(score(aligned, truth), seconds=round(time.perf_counter() - start, 4))
+
+    start = time.perf_counter()
+    legacy = split_equal_lengths(text, len(paragraphs))
+    result['equal_lengths'] = dict(score(legacy, truth), seconds=round(time.perf_counter() - start, 4))
+    return result
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark paragraph reconstruction')
+    parser.add_argument('--words', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help=f'Synthetic lesson sizes in words (default: {DEFAULT_SIZES})')
+    parser.add_argument('--noise', type=float, default=0.02,
+                        help='Rate of substituted, deleted and inserted words (default: 0.02)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the synthetic lessons')
+    parser.add_argument('--json', help='Optional path to write results as JSON')
+    args = parser.parse_args()
+
+    results = [run_benchmark(words, args.noise, args.seed) for words in args.words]
+
+    for r in results:
+        print(f"\n📄 {r['words']:,} words, {r['characters']:,} characters, {r['paragraphs']:,} paragraphs")
+        for name, label in (('equal_lengths', 'Equal lengths'), ('aligned', 'Aligned')):
+            m = r[name]
+            print(f"   {label:<14} {m['seconds']:>8.3f}s  {m['exact']:,}/{r['paragraphs'] - 1:,} breaks exact "
+                  f"({m['accuracy']:.1%}), {m['wrong']:,} misplaced")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Saved results to: {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the preprocessing pipeline
+
+Synthesizes realistic ElevenLabs alignments (minutes to 10+ hours of speech)
+with numbered/bulleted/colon lists, quotations, abbreviations, URLs, emails
+and equations, then runs ElevenLabsCompleteProcessorWithParagraphs.process()
+under Instrumentation (see instrumentation.py), recording wall time, CPU time
+and peak traced memory per stage.
+
+Results are written as sorted, indented JSON so runs from different commits
+can be diffed directly, or compared with --compare:
+
+    python3 benchmark_pipeline.py --minutes 5 30 -o bench_new.json
+    python3 benchmark_pipeline.py --minutes 5 30 --compare bench_old.json
+"""
+
+import json
+import platform
+import random
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from process_elevenlabs_complete_with_paragraphs import ElevenLabsCompleteProcessorWithParagraphs, PROCESSOR_VERSION
+from lookup_table import np
+from instrumentation import Instrumentation
+
+RESULTS_VERSION = "1.0"
+
+# Stages of ElevenLabsCompleteProcessorWithParagraphs.process(), in order
+STAGES = ['load', 'reconstruct', 'word_extraction', 'gap_elimination', 'structure_detection',
+          'sentence_detection', 'coverage', 'headers', 'lookup']
+
+SPEECH_CHARS_PER_SECOND = 15.5  # measured on tests/test_content
+
+SENTENCES = [
+    'Risk management is the process of identifying, analyzing and treating loss exposures.',
+    'Dr. Smith reviewed the claim with Mr. Jones before 5 p.m. on Friday.',
+    'The insurer, e.g. a mutual company, shares profits with its policyholders.',
+    'She said, "Underwriting is where the value chain begins."',
+    'Premiums rose 5% while the loss ratio fell from 72% to 68%.',
+    'If losses = 200 and premiums = 250, the ratio is 200/250 = 0.8.',
+    'Visit https://www.example.com/risk for more details.',
+    'Questions can be sent to claims@example.com at any time.',
+    'The U.S. market is regulated state by state; the E.U. uses a single framework.',
+    'Why does this matter? Because every decision adds up!',
+    'Consider the following: Avoidance, Prevention, Reduction, and Transfer.',
+    "It's the adjuster's job to investigate—quickly and fairly—every claim.",
+]
+
+LIST_BLOCKS = [
+    ['Key terms include:', 'Exposure', 'Peril', 'Hazard'],
+    ['The steps are:', '1. Identify exposures.', '2. Analyze exposures.', '3. Select techniques.'],
+    ['Common techniques:', '- Avoidance', '- Loss prevention', '- Risk transfer'],
+    ['Options:', 'a) Retain the risk.', 'b) Transfer the risk.'],
+]
+
+
+def generate_lesson(directory: Path, minutes: float, seed: int = 42) -> Tuple[Path, Path]:
+    """
+    Write a synthetic lesson (alignment JSON + markdown) of roughly `minutes` of speech
+
+    Returns:
+        (alignment_path, markdown_path)
+    """
+    rng = random.Random(seed)
+    target_chars = int(minutes * 60 * SPEECH_CHARS_PER_SECOND)
+
+    paragraphs = []
+    size = 0
+    while size < target_chars:
+        if rng.random() < 0.15:
+            block = rng.choice(LIST_BLOCKS)
+        else:
+            block = [' '.join(rng.choice(SENTENCES) for _ in range(rng.randint(2, 6)))]
+        paragraphs.extend(block)
+        size += sum(len(p) + 1 for p in block)
+
+    # ElevenLabs speaks paragraphs as one stream of characters
+    text = ' '.join(paragraphs)
+    characters = list(text)
+    starts = []
+    ends = []
+    t = 0.0
+    for i, char in enumerate(characters):
+        duration = rng.uniform(0.04, 0.09)
+        if char in '.!?' and (i + 1 == len(characters) or characters[i + 1] == ' '):
+            duration += rng.uniform(0.2, 0.6)  # pause after sentences
+        elif char in ',;:':
+            duration += rng.uniform(0.05, 0.2)
+        starts.append(round(t, 3))
+        t += duration
+        ends.append(round(t, 3))
+
+    stem = f"synthetic_{minutes:g}min"
+    alignment_path = directory / f"{stem}.json"
+    markdown_path = directory / f"{stem}.md"
+    with open(alignment_path, 'w', encoding='utf-8') as f:
+        json.dump({'alignment': {
+            'characters': characters,
+            'character_start_times_seconds': starts,
+            'character_end_times_seconds': ends
+        }}, f)
+    with open(markdown_path, 'w', encoding='utf-8') as f:
+        f.write(f"# Synthetic Lesson ({minutes:g} minutes)\n\n" + '\n\n'.join(paragraphs) + '\n')
+
+    return alignment_path, markdown_path
+
+
+def run_stages(alignment_path: Path, markdown_path: Path, track_memory: bool = False) -> Dict:
+    """Run process() once and collect its per-stage records"""
+    instrumentation = Instrumentation(alignment_path.stem, trace_memory=track_memory)
+    try:
+        processor = ElevenLabsCompleteProcessorWithParagraphs(
+            str(alignment_path), str(markdown_path), instrumentation=instrumentation)
+        content = processor.process()
+    finally:
+        instrumentation.close()
+
+    stages = {}
+    for record in instrumentation.records:
+        stage = {
+            'seconds': round(record.wall_seconds, 4),
+            'cpu_seconds': round(record.cpu_seconds, 4)
+        }
+        if record.allocated_mb is not None:
+            stage['peak_mb'] = round(record.allocated_mb, 2)
+            stage['retained_mb'] = round(record.retained_mb, 2)
+        stages[record.stage] = stage
+
+    return {
+        'characters': len(processor.characters),
+        'words': content['metadata']['word_count'],
+        'sentences': len(content['timing']['sentences']),
+        'paragraphs': len(content['paragraphs']),
+        'duration_ms': content['timing']['total_duration_ms'],
+        'stages': stages
+    }
+
+
+def benchmark(minutes: float, seed: int = 42, track_memory: bool = True) -> Dict:
+    """Generate one synthetic lesson and benchmark it (timing pass, then memory pass)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        alignment_path, markdown_path = generate_lesson(Path(tmp), minutes, seed)
+        result = run_stages(alignment_path, markdown_path)
+        result['minutes'] = minutes
+        result['total_seconds'] = round(sum(s['seconds'] for s in result['stages'].values()), 4)
+
+        # tracemalloc slows Python down, so memory is measured in a separate pass
+        if track_memory:
+            memory = run_stages(alignment_path, markdown_path, track_memory=True)
+            result['peak_mb'] = max(stage['peak_mb'] for stage in memory['stages'].values())
+            for name, stage in memory['stages'].items():
+                result['stages'][name]['peak_mb'] = stage['peak_mb']
+                result['stages'][name]['retained_mb'] = stage['retained_mb']
+
+    return result
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def print_results(runs: List[Dict], baseline: Dict = None):
+    """Per-stage table, with change vs. a baseline run of the same length if given"""
+    baseline_runs = {r['minutes']: r for r in (baseline or {}).get('runs', [])}
+    for run in runs:
+        print(f"\n📊 {run['minutes']:g} min: {run['words']:,} words, {run['sentences']:,} sentences, "
+              f"{run['characters']:,} characters")
+        old = baseline_runs.get(run['minutes'])
+        print(f"   {'Stage':<22} {'Wall s':>9} {'CPU s':>9} {'Peak MB':>9}" + (f" {'vs base':>9}" if old else ""))
+        for name in STAGES:
+            stage = run['stages'][name]
+            line = f"   {name:<22} {stage['seconds']:>9.3f} {stage['cpu_seconds']:>9.3f} {stage.get('peak_mb', 0):>9.1f}"
+            if old and name in old['stages'] and old['stages'][name]['seconds']:
+                line += f" {stage['seconds'] / old['stages'][name]['seconds']:>8.2f}x"
+            print(line)
+        print(f"   {'total':<22} {run['total_seconds']:>9.3f} {'':>9} {run.get('peak_mb', 0):>9.1f}")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark every stage of the preprocessing pipeline')
+    parser.add_argument('--minutes', type=float, nargs='+', default=[5, 30],
+                        help='Synthetic lesson lengths in minutes (default: 5 30)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for synthetic content')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc memory pass')
+    parser.add_argument('-o', '--output', default='benchmark_results.json',
+                        help='Results JSON (default: benchmark_results.json)')
+    parser.add_argument('--compare', help='Previous results JSON to compare against')
+    args = parser.parse_args()
+
+    runs = []
+    for minutes in args.minutes:
+        print(f"⏱️ Benchmarking {minutes:g} minutes of synthetic audio...")
+        runs.append(benchmark(minutes, args.seed, track_memory=not args.no_memory))
+
+    results = {
+        'version': RESULTS_VERSION,
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'git_commit': _git_commit(),
+        'processor_version': PROCESSOR_VERSION,
+        'python': platform.python_version(),
+        'numpy': np.__version__ if np is not None else None,
+        'seed': args.seed,
+        'stages': STAGES,
+        'runs': runs
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_results(runs, baseline)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"\n✅ Saved results to: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
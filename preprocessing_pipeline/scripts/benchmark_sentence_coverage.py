@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark word-to-sentence assignment in ensure_continuous_sentence_coverage
+
+Generates synthetic book-length timing (words grouped into sentences with
+pauses between them) and times the linear per-word sentence scan against the
+bisect assignment, checking that both produce identical sentence indices.
+"""
+
+import copy
+import json
+import random
+import time
+from typing import Dict, List, Tuple
+
+from sentence_coverage import close_sentence_gaps, assign_words_to_sentences, _assign_linear
+
+
+def generate_timing(word_count: int = 20000, seed: int = 42) -> Tuple[List[Dict], List[Dict]]:
+    """Synthetic words and sentences, roughly 15 words per sentence"""
+    rng = random.Random(seed)
+    words = []
+    sentences = []
+    t = 0
+    while len(words) < word_count:
+        first = len(words)
+        for _ in range(rng.randint(5, 25)):
+            duration = rng.randint(80, 600)
+            words.append({'word': 'word', 'start_ms': t, 'end_ms': t + duration})
+            t += duration + rng.randint(0, 40)
+        sentences.append({'start_ms': words[first]['start_ms'], 'end_ms': words[-1]['end_ms'],
+                          'word_start_index': first, 'word_end_index': len(words) - 1})
+        t += rng.randint(200, 900)  # pause between sentences
+    return words, sentences
+
+
+def run_benchmark(word_count: int = 20000, seed: int = 42) -> Dict:
+    """Time both assignment strategies on the same synthetic timing"""
+    words, sentences = generate_timing(word_count, seed)
+    close_sentence_gaps(sentences)
+    linear_words = copy.deepcopy(words)
+
+    start = time.perf_counter()
+    assign_words_to_sentences(words, sentences)
+    bisect_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _assign_linear(linear_words, sentences)
+    linear_seconds = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(words, linear_words) if a['sentence_index'] != b['sentence_index'])
+    return {
+        'words': len(words),
+        'sentences': len(sentences),
+        'linear_seconds': round(linear_seconds, 4),
+        'bisect_seconds': round(bisect_seconds, 4),
+        'speedup': round(linear_seconds / bisect_seconds, 1) if bisect_seconds else None,
+        'mismatches': mismatches
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark word-to-sentence assignment')
+    parser.add_argument('--words', type=int, default=20000, help='Synthetic word count (default: 20000)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the synthetic timing')
+    parser.add_argument('--json', help='Optional path to write results as JSON')
+    args = parser.parse_args()
+
+    result = run_benchmark(args.words, args.seed)
+
+    print(f"📄 Timing: {result['words']:,} words, {result['sentences']:,} sentences")
+    print(f"   Linear scan: {result['linear_seconds']:.3f}s")
+    print(f"   Bisect:      {result['bisect_seconds']:.3f}s ({result['speedup']}x faster)")
+    if result['mismatches']:
+        print(f"   ⚠️ {result['mismatches']} words assigned differently")
+    else:
+        print(f"   ✅ Identical sentence indices")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"\n✅ Saved results to: {args.json}")
+
+
+if __name__ == '__main__':
+    main()
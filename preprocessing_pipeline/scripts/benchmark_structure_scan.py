@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark single-pass structure detection against one scan per family
+
+detect_structures() finds lists, quotations, dialog, equations, URLs,
+emails and headers with one finditer over a combined pattern. This script
+times it against the reference detectors in tests/structure_oracle.py, which
+run each family's patterns one after another (how detect_structures used to
+work), on:
+- the markdown of every lesson in tests/test_content, concatenated
+- the same markdown repeated (default 50x, about 1.1M characters)
+- the synthetic document from benchmark_text_index.py
+
+Both must find the same structures; the script reports any difference.
+The per-document TextIndex is built before timing, since both use it.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from edge_case_handlers import EdgeCaseHandlers, TextStructure
+from benchmark_text_index import generate_document
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'tests'))
+
+from structure_oracle import lesson_markdown, multi_scan
+
+
+def _signature(structures: List[TextStructure]) -> List:
+    return sorted((s.type.value, s.start_pos, s.end_pos, s.content, str(s.metadata)) for s in structures)
+
+
+def _best_of(fn: Callable, runs: int) -> float:
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(repeat: int = 50, synthetic_chars: int = 500000, runs: int = 5) -> List[Dict]:
+    """Time both approaches on each document and check they agree"""
+    handlers = EdgeCaseHandlers()
+    markdown = lesson_markdown()
+    documents = [
+        ('test_content', markdown),
+        (f'test_content x{repeat}', '\n\n'.join([markdown] * repeat)),
+        ('synthetic', generate_document(synthetic_chars)),
+    ]
+
+    results = []
+    for name, text in documents:
+        handlers.get_text_index(text)
+        single = handlers.detect_structures(text)
+        multi = multi_scan(handlers, text)
+        single_seconds = _best_of(lambda: handlers.detect_structures(text), runs)
+        multi_seconds = _best_of(lambda: multi_scan(handlers, text), runs)
+        results.append({
+            'document': name,
+            'chars': len(text),
+            'structures': len(single),
+            'multi_scan_ms': round(multi_seconds * 1000, 3),
+            'single_pass_ms': round(single_seconds * 1000, 3),
+            'speedup': round(multi_seconds / single_seconds, 2) if single_seconds else None,
+            'identical': _signature(single) == _signature(multi)
+        })
+    return results
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark single-pass structure detection')
+    parser.add_argument('--repeat', type=int, default=50, help='Copies of the test_content markdown (default: 50)')
+    parser.add_argument('--chars', type=int, default=500000, help='Synthetic document size (default: 500000)')
+    parser.add_argument('--runs', type=int, default=5, help='Timed runs per approach, best is kept (default: 5)')
+    parser.add_argument('--json', help='Optional path to write results as JSON')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.repeat, args.chars, args.runs)
+
+    print(f"   {'Document':<20} {'Chars':>10} {'Structures':>11} {'Multi ms':>10} {'Single ms':>10} {'Speedup':>8}")
+    for r in results:
+        print(f"   {r['document']:<20} {r['chars']:>10,} {r['structures']:>11,} {r['multi_scan_ms']:>10.2f} "
+              f"{r['single_pass_ms']:>10.2f} {r['speedup']:>7.2f}x")
+    if all(r['identical'] for r in results):
+        print("   ✅ Both approaches find identical structures")
+    else:
+        print("   ⚠️ Structures differ between approaches: "
+              + ', '.join(r['document'] for r in results if not r['identical']))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Saved results to: {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-document TextIndex used by EdgeCaseHandlers
+
+Generates a synthetic document (500k characters by default) full of
+semicolons, colons, quotations and code-like fragments, then times the
+semicolon and colon break checks at every candidate position with:
+- the previous per-call implementation (rescans text before/after the position)
+- the indexed implementation (index built once in detect_structures)
+
+Both must agree at every position; the script reports any disagreement.
+"""
+
+import io
+import json
+import random
+import re
+import time
+from contextlib import redirect_stdout
+from typing import Dict
+
+from edge_case_handlers import EdgeCaseHandlers
+
+SENTENCES = [
+    'The insured reported the loss; the adjuster arrived the next day.',
+    'Risk managers consider three options: Avoidance, Reduction, and Transfer.',
+    'She said "the policy covers it; read the endorsement" before leaving.',
+    'The meeting starts at 10:30 and ends at 11:45.',
+    "It's the insurer's duty to respond; it's also good practice.",
+    'Use the formula if (loss > deductible) { pay(loss); } to settle claims.',
+    'Key terms:\nExposure\nPeril\nHazard',
+    'Premiums rose 5% this year; claims fell by 3%.',
+]
+
+
+def generate_document(target_chars: int = 500000, seed: int = 42) -> str:
+    """Build a synthetic lesson text of roughly target_chars characters"""
+    rng = random.Random(seed)
+    parts = []
+    size = 0
+    while size < target_chars:
+        paragraph = ' '.join(rng.choice(SENTENCES) for _ in range(rng.randint(3, 8)))
+        parts.append(paragraph)
+        size += len(paragraph) + 2
+    return '\n\n'.join(parts)[:target_chars]
+
+
+class LegacyChecks:
+    """The per-call checks as they were before TextIndex, for comparison"""
+
+    def __init__(self, handlers: EdgeCaseHandlers):
+        self.handlers = handlers
+
+    def is_within_code(self, text: str, position: int) -> bool:
+        context = text[max(0, position - 50):min(len(text), position + 50)]
+        return bool(self.handlers.patterns['code_snippet'].search(context))
+
+    def is_within_quotes(self, text: str, position: int) -> bool:
+        before_text = text[:position]
+        return (before_text.count('"') + before_text.count("'")) % 2 == 1
+
+    def should_break_at_semicolon(self, text: str, semicolon_pos: int) -> bool:
+        if self.is_within_code(text, semicolon_pos):
+            return False
+        if self.is_within_quotes(text, semicolon_pos):
+            return False
+        return True
+
+    def should_break_at_colon(self, text: str, colon_pos: int) -> bool:
+        after_colon = text[colon_pos + 1:].strip()
+        if after_colon and (after_colon[0].isupper() or after_colon[0].isdigit()):
+            if '\n' in after_colon[:100]:
+                return True
+            words = after_colon.split()[:10]
+            if sum(1 for w in words if w and w[0].isupper()) > 3:
+                return True
+        if colon_pos > 0 and colon_pos < len(text) - 1:
+            if re.compile(r'\d{1,2}:\d{2}').match(text[max(0, colon_pos - 2):colon_pos + 3]):
+                return False
+        return False
+
+
+def run_benchmark(target_chars: int = 500000, seed: int = 42, skip_legacy: bool = False) -> Dict:
+    """Time both implementations over every ';' and ':' in a synthetic document"""
+    text = generate_document(target_chars, seed)
+    with redirect_stdout(io.StringIO()):
+        handlers = EdgeCaseHandlers()
+    legacy = LegacyChecks(handlers)
+
+    semicolons = [m.start() for m in re.finditer(';', text)]
+    colons = [m.start() for m in re.finditer(':', text)]
+
+    start = time.perf_counter()
+    handlers.detect_structures(text)
+    detect_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = handlers.get_text_index(text)
+    indexed = ([handlers.should_break_at_semicolon(text, p) for p in semicolons],
+               [handlers.should_break_at_colon(text, p) for p in colons])
+    indexed_seconds = time.perf_counter() - start
+    assert handlers.get_text_index(text) is index, "index was rebuilt between calls"
+
+    result = {
+        'chars': len(text),
+        'semicolons': len(semicolons),
+        'colons': len(colons),
+        'detect_structures_seconds': round(detect_seconds, 4),
+        'indexed_seconds': round(indexed_seconds, 4),
+    }
+
+    if not skip_legacy:
+        start = time.perf_counter()
+        expected = ([legacy.should_break_at_semicolon(text, p) for p in semicolons],
+                    [legacy.should_break_at_colon(text, p) for p in colons])
+        legacy_seconds = time.perf_counter() - start
+        result['legacy_seconds'] = round(legacy_seconds, 4)
+        result['speedup'] = round(legacy_seconds / indexed_seconds, 1) if indexed_seconds else None
+        result['mismatches'] = (sum(a != b for a, b in zip(indexed[0], expected[0])) +
+                                sum(a != b for a, b in zip(indexed[1], expected[1])))
+
+    return result
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark indexed quote/code/colon checks')
+    parser.add_argument('--chars', type=int, default=500000, help='Synthetic document size (default: 500000)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the synthetic document')
+    parser.add_argument('--skip-legacy', action='store_true', help='Only time the indexed implementation')
+    parser.add_argument('--json', help='Optional path to write results as JSON')
+    args = parser.parse_args()
+
+    result = run_benchmark(args.chars, args.seed, args.skip_legacy)
+
+    print(f"📄 Document: {result['chars']:,} chars, {result['semicolons']:,} semicolons, {result['colons']:,} colons")
+    print(f"   detect_structures (incl. index build): {result['detect_structures_seconds']:.3f}s")
+    print(f"   Indexed checks: {result['indexed_seconds']:.3f}s")
+    if 'legacy_seconds' in result:
+        print(f"   Legacy checks:  {result['legacy_seconds']:.3f}s ({result['speedup']}x slower)")
+        if result['mismatches']:
+            print(f"   ⚠️ {result['mismatches']} positions disagree between implementations")
+        else:
+            print(f"   ✅ Both implementations agree at every position")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"\n✅ Saved results to: {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Incremental Build Cache for Audio Learning App Preprocessing Pipeline
+
+Stores processed lesson content on disk, keyed by a SHA-256 of everything
+that can change the output: the ElevenLabs alignment, the original content,
+the processing configuration, the abbreviation database and the processor
+version string. Re-running a course rebuild then only reprocesses lessons
+whose inputs changed.
+
+Layout:
+    {cache_dir}/{processor_version}/{key[:2]}/{key}.json   cached process() output
+    {cache_dir}/outputs/{path_hash}.json                   last key saved to an output path
+
+Entries from other processor versions are never hit; prune() deletes them.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, List
+
+DEFAULT_CACHE_DIR = str(Path(__file__).parent.parent / '.build_cache')
+
+
+def _hash_file(hasher, path: Optional[str]):
+    """Feed a file's bytes (or a marker when absent) into a hasher"""
+    if path and os.path.exists(path):
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                hasher.update(chunk)
+    else:
+        hasher.update(b'<missing>')
+    hasher.update(b'\0')
+
+
+def _atomic_write_json(path: Path, data: Dict):
+    """Write JSON via a temp file so concurrent workers never see partial entries"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class BuildCache:
+    """Content-hash cache for processed lessons"""
+
+    def __init__(self, processor_version: str, cache_dir: str = DEFAULT_CACHE_DIR):
+        """
+        Initialize cache
+
+        Args:
+            processor_version: Version string of the processor writing entries
+            cache_dir: Directory holding cache entries
+        """
+        if not processor_version or processor_version == 'outputs':
+            raise ValueError("BuildCache requires a processor version string")
+        self.cache_dir = Path(cache_dir)
+        self.processor_version = processor_version
+        self.hits = 0
+        self.misses = 0
+
+    def compute_key(self, input_paths: List[Optional[str]], config: Dict) -> str:
+        """
+        Hash processor version, input files and configuration into a cache key
+
+        Args:
+            input_paths: Files whose content affects the output (missing files hash as a marker)
+            config: Processing configuration (hashed in canonical JSON form)
+        """
+        hasher = hashlib.sha256()
+        hasher.update(self.processor_version.encode('utf-8') + b'\0')
+        for path in input_paths:
+            _hash_file(hasher, path)
+        hasher.update(json.dumps(config or {}, sort_keys=True).encode('utf-8'))
+        return hasher.hexdigest()
+
+    def lesson_key(self, alignment_path: str, original_path: Optional[str], config: Dict) -> str:
+        """Cache key for one lesson: alignment, original content, config and abbreviations"""
+        abbreviations = (config or {}).get('sentence_detection', {}).get('abbreviation_database', 'abbreviations.json')
+        abbreviations_path = Path(__file__).parent / abbreviations
+        return self.compute_key([alignment_path, original_path, str(abbreviations_path)], config)
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / self.processor_version / key[:2] / f"{key}.json"
+
+    def _output_stamp_path(self, output_path: str) -> Path:
+        path_hash = hashlib.sha256(str(Path(output_path).resolve()).encode('utf-8')).hexdigest()
+        return self.cache_dir / 'outputs' / f"{path_hash}.json"
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return cached content for a key, counting the hit or miss"""
+        entry = self._entry_path(key)
+        if entry.exists():
+            try:
+                with open(entry, 'r', encoding='utf-8') as f:
+                    content = json.load(f)
+                self.hits += 1
+                return content
+            except (OSError, ValueError):
+                # Corrupt entry: treat as a miss and let put() overwrite it
+                pass
+        self.misses += 1
+        return None
+
+    def put(self, key: str, content: Dict):
+        """Store processed content under a key"""
+        _atomic_write_json(self._entry_path(key), content)
+
+    def is_output_current(self, output_path: str, key: str, artifacts: List[str]) -> bool:
+        """True if output_path was last saved from this key and all artifacts still exist"""
+        stamp = self._output_stamp_path(output_path)
+        if not stamp.exists() or not all(os.path.exists(p) for p in artifacts):
+            return False
+        try:
+            with open(stamp, 'r', encoding='utf-8') as f:
+                return json.load(f).get('key') == key
+        except (OSError, ValueError):
+            return False
+
+    def record_output(self, output_path: str, key: str):
+        """Remember which key produced the files at output_path"""
+        _atomic_write_json(self._output_stamp_path(output_path), {
+            'output_path': str(Path(output_path).resolve()),
+            'key': key,
+            'processor_version': self.processor_version
+        })
+
+    def prune(self, keep_version: Optional[str] = None) -> int:
+        """
+        Invalidate entries by processor version
+
+        Args:
+            keep_version: Version to keep (default: this cache's version).
+                Pass "" to remove every version.
+
+        Returns:
+            Number of version directories removed
+        """
+        keep = self.processor_version if keep_version is None else keep_version
+        removed = 0
+        if not self.cache_dir.exists():
+            return removed
+        for version_dir in self.cache_dir.iterdir():
+            if version_dir.is_dir() and version_dir.name != 'outputs' and version_dir.name != keep:
+                shutil.rmtree(version_dir)
+                removed += 1
+        if keep == "":
+            shutil.rmtree(self.cache_dir / 'outputs', ignore_errors=True)
+        return removed
+
+    def summary(self) -> str:
+        """Human-readable hit/miss line"""
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0
+        return f"{self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate)"
@@ -0,0 +1,745 @@
+#!/usr/bin/env python3
+"""
+Upload a whole course of preprocessed lessons to Supabase
+
+upload_to_supabase.py handles one learning object per invocation: a new
+client, a Storage upload, one upsert and a verification read of the whole
+`words` JSONB. This script takes a course manifest instead and shares one
+SupabaseRestClient (see supabase_rest.py) across the run:
+
+- Storage uploads (audio and binary lookup tables) run concurrently on a
+  bounded thread pool, each worker reusing its keep-alive connection
+- learning_objects rows are upserted in multi-row batches as lessons finish
+- verification reads a lightweight column projection for all lessons at
+  once instead of every lesson's full `words` JSONB
+
+Re-publishing is incremental. SHA-256 hashes of the enhanced JSON, lookup
+table, audio and the row itself are stored in the row's metadata under
+`uploadHashes`; audio or lookup tables whose hash and Storage path match
+are not re-uploaded, and rows whose hashes all match are not rewritten.
+--force uploads everything.
+
+Audio files of at least --resumable-over MB are sent in resumable chunks
+(see resumable_upload.py), so an interrupted upload continues from the last
+chunk on the next run; -j sets how many files upload at once.
+
+--bundle also packs the course into one download archive (see
+course_bundle.py), uploads it next to the audio as {course_id}.bundle and
+records its URL, SHA-256 and size in the course row's `download_bundle`
+column; an unchanged bundle is not re-uploaded.
+
+--precompressed gzip uploads the .gz variant of each binary lookup table
+written by `batch_process.py --precompress gzip`, with Content-Encoding:
+gzip, so clients download the compressed bytes and decode them
+transparently. Tables without that variant are uploaded as they are.
+
+Course manifest (relative paths are resolved from the manifest's directory):
+
+    {
+      "course_id": "e3d85ff7-...",
+      "assignment_id": "a1b2c3d4-...",
+      "storage_prefix": "courses/CPCU 500/assignments/Risk Management",
+      "lessons": [
+        {"id": "63ad7b78-...", "title": "Risk Management Fundamentals", "order": 1,
+         "enhanced_json": "processed/lesson_1_enhanced.json",
+         "audio_file": "audio/lesson_1.mp3",
+         "lookup_bin": "processed/lesson_1_enhanced_lookup.bin"}
+      ]
+    }
+
+Lessons may override course_id, assignment_id and storage_prefix;
+lookup_json is inlined only when no lookup_bin is given, as in
+upload_to_supabase.py.
+"""
+
+import hashlib
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from course_bundle import build_bundle, course_bundle_entries
+from lookup_table import BINARY_HEADER, decode_binary_lookup
+from precompress import CODEC_SUFFIXES, find_variant
+from supabase_rest import SupabaseRestClient
+from resumable_upload import DEFAULT_CHUNK_SIZE, DEFAULT_STATE_FILE, ResumableUploader, UploadState
+
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    load_dotenv = None
+
+# Storage layout: courses/{course}/assignments/{assignment}/{filename}
+STORAGE_BUCKET = 'course-audio'
+STORAGE_PREFIX = 'courses/CPCU 500/assignments/Risk Management'
+DEFAULT_COURSE_ID = 'e3d85ff7-cb25-4702-b2ba-813e8a24f16d'  # Test course ID
+
+TABLE = 'learning_objects'
+
+# Verification projection: a few scalars instead of the whole words JSONB
+VERIFY_COLUMNS = ('id,total_duration_ms,audio_url,'
+                  'lookup_binary_url:words->lookupTableBinary->>url,'
+                  'lookup_version:words->lookupTable->>version,'
+                  'row_hash:metadata->uploadHashes->>row')
+VERIFY_IDS_PER_REQUEST = 50
+
+# Read before uploading: what is already stored, to skip unchanged uploads
+UPLOAD_HASHES_KEY = 'uploadHashes'
+EXISTING_COLUMNS = (f'id,audio_url,lookup_binary:words->lookupTableBinary,'
+                    f'upload_hashes:metadata->{UPLOAD_HASHES_KEY}')
+
+# Course rows record the published download bundle
+COURSES_TABLE = 'courses'
+BUNDLE_COLUMN = 'download_bundle'
+
+REPORT_VERSION = "1.0"
+
+
+@dataclass
+class LessonUpload:
+    """One learning object from the course manifest"""
+    id: str
+    title: str
+    enhanced_json: str
+    assignment_id: str
+    course_id: str = DEFAULT_COURSE_ID
+    order: int = 0
+    audio_file: Optional[str] = None
+    lookup_json: Optional[str] = None
+    lookup_bin: Optional[str] = None
+    storage_prefix: str = STORAGE_PREFIX
+
+
+def load_course_manifest(path: str) -> List[LessonUpload]:
+    """
+    Read a course manifest into LessonUpload entries
+
+    Args:
+        path: Manifest JSON path
+
+    Returns:
+        Lessons in manifest order
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    base = Path(path).parent
+
+    def resolve(value: Optional[str]) -> Optional[str]:
+        return str(base / value) if value else None
+
+    lessons = []
+    for i, entry in enumerate(manifest.get('lessons', [])):
+        for key in ('id', 'title', 'enhanced_json'):
+            if key not in entry:
+                raise ValueError(f"Lesson {i} in {path} is missing '{key}'")
+        assignment_id = entry.get('assignment_id', manifest.get('assignment_id'))
+        if not assignment_id:
+            raise ValueError(f"Lesson {i} in {path} has no assignment_id")
+        lessons.append(LessonUpload(
+            id=entry['id'],
+            title=entry['title'],
+            enhanced_json=resolve(entry['enhanced_json']),
+            assignment_id=assignment_id,
+            course_id=entry.get('course_id', manifest.get('course_id', DEFAULT_COURSE_ID)),
+            order=entry.get('order', i),
+            audio_file=resolve(entry.get('audio_file')),
+            lookup_json=resolve(entry.get('lookup_json')),
+            lookup_bin=resolve(entry.get('lookup_bin')),
+            storage_prefix=entry.get('storage_prefix', manifest.get('storage_prefix', STORAGE_PREFIX))
+        ))
+    return lessons
+
+
+def audio_storage_name(audio_file_path: str, learning_object_id: str, prefix: str = STORAGE_PREFIX) -> str:
+    """Storage path for a lesson's audio: the file name, lowercased with dashes for spaces"""
+    base_name = os.path.basename(audio_file_path).replace(' ', '-').lower()
+    if not base_name.endswith('.mp3'):
+        base_name = f'{learning_object_id}.mp3'
+    return f'{prefix}/{base_name}'
+
+
+def lookup_storage_name(learning_object_id: str, prefix: str = STORAGE_PREFIX) -> str:
+    """Storage path for a lesson's binary lookup table"""
+    return f'{prefix}/{learning_object_id}_lookup.bin'
+
+
+def lookup_binary_reference(data: bytes, url: str, content_encoding: Optional[str] = None) -> Dict:
+    """words.lookupTableBinary entry for an uploaded binary lookup table (data is the decoded table)"""
+    _, version, _, interval_ms, total_duration_ms, interval_count, _, _ = BINARY_HEADER.unpack_from(data, 0)
+    reference = {
+        'url': url,
+        'sizeBytes': len(data),
+        'formatVersion': version,
+        'interval': interval_ms,
+        'totalDurationMs': total_duration_ms,
+        'intervalCount': interval_count
+    }
+    if content_encoding:
+        # Served with this Content-Encoding; HTTP clients decode it transparently
+        reference['contentEncoding'] = content_encoding
+    return reference
+
+
+def read_lookup_binary(path: str, content_encoding: Optional[str] = None) -> Tuple[bytes, bytes, Optional[str]]:
+    """
+    Read a binary lookup table and the bytes to upload for it
+
+    Args:
+        path: The _lookup.bin file
+        content_encoding: Upload its precompressed variant (see precompress.py) with this
+            codec when save() wrote one; the plain file is uploaded otherwise
+
+    Returns:
+        (decoded table, bytes to upload, Content-Encoding or None)
+
+    Raises:
+        ValueError: If the table is damaged (see decode_binary_lookup), so it is never published
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    decode_binary_lookup(data)
+    variant = find_variant(path, content_encoding)
+    if variant is None:
+        return data, data, None
+    with open(variant, 'rb') as f:
+        return data, f.read(), content_encoding
+
+
+def sha256_hex(data: bytes) -> str:
+    """SHA-256 of in-memory bytes, as hex"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_unchanged(stored_hashes: Dict, hashes: Dict, key: str) -> bool:
+    """Whether an artifact's hash (and Storage path, if it has one) matches the stored upload hashes"""
+    return (key in hashes and stored_hashes.get(key) == hashes[key]
+            and stored_hashes.get(f'{key}Path') == hashes.get(f'{key}Path'))
+
+
+def attach_upload_hashes(record: Dict, hashes: Dict) -> int:
+    """
+    Hash the row itself and store all upload hashes in its metadata
+
+    Args:
+        record: learning_objects row from build_learning_object_record()
+        hashes: Artifact hashes (enhancedJson, lookup, audio, ...); 'row' is added
+
+    Returns:
+        Size of the row in bytes, as serialized for hashing
+    """
+    body = json.dumps(record, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    hashes['row'] = sha256_hex(body)
+    record['metadata'] = {**record['metadata'], UPLOAD_HASHES_KEY: hashes}
+    return len(body)
+
+
+def build_words_data(enhanced_data: Dict) -> Dict:
+    """words JSONB for a learning object, before any lookup table is attached"""
+    timing = enhanced_data.get('timing', {})
+    return {
+        'words': timing.get('words', []),
+        'sentences': timing.get('sentences', []),
+        'totalDurationMs': timing.get('total_duration_ms', 0),
+        'createdAt': enhanced_data.get('metadata', {}).get('generated_at', '')
+    }
+
+
+def build_learning_object_record(enhanced_data: Dict, learning_object_id: str, assignment_id: str,
+                                 title: str, order_index: int, words_data: Dict,
+                                 audio_url: Optional[str], audio_size_bytes: int,
+                                 course_id: str = DEFAULT_COURSE_ID) -> Dict:
+    """
+    learning_objects row for an enhanced JSON
+
+    Args:
+        enhanced_data: Loaded enhanced JSON from preprocessing
+        learning_object_id: UUID of the learning object
+        assignment_id: UUID of the parent assignment
+        title: Title of the learning object
+        order_index: Order within the assignment
+        words_data: words JSONB (see build_words_data), with any lookup table attached
+        audio_url: Public audio URL, or None
+        audio_size_bytes: Audio file size
+        course_id: UUID of the course
+
+    Returns:
+        The row, ready to upsert
+    """
+    timing = enhanced_data.get('timing', {})
+    return {
+        'id': learning_object_id,
+        'assignment_id': assignment_id,
+        'course_id': course_id,
+        'title': title,
+        'display_text': enhanced_data.get('display_text', ''),
+        'order_index': order_index,
+        'total_duration_ms': timing.get('total_duration_ms', 0),
+        'words': words_data,  # JSONB field with lookup table (inline or Storage reference)
+        'sentences': timing.get('sentences', []),  # Separate sentence timings field
+        'metadata': enhanced_data.get('metadata', {}),
+        'paragraphs': enhanced_data.get('paragraphs', []),
+        'headers': enhanced_data.get('headers', []),
+        'formatting': enhanced_data.get('formatting', {}),
+        'audio_url': audio_url or '',  # Required field
+        'audio_size_bytes': audio_size_bytes,  # Required field
+        'audio_format': 'mp3',
+        'audio_codec': 'mp3_128',
+        'content_version': '1.0',  # New versioning column
+        'preprocessing_source': 'elevenlabs-complete-with-paragraphs'  # Track preprocessing source
+    }
+
+
+class BulkUploader:
+    """Uploads many learning objects through one shared client"""
+
+    def __init__(self, client: SupabaseRestClient, workers: int = 8, batch_size: int = 10,
+                 bucket: str = STORAGE_BUCKET, resumable: Optional[ResumableUploader] = None,
+                 resumable_threshold: int = DEFAULT_CHUNK_SIZE, content_encoding: Optional[str] = None):
+        """
+        Args:
+            client: Shared Supabase client
+            workers: Thread pool size for Storage uploads
+            batch_size: learning_objects rows per upsert request
+            bucket: Storage bucket for audio and lookup tables
+            resumable: Chunked uploader for large audio files, or None to always upload in one request
+            resumable_threshold: Audio files of at least this many bytes use the resumable uploader
+            content_encoding: Upload lookup tables precompressed with this codec where save() wrote them
+        """
+        self.client = client
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.bucket = bucket
+        self.resumable = resumable
+        self.resumable_threshold = resumable_threshold
+        self.content_encoding = content_encoding
+
+    def upload_audio(self, audio_file: str, file_name: str, size: int, result: Dict) -> str:
+        """Upload one audio file, in resumable chunks if it is large enough; returns its public URL"""
+        if self.resumable is not None and size >= self.resumable_threshold:
+            url, stats = self.resumable.upload_file(self.bucket, file_name, audio_file, 'audio/mpeg')
+            result['bytes_uploaded'] += stats['bytes_sent']
+            if stats['resumed_from']:
+                result['resumed_from'] = stats['resumed_from']
+            return url
+
+        with open(audio_file, 'rb') as f:
+            data = f.read()
+        url = self.client.upload_object(self.bucket, file_name, data, 'audio/mpeg')
+        result['bytes_uploaded'] += len(data)
+        return url
+
+    def fetch_existing(self, ids: List[str]) -> Dict[str, Dict]:
+        """Upload hashes and Storage references of rows already on the server, by id"""
+        rows = {}
+        for i in range(0, len(ids), VERIFY_IDS_PER_REQUEST):
+            chunk = ','.join(ids[i:i + VERIFY_IDS_PER_REQUEST])
+            for row in self.client.select(TABLE, EXISTING_COLUMNS, {'id': f'in.({chunk})'}):
+                rows[row['id']] = row
+        return rows
+
+    def prepare_lesson(self, lesson: LessonUpload, existing: Optional[Dict] = None) -> Dict:
+        """
+        Upload a lesson's changed Storage objects and build its row (runs on the thread pool)
+
+        Args:
+            lesson: Lesson to upload
+            existing: The lesson's current row from fetch_existing(), if any
+
+        Returns:
+            Result dict with the row under 'record' (absent when the stored row is
+            already identical), or status 'failed' and the error
+        """
+        start = time.perf_counter()
+        result = {'id': lesson.id, 'title': lesson.title, 'status': 'ok', 'warnings': [],
+                  'skipped': [], 'bytes_uploaded': 0, 'bytes_saved': 0}
+        existing = existing or {}
+        stored_hashes = existing.get('upload_hashes') or {}
+        hashes = {}
+        try:
+            with open(lesson.enhanced_json, 'rb') as f:
+                data = f.read()
+            hashes['enhancedJson'] = sha256_hex(data)
+            enhanced_data = json.loads(data)
+            words_data = build_words_data(enhanced_data)
+
+            # Prefer the binary lookup table in Storage over inlining JSON into JSONB
+            if lesson.lookup_bin and os.path.exists(lesson.lookup_bin):
+                data, stored, encoding = read_lookup_binary(lesson.lookup_bin, self.content_encoding)
+                file_name = lookup_storage_name(lesson.id, lesson.storage_prefix)
+                # Hash what is stored, so switching encodings re-uploads the object
+                hashes['lookup'] = sha256_hex(stored)
+                hashes['lookupPath'] = file_name
+                if is_unchanged(stored_hashes, hashes, 'lookup') and existing.get('lookup_binary'):
+                    words_data['lookupTableBinary'] = existing['lookup_binary']
+                    result['skipped'].append('lookup')
+                    result['bytes_saved'] += len(stored)
+                else:
+                    url = self.client.upload_object(self.bucket, file_name, stored, 'application/octet-stream',
+                                                    headers={'Content-Encoding': encoding} if encoding else None)
+                    words_data['lookupTableBinary'] = lookup_binary_reference(data, url, encoding)
+                    result['bytes_uploaded'] += len(stored)
+                result['lookup'] = 'binary'
+            elif lesson.lookup_json and os.path.exists(lesson.lookup_json):
+                with open(lesson.lookup_json, 'rb') as f:
+                    data = f.read()
+                hashes['lookup'] = sha256_hex(data)
+                words_data['lookupTable'] = json.loads(data)
+                result['lookup'] = 'inline'
+            else:
+                result['lookup'] = None
+
+            audio_url = None
+            audio_size_bytes = 0
+            if lesson.audio_file and os.path.exists(lesson.audio_file):
+                file_name = audio_storage_name(lesson.audio_file, lesson.id, lesson.storage_prefix)
+                audio_hash = file_sha256(lesson.audio_file)
+                audio_size_bytes = os.path.getsize(lesson.audio_file)
+                if is_unchanged(stored_hashes, {'audio': audio_hash, 'audioPath': file_name}, 'audio') \
+                        and existing.get('audio_url'):
+                    audio_url = existing['audio_url']
+                    hashes.update(audio=audio_hash, audioPath=file_name)
+                    result['skipped'].append('audio')
+                    result['bytes_saved'] += audio_size_bytes
+                else:
+                    try:
+                        audio_url = self.upload_audio(lesson.audio_file, file_name, audio_size_bytes, result)
+                        # Only recorded once the upload succeeded, so a failed upload is retried next time
+                        hashes.update(audio=audio_hash, audioPath=file_name)
+                    except Exception as e:
+                        # Same fallback as upload_to_supabase.py: point at the expected location
+                        audio_url = self.client.public_url(self.bucket, file_name)
+                        result['warnings'].append(f"Could not upload audio to Storage: {e}")
+            result['audio_url'] = audio_url
+            result['audio_size_bytes'] = audio_size_bytes
+
+            record = build_learning_object_record(
+                enhanced_data, lesson.id, lesson.assignment_id, lesson.title, lesson.order,
+                words_data, audio_url, audio_size_bytes, lesson.course_id)
+            row_size = attach_upload_hashes(record, hashes)
+            result['duration_ms'] = record['total_duration_ms']
+            result['hashes'] = hashes
+            if hashes == stored_hashes:
+                result['skipped'].append('row')
+                result['bytes_saved'] += row_size
+            else:
+                result['record'] = record
+                result['bytes_uploaded'] += row_size
+        except Exception as e:
+            result['status'] = 'failed'
+            result['error'] = f"{type(e).__name__}: {e}"
+            result['traceback'] = traceback.format_exc()
+
+        result['seconds'] = round(time.perf_counter() - start, 3)
+        return result
+
+    def _upsert_batch(self, batch: List[Dict]):
+        try:
+            self.client.upsert_rows(TABLE, [result.pop('record') for result in batch])
+        except Exception as e:
+            for result in batch:
+                result['status'] = 'failed'
+                result['error'] = f"Upsert failed: {type(e).__name__}: {e}"
+
+    def verify(self, results: List[Dict]) -> int:
+        """
+        Check uploaded rows with a column projection, marking each result 'verified'
+
+        Returns:
+            Number of lessons that failed verification
+        """
+        uploaded = [r for r in results if r['status'] == 'ok']
+        rows = {}
+        for i in range(0, len(uploaded), VERIFY_IDS_PER_REQUEST):
+            ids = ','.join(r['id'] for r in uploaded[i:i + VERIFY_IDS_PER_REQUEST])
+            for row in self.client.select(TABLE, VERIFY_COLUMNS, {'id': f'in.({ids})'}):
+                rows[row['id']] = row
+
+        failures = 0
+        for result in uploaded:
+            row = rows.get(result['id'])
+            problems = []
+            if row is None:
+                problems.append('row not found')
+            else:
+                if row.get('total_duration_ms') != result['duration_ms']:
+                    problems.append('total_duration_ms mismatch')
+                if (row.get('audio_url') or None) != result['audio_url']:
+                    problems.append('audio_url mismatch')
+                if result['lookup'] == 'binary' and not row.get('lookup_binary_url'):
+                    problems.append('binary lookup table missing')
+                if result['lookup'] == 'inline' and row.get('lookup_version') is None:
+                    problems.append('inline lookup table missing')
+                if row.get('row_hash') != result['hashes']['row']:
+                    problems.append('row hash mismatch')
+            result['verified'] = not problems
+            if problems:
+                result['verify_errors'] = problems
+                failures += 1
+        return failures
+
+    def upload(self, lessons: List[LessonUpload], verify: bool = True, progress=None,
+               force: bool = False) -> List[Dict]:
+        """
+        Upload every lesson: Storage objects concurrently, rows in batches as lessons finish
+
+        Storage objects and rows whose upload hashes match the server's are skipped.
+
+        Args:
+            lessons: Lessons to upload
+            verify: Read back a projection of every row afterwards
+            progress: Optional callback given each lesson result as its Storage uploads finish
+            force: Upload everything, ignoring the hashes stored on the server
+
+        Returns:
+            Per-lesson results in manifest order
+        """
+        existing = {} if force else self.fetch_existing([lesson.id for lesson in lessons])
+        results = []
+        pending = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self.prepare_lesson, lesson, existing.get(lesson.id)) for lesson in lessons]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                if progress:
+                    progress(result)
+                if 'record' in result:
+                    pending.append(result)
+                    if len(pending) >= self.batch_size:
+                        self._upsert_batch(pending)
+                        pending = []
+        self._upsert_batch(pending)
+
+        order = {lesson.id: i for i, lesson in enumerate(lessons)}
+        results.sort(key=lambda r: order[r['id']])
+        if verify:
+            self.verify(results)
+        return results
+
+
+def client_from_env(timeout: float = 60.0) -> SupabaseRestClient:
+    """Client for SUPABASE_URL / SUPABASE_ANON_KEY (read from .env when python-dotenv is installed)"""
+    if load_dotenv is not None:
+        load_dotenv()
+    url = os.environ.get('SUPABASE_URL')
+    key = os.environ.get('SUPABASE_ANON_KEY')
+    if not url or not key:
+        raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY must be set in environment")
+    return SupabaseRestClient(url, key, timeout)
+
+
+def publish_course_bundle(client: SupabaseRestClient, lessons: List[LessonUpload], bundle_path: str,
+                          bucket: str = STORAGE_BUCKET, resumable: Optional[ResumableUploader] = None,
+                          resumable_threshold: int = DEFAULT_CHUNK_SIZE, force: bool = False) -> Dict:
+    """
+    Build a course's download bundle, upload it and record it on the course row
+
+    Args:
+        client: Shared Supabase client
+        lessons: The course's lessons
+        bundle_path: Local path for the bundle
+        bucket: Storage bucket
+        resumable: Chunked uploader for large bundles, or None
+        resumable_threshold: Bundle size in bytes from which the resumable uploader is used
+        force: Upload and record the bundle even if the course already has this exact one
+
+    Returns:
+        The course's download_bundle record, plus 'skipped' and 'recorded' flags
+    """
+    course_ids = {lesson.course_id for lesson in lessons}
+    if len(course_ids) != 1:
+        raise ValueError(f"A bundle holds exactly one course, got {len(course_ids)}")
+    course_id = course_ids.pop()
+
+    summary = build_bundle(course_bundle_entries(lessons, course_id), bundle_path)
+    storage_name = f"{lessons[0].storage_prefix}/{course_id}.bundle"
+    courses = client.select(COURSES_TABLE, f'id,{BUNDLE_COLUMN}', {'id': f'eq.{course_id}'})
+    stored = (courses[0].get(BUNDLE_COLUMN) if courses else None) or {}
+
+    record = {
+        'url': client.public_url(bucket, storage_name),
+        'path': storage_name,
+        'sha256': summary['sha256'],
+        'sizeBytes': summary['size_bytes'],
+        'formatVersion': summary['format_version'],
+        'lessonCount': len(lessons),
+        'entryCount': summary['entry_count'],
+        'publishedAt': datetime.now(timezone.utc).isoformat()
+    }
+    if not force and stored.get('sha256') == record['sha256'] and stored.get('path') == storage_name:
+        return dict(stored, skipped=True, recorded=True)
+
+    if resumable is not None and summary['size_bytes'] >= resumable_threshold:
+        resumable.upload_file(bucket, storage_name, bundle_path, 'application/octet-stream')
+    else:
+        with open(bundle_path, 'rb') as f:
+            client.upload_object(bucket, storage_name, f.read(), 'application/octet-stream')
+
+    # Only existing courses can record it (the row carries required catalogue fields)
+    if courses:
+        client.update_rows(COURSES_TABLE, {BUNDLE_COLUMN: record}, {'id': f'eq.{course_id}'})
+    return dict(record, skipped=False, recorded=bool(courses))
+
+
+def run_upload(manifest_path: str, client: SupabaseRestClient, workers: int = 8, batch_size: int = 10,
+               verify: bool = True, report_path: Optional[str] = None, force: bool = False,
+               resumable: Optional[ResumableUploader] = None, resumable_threshold: int = DEFAULT_CHUNK_SIZE,
+               bundle_path: Optional[str] = None, content_encoding: Optional[str] = None) -> Dict:
+    """
+    Upload every lesson in a course manifest and print a summary
+
+    Args:
+        manifest_path: Course manifest JSON
+        client: Shared Supabase client
+        workers: Thread pool size for Storage uploads
+        batch_size: Rows per upsert request
+        verify: Verify rows afterwards with a column projection
+        report_path: Optional path for the JSON upload report
+        force: Upload everything, even artifacts whose hashes match the server's
+        resumable: Chunked uploader for large audio files, or None
+        resumable_threshold: Audio size in bytes from which the resumable uploader is used
+        bundle_path: If given, also publish the course download bundle built at this path
+        content_encoding: Upload lookup tables' precompressed variants with this codec, where present
+
+    Returns:
+        The report dictionary
+    """
+    lessons = load_course_manifest(manifest_path)
+    print(f"📚 Uploading {len(lessons)} lessons from {manifest_path}")
+    print(f"   Workers: {workers}, rows per upsert: {batch_size}")
+
+    start = time.perf_counter()
+    done = []
+
+    def progress(result: Dict):
+        done.append(result)
+        icon = "✅" if result['status'] == 'ok' else "❌"
+        unchanged = f" [unchanged: {', '.join(result['skipped'])}]" if result['skipped'] else ""
+        print(f"{icon} [{len(done)}/{len(lessons)}] {result['title']} ({result['seconds']:.2f}s){unchanged}")
+        if result.get('resumed_from'):
+            print(f"   ↪️ Resumed audio upload at {result['resumed_from']:,} bytes")
+        for warning in result['warnings']:
+            print(f"   ⚠️ {warning}")
+        if result['status'] != 'ok':
+            print(f"   {result['error']}")
+
+    uploader = BulkUploader(client, workers, batch_size, resumable=resumable, resumable_threshold=resumable_threshold,
+                            content_encoding=content_encoding)
+    results = uploader.upload(lessons, verify=verify, progress=progress, force=force)
+
+    failures = [r for r in results if r['status'] != 'ok']
+    unverified = [r for r in results if r['status'] == 'ok' and verify and not r.get('verified')]
+    report = {
+        'version': REPORT_VERSION,
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'manifest': str(manifest_path),
+        'workers': workers,
+        'batch_size': batch_size,
+        'total_seconds': round(time.perf_counter() - start, 3),
+        'lesson_count': len(results),
+        'failure_count': len(failures),
+        'unverified_count': len(unverified),
+        'rows_written': sum(1 for r in results if r['status'] == 'ok' and 'row' not in r['skipped']),
+        'bytes_uploaded': sum(r['bytes_uploaded'] for r in results),
+        'bytes_saved': sum(r['bytes_saved'] for r in results),
+        'requests': client.request_count,
+        'connections': client.connections_opened,
+        'lessons': [{k: v for k, v in r.items() if k != 'traceback'} for r in results]
+    }
+
+    for result in failures:
+        if result['error'].startswith('Upsert failed'):
+            print(f"❌ {result['title']}: {result['error']}")
+    for result in unverified:
+        print(f"❌ Verification failed for {result['title']}: {', '.join(result['verify_errors'])}")
+
+    print(f"\n📊 Upload summary:")
+    print(f"   Lessons: {len(results)}")
+    print(f"   Failures: {len(failures)}")
+    if verify:
+        print(f"   Verified: {len(results) - len(failures) - len(unverified)}")
+    print(f"   Rows written: {report['rows_written']}")
+    print(f"   Uploaded: {report['bytes_uploaded']:,} bytes")
+    print(f"   Saved (unchanged): {report['bytes_saved']:,} bytes")
+    if bundle_path:
+        # Bundle only a fully published course, so it never holds lessons the database lacks
+        if failures:
+            print("⚠️ Skipping the download bundle: some lessons failed")
+        else:
+            bundle = publish_course_bundle(client, lessons, bundle_path, resumable=resumable,
+                                           resumable_threshold=resumable_threshold, force=force)
+            report['bundle'] = bundle
+            state = "unchanged" if bundle['skipped'] else f"uploaded to {bundle['path']}"
+            print(f"   Bundle: {bundle['sizeBytes']:,} bytes, {state}")
+            if not bundle['recorded']:
+                print(f"⚠️ Course {lessons[0].course_id} not found; bundle not recorded in {COURSES_TABLE}")
+    print(f"   Requests: {client.request_count} over {client.connections_opened} connection(s)")
+    print(f"   Wall time: {report['total_seconds']:.2f}s")
+
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"✅ Saved upload report to: {report_path}")
+
+    return report
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Upload every lesson in a course manifest to Supabase')
+    parser.add_argument('manifest', help='Course manifest JSON (see module docstring)')
+    parser.add_argument('-j', '--workers', type=int, default=8, help='Concurrent Storage uploads (default: 8)')
+    parser.add_argument('--batch-size', type=int, default=10, help='learning_objects rows per upsert (default: 10)')
+    parser.add_argument('--timeout', type=float, default=60.0, help='Request timeout in seconds (default: 60)')
+    parser.add_argument('--no-verify', action='store_true', help='Skip the verification read')
+    parser.add_argument('--report', help='Optional path to write the upload report as JSON')
+    parser.add_argument('--chunk-size', type=float, default=DEFAULT_CHUNK_SIZE / 2 ** 20,
+                        help='Resumable upload chunk size in MB (default: 6, as Supabase expects)')
+    parser.add_argument('--resumable-over', type=float, default=DEFAULT_CHUNK_SIZE / 2 ** 20,
+                        help='Upload audio of at least this many MB in resumable chunks (default: 6)')
+    parser.add_argument('--upload-state', default=DEFAULT_STATE_FILE,
+                        help=f'Resumable upload progress file (default: {DEFAULT_STATE_FILE})')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-upload audio, lookup tables and rows even if their hashes are unchanged')
+    parser.add_argument('--bundle', nargs='?', const='', metavar='PATH',
+                        help='Also publish the course download bundle (default path: the manifest with .bundle)')
+    parser.add_argument('--precompressed', choices=list(CODEC_SUFFIXES), metavar='CODEC',
+                        help='Upload lookup tables precompressed with this codec (written by --precompress) '
+                             'and serve them with the matching Content-Encoding')
+    args = parser.parse_args()
+
+    client = client_from_env(args.timeout)
+    print(f"✅ Connected to Supabase: {client.url}")
+    resumable = ResumableUploader(client, UploadState(args.upload_state), int(args.chunk_size * 2 ** 20))
+    bundle_path = None
+    if args.bundle is not None:
+        bundle_path = args.bundle or str(Path(args.manifest).with_suffix('.bundle'))
+    try:
+        report = run_upload(args.manifest, client, args.workers, args.batch_size,
+                            verify=not args.no_verify, report_path=args.report, force=args.force,
+                            resumable=resumable, resumable_threshold=int(args.resumable_over * 2 ** 20),
+                            bundle_path=bundle_path, content_encoding=args.precompressed)
+    finally:
+        client.close()
+    return 1 if report['failure_count'] or report['unverified_count'] else 0
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
@@ -0,0 +1,394 @@
+"""
+Chunked Long-Text Synthesis for Audio Learning App Content Generation
+
+Sending a whole lesson in one TTS request caps lesson length at the
+provider's input limit, and one failure re-synthesizes everything. Here the
+text is split into chunks of at most max_chars, which are synthesized
+concurrently through AsyncTTSClient (so every chunk is cached and retried on
+its own) and stitched back together:
+
+1. split_for_synthesis() cuts at paragraph breaks, then sentence ends.
+   Abbreviations are not sentence ends, and no cut lands inside a
+   structure found by EdgeCaseHandlers (a list with its introducing line, a
+   quotation, a URL, ...)
+2. The chunks' MP3 frames are concatenated (ID3 tags and Xing/Info header
+   frames dropped) and each chunk's duration is read from its frame headers
+3. Each chunk's alignment is shifted by the audio before it and joined into
+   one per-character ElevenLabs-shaped alignment over the original text, the
+   format process_elevenlabs_complete_with_paragraphs.py reads. Speechify
+   word speech marks are spread over their characters first, and are also
+   returned shifted for the Speechify-style outputs of the generation scripts
+
+    result = asyncio.run(synthesize_long_text(client, text))
+    json.dump(result.elevenlabs_response(include_audio=False), f)
+"""
+
+import base64
+import re
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from edge_case_handlers import EdgeCaseHandlers, LIST_STRUCTURE_TYPES
+from tts_client import AsyncTTSClient, TTSRequest
+
+DEFAULT_MAX_CHARS = 2000
+
+_PARAGRAPH_BREAK = re.compile(r'\n[ \t]*\n\s*')
+_SENTENCE_END = re.compile(r'[.!?]["\'”’)\]]*(\s+)|\n\s*')
+
+# MPEG audio frame header tables, indexed by (version, layer)
+# version: 3 = MPEG 1, 2 = MPEG 2, 0 = MPEG 2.5; layer: 3 = I, 2 = II, 1 = III
+_BITRATES_KBPS = {
+    (3, 3): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (3, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (3, 1): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 3): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 1): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+@dataclass
+class StitchedSynthesis:
+    """Chunk responses joined into one recording over the original text"""
+    audio: bytes
+    characters: List[str]
+    start_times: List[float]
+    end_times: List[float]
+    speech_marks: List[Dict] = field(default_factory=list)
+    spans: List[Tuple[int, int]] = field(default_factory=list)
+
+    def elevenlabs_response(self, include_audio: bool = True) -> Dict:
+        """ElevenLabs "with timestamps" shape, as read by alignment_loader"""
+        response = {}
+        if include_audio:
+            response['audio_base64'] = base64.b64encode(self.audio).decode('ascii')
+        response['alignment'] = {
+            'characters': self.characters,
+            'character_start_times_seconds': self.start_times,
+            'character_end_times_seconds': self.end_times,
+        }
+        return response
+
+    def speechify_response(self) -> Dict:
+        """Speechify /v1/audio/speech shape (audio_data and word speech marks)"""
+        return {'audio_data': base64.b64encode(self.audio).decode('ascii'), 'speech_marks': self.speech_marks}
+
+
+def _protected_blocks(text: str, handlers: EdgeCaseHandlers) -> List[Tuple[int, int]]:
+    """Merged spans no chunk boundary may cut through"""
+    spans = []
+    for structure in handlers.detect_structures(text):
+        start, end = structure.start_pos, structure.end_pos
+        if structure.type in LIST_STRUCTURE_TYPES:
+            # Keep a list with the line that introduces it ("...include:")
+            line_start = text.rfind('\n', 0, max(0, start - 1)) + 1
+            if start > 0 and text[line_start:start].rstrip().endswith(':'):
+                start = line_start
+        spans.append((start, end, structure.type in LIST_STRUCTURE_TYPES))
+    spans.sort()
+
+    blocks = []
+    for start, end, is_list in spans:
+        if blocks:
+            last_start, last_end, last_list = blocks[-1]
+            # Overlapping spans merge; so do consecutive list items
+            if start < last_end or (is_list and last_list and text[last_end:start].isspace()):
+                blocks[-1] = (last_start, max(last_end, end), last_list and is_list)
+                continue
+        blocks.append((start, end, is_list))
+    return [(start, end) for start, end, _ in blocks]
+
+
+def split_for_synthesis(text: str, max_chars: int = DEFAULT_MAX_CHARS,
+                        handlers: Optional[EdgeCaseHandlers] = None) -> List[Tuple[int, int]]:
+    """
+    Split text into chunks for separate synthesis
+
+    Args:
+        text: Full lesson text
+        max_chars: Preferred maximum chunk length. A single sentence or
+                   structure longer than this becomes one oversized chunk
+                   rather than being cut
+        handlers: EdgeCaseHandlers for abbreviations and structures
+
+    Returns:
+        (start, end) spans of the chunks in text order, without the
+        whitespace between them
+    """
+    if max_chars <= 0:
+        raise ValueError("max_chars must be positive")
+    handlers = handlers or EdgeCaseHandlers()
+    blocks = _protected_blocks(text, handlers)
+    block_starts = [start for start, _ in blocks]
+
+    def is_protected(cut: int, resume: int) -> bool:
+        i = bisect_left(block_starts, cut) - 1
+        return i >= 0 and blocks[i][1] > resume
+
+    def is_abbreviation(match: re.Match) -> bool:
+        punct = match.start()
+        if text[punct] != '.':
+            return False
+        word_start = max(text.rfind(' ', 0, punct), text.rfind('\n', 0, punct)) + 1
+        next_word = text[match.end():match.end() + 30].split(maxsplit=1)
+        return handlers.is_abbreviation(text[word_start:punct + 1], next_word[0] if next_word else None)
+
+    # Candidate boundaries: (end of the chunk's text, start of the next chunk's text)
+    paragraphs = [(m.start(), m.end()) for m in _PARAGRAPH_BREAK.finditer(text)]
+    sentences = []
+    for m in _SENTENCE_END.finditer(text):
+        if m.group(1) is None:
+            sentences.append((m.start(), m.end()))
+        elif not is_abbreviation(m):
+            sentences.append((m.start(1), m.end()))
+    paragraphs = [b for b in paragraphs if not is_protected(*b)]
+    sentences = [b for b in sentences if not is_protected(*b)]
+    candidates = sorted(set(paragraphs + sentences))
+    paragraph_set = set(paragraphs)
+
+    spans = []
+    position = len(text) - len(text.lstrip())
+    text_end = len(text.rstrip())
+    while position < text_end:
+        if text_end - position <= max_chars:
+            spans.append((position, text_end))
+            break
+        limit = position + max_chars
+        fitting = [b for b in candidates if position < b[0] <= limit]
+        # A paragraph break in the second half of the window beats a later sentence end
+        preferred = [b for b in fitting if b in paragraph_set and b[0] >= position + max_chars // 2]
+        if preferred or fitting:
+            cut, resume = (preferred or fitting)[-1]
+        else:
+            later = [b for b in candidates if b[0] > position and b[1] < text_end]
+            if not later:
+                spans.append((position, text_end))
+                break
+            cut, resume = later[0]
+        spans.append((position, cut))
+        position = resume
+    return spans
+
+
+def _frame_info(data: bytes, pos: int) -> Optional[Tuple[int, int, int]]:
+    """(frame length, samples, sample rate) of a valid MPEG audio frame header at pos"""
+    if pos + 4 > len(data) or data[pos] != 0xFF or data[pos + 1] & 0xE0 != 0xE0:
+        return None
+    version = (data[pos + 1] >> 3) & 3
+    layer = (data[pos + 1] >> 1) & 3
+    bitrate_index = data[pos + 2] >> 4
+    rate_index = (data[pos + 2] >> 2) & 3
+    if version == 1 or layer == 0 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    bitrate = _BITRATES_KBPS[(3 if version == 3 else 2, layer)][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    padding = (data[pos + 2] >> 1) & 1
+    if layer == 3:
+        return (12 * bitrate // sample_rate + padding) * 4, 384, sample_rate
+    samples = 576 if layer == 1 and version != 3 else 1152
+    return samples // 8 * bitrate // sample_rate + padding, samples, sample_rate
+
+
+def _strip_tags(data: bytes) -> bytes:
+    """Drop a leading ID3v2 tag and a trailing ID3v1 tag"""
+    if data[:3] == b'ID3' and len(data) >= 10:
+        size = (data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F)
+        data = data[10 + size + (10 if data[5] & 0x10 else 0):]
+    if len(data) >= 128 and data[-128:-125] == b'TAG':
+        data = data[:-128]
+    return data
+
+
+def mp3_frames(data: bytes) -> Iterator[Tuple[int, int, int, int]]:
+    """
+    Audio frames of an MP3 stream
+
+    Returns:
+        (offset, length, samples, sample rate) per frame. Bytes that are not
+        frames (tags, junk) are skipped
+    """
+    pos = 0
+    while pos + 4 <= len(data):
+        info = _frame_info(data, pos)
+        if info is None or pos + info[0] > len(data):
+            pos = data.find(b'\xff', pos + 1)
+            if pos < 0:
+                return
+            continue
+        yield (pos, *info)
+        pos += info[0]
+
+
+def _is_vbr_header(frame: bytes) -> bool:
+    # Xing/Info/VBRI headers sit in the first frame, after the side information
+    return any(tag in frame[:64] for tag in (b'Xing', b'Info', b'VBRI'))
+
+
+def concatenate_mp3(parts: List[bytes]) -> Tuple[bytes, List[Optional[float]]]:
+    """
+    Join MP3 files frame by frame
+
+    Args:
+        parts: MP3 files in playback order
+
+    Returns:
+        (joined audio, duration in seconds per part, or None where a part
+        has no parseable frames and is copied as-is)
+    """
+    output = bytearray()
+    durations = []
+    for part in parts:
+        data = _strip_tags(part)
+        seconds = 0.0
+        frames = 0
+        for offset, length, samples, sample_rate in mp3_frames(data):
+            frame = data[offset:offset + length]
+            if frames == 0 and _is_vbr_header(frame):
+                frames += 1
+                continue  # its frame count describes this part only
+            output += frame
+            seconds += samples / sample_rate
+            frames += 1
+        if frames == 0:
+            output += data
+            durations.append(None)
+        else:
+            durations.append(seconds)
+    return bytes(output), durations
+
+
+def _fill_gaps(starts: List[Optional[float]], ends: List[Optional[float]]):
+    """Give untimed characters evenly spread times between their timed neighbours"""
+    n = len(starts)
+    i = 0
+    while i < n:
+        if starts[i] is not None:
+            i += 1
+            continue
+        j = i
+        while j < n and starts[j] is None:
+            j += 1
+        before = ends[i - 1] if i > 0 else 0.0
+        after = max(before, starts[j]) if j < n else before
+        step = (after - before) / (j - i)
+        for k in range(i, j):
+            starts[k] = before + step * (k - i)
+            ends[k] = before + step * (k - i + 1)
+        i = j
+
+
+def response_alignment(response: Dict, chunk_text: str) -> Tuple[List[str], List[float], List[float]]:
+    """
+    Per-character alignment of one TTS response
+
+    Args:
+        response: ElevenLabs response (alignment) or Speechify response (word speech_marks)
+        chunk_text: Text the response was synthesized from
+
+    Returns:
+        (characters, start times, end times) in seconds
+    """
+    alignment = response.get('alignment')
+    if alignment:
+        return (list(alignment['characters']), list(alignment['character_start_times_seconds']),
+                list(alignment['character_end_times_seconds']))
+
+    n = len(chunk_text)
+    starts: List[Optional[float]] = [None] * n
+    ends: List[Optional[float]] = [None] * n
+    for mark in response.get('speech_marks') or []:
+        if not isinstance(mark, dict) or mark.get('type') != 'word':
+            continue
+        char_start, char_end = mark.get('start', 0), min(mark.get('end', 0), n)
+        if char_end <= char_start:
+            continue
+        begin = mark['time'] / 1000
+        step = (mark.get('end_time', mark['time'] + 200) / 1000 - begin) / (char_end - char_start)
+        for i in range(char_start, char_end):
+            starts[i] = begin + step * (i - char_start)
+            ends[i] = begin + step * (i - char_start + 1)
+    _fill_gaps(starts, ends)
+    return list(chunk_text), starts, ends
+
+
+def _response_audio(response: Dict) -> bytes:
+    return base64.b64decode(response.get('audio_base64') or response.get('audio_data') or '')
+
+
+def stitch_responses(text: str, spans: List[Tuple[int, int]], responses: List[Dict]) -> StitchedSynthesis:
+    """
+    Join chunk responses into one recording and one alignment over text
+
+    Args:
+        text: Full text the spans index into
+        spans: Chunk spans from split_for_synthesis
+        responses: One TTS response per span
+
+    Returns:
+        StitchedSynthesis whose characters spell out text[spans[0][0]:spans[-1][1]]
+    """
+    audio, durations = concatenate_mp3([_response_audio(response) for response in responses])
+
+    characters: List[str] = []
+    starts: List[float] = []
+    ends: List[float] = []
+    speech_marks = []
+    offset = 0.0
+    previous_end = spans[0][0] if spans else 0
+
+    for (start, end), response, duration in zip(spans, responses, durations):
+        # Whitespace between chunks is spread over the pause before this chunk
+        gap = text[previous_end:start]
+        before = ends[-1] if ends else 0.0
+        for k, char in enumerate(gap):
+            characters.append(char)
+            starts.append(before + (offset - before) * k / len(gap))
+            ends.append(before + (offset - before) * (k + 1) / len(gap))
+
+        chunk_chars, chunk_starts, chunk_ends = response_alignment(response, text[start:end])
+        characters.extend(chunk_chars)
+        starts.extend(t + offset for t in chunk_starts)
+        ends.extend(t + offset for t in chunk_ends)
+
+        offset_ms = round(offset * 1000)
+        for mark in response.get('speech_marks') or []:
+            if isinstance(mark, dict) and mark.get('type') == 'word':
+                shifted = dict(mark, time=mark['time'] + offset_ms, start=mark.get('start', 0) + start,
+                               end=mark.get('end', 0) + start)
+                if 'end_time' in mark:
+                    shifted['end_time'] = mark['end_time'] + offset_ms
+                speech_marks.append(shifted)
+
+        chunk_seconds = duration if duration is not None else (chunk_ends[-1] if chunk_ends else 0.0)
+        offset = max(offset + chunk_seconds, ends[-1] if ends else 0.0)
+        previous_end = end
+
+    return StitchedSynthesis(audio, characters, starts, ends, speech_marks, list(spans))
+
+
+async def synthesize_long_text(client: AsyncTTSClient, text: str, voice: str = 'henry',
+                               model: str = 'simba-turbo', speed: float = 1.0,
+                               max_chars: int = DEFAULT_MAX_CHARS,
+                               handlers: Optional[EdgeCaseHandlers] = None) -> StitchedSynthesis:
+    """
+    Synthesize text of any length as concurrently requested chunks
+
+    Args:
+        client: TTS client (its concurrency, rate limit, retries and cache apply per chunk)
+        text: Full lesson text
+        voice: Voice id
+        model: TTS model
+        speed: Speaking rate
+        max_chars: Preferred maximum characters per request
+        handlers: EdgeCaseHandlers used to choose chunk boundaries
+
+    Returns:
+        StitchedSynthesis with the joined audio and alignment
+    """
+    spans = split_for_synthesis(text, max_chars, handlers)
+    responses = await client.synthesize_all([TTSRequest(text[start:end], voice, model, speed)
+                                             for start, end in spans])
+    return stitch_responses(text, spans, responses)
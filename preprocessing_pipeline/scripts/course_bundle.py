@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Course Download Bundles for Audio Learning App
+
+Downloading a course lesson by lesson means several small requests per
+lesson (audio, enhanced JSON, lookup tables), and on mobile networks the
+per-request overhead dominates. This stage packs every file of a course into
+one indexed archive that the app downloads once, then reads entries from by
+offset (memory-mapped, or fetched with HTTP range requests).
+
+Bundle format (`.bundle`, all integers little-endian):
+
+    offset    size   field
+    0         4      magic b"ACBN"
+    4         2      format version (uint16, currently 1)
+    6         2      flags (uint16, reserved, 0)
+    8         4      entry count n (uint32)
+    12        4      name table size s (uint32)
+    16        8      data offset (uint64): start of the first payload
+    24        64n    file table, one 64-byte record per entry:
+                       +0   8   payload offset from the start of the bundle (uint64)
+                       +8   8   stored length (uint64)
+                       +16  8   original length (uint64)
+                       +24  4   name offset within the name table (uint32)
+                       +28  2   name length (uint16)
+                       +30  1   compression (0 = stored, 1 = zlib)
+                       +31  1   reserved
+                       +32  32  SHA-256 of the original (uncompressed) bytes
+    24+64n    s      name table: UTF-8 entry names, back to back
+    ...              payloads, each starting on an 8-byte boundary
+
+Entries of a course bundle:
+
+    manifest.json            course id and lessons (id, title, order, entry names)
+    {lesson_id}/content.json enhanced JSON from save()
+    {lesson_id}/audio.mp3    stored as-is (MP3 does not compress)
+    {lesson_id}/lookup.json  when the lesson has one
+    {lesson_id}/lookup.bin   binary lookup table, when the lesson has one
+
+With compression on, every other entry is zlib-compressed when that makes
+it smaller. bulk_upload.py --bundle builds, uploads and records the bundle.
+
+Usage:
+    python course_bundle.py course.json -o course.bundle
+    python course_bundle.py --list course.bundle
+"""
+
+import hashlib
+import json
+import os
+import struct
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Tuple, Union
+
+BUNDLE_MAGIC = b"ACBN"
+BUNDLE_VERSION = 1
+BUNDLE_HEADER = struct.Struct('<4sHHIIQ')
+BUNDLE_ENTRY = struct.Struct('<QQQIHBB32s')
+PAYLOAD_ALIGNMENT = 8
+MANIFEST_ENTRY = 'manifest.json'
+MANIFEST_VERSION = "1.0"
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+
+# Already-compressed formats are always stored
+STORED_SUFFIXES = ('.mp3', '.m4a', '.aac', '.ogg', '.opus')
+
+COPY_CHUNK_SIZE = 1 << 20
+
+# An entry's source: a file path, or the bytes themselves
+Source = Union[str, bytes]
+
+
+@dataclass
+class BundleEntry:
+    """One record of a bundle's file table"""
+    name: str
+    offset: int
+    stored_length: int
+    length: int
+    compression: int
+    sha256: str
+
+
+def _padding(position: int) -> int:
+    return -position % PAYLOAD_ALIGNMENT
+
+
+def _write_entry(out: BinaryIO, name: str, source: Source, compress: bool) -> Tuple[int, int, int, bytes]:
+    """Write one payload at the current position; returns (stored length, length, compression, digest)"""
+    if compress and not name.lower().endswith(STORED_SUFFIXES):
+        if isinstance(source, str):
+            with open(source, 'rb') as f:
+                source = f.read()
+        packed = zlib.compress(source, 9)
+        if len(packed) < len(source):
+            out.write(packed)
+            return len(packed), len(source), COMPRESSION_ZLIB, hashlib.sha256(source).digest()
+
+    if isinstance(source, bytes):
+        out.write(source)
+        return len(source), len(source), COMPRESSION_NONE, hashlib.sha256(source).digest()
+
+    # Large files (audio) are copied in chunks, hashed on the way
+    digest = hashlib.sha256()
+    length = 0
+    with open(source, 'rb') as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b''):
+            out.write(chunk)
+            digest.update(chunk)
+            length += len(chunk)
+    return length, length, COMPRESSION_NONE, digest.digest()
+
+
+def build_bundle(entries: List[Tuple[str, Source]], output_path: str, compress: bool = True) -> Dict:
+    """
+    Pack files into a bundle
+
+    Args:
+        entries: (entry name, file path or bytes) in bundle order
+        output_path: Bundle file to write (replaced atomically)
+        compress: zlib-compress entries where that makes them smaller
+
+    Returns:
+        Summary with path, size_bytes, sha256 (of the whole bundle) and entry_count
+    """
+    names = [name.encode('utf-8') for name, _ in entries]
+    if len(set(names)) != len(names):
+        raise ValueError("Bundle entry names must be unique")
+    name_table = b''.join(names)
+    table_end = BUNDLE_HEADER.size + BUNDLE_ENTRY.size * len(entries) + len(name_table)
+    data_offset = table_end + _padding(table_end)
+
+    records = []
+    tmp_path = f"{output_path}.tmp"
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with open(tmp_path, 'wb') as out:
+            # Payloads first; the header and file table are filled in once their offsets are known
+            out.seek(data_offset)
+            name_offset = 0
+            for (name, source), encoded in zip(entries, names):
+                offset = out.tell()
+                stored_length, length, compression, digest = _write_entry(out, name, source, compress)
+                out.write(bytes(_padding(out.tell())))
+                records.append(BUNDLE_ENTRY.pack(offset, stored_length, length, name_offset, len(encoded),
+                                                 compression, 0, digest))
+                name_offset += len(encoded)
+
+            out.seek(0)
+            out.write(BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, 0, len(entries), len(name_table),
+                                         data_offset))
+            out.write(b''.join(records))
+            out.write(name_table)
+            out.write(bytes(data_offset - table_end))
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    digest = hashlib.sha256()
+    with open(output_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return {
+        'path': str(output_path),
+        'size_bytes': os.path.getsize(output_path),
+        'sha256': digest.hexdigest(),
+        'entry_count': len(entries),
+        'format_version': BUNDLE_VERSION
+    }
+
+
+def read_bundle_index(path: str) -> List[BundleEntry]:
+    """Read a bundle's file table (only the header and table are read)"""
+    with open(path, 'rb') as f:
+        header = f.read(BUNDLE_HEADER.size)
+        if len(header) < BUNDLE_HEADER.size:
+            raise ValueError(f"Not a course bundle (too short): {path}")
+        magic, version, _, count, names_size, _ = BUNDLE_HEADER.unpack(header)
+        if magic != BUNDLE_MAGIC:
+            raise ValueError(f"Not a course bundle (magic {magic!r})")
+        if version > BUNDLE_VERSION:
+            raise ValueError(f"Unsupported bundle version: {version}")
+        table = f.read(BUNDLE_ENTRY.size * count)
+        name_table = f.read(names_size)
+
+    entries = []
+    for i in range(count):
+        offset, stored_length, length, name_offset, name_length, compression, _, digest = \
+            BUNDLE_ENTRY.unpack_from(table, i * BUNDLE_ENTRY.size)
+        name = name_table[name_offset:name_offset + name_length].decode('utf-8')
+        entries.append(BundleEntry(name, offset, stored_length, length, compression, digest.hex()))
+    return entries
+
+
+def read_bundle_entry(path: str, entry: BundleEntry, verify: bool = True) -> bytes:
+    """
+    Read one entry's original bytes
+
+    Raises:
+        ValueError: If verify is set and the bytes do not match the entry's hash
+    """
+    with open(path, 'rb') as f:
+        f.seek(entry.offset)
+        data = f.read(entry.stored_length)
+    if entry.compression == COMPRESSION_ZLIB:
+        data = zlib.decompress(data)
+    elif entry.compression != COMPRESSION_NONE:
+        raise ValueError(f"Unknown compression {entry.compression} for {entry.name}")
+    if verify and (len(data) != entry.length or hashlib.sha256(data).hexdigest() != entry.sha256):
+        raise ValueError(f"Bundle entry {entry.name} is corrupt")
+    return data
+
+
+def course_bundle_entries(lessons: List, course_id: str) -> List[Tuple[str, Source]]:
+    """
+    Entries for a course bundle
+
+    Args:
+        lessons: LessonUpload entries from bulk_upload.load_course_manifest()
+        course_id: Course the bundle belongs to
+
+    Returns:
+        (entry name, source) pairs, manifest.json first
+    """
+    files = []
+    manifest_lessons = []
+    for lesson in sorted(lessons, key=lambda lesson: lesson.order):
+        lesson_files = {'content': f"{lesson.id}/content.json"}
+        files.append((lesson_files['content'], lesson.enhanced_json))
+        for key, source, name in (('audio', lesson.audio_file, 'audio.mp3'),
+                                  ('lookup', lesson.lookup_json, 'lookup.json'),
+                                  ('lookupBinary', lesson.lookup_bin, 'lookup.bin')):
+            if source and os.path.exists(source):
+                lesson_files[key] = f"{lesson.id}/{name}"
+                files.append((lesson_files[key], source))
+        manifest_lessons.append({'id': lesson.id, 'title': lesson.title, 'order': lesson.order,
+                                 'files': lesson_files})
+
+    manifest = {'version': MANIFEST_VERSION, 'courseId': course_id, 'lessons': manifest_lessons}
+    return [(MANIFEST_ENTRY, json.dumps(manifest, ensure_ascii=False).encode('utf-8'))] + files
+
+
+def main():
+    import argparse
+    from bulk_upload import load_course_manifest
+
+    parser = argparse.ArgumentParser(description='Pack a course into one download bundle')
+    parser.add_argument('path', help='Course manifest JSON (see bulk_upload.py), or a bundle with --list')
+    parser.add_argument('-o', '--output', help='Bundle file (default: the manifest path with .bundle)')
+    parser.add_argument('--no-compress', action='store_true', help='Store every entry uncompressed')
+    parser.add_argument('--list', action='store_true', help='Print the file table of an existing bundle')
+    args = parser.parse_args()
+
+    if args.list:
+        for entry in read_bundle_index(args.path):
+            method = 'zlib' if entry.compression == COMPRESSION_ZLIB else 'stored'
+            print(f"{entry.offset:>12,} {entry.stored_length:>12,} {entry.length:>12,} {method:<6} {entry.name}")
+        return 0
+
+    lessons = load_course_manifest(args.path)
+    if not lessons:
+        print(f"❌ No lessons in {args.path}")
+        return 1
+    output = args.output or str(Path(args.path).with_suffix('.bundle'))
+    summary = build_bundle(course_bundle_entries(lessons, lessons[0].course_id), output,
+                           compress=not args.no_compress)
+    print(f"✅ Bundled {len(lessons)} lessons ({summary['entry_count']} entries) into {output}")
+    print(f"   Size: {summary['size_bytes']:,} bytes, SHA-256: {summary['sha256']}")
+    return 0
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
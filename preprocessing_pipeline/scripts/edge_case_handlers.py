@@ -14,7 +14,9 @@ Edge cases handled:
 - Structural elements (headers, captions)
 """
 
+import heapq
 import re
+from bisect import bisect_left, bisect_right
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
@@ -46,9 +48,191 @@ class TextStructure:
     metadata: Dict = None
 
 
+LIST_STRUCTURE_TYPES = (StructureType.COLON_LIST, StructureType.NUMBERED_LIST,
+                        StructureType.BULLETED_LIST, StructureType.LETTERED_LIST)
+
+# Where structures overlap, higher ranks win. This is the order the detectors
+# originally ran in (lists, quotations, dialog, maths, URLs, emails, headers),
+# so a list sorted by position resolves overlaps exactly as before.
+STRUCTURE_PRECEDENCE = {
+    StructureType.COLON_LIST: 0,
+    StructureType.NUMBERED_LIST: 1,
+    StructureType.BULLETED_LIST: 1,
+    StructureType.LETTERED_LIST: 1,
+    StructureType.QUOTATION: 2,
+    StructureType.DIALOG: 3,
+    StructureType.EQUATION: 4,
+    StructureType.URL: 5,
+    StructureType.EMAIL: 6,
+    StructureType.HEADER: 7,
+}
+
+
+class StructureIndex:
+    """
+    Sorted interval index over TextStructure spans
+
+    Resolves overlapping spans once into non-overlapping segments, each owned
+    by a single structure, so position lookups are a bisect and memory grows
+    with the number of structures rather than the characters they cover.
+
+    Precedence: where spans overlap, the structure that comes later in the
+    input list wins. With a precedence map (e.g. STRUCTURE_PRECEDENCE), the
+    higher-ranked type wins first and input order only breaks ties.
+    """
+
+    def __init__(self, structures: List[TextStructure], precedence: Optional[Dict[StructureType, int]] = None):
+        self.starts = []
+        self.ends = []
+        self.owners = []
+
+        count = len(structures)
+        spans = [(s.start_pos, s.end_pos, order + (precedence.get(s.type, 0) * count if precedence else 0), s)
+                 for order, s in enumerate(structures) if s.end_pos > s.start_pos]
+        boundaries = sorted({pos for start, end, _, _ in spans for pos in (start, end)})
+        spans.sort(key=lambda span: span[0])
+
+        active = []  # max-heap on priority: (-priority, end, structure)
+        next_span = 0
+        for segment_start, segment_end in zip(boundaries, boundaries[1:]):
+            while next_span < len(spans) and spans[next_span][0] <= segment_start:
+                start, end, priority, structure = spans[next_span]
+                heapq.heappush(active, (-priority, end, structure))
+                next_span += 1
+            while active and active[0][1] <= segment_start:
+                heapq.heappop(active)
+            if not active:
+                continue
+
+            owner = active[0][2]
+            if self.owners and self.owners[-1] is owner and self.ends[-1] == segment_start:
+                self.ends[-1] = segment_end
+            else:
+                self.starts.append(segment_start)
+                self.ends.append(segment_end)
+                self.owners.append(owner)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def find(self, position: int) -> Optional[TextStructure]:
+        """Structure covering position (start_pos <= position < end_pos), if any"""
+        i = bisect_right(self.starts, position) - 1
+        if i >= 0 and position < self.ends[i]:
+            return self.owners[i]
+        return None
+
+    def segments(self) -> List[Tuple[int, int, TextStructure]]:
+        """Non-overlapping (start, end, structure) segments in text order"""
+        return list(zip(self.starts, self.ends, self.owners))
+
+
+class TextIndex:
+    """
+    Per-document index for position queries used during sentence detection
+
+    Built once per text in O(n) so that quote, code and colon checks no longer
+    rescan the document on every call:
+    - quote parity prefix array: is_within_quotes() in O(1)
+    - code snippet matches with suffix minima: is_within_code() in O(log n)
+    - bounded look-ahead after a colon instead of slicing the whole remainder
+    - line table (lines and their start offsets) shared by line-based detectors
+    """
+
+    QUOTE_CHARS = '"\''
+    WORD_PATTERN = re.compile(r'\S+')
+    CODE_WINDOW = 50
+
+    def __init__(self, text: str, code_pattern: re.Pattern):
+        self.text = text
+        self.length = len(text)
+        self.rstrip_length = len(text.rstrip())
+
+        # line_starts[i] is the offset of lines[i] in text
+        self.lines = text.split('\n')
+        self.line_starts = []
+        offset = 0
+        for line in self.lines:
+            self.line_starts.append(offset)
+            offset += len(line) + 1  # +1 for newline
+
+        # quote_parity[i] is 1 when text[:i] contains an odd number of quotes
+        parity = bytearray(self.length + 1)
+        odd = 0
+        for i, char in enumerate(text):
+            if char in self.QUOTE_CHARS:
+                odd ^= 1
+            parity[i + 1] = odd
+        self.quote_parity = parity
+
+        # Every position where a code snippet starts, with the end of its
+        # shortest match; suffix minima answer "any snippet inside a window?"
+        lookahead = re.compile(f'(?=({code_pattern.pattern}))', code_pattern.flags)
+        self.code_starts = []
+        code_ends = []
+        for match in lookahead.finditer(text):
+            # The trailing \s*{? is optional, so the shortest match ends at ')'
+            snippet = match.group(1).rstrip('{').rstrip()
+            self.code_starts.append(match.start())
+            code_ends.append(match.start() + len(snippet))
+        self.code_min_end = code_ends[:]
+        for i in range(len(code_ends) - 2, -1, -1):
+            self.code_min_end[i] = min(self.code_min_end[i], self.code_min_end[i + 1])
+
+    def _slice_end(self, position: int) -> int:
+        """Clamp a position the way text[:position] would"""
+        if position < 0:
+            return max(0, self.length + position)
+        return min(position, self.length)
+
+    def is_within_quotes(self, position: int) -> bool:
+        """Odd number of quote characters before position"""
+        return self.quote_parity[self._slice_end(position)] == 1
+
+    def is_within_code(self, position: int) -> bool:
+        """A code snippet fits inside the +/-50 character window around position"""
+        window_start = self._slice_end(max(0, position - self.CODE_WINDOW))
+        window_end = self._slice_end(min(self.length, position + self.CODE_WINDOW))
+        i = bisect_left(self.code_starts, window_start)
+        return i < len(self.code_starts) and self.code_min_end[i] <= window_end
+
+    def after_colon(self, colon_pos: int, max_chars: int = 100, max_words: int = 10) -> Tuple[str, List[str]]:
+        """
+        Leading characters and words of text[colon_pos + 1:].strip()
+
+        Returns the same prefix and first words as stripping and splitting the
+        whole remainder, but only touches the characters it returns.
+        """
+        start = colon_pos + 1
+        if start < 0:
+            start = max(0, self.length + start)
+        first = self.WORD_PATTERN.search(self.text, start)
+        if not first or first.start() >= self.rstrip_length:
+            return '', []
+        begin = first.start()
+        prefix = self.text[begin:min(begin + max_chars, self.rstrip_length)]
+        words = []
+        for match in self.WORD_PATTERN.finditer(self.text, begin, self.rstrip_length):
+            words.append(match.group())
+            if len(words) >= max_words:
+                break
+        return prefix, words
+
+
 class EdgeCaseHandlers:
     """Handles edge cases in sentence detection"""
 
+    # Characters a structure can start at in the single-pass scanner: newline
+    # (line-based families), quotes, digits (equations), capitals (formulas),
+    # 'h'/'w' (URLs) and '@' (emails)
+    STRUCTURE_TRIGGERS = r'[\n"\'\dA-Zhw@]'
+    EMAIL_LOCAL_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789._%+-')
+    LIST_MARKER_TYPES = {
+        'numbered': StructureType.NUMBERED_LIST,
+        'bulleted': StructureType.BULLETED_LIST,
+        'lettered': StructureType.LETTERED_LIST,
+    }
+
     def __init__(self, config: Dict = None):
         """
         Initialize edge case handlers with configuration
@@ -57,6 +241,7 @@ class EdgeCaseHandlers:
             config: Configuration dictionary for customization
         """
         self.config = config or {}
+        self.text_index = None
         self.load_abbreviations()
         self.init_patterns()
 
@@ -86,6 +271,9 @@ class EdgeCaseHandlers:
             'numbered_list': re.compile(r'^(\d+)[.)] '),
             'lettered_list': re.compile(r'^([a-z])[.)] ', re.IGNORECASE),
             'bulleted_list': re.compile(r'^[•·▪▫◦‣⁃\-*+] '),
+            # All list item markers in one pass (markers are mutually exclusive)
+            'list_item': re.compile(r'^(?:(?P<numbered>\d+[.)] )|(?P<bulleted>[•·▪▫◦‣⁃\-*+] )|'
+                                    r'(?P<lettered>[a-z][.)] ))', re.IGNORECASE),
 
             # Quotation patterns
             'quote_start': re.compile(r'["\'""'']'),
@@ -111,193 +299,202 @@ class EdgeCaseHandlers:
             # Structural elements
             'header': re.compile(r'^(Chapter|Section|Part)\s+\d+[:.]\s*', re.IGNORECASE),
             'figure_caption': re.compile(r'^(Figure|Table|Chart|Graph)\s+\d+[:.]\s*', re.IGNORECASE),
+
+            # Time format around a colon
+            'time': re.compile(r'\d{1,2}:\d{2}'),
         }
 
+        # Every structure family in one regex (see detect_structures)
+        self.patterns['structure_scan'], self.patterns['first_line'] = self.build_structure_scanner()
+
+    def build_structure_scanner(self) -> Tuple[re.Pattern, re.Pattern]:
+        """
+        Combine the structure detectors into one regex for a single finditer pass
+
+        Each family is a zero-width lookahead capturing what its own detector
+        would match at that position, so families overlap each other exactly
+        as separate scans did. Line-based families (colon lists, list items)
+        are matched from the newline before the line and emails from their
+        '@' (see _email_at), so every family starts at one of
+        STRUCTURE_TRIGGERS and the regex engine skips all other characters.
+        The remaining families start with distinct characters and are plain
+        alternatives; the line families can coincide, so they are optional
+        and a conditional rejects newlines where none matched.
+
+        Headers and dialog markers are only matched at the start of the text
+        (their patterns have no MULTILINE flag), by the first-line matcher.
+
+        Returns:
+            (scanner for the whole text, matcher for the first line)
+        """
+        list_item = (r'(?P<list_item>(?:(?P<numbered>\d+[.)] )|(?P<bulleted>[•·▪▫◦‣⁃\-*+] )|'
+                     r'(?i:(?P<lettered>[a-z][.)] )))[^\n]*)')
+        # header or figure_caption (they cannot both match), at the start of the text only
+        header = r'(?P<header>(?i:(?:Chapter|Section|Part|Figure|Table|Chart|Graph)\s+\d+[:.]\s*))'
+        # dialog_marker has no MULTILINE flag, so it only matches at the start of the text
+        dialog = r'(?P<dialog>(?P<speaker>[A-Z][a-z]+):\s*["\'])'
+
+        # Line after a line ending in ':' (capital/period checks are done on the capture)
+        colon_item = r'(?<=:)\n(?P<colon_item>[^\n]+)'
+        new_line = f'(?:(?={colon_item}))?(?:(?=\\n{list_item}))?(?(colon_item)|(?(list_item)|(?!)))'
+        inline = [
+            f"(?P<quote>{self.patterns['quote_start'].pattern})",
+            f"(?P<equation>{self.patterns['equation'].pattern})",
+            f"(?P<formula>{self.patterns['formula'].pattern})",
+            f"(?P<url>{self.patterns['url'].pattern})",
+            r'(?P<at>@)',
+        ]
+
+        scanner = (f'(?={self.STRUCTURE_TRIGGERS})(?:{new_line}|' +
+                   '|'.join(f'(?={family})' for family in inline) + ')')
+        first_line = ''.join(f'(?:(?={family}))?' for family in (list_item, header, dialog))
+        return re.compile(scanner), re.compile(first_line)
+
+    def get_text_index(self, text: str) -> TextIndex:
+        """Return the index for text, building it only when the document changes"""
+        if self.text_index is None or self.text_index.text is not text:
+            self.text_index = TextIndex(text, self.patterns['code_snippet'])
+        return self.text_index
+
     def detect_structures(self, text: str) -> List[TextStructure]:
         """
         Detect all special structures in the text
 
+        All families (lists, quotations, equations, URLs, emails) come from
+        one finditer over the structure_scan pattern, plus headers and dialog
+        from the first_line matcher, since those only occur at the start of
+        the text. Each family resumes after its previous match, as its own
+        finditer would,
+        so the result is the same as scanning each family's patterns
+        separately (tests/structure_oracle.py).
+
         Args:
             text: The text to analyze
 
         Returns:
-            List of detected structures
+            List of detected structures sorted by start position (overlaps
+            resolve by STRUCTURE_PRECEDENCE)
         """
         structures = []
 
-        # Detect lists
-        structures.extend(self.detect_lists(text))
+        # Build the per-document index used by the break checks
+        self.get_text_index(text)
 
-        # Detect quotations
-        structures.extend(self.detect_quotations(text))
-
-        # Detect mathematical expressions
-        structures.extend(self.detect_mathematical(text))
-
-        # Detect URLs and emails
-        structures.extend(self.detect_urls_emails(text))
+        first_line = self.patterns['first_line'].match(text)
+        self._add_line_structures(structures, first_line, 0)
+        if first_line.group('dialog') is not None:
+            structures.append(TextStructure(
+                type=StructureType.DIALOG,
+                start_pos=0,
+                end_pos=first_line.end('dialog'),
+                content=first_line.group('dialog'),
+                metadata={'speaker': first_line.group('speaker')}
+            ))
+        if first_line.group('header') is not None:
+            structures.append(TextStructure(
+                type=StructureType.HEADER,
+                start_pos=0,
+                end_pos=first_line.end('header'),
+                content=first_line.group('header')
+            ))
 
-        # Detect headers and captions
-        structures.extend(self.detect_structural_elements(text))
+        inline_types = (
+            ('equation', StructureType.EQUATION),
+            ('formula', StructureType.EQUATION),
+            ('url', StructureType.URL),
+        )
+        resume = {'equation': 0, 'formula': 0, 'url': 0, 'email': 0}
+        quote_stack = []
 
-        return structures
+        for match in self.patterns['structure_scan'].finditer(text):
+            pos = match.start()
 
-    def detect_lists(self, text: str) -> List[TextStructure]:
-        """Detect various types of lists in text"""
-        structures = []
-        lines = text.split('\n')
-
-        for i, line in enumerate(lines):
-            # Check for colon-introduced list
-            if i > 0 and lines[i-1].endswith(':'):
-                # Check if current line starts with capital letter (potential list item)
-                if line and line[0].isupper() and not line.endswith('.'):
-                    start_pos = sum(len(l) + 1 for l in lines[:i])  # +1 for newlines
+            if text[pos] == '\n':
+                line = match.group('colon_item')
+                if line is not None and line[0].isupper() and not line.endswith('.'):
                     structures.append(TextStructure(
                         type=StructureType.COLON_LIST,
-                        start_pos=start_pos,
-                        end_pos=start_pos + len(line),
+                        start_pos=pos + 1,
+                        end_pos=pos + 1 + len(line),
                         content=line
                     ))
-
-            # Check for numbered list
-            if self.patterns['numbered_list'].match(line):
-                start_pos = sum(len(l) + 1 for l in lines[:i])
-                structures.append(TextStructure(
-                    type=StructureType.NUMBERED_LIST,
-                    start_pos=start_pos,
-                    end_pos=start_pos + len(line),
-                    content=line
-                ))
-
-            # Check for bulleted list
-            if self.patterns['bulleted_list'].match(line):
-                start_pos = sum(len(l) + 1 for l in lines[:i])
-                structures.append(TextStructure(
-                    type=StructureType.BULLETED_LIST,
-                    start_pos=start_pos,
-                    end_pos=start_pos + len(line),
-                    content=line
-                ))
-
-            # Check for lettered list
-            if self.patterns['lettered_list'].match(line):
-                start_pos = sum(len(l) + 1 for l in lines[:i])
-                structures.append(TextStructure(
-                    type=StructureType.LETTERED_LIST,
-                    start_pos=start_pos,
-                    end_pos=start_pos + len(line),
-                    content=line
-                ))
-
-        return structures
-
-    def detect_quotations(self, text: str) -> List[TextStructure]:
-        """Detect quotations and dialog in text"""
-        structures = []
-
-        # Track quote pairs
-        quote_stack = []
-        for match in re.finditer(r'["\'""'']', text):
-            quote_char = match.group()
-            pos = match.start()
-
-            if not quote_stack or quote_char in '["\'""':  # Opening quote
-                quote_stack.append((quote_char, pos))
-            else:  # Potential closing quote
-                if quote_stack:
-                    opening_char, start_pos = quote_stack.pop()
-                    content = text[start_pos:match.end()]
+                self._add_line_structures(structures, match, pos + 1)
+                continue
+
+            quote = match.group('quote')
+            if quote is not None:
+                quotation = self._pair_quote(text, quote_stack, quote, pos)
+                if quotation:
+                    structures.append(quotation)
+
+            for name, structure_type in inline_types:
+                if pos >= resume[name]:
+                    content = match.group(name)
+                    if content is not None:
+                        resume[name] = pos + len(content)
+                        structures.append(TextStructure(
+                            type=structure_type,
+                            start_pos=pos,
+                            end_pos=resume[name],
+                            content=content
+                        ))
+
+            if match.group('at') is not None:
+                email = self._email_at(text, pos, resume['email'])
+                if email:
+                    resume['email'] = email.end()
                     structures.append(TextStructure(
-                        type=StructureType.QUOTATION,
-                        start_pos=start_pos,
-                        end_pos=match.end(),
-                        content=content
+                        type=StructureType.EMAIL,
+                        start_pos=email.start(),
+                        end_pos=email.end(),
+                        content=email.group()
                     ))
 
-        # Detect dialog markers
-        for match in self.patterns['dialog_marker'].finditer(text):
-            structures.append(TextStructure(
-                type=StructureType.DIALOG,
-                start_pos=match.start(),
-                end_pos=match.end(),
-                content=match.group(),
-                metadata={'speaker': match.group(1)}
-            ))
-
+        structures.sort(key=lambda structure: structure.start_pos)
         return structures
 
-    def detect_mathematical(self, text: str) -> List[TextStructure]:
-        """Detect mathematical expressions and calculations"""
-        structures = []
-
-        # Detect equations
-        for match in self.patterns['equation'].finditer(text):
+    def _add_line_structures(self, structures: List[TextStructure], match: re.Match, line_start: int):
+        """Append the list item a scanner match found at line_start"""
+        line = match.group('list_item')
+        if line is not None:
+            marker = next(name for name in ('numbered', 'bulleted', 'lettered') if match.group(name) is not None)
             structures.append(TextStructure(
-                type=StructureType.EQUATION,
-                start_pos=match.start(),
-                end_pos=match.end(),
-                content=match.group()
+                type=self.LIST_MARKER_TYPES[marker],
+                start_pos=line_start,
+                end_pos=line_start + len(line),
+                content=line
             ))
 
-        # Detect formulas
-        for match in self.patterns['formula'].finditer(text):
-            structures.append(TextStructure(
-                type=StructureType.EQUATION,
-                start_pos=match.start(),
-                end_pos=match.end(),
-                content=match.group()
-            ))
-
-        return structures
-
-    def detect_urls_emails(self, text: str) -> List[TextStructure]:
-        """Detect URLs and email addresses"""
-        structures = []
-
-        # Detect URLs
-        for match in self.patterns['url'].finditer(text):
-            structures.append(TextStructure(
-                type=StructureType.URL,
-                start_pos=match.start(),
-                end_pos=match.end(),
-                content=match.group()
-            ))
-
-        # Detect emails
-        for match in self.patterns['email'].finditer(text):
-            structures.append(TextStructure(
-                type=StructureType.EMAIL,
-                start_pos=match.start(),
-                end_pos=match.end(),
-                content=match.group()
-            ))
-
-        return structures
-
-    def detect_structural_elements(self, text: str) -> List[TextStructure]:
-        """Detect headers, captions, and other structural elements"""
-        structures = []
-
-        # Detect headers
-        for match in self.patterns['header'].finditer(text):
-            structures.append(TextStructure(
-                type=StructureType.HEADER,
-                start_pos=match.start(),
-                end_pos=match.end(),
-                content=match.group()
-            ))
-
-        # Detect figure/table captions
-        for match in self.patterns['figure_caption'].finditer(text):
-            structures.append(TextStructure(
-                type=StructureType.HEADER,
-                start_pos=match.start(),
-                end_pos=match.end(),
-                content=match.group()
-            ))
+    def _email_at(self, text: str, at_pos: int, resume: int) -> Optional[re.Match]:
+        """
+        The email pattern match around the '@' at at_pos, starting no earlier than resume
 
-        return structures
+        The local part is a run of EMAIL_LOCAL_CHARS ending at the '@', so the
+        leftmost match (the one finditer would return) starts inside that run.
+        """
+        start = at_pos
+        while start > resume and text[start - 1] in self.EMAIL_LOCAL_CHARS:
+            start -= 1
+        for candidate in range(start, at_pos):
+            match = self.patterns['email'].match(text, candidate)
+            if match:
+                return match
+        return None
+
+    def _pair_quote(self, text: str, quote_stack: List[Tuple[str, int]], quote_char: str,
+                    pos: int) -> Optional[TextStructure]:
+        """Push an opening quote, or return the quotation a closing quote completes"""
+        if not quote_stack or quote_char in '["\'""':  # Opening quote
+            quote_stack.append((quote_char, pos))
+            return None
+        # Potential closing quote
+        opening_char, start_pos = quote_stack.pop()
+        return TextStructure(
+            type=StructureType.QUOTATION,
+            start_pos=start_pos,
+            end_pos=pos + len(quote_char),
+            content=text[start_pos:pos + len(quote_char)]
+        )
 
     def is_abbreviation(self, word: str, next_word: str = None) -> bool:
         """
@@ -346,16 +543,16 @@ class EdgeCaseHandlers:
             True if sentence should break at colon
         """
         # Check if it's followed by a list
-        after_colon = text[colon_pos + 1:].strip()
+        after_colon, words = self.get_text_index(text).after_colon(colon_pos)
 
         # If next content starts with capital letter or number, might be a list
         if after_colon and (after_colon[0].isupper() or after_colon[0].isdigit()):
             # Look for list patterns
-            if '\n' in after_colon[:100]:  # Check first 100 chars for newline
+            if '\n' in after_colon:  # Check first 100 chars for newline
                 return True
 
             # Check for inline list (multiple capitalized words)
-            words = after_colon.split()[:10]  # Check first 10 words
+            # (words holds the first 10 words)
             cap_words = sum(1 for w in words if w and w[0].isupper())
             if cap_words > 3:  # Multiple capitalized words suggest a list
                 return True
@@ -366,8 +563,7 @@ class EdgeCaseHandlers:
                 return False
 
         # Check if it's in a time format (don't break)
-        time_pattern = re.compile(r'\d{1,2}:\d{2}')
-        if time_pattern.match(text[max(0, colon_pos - 2):colon_pos + 3]):
+        if self.patterns['time'].match(text[max(0, colon_pos - 2):colon_pos + 3]):
             return False
 
         return False
@@ -399,21 +595,13 @@ class EdgeCaseHandlers:
 
     def is_within_code(self, text: str, position: int) -> bool:
         """Check if position is within a code snippet"""
-        # Simple heuristic: look for code patterns nearby
-        context_start = max(0, position - 50)
-        context_end = min(len(text), position + 50)
-        context = text[context_start:context_end]
-
-        return bool(self.patterns['code_snippet'].search(context))
+        # Simple heuristic: look for code patterns within 50 characters
+        return self.get_text_index(text).is_within_code(position)
 
     def is_within_quotes(self, text: str, position: int) -> bool:
         """Check if position is within quotation marks"""
-        # Count quotes before position
-        before_text = text[:position]
-        quote_count = before_text.count('"') + before_text.count("'")
-
-        # Odd count means we're inside quotes
-        return quote_count % 2 == 1
+        # Odd count of quotes before position means we're inside quotes
+        return self.get_text_index(text).is_within_quotes(position)
 
     def split_list_items(self, text: str, structures: List[TextStructure]) -> List[Tuple[str, int, int]]:
         """
@@ -429,25 +617,26 @@ class EdgeCaseHandlers:
         segments = []
         last_pos = 0
 
-        for structure in sorted(structures, key=lambda s: s.start_pos):
-            if structure.type in [StructureType.COLON_LIST, StructureType.NUMBERED_LIST,
-                                  StructureType.BULLETED_LIST, StructureType.LETTERED_LIST]:
-                # Add text before list item
-                if last_pos < structure.start_pos:
-                    segments.append((
-                        text[last_pos:structure.start_pos],
-                        last_pos,
-                        structure.start_pos
-                    ))
-
-                # Add list item as separate segment
+        # Overlapping list items (e.g. a colon list line that is also
+        # lettered) resolve to a single segment
+        list_items = StructureIndex([s for s in structures if s.type in LIST_STRUCTURE_TYPES])
+        for start_pos, end_pos, structure in list_items.segments():
+            # Add text before list item
+            if last_pos < start_pos:
                 segments.append((
-                    structure.content,
-                    structure.start_pos,
-                    structure.end_pos
+                    text[last_pos:start_pos],
+                    last_pos,
+                    start_pos
                 ))
 
-                last_pos = structure.end_pos
+            # Add list item as separate segment
+            segments.append((
+                text[start_pos:end_pos],
+                start_pos,
+                end_pos
+            ))
+
+            last_pos = end_pos
 
         # Add remaining text
         if last_pos < len(text):
@@ -478,10 +667,7 @@ class EdgeCaseHandlers:
         sentence_index = 0
 
         # Create structure position lookup for efficiency
-        structure_map = {}
-        for struct in structures:
-            for pos in range(struct.start_pos, struct.end_pos):
-                structure_map[pos] = struct
+        structure_index = StructureIndex(structures, STRUCTURE_PRECEDENCE)
 
         i = 0
         while i < len(words):
@@ -518,12 +704,10 @@ class EdgeCaseHandlers:
                     break_reason = "semicolon"
 
             # Check if we're at a structure boundary
-            if word_end_pos in structure_map:
-                struct = structure_map[word_end_pos]
-                if struct.type in [StructureType.COLON_LIST, StructureType.NUMBERED_LIST,
-                                   StructureType.BULLETED_LIST, StructureType.LETTERED_LIST]:
-                    should_break = True
-                    break_reason = f"list_{struct.type.value}"
+            struct = structure_index.find(word_end_pos)
+            if struct and struct.type in LIST_STRUCTURE_TYPES:
+                should_break = True
+                break_reason = f"list_{struct.type.value}"
 
             if should_break and current_sentence_words:
                 # Create sentence
@@ -0,0 +1,200 @@
+"""
+Stage Instrumentation and Logging for Audio Learning App Preprocessing Pipeline
+
+Processors wrap each stage of process() in Instrumentation.stage(), which
+records wall time, CPU time and item counts (words, sentences, ...) for the
+stage. Two optional extras are enabled per run, typically from a CLI flag:
+
+    trace_memory   tracemalloc per stage: bytes allocated and retained
+    profile_dir    a cProfile .prof file per stage (view with snakeviz or pstats)
+
+Records are emitted as JSON lines, one object per stage, so reports from
+many lessons or batch workers can simply be appended to one file:
+
+    {"label": "lesson_01", "stage": "word_extraction", "wall_seconds": 0.0123,
+     "cpu_seconds": 0.0121, "counts": {"words": 1520}}
+
+Processor progress messages go through the "preprocessing_pipeline" logger,
+which is quiet by default (warnings only). CLIs call configure_logging() to
+show them again.
+"""
+
+import cProfile
+import json
+import logging
+import re
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+LOGGER_NAME = 'preprocessing_pipeline'
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger for a pipeline module, under the shared pipeline logger"""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Writes to sys.stdout as it is at emit time, so redirect_stdout() still captures it"""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+def configure_logging(verbose: bool = True) -> logging.Logger:
+    """
+    Send pipeline messages to stdout as plain lines
+
+    Args:
+        verbose: Show progress messages (INFO); otherwise only warnings
+
+    Returns:
+        The shared pipeline logger
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    if not any(isinstance(h, _StdoutHandler) for h in logger.handlers):
+        handler = _StdoutHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.propagate = False
+    logger.setLevel(logging.INFO if verbose else logging.WARNING)
+    return logger
+
+
+@dataclass
+class StageRecord:
+    """Measurements for one stage of one run"""
+    stage: str
+    label: str = ''
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    allocated_mb: Optional[float] = None
+    retained_mb: Optional[float] = None
+    counts: Dict[str, int] = field(default_factory=dict)
+    profile_path: Optional[str] = None
+
+    def count(self, **counts: int):
+        """Record item counts for the stage, e.g. record.count(words=len(words))"""
+        self.counts.update(counts)
+
+    def to_dict(self) -> Dict:
+        """JSON-ready record, leaving out measurements that were not taken"""
+        data = {
+            'label': self.label,
+            'stage': self.stage,
+            'wall_seconds': round(self.wall_seconds, 6),
+            'cpu_seconds': round(self.cpu_seconds, 6),
+            'counts': self.counts
+        }
+        if self.allocated_mb is not None:
+            data['allocated_mb'] = self.allocated_mb
+            data['retained_mb'] = self.retained_mb
+        if self.profile_path:
+            data['profile'] = self.profile_path
+        return data
+
+
+class Instrumentation:
+    """Collects a StageRecord for every stage run under it"""
+
+    def __init__(self, label: str = '', trace_memory: bool = False, profile_dir: Optional[str] = None):
+        """
+        Args:
+            label: Name stored with every record (usually the lesson)
+            trace_memory: Measure allocations per stage with tracemalloc
+            profile_dir: Directory for per-stage cProfile stats, or None
+        """
+        self.label = label
+        self.trace_memory = trace_memory
+        self.profile_dir = profile_dir
+        self.records: List[StageRecord] = []
+        self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageRecord]:
+        """Measure the enclosed block as one stage; the record is yielded for item counts"""
+        record = StageRecord(stage=name, label=self.label)
+
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+
+        profiler = None
+        if self.profile_dir:
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_seconds = time.perf_counter() - wall
+            record.cpu_seconds = time.process_time() - cpu
+
+            if profiler is not None:
+                profiler.disable()
+                directory = Path(self.profile_dir)
+                directory.mkdir(parents=True, exist_ok=True)
+                stem = re.sub(r'[^\w.-]+', '_', self.label) or 'run'
+                path = directory / f"{stem}.{name}.prof"
+                profiler.dump_stats(str(path))
+                record.profile_path = str(path)
+
+            if tracing and tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                record.allocated_mb = round((peak - memory_before) / 1e6, 3)
+                record.retained_mb = round((current - memory_before) / 1e6, 3)
+
+            self.records.append(record)
+
+    def report(self) -> List[Dict]:
+        """All records so far, as JSON-ready dicts in stage order"""
+        return [record.to_dict() for record in self.records]
+
+    def write_jsonl(self, path: str, append: bool = True) -> str:
+        """Write one JSON line per stage record"""
+        with open(path, 'a' if append else 'w', encoding='utf-8') as f:
+            for data in self.report():
+                f.write(json.dumps(data) + '\n')
+        return path
+
+    def close(self):
+        """Stop tracemalloc if this instrumentation started it"""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+
+def add_instrumentation_arguments(parser):
+    """Per-stage report and profiling flags shared by the pipeline CLIs"""
+    parser.add_argument('--timing-report', metavar='FILE',
+                        help='Append per-stage wall/CPU time and item counts as JSON lines')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Record allocations per stage with tracemalloc (slower)')
+    parser.add_argument('--profile-dir', metavar='DIR', help='Write a cProfile .prof file per stage')
+
+
+def instrumentation_from_args(args, label: str) -> Instrumentation:
+    """Instrumentation configured by add_instrumentation_arguments() flags"""
+    return Instrumentation(label, trace_memory=args.trace_memory, profile_dir=args.profile_dir)
+
+
+def read_jsonl(path: str) -> List[Dict]:
+    """Load a stage report written by write_jsonl()"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
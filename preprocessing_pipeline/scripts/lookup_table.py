@@ -0,0 +1,466 @@
+"""
+Lookup Table Encodings for Audio Learning App Preprocessing Pipeline
+
+The legacy lookup table samples the word/sentence position every 10ms, which
+produces one [word_index, sentence_index] pair per tick (~100 entries per
+second of audio). Consecutive ticks almost always repeat the same pair, so this
+module provides a run-length interval encoding that stores only the ticks
+where the active word or sentence changes.
+
+Interval format (lookup table version 2.0):
+
+    "intervals": {
+        "start_ms": [0, 120, 340, ...],       # strictly increasing
+        "word_index": [0, 1, 2, ...],
+        "sentence_index": [0, 0, 0, ...]
+    }
+
+Binary-search contract:
+    For a playback position t (0 <= t <= totalDurationMs), the active entry is
+    i = bisect_right(start_ms, t) - 1. If i < 0 there is no active word and the
+    result is (-1, -1); otherwise the result is (word_index[i], sentence_index[i]).
+    The answer is always identical to the legacy lookup[t // interval] entry.
+
+Binary format (`_lookup.bin`, all fields little-endian):
+
+    offset  size  field
+    0       4     magic b"ALUT"
+    4       2     format version (uint16, currently 1)
+    6       2     flags (uint16, bit 0 = sentence_index stored as int32)
+    8       4     interval_ms (uint32)
+    12      4     total_duration_ms (uint32)
+    16      4     interval count n (uint32)
+    20      4     word count (uint32)
+    24      4     sentence count (uint32)
+    28      4n    start_ms (int32[n])
+    28+4n   4n    word_index (int32[n])
+    28+8n   2n|4n sentence_index (int16[n], or int32[n] when flag bit 0 is set)
+
+The int32 arrays start on 4-byte boundaries so clients can view them directly
+(e.g. Dart `Int32List.view` on a `ByteData`) without a decode step.
+
+Per-tick sampling (`sample_lookup`) is vectorized with NumPy `searchsorted`
+when NumPy is installed, and falls back to the original pure-Python loops
+otherwise. Both paths produce identical tables.
+"""
+
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from typing import List, Dict, Tuple, Union, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; sampling falls back to pure Python
+    np = None
+
+LEGACY_LOOKUP_VERSION = "1.0"
+INTERVAL_LOOKUP_VERSION = "2.0"
+
+BINARY_LOOKUP_MAGIC = b"ALUT"
+BINARY_LOOKUP_VERSION = 1
+BINARY_HEADER = struct.Struct('<4sHHIIIII')
+FLAG_WIDE_SENTENCE_INDEX = 0x1
+
+
+def encode_intervals(lookup: List[List[int]], interval_ms: int) -> Dict[str, List[int]]:
+    """
+    Run-length encode a sampled lookup table into interval boundaries
+
+    Args:
+        lookup: Legacy [word_index, sentence_index] pairs, one per tick
+        interval_ms: Time between ticks in milliseconds
+
+    Returns:
+        Dictionary of parallel start_ms / word_index / sentence_index arrays
+    """
+    start_ms = []
+    word_indices = []
+    sentence_indices = []
+
+    previous = None
+    for tick, (word_idx, sentence_idx) in enumerate(lookup):
+        if (word_idx, sentence_idx) != previous:
+            start_ms.append(tick * interval_ms)
+            word_indices.append(word_idx)
+            sentence_indices.append(sentence_idx)
+            previous = (word_idx, sentence_idx)
+
+    return {
+        "start_ms": start_ms,
+        "word_index": word_indices,
+        "sentence_index": sentence_indices
+    }
+
+
+def _word_columns(words) -> Tuple[List, List, List]:
+    """start_ms, end_ms and sentence_index columns of word dicts or a TimingTrack"""
+    if isinstance(getattr(words, 'start_ms', None), array):
+        return words.start_ms.tolist(), words.end_ms.tolist(), words.sentence_index.tolist()
+    return ([w['start_ms'] for w in words], [w['end_ms'] for w in words],
+            [w.get('sentence_index', 0) for w in words])
+
+
+def lookup_intervals(words: List[Dict], num_entries: int, interval_ms: int = 10,
+                     end_inclusive: bool = True) -> Dict[str, List[int]]:
+    """
+    Interval encoding of the table sample_lookup() would produce, without sampling it
+
+    Works from the word start/end times in O(words) rather than one entry
+    per tick, so the interval table costs nothing like the legacy array it
+    replaces. The result is identical to
+    encode_intervals(sample_lookup(words, num_entries, interval_ms, end_inclusive), interval_ms).
+
+    Args:
+        words: Word timing dictionaries (or a TimingTrack) sorted by start_ms
+        num_entries: Number of ticks the table covers
+        interval_ms: Time between ticks in milliseconds
+        end_inclusive: Activity rule, as for sample_lookup()
+
+    Returns:
+        Dictionary of parallel start_ms / word_index / sentence_index arrays
+    """
+    starts, ends, sentence_indices = _word_columns(words)
+    unsorted = any(b < a for a, b in zip(starts, starts[1:]))
+    overlapping = not end_inclusive and any(e > s for e, s in zip(ends, starts[1:]))
+    if unsorted or overlapping:
+        # Outside the rule's ordering assumptions only the sampled table is authoritative
+        return encode_intervals(sample_lookup(words, num_entries, interval_ms, end_inclusive), interval_ms)
+
+    def first_tick(time_ms, inclusive: bool) -> int:
+        """First tick at or after time_ms (strictly after it when not inclusive)"""
+        tick = -(-time_ms // interval_ms) if inclusive else time_ms // interval_ms + 1
+        return max(0, int(tick))
+
+    # (first tick, word index) changes in time order; a change replaces any
+    # earlier one that would not start before it
+    changes = [(0, -1)]
+
+    def change(time_ms, inclusive: bool, word_idx: int):
+        tick = first_tick(time_ms, inclusive)
+        while changes and changes[-1][0] >= tick:
+            changes.pop()
+        changes.append((tick, word_idx))
+
+    # Word i is the candidate from its start until the next word starts
+    for i, start in enumerate(starts):
+        if not end_inclusive:
+            # Active on [start, end)
+            change(start, True, i)
+            change(max(ends[i], start), True, -1)
+        elif ends[i] >= start:
+            # Active on [start, end], then the previous word while that one lasts
+            change(start, True, i)
+            end = ends[i]
+            if i > 0 and ends[i - 1] > end:
+                change(end, False, i - 1)
+                end = ends[i - 1]
+            change(end, False, -1)
+        elif i > 0 and ends[i - 1] >= start:
+            # Never active itself; the previous word still is
+            change(start, True, i - 1)
+            change(ends[i - 1], False, -1)
+        else:
+            change(start, True, -1)
+
+    start_ms = []
+    word_indices = []
+    sentence_index = []
+    for tick, word_idx in changes:
+        if tick >= num_entries:
+            break
+        if word_indices and word_indices[-1] == word_idx:
+            continue
+        start_ms.append(tick * interval_ms)
+        word_indices.append(word_idx)
+        sentence_index.append(sentence_indices[word_idx] if word_idx >= 0 else -1)
+
+    return {
+        "start_ms": start_ms,
+        "word_index": word_indices,
+        "sentence_index": sentence_index
+    }
+
+
+def active_ticks(intervals: Dict[str, List[int]], interval_ms: int, num_entries: int) -> int:
+    """Number of ticks (of num_entries) that have an active word"""
+    starts = intervals["start_ms"]
+    total = 0
+    for i, word_idx in enumerate(intervals["word_index"]):
+        if word_idx >= 0:
+            end_tick = starts[i + 1] // interval_ms if i + 1 < len(starts) else num_entries
+            total += end_tick - starts[i] // interval_ms
+    return total
+
+
+def find_interval(intervals: Dict[str, List[int]], time_ms: int) -> Tuple[int, int]:
+    """
+    Resolve (word_index, sentence_index) at a playback position
+
+    Implements the binary-search contract documented at module level.
+    """
+    i = bisect_right(intervals["start_ms"], time_ms) - 1
+    if i < 0:
+        return -1, -1
+    return intervals["word_index"][i], intervals["sentence_index"][i]
+
+
+def decode_intervals(intervals: Dict[str, List[int]], interval_ms: int, num_entries: int) -> List[List[int]]:
+    """Expand intervals back into the legacy per-tick lookup array"""
+    lookup = []
+    starts = intervals["start_ms"]
+    i = -1
+    for tick in range(num_entries):
+        time_ms = tick * interval_ms
+        while i + 1 < len(starts) and starts[i + 1] <= time_ms:
+            i += 1
+        if i < 0:
+            lookup.append([-1, -1])
+        else:
+            lookup.append([intervals["word_index"][i], intervals["sentence_index"][i]])
+    return lookup
+
+
+def sample_lookup(words: List[Dict], num_entries: int, interval_ms: int = 10,
+                  end_inclusive: bool = True, use_numpy: bool = True) -> List[List[int]]:
+    """
+    Sample the active [word_index, sentence_index] at every tick
+
+    Args:
+        words: Word timing dictionaries sorted by start_ms
+        num_entries: Number of ticks to sample (tick i is at i * interval_ms)
+        interval_ms: Time between ticks in milliseconds
+        end_inclusive: True for the original processor's rule (word active on
+            [start_ms, end_ms], falling back to the previous word), False for
+            the paragraph processor's half-open [start_ms, end_ms) rule
+        use_numpy: Use the vectorized engine when NumPy is available
+
+    Returns:
+        Legacy lookup array of [word_index, sentence_index] pairs
+    """
+    if use_numpy and np is not None and words:
+        lookup = _sample_lookup_numpy(words, num_entries, interval_ms, end_inclusive)
+        if lookup is not None:
+            return lookup
+
+    if end_inclusive:
+        return _sample_lookup_pointer(words, num_entries, interval_ms)
+    return _sample_lookup_bisect(words, num_entries, interval_ms)
+
+
+def _sample_lookup_pointer(words: List[Dict], num_entries: int, interval_ms: int) -> List[List[int]]:
+    """Pure-Python sampling with a forward word pointer and inclusive end times"""
+    lookup = []
+
+    # Track current indices
+    word_idx = 0
+
+    # Generate lookup entry for each time position
+    for tick in range(num_entries):
+        time_ms = tick * interval_ms
+
+        # Find active word at this time
+        while word_idx < len(words) - 1:
+            if words[word_idx + 1]['start_ms'] <= time_ms:
+                word_idx += 1
+            else:
+                break
+
+        # Check if current word is actually active at this time
+        current_word_idx = -1
+        if word_idx < len(words):
+            word = words[word_idx]
+            if word['start_ms'] <= time_ms <= word['end_ms']:
+                current_word_idx = word_idx
+            elif word_idx > 0:
+                # Check previous word (for gaps that were filled)
+                prev_word = words[word_idx - 1]
+                if prev_word['start_ms'] <= time_ms <= prev_word['end_ms']:
+                    current_word_idx = word_idx - 1
+
+        # Get sentence index from word
+        if current_word_idx >= 0:
+            sentence_idx = words[current_word_idx].get('sentence_index', 0)
+        else:
+            sentence_idx = -1
+
+        # Add entry: [word_index, sentence_index]
+        lookup.append([current_word_idx, sentence_idx])
+
+    return lookup
+
+
+def _sample_lookup_bisect(words: List[Dict], num_entries: int, interval_ms: int) -> List[List[int]]:
+    """Pure-Python sampling with a binary search per tick and half-open end times"""
+    lookup = []
+
+    for tick in range(num_entries):
+        time_ms = tick * interval_ms
+
+        # Binary search for word at this time
+        word_idx = -1
+        left, right = 0, len(words) - 1
+        while left <= right:
+            mid = (left + right) // 2
+            if words[mid]['start_ms'] <= time_ms < words[mid]['end_ms']:
+                word_idx = mid
+                break
+            elif time_ms < words[mid]['start_ms']:
+                right = mid - 1
+            else:
+                left = mid + 1
+
+        # Find sentence index
+        sentence_idx = words[word_idx].get('sentence_index', 0) if word_idx >= 0 else -1
+        lookup.append([word_idx, sentence_idx])
+
+    return lookup
+
+
+def _sample_lookup_numpy(words: List[Dict], num_entries: int, interval_ms: int,
+                         end_inclusive: bool) -> Optional[List[List[int]]]:
+    """
+    Vectorized sampling: pack word arrays once and resolve every tick with searchsorted
+
+    Accepts a list of word dicts or a TimingTrack (see timing_track.py).
+    Returns None when the words violate the ordering the vectorized rule relies
+    on (unsorted starts, or overlapping words for the half-open rule), so the
+    caller can fall back to the pure-Python loop and keep results identical.
+    """
+    if isinstance(getattr(words, 'start_ms', None), array):
+        # Columnar TimingTrack: view the typed arrays instead of walking words
+        starts, ends, sentence_indices = (
+            np.frombuffer(column, dtype=np.dtype(column.typecode)).astype(np.int64)
+            for column in (words.start_ms, words.end_ms, words.sentence_index)
+        )
+    else:
+        starts = np.fromiter((w['start_ms'] for w in words), dtype=np.int64, count=len(words))
+        ends = np.fromiter((w['end_ms'] for w in words), dtype=np.int64, count=len(words))
+        sentence_indices = np.fromiter((w.get('sentence_index', 0) for w in words), dtype=np.int64, count=len(words))
+
+    if np.any(starts[1:] < starts[:-1]):
+        return None
+    if not end_inclusive and np.any(ends[:-1] > starts[1:]):
+        return None
+
+    times = np.arange(num_entries, dtype=np.int64) * interval_ms
+
+    # Last word whose start is <= t (equivalent to the forward pointer)
+    candidate = np.searchsorted(starts, times, side='right') - 1
+
+    if end_inclusive:
+        candidate = np.maximum(candidate, 0)
+        active = (starts[candidate] <= times) & (times <= ends[candidate])
+        previous = np.maximum(candidate - 1, 0)
+        previous_active = (~active & (candidate > 0) &
+                           (starts[previous] <= times) & (times <= ends[previous]))
+        word_idx = np.where(active, candidate, np.where(previous_active, previous, -1))
+    else:
+        safe = np.maximum(candidate, 0)
+        active = (candidate >= 0) & (times < ends[safe])
+        word_idx = np.where(active, candidate, -1)
+
+    # Mask gaps in bulk: ticks without an active word get sentence -1
+    sentence_idx = np.where(word_idx >= 0, sentence_indices[np.maximum(word_idx, 0)], -1)
+
+    return np.stack((word_idx, sentence_idx), axis=1).tolist()
+
+
+def _little_endian(values: array) -> bytes:
+    """Return array bytes in little-endian order regardless of host"""
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def encode_binary_lookup(intervals: Dict[str, List[int]], interval_ms: int, total_duration_ms: int,
+                         word_count: int, sentence_count: int) -> bytes:
+    """
+    Pack an interval lookup into the compact binary format
+
+    Args:
+        intervals: Interval arrays from encode_intervals()
+        interval_ms: Tick interval of the source lookup table
+        total_duration_ms: Total audio duration in milliseconds
+        word_count: Number of words in the lesson
+        sentence_count: Number of sentences in the lesson
+
+    Returns:
+        The complete binary artifact
+    """
+    sentence_indices = intervals["sentence_index"]
+    flags = 0
+    sentence_typecode = 'h'
+    if sentence_indices and (max(sentence_indices) > 0x7FFF or min(sentence_indices) < -0x8000):
+        flags |= FLAG_WIDE_SENTENCE_INDEX
+        sentence_typecode = 'i'
+
+    header = BINARY_HEADER.pack(
+        BINARY_LOOKUP_MAGIC, BINARY_LOOKUP_VERSION, flags, interval_ms, total_duration_ms,
+        len(intervals["start_ms"]), word_count, sentence_count
+    )
+
+    return b''.join((
+        header,
+        _little_endian(array('i', intervals["start_ms"])),
+        _little_endian(array('i', intervals["word_index"])),
+        _little_endian(array(sentence_typecode, sentence_indices))
+    ))
+
+
+def decode_binary_lookup(data: Union[bytes, bytearray, memoryview]) -> Dict:
+    """
+    Parse a binary lookup artifact back into header fields and interval arrays
+
+    Raises:
+        ValueError: If the data is not a binary lookup table, is a newer
+            version, or is shorter than its header says (truncated)
+    """
+    if len(data) < BINARY_HEADER.size:
+        raise ValueError(f"Truncated binary lookup table: {len(data)} bytes, header needs {BINARY_HEADER.size}")
+    magic, version, flags, interval_ms, total_duration_ms, count, word_count, sentence_count = \
+        BINARY_HEADER.unpack_from(data, 0)
+    if magic != BINARY_LOOKUP_MAGIC:
+        raise ValueError(f"Not a binary lookup table (magic {magic!r})")
+    if version > BINARY_LOOKUP_VERSION:
+        raise ValueError(f"Unsupported binary lookup version: {version}")
+
+    sentence_typecode = 'i' if flags & FLAG_WIDE_SENTENCE_INDEX else 'h'
+    expected = BINARY_HEADER.size + count * (4 + 4 + array(sentence_typecode).itemsize)
+    if len(data) < expected:
+        raise ValueError(f"Truncated binary lookup table: {len(data)} bytes, {count} intervals need {expected}")
+
+    columns = []
+    offset = BINARY_HEADER.size
+    for typecode in ('i', 'i', sentence_typecode):
+        column = array(typecode)
+        size = count * column.itemsize
+        column.frombytes(bytes(data[offset:offset + size]))
+        if sys.byteorder == 'big':
+            column.byteswap()
+        columns.append(column.tolist())
+        offset += size
+
+    return {
+        "version": version,
+        "interval": interval_ms,
+        "totalDurationMs": total_duration_ms,
+        "word_count": word_count,
+        "sentence_count": sentence_count,
+        "intervals": {
+            "start_ms": columns[0],
+            "word_index": columns[1],
+            "sentence_index": columns[2]
+        }
+    }
+
+
+def write_binary_lookup(path: str, intervals: Dict[str, List[int]], interval_ms: int,
+                        total_duration_ms: int, word_count: int, sentence_count: int) -> int:
+    """Write the binary lookup artifact in a single call and return its size in bytes"""
+    data = encode_binary_lookup(intervals, interval_ms, total_duration_ms, word_count, sentence_count)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Paragraph Alignment for Audio Learning App
+
+ElevenLabs returns the narrated text as one character stream with no
+paragraph structure. The original markdown still has it, but its text is not
+identical: headers and emphasis markers, list bullets, and words the
+narration added, dropped or normalized. This module maps the original
+paragraphs onto the stream and returns exact break offsets.
+
+Alignment works on normalized tokens (case-folded \\w+ runs), in the style
+of patience diff. Every gap (at first, the whole sequences) is trimmed of
+its common prefix and suffix, so identical stretches align even when none of
+their tokens is unique; then:
+
+1. Anchor: token trigrams that occur exactly once in both sequences are
+   paired, and the longest chain of pairs increasing in both sequences (LIS,
+   O(m log m)) is kept. Every anchor is extended over equal neighbouring
+   tokens.
+2. Refine: each gap between anchors is anchored again with single tokens
+   that are unique within the gap, recursively.
+3. Fill: gaps with no unique tokens left are aligned by an edit-distance DP
+   restricted to a band around the gap's diagonal. Gaps too large for the
+   band budget are anchored again with longer grams (6, 12, ... tokens),
+   which are unique even in very repetitive text, and only stay unaligned
+   when no gram up to MAX_ANCHOR_GRAM tokens is.
+
+Anchoring and refinement touch each token a constant number of times, and
+the DP only runs on small gaps, so alignment stays close to linear in the
+text length and handles book-length inputs.
+
+A break between two consecutive original paragraphs is placed at the first
+token of the stream after the last aligned token of the earlier paragraph,
+preferring tokens that follow sentence punctuation. Breaks are placed only
+after whitespace, so they never split a word. Paragraphs with no aligned
+tokens are merged into their neighbours.
+
+display_offsets() then maps every character of the stream to its position
+in the display text with the breaks, for exact word offsets.
+"""
+
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r'\w+')
+ANCHOR_GRAM = 3
+# Longest gram tried on gaps too large for the DP (repetitive text has no unique short grams)
+MAX_ANCHOR_GRAM = 48
+DP_BAND = 8
+# Largest gap (in DP cells) aligned by the banded DP; larger ones stay unaligned
+MAX_DP_CELLS = 200_000
+SENTENCE_END = '.!?:;'
+
+_GAP = 1
+_MISMATCH = 1
+
+
+def tokenize(text: str) -> Tuple[List[str], List[int]]:
+    """Normalized tokens of a text and their start offsets"""
+    tokens = []
+    starts = []
+    for match in TOKEN_PATTERN.finditer(text):
+        tokens.append(match.group().casefold())
+        starts.append(match.start())
+    return tokens, starts
+
+
+def _unique_pairs(a: List[str], b: List[str], a0: int, a1: int, b0: int, b1: int,
+                  k: int) -> List[Tuple[int, int]]:
+    """(i, j) for every k-gram starting at a[i] and b[j] that is unique within both ranges"""
+    def unique_grams(tokens, start, stop) -> Dict[Tuple[str, ...], int]:
+        seen: Dict[Tuple[str, ...], int] = {}
+        for i in range(start, stop - k + 1):
+            gram = tuple(tokens[i:i + k])
+            seen[gram] = -1 if gram in seen else i
+        return seen
+
+    in_b = unique_grams(b, b0, b1)
+    return [(i, in_b[gram]) for gram, i in unique_grams(a, a0, a1).items()
+            if i >= 0 and in_b.get(gram, -1) >= 0]
+
+
+def _increasing_chain(pairs: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Longest chain of pairs increasing in both coordinates (patience sorting)"""
+    pairs.sort()
+    tails: List[int] = []
+    tail_index: List[int] = []
+    previous: List[int] = []
+    for n, (_, j) in enumerate(pairs):
+        slot = bisect_left(tails, j)
+        if slot == len(tails):
+            tails.append(j)
+            tail_index.append(n)
+        else:
+            tails[slot] = j
+            tail_index[slot] = n
+        previous.append(tail_index[slot - 1] if slot else -1)
+
+    chain = []
+    n = tail_index[-1] if tail_index else -1
+    while n >= 0:
+        chain.append(pairs[n])
+        n = previous[n]
+    chain.reverse()
+    return chain
+
+
+def _band_width(la: int, lb: int) -> int:
+    """Wide enough that consecutive rows' windows overlap, whatever the gap's shape"""
+    return DP_BAND + -(-lb // la)
+
+
+def _fits_band(la: int, lb: int) -> bool:
+    """Whether a la x lb gap is within the banded DP's cell budget"""
+    return la * (2 * _band_width(la, lb) + 1) <= MAX_DP_CELLS
+
+
+def _banded_matches(a: List[str], b: List[str], a0: int, a1: int, b0: int, b1: int) -> List[Tuple[int, int]]:
+    """Equal-token pairs on a minimum edit-distance path between a[a0:a1] and b[b0:b1]"""
+    la, lb = a1 - a0, b1 - b0
+    if not la or not lb or not _fits_band(la, lb):
+        return []
+    width = _band_width(la, lb)
+
+    windows = []
+    rows = []
+    for i in range(la + 1):
+        center = i * lb // la
+        lo, hi = max(0, center - width), min(lb, center + width)
+        row = [0] * (hi - lo + 1)
+        for j in range(lo, hi + 1):
+            if i == 0:
+                row[j - lo] = j * _GAP
+                continue
+            plo, phi = windows[i - 1]
+            above = rows[i - 1][j - plo] + _GAP if plo <= j <= phi else None
+            left = row[j - 1 - lo] + _GAP if j > lo else (i * _GAP if j == 0 else None)
+            if j > 0 and plo <= j - 1 <= phi:
+                cost = 0 if a[a0 + i - 1] == b[b0 + j - 1] else _MISMATCH
+                diagonal = rows[i - 1][j - 1 - plo] + cost
+            else:
+                diagonal = None
+            row[j - lo] = min(c for c in (above, left, diagonal) if c is not None)
+        windows.append((lo, hi))
+        rows.append(row)
+
+    # Trace back from the bottom-right corner, keeping equal diagonal steps
+    matches = []
+    i, j = la, lb
+    while i > 0 and j > 0:
+        lo, hi = windows[i]
+        plo, phi = windows[i - 1]
+        here = rows[i][j - lo]
+        if plo <= j - 1 <= phi:
+            equal = a[a0 + i - 1] == b[b0 + j - 1]
+            if here == rows[i - 1][j - 1 - plo] + (0 if equal else _MISMATCH):
+                if equal:
+                    matches.append((a0 + i - 1, b0 + j - 1))
+                i, j = i - 1, j - 1
+                continue
+        if plo <= j <= phi and here == rows[i - 1][j - plo] + _GAP:
+            i -= 1
+        else:
+            j -= 1
+    matches.reverse()
+    return matches
+
+
+def align_tokens(a: List[str], b: List[str]) -> List[Optional[int]]:
+    """
+    Align two token sequences
+
+    Returns:
+        For every token of a, the index of the equal token of b it is aligned
+        with, or None; aligned indices are strictly increasing
+    """
+    mapping: List[Optional[int]] = [None] * len(a)
+    # Gaps still to align, each with the gram size to anchor it with
+    pending = [(0, len(a), 0, len(b), ANCHOR_GRAM)]
+    while pending:
+        a0, a1, b0, b1, k = pending.pop()
+        # Equal tokens at either end align as they are, however repetitive
+        while a0 < a1 and b0 < b1 and a[a0] == b[b0]:
+            mapping[a0] = b0
+            a0, b0 = a0 + 1, b0 + 1
+        while a0 < a1 and b0 < b1 and a[a1 - 1] == b[b1 - 1]:
+            a1, b1 = a1 - 1, b1 - 1
+            mapping[a1] = b1
+        if a0 >= a1 or b0 >= b1:
+            continue
+
+        chain = _increasing_chain(_unique_pairs(a, b, a0, a1, b0, b1, k))
+        if not chain:
+            if k == ANCHOR_GRAM:
+                k = 1
+            elif _fits_band(a1 - a0, b1 - b0):
+                for i, j in _banded_matches(a, b, a0, a1, b0, b1):
+                    mapping[i] = j
+                continue
+            elif k < MAX_ANCHOR_GRAM:
+                k = max(2 * ANCHOR_GRAM, 2 * k)
+            else:
+                continue
+            pending.append((a0, a1, b0, b1, k))
+            continue
+
+        # Extend every anchor over equal neighbours, then queue the gaps between them
+        i_prev, j_prev = a0, b0
+        for i, j in chain:
+            if i < i_prev or j < j_prev:
+                continue  # Swallowed by the previous anchor's extension
+            while i > i_prev and j > j_prev and a[i - 1] == b[j - 1]:
+                i, j = i - 1, j - 1
+            pending.append((i_prev, i, j_prev, j, 1))
+            while i < a1 and j < b1 and a[i] == b[j]:
+                mapping[i] = j
+                i, j = i + 1, j + 1
+            i_prev, j_prev = i, j
+        pending.append((i_prev, a1, j_prev, b1, 1))
+    return mapping
+
+
+def paragraph_breaks(text: str, paragraphs: List[str]) -> List[int]:
+    """
+    Offsets in text where each original paragraph after the first begins
+
+    Args:
+        text: The narrated character stream
+        paragraphs: Original paragraphs, in order (markdown is fine)
+
+    Returns:
+        Strictly increasing offsets, each at the start of a token that follows
+        whitespace; paragraphs that could not be placed are merged, so there
+        may be fewer than len(paragraphs) - 1
+    """
+    stream, starts = tokenize(text)
+    original = []
+    owner = []
+    for index, paragraph in enumerate(paragraphs):
+        tokens, _ = tokenize(paragraph)
+        original.extend(tokens)
+        owner.extend([index] * len(tokens))
+    mapping = align_tokens(original, stream)
+
+    # Aligned stream positions of each paragraph's first and last tokens
+    spans: Dict[int, List[int]] = {}
+    for token, j in enumerate(mapping):
+        if j is not None:
+            span = spans.setdefault(owner[token], [j, j])
+            span[1] = j
+
+    def follows_sentence(offset: int) -> bool:
+        while offset > 0 and text[offset - 1].isspace():
+            offset -= 1
+        return offset > 0 and text[offset - 1] in SENTENCE_END
+
+    breaks = []
+    previous_last = None
+    for index in sorted(spans):
+        first, last = spans[index]
+        if previous_last is not None and first > previous_last:
+            candidates = [t for t in range(previous_last + 1, first + 1)
+                          if starts[t] > 0 and text[starts[t] - 1].isspace()]
+            after_sentence = [t for t in candidates if follows_sentence(starts[t])]
+            if candidates:
+                breaks.append(starts[(after_sentence or candidates)[0]])
+        previous_last = last if previous_last is None else max(previous_last, last)
+    return breaks
+
+
+def display_offsets(text: str, display_text: str) -> List[int]:
+    """
+    Map every character of text to its index in display_text, in one pass
+
+    display_text must differ from text only in whitespace, e.g. stripped
+    paragraphs joined with paragraph breaks. Whitespace of text that is
+    missing from display_text maps to the index of the next kept character;
+    any other difference maps character for character.
+    """
+    offsets = [0] * len(text)
+    j = 0
+    for i, char in enumerate(text):
+        if not char.isspace():
+            # Skip whitespace that only display_text has (paragraph breaks)
+            while j < len(display_text) and display_text[j] != char and display_text[j].isspace():
+                j += 1
+        offsets[i] = j
+        if j < len(display_text) and display_text[j] == char:
+            j += 1
+        elif not char.isspace():
+            j = min(j + 1, len(display_text))
+    return offsets
+
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Precompressed Output Variants for Audio Learning App
+
+The enhanced JSON and lookup tables are highly repetitive ([w, s] pairs,
+word dicts with the same keys), so they compress very well. save() can
+write minified JSON and, next to every output, precompressed copies that
+are uploaded as-is with a matching Content-Encoding header:
+
+    lesson_enhanced.json       lesson_enhanced.json.gz   (gzip)
+                               lesson_enhanced.json.br   (br, needs `brotli`)
+                               lesson_enhanced.json.zst  (zstd, needs `zstandard`)
+
+Both options live in the "output" section of config.json ("minify" and
+"precompress": a list of codec names) and are off by default, so the plain
+outputs stay byte-for-byte what earlier versions wrote. gzip output is
+deterministic (no timestamp), so unchanged lessons keep their upload hashes.
+"""
+
+import gzip
+import os
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; only gzip is always available
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # Zstandard is optional as well
+    zstandard = None
+
+
+@dataclass(frozen=True)
+class Codec:
+    """A compression format; its name is also its Content-Encoding token"""
+    name: str
+    suffix: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+def _zstd_compress(data: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=19).compress(data)
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+# File suffix per codec save() accepts, whether or not its package is installed here
+CODEC_SUFFIXES = {'gzip': '.gz', 'br': '.br', 'zstd': '.zst'}
+CODEC_PACKAGES = {'br': 'brotli', 'zstd': 'zstandard'}
+
+CODECS: Dict[str, Codec] = {
+    'gzip': Codec('gzip', '.gz', lambda data: gzip.compress(data, 9, mtime=0), gzip.decompress),
+}
+if brotli is not None:
+    CODECS['br'] = Codec('br', '.br', lambda data: brotli.compress(data, quality=11), brotli.decompress)
+if zstandard is not None:
+    CODECS['zstd'] = Codec('zstd', '.zst', _zstd_compress, _zstd_decompress)
+
+
+def resolve_codecs(names: List[str]) -> List[Codec]:
+    """
+    Look up codecs by name
+
+    Raises:
+        ValueError: For an unknown codec, or one whose package is not installed
+    """
+    codecs = []
+    for name in names:
+        if name not in CODEC_SUFFIXES:
+            raise ValueError(f"Unknown codec {name!r} (choose from {', '.join(CODEC_SUFFIXES)})")
+        if name not in CODECS:
+            package = CODEC_PACKAGES[name]
+            raise ValueError(f"Codec {name!r} needs the {package} package (pip install {package})")
+        codecs.append(CODECS[name])
+    return codecs
+
+
+def output_options(config: Dict) -> Dict:
+    """The minify flag and precompress codecs from a processing config's "output" section"""
+    output = config.get('output', {})
+    return {'minify': bool(output.get('minify', False)),
+            'codecs': resolve_codecs(output.get('precompress', []))}
+
+
+def variant_paths(path: str, codecs: List[Codec]) -> List[str]:
+    """Paths of a file's precompressed variants"""
+    return [path + codec.suffix for codec in codecs]
+
+
+def write_variants(path: str, data: bytes, codecs: List[Codec]) -> Dict[str, int]:
+    """
+    Write precompressed copies of data next to path
+
+    Returns:
+        Compressed size in bytes per codec name
+    """
+    sizes = {}
+    for codec in codecs:
+        packed = codec.compress(data)
+        with open(path + codec.suffix, 'wb') as f:
+            f.write(packed)
+        sizes[codec.name] = len(packed)
+    return sizes
+
+
+def find_variant(path: str, name: Optional[str]) -> Optional[str]:
+    """
+    Path of a file's precompressed variant, if one was written
+
+    Args:
+        path: The plain output
+        name: Codec name, or None for the plain file
+    """
+    if not name:
+        return None
+    if name not in CODEC_SUFFIXES:
+        raise ValueError(f"Unknown codec {name!r} (choose from {', '.join(CODEC_SUFFIXES)})")
+    variant = path + CODEC_SUFFIXES[name]
+    return variant if os.path.exists(variant) else None
+
+
+def add_output_arguments(parser):
+    """Command line overrides for the "output" options above"""
+    parser.add_argument('--minify', action='store_true', help='Write minified JSON instead of indented JSON')
+    parser.add_argument('--precompress', metavar='CODECS',
+                        help=f"Also write precompressed outputs, comma separated ({', '.join(CODEC_SUFFIXES)})")
+
+
+def apply_output_arguments(config: Dict, args) -> Dict:
+    """Fold --minify/--precompress into a processing config (so they are part of the build cache key)"""
+    if not args.minify and not args.precompress:
+        return config
+    output = dict(config.get('output', {}))
+    if args.minify:
+        output['minify'] = True
+    if args.precompress:
+        output['precompress'] = [name.strip() for name in args.precompress.split(',') if name.strip()]
+        resolve_codecs(output['precompress'])
+    return dict(config, output=output)
@@ -14,12 +14,22 @@ import re
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 from edge_case_handlers import EdgeCaseHandlers, StructureType
+from lookup_table import sample_lookup, lookup_intervals, active_ticks, write_binary_lookup, INTERVAL_LOOKUP_VERSION
+from alignment_loader import load_alignment
+from timing_shards import (shard_ms_from_config, shard_directory, write_timing_shards, add_shard_arguments,
+                           apply_shard_arguments)
+from sentence_coverage import close_sentence_gaps, assign_words_to_sentences
+from instrumentation import (Instrumentation, add_instrumentation_arguments, configure_logging, get_logger,
+                             instrumentation_from_args)
+
+logger = get_logger(__name__)
 
 
 class ElevenLabsCompleteProcessor:
     """Process complete ElevenLabs character-level timing to word-level"""
 
-    def __init__(self, elevenlabs_path: str, original_content_path: Optional[str] = None, config: Dict = None):
+    def __init__(self, elevenlabs_path: str, original_content_path: Optional[str] = None, config: Dict = None,
+                 instrumentation: Optional[Instrumentation] = None):
         """
         Initialize processor
 
@@ -27,17 +37,20 @@ class ElevenLabsCompleteProcessor:
             elevenlabs_path: Path to ElevenLabs JSON with character timing
             original_content_path: Optional path to original content for verification
             config: Optional configuration for edge case handling
+            instrumentation: Optional per-stage recorder (one is created if omitted)
         """
         self.elevenlabs_path = elevenlabs_path
         self.original_content_path = original_content_path
         self.config = config or {}
+        self.instrumentation = instrumentation or Instrumentation(Path(elevenlabs_path).stem)
 
         # Initialize edge case handlers
         self.edge_handlers = EdgeCaseHandlers(config)
 
-        # Load ElevenLabs data
-        with open(elevenlabs_path, 'r', encoding='utf-8') as f:
-            self.elevenlabs_data = json.load(f)
+        # Stream ElevenLabs alignment into compact buffers (audio payload is skipped)
+        with self.instrumentation.stage('load') as stage:
+            self.alignment = load_alignment(elevenlabs_path)
+            stage.count(characters=len(self.alignment.characters))
 
         # Load original content if provided
         self.original_content = None
@@ -46,15 +59,14 @@ class ElevenLabsCompleteProcessor:
                 self.original_content = json.load(f)
 
         # Extract alignment data
-        self.alignment = self.elevenlabs_data.get('alignment', {})
-        self.characters = self.alignment.get('characters', [])
-        self.start_times = self.alignment.get('character_start_times_seconds', [])
-        self.end_times = self.alignment.get('character_end_times_seconds', [])
+        self.characters = self.alignment.characters
+        self.start_times = self.alignment.start_times
+        self.end_times = self.alignment.end_times
 
-        print(f"📊 Loaded ElevenLabs data:")
-        print(f"   Characters: {len(self.characters)}")
-        print(f"   Start times: {len(self.start_times)}")
-        print(f"   End times: {len(self.end_times)}")
+        logger.info(f"📊 Loaded ElevenLabs data:")
+        logger.info(f"   Characters: {len(self.characters)}")
+        logger.info(f"   Start times: {len(self.start_times)}")
+        logger.info(f"   End times: {len(self.end_times)}")
 
     def reconstruct_text(self) -> str:
         """Reconstruct full text from character array"""
@@ -119,7 +131,7 @@ class ElevenLabsCompleteProcessor:
         if not words:
             return words
 
-        print("\n🔧 Eliminating timing gaps...")
+        logger.info("\n🔧 Eliminating timing gaps...")
 
         # Track statistics
         gaps_found = 0
@@ -149,7 +161,7 @@ class ElevenLabsCompleteProcessor:
                     # by adjusting its start if needed in a second pass
             elif gap < 0:
                 # Overlap detected (shouldn't happen but handle gracefully)
-                print(f"   ⚠️ Overlap detected: '{current_word['word']}' -> '{next_word['word']}': {-gap}ms overlap")
+                logger.warning(f"   ⚠️ Overlap detected: '{current_word['word']}' -> '{next_word['word']}': {-gap}ms overlap")
                 # Adjust current word to end exactly when next starts
                 current_word['end_ms'] = next_word['start_ms']
 
@@ -159,12 +171,12 @@ class ElevenLabsCompleteProcessor:
 
         if gaps_found > 0:
             avg_gap = total_gap_ms / gaps_found
-            print(f"   ✅ Eliminated {gaps_found} gaps")
-            print(f"      Average gap: {avg_gap:.1f}ms")
-            print(f"      Max gap: {max_gap}ms")
-            print(f"      Total gap time: {total_gap_ms}ms")
+            logger.info(f"   ✅ Eliminated {gaps_found} gaps")
+            logger.info(f"      Average gap: {avg_gap:.1f}ms")
+            logger.info(f"      Max gap: {max_gap}ms")
+            logger.info(f"      Total gap time: {total_gap_ms}ms")
         else:
-            print("   ✅ No gaps found (timing already continuous)")
+            logger.info("   ✅ No gaps found (timing already continuous)")
 
         return words
 
@@ -176,6 +188,12 @@ class ElevenLabsCompleteProcessor:
         at regular intervals (default 10ms). This enables O(1) lookups instead of
         O(log n) binary search, dramatically improving performance.
 
+        The table also carries a run-length interval encoding (see lookup_table.py)
+        that is a fraction of the size, built straight from the word times. The
+        per-tick `lookup` array is only sampled when it is kept, i.e. unless
+        `output.include_legacy_lookup` is disabled in the config. Sampling is
+        vectorized with NumPy when it is installed.
+
         Args:
             words: List of word timing dictionaries
             sentences: List of sentence dictionaries
@@ -185,62 +203,36 @@ class ElevenLabsCompleteProcessor:
         Returns:
             Dictionary with lookup table structure
         """
-        print(f"🚀 Generating O(1) lookup table (interval: {interval_ms}ms)...")
+        logger.info(f"🚀 Generating O(1) lookup table (interval: {interval_ms}ms)...")
 
         # Calculate number of entries needed
         num_entries = (total_duration_ms // interval_ms) + 1
-        lookup = []
-
-        # Track current indices
-        word_idx = 0
-        sentence_idx = 0
-
-        # Generate lookup entry for each time position
-        for time_ms in range(0, total_duration_ms + 1, interval_ms):
-            # Find active word at this time
-            while word_idx < len(words) - 1:
-                if words[word_idx + 1]['start_ms'] <= time_ms:
-                    word_idx += 1
-                else:
-                    break
-
-            # Check if current word is actually active at this time
-            current_word_idx = -1
-            if word_idx < len(words):
-                word = words[word_idx]
-                if word['start_ms'] <= time_ms <= word['end_ms']:
-                    current_word_idx = word_idx
-                elif word_idx > 0:
-                    # Check previous word (for gaps that were filled)
-                    prev_word = words[word_idx - 1]
-                    if prev_word['start_ms'] <= time_ms <= prev_word['end_ms']:
-                        current_word_idx = word_idx - 1
-
-            # Get sentence index from word
-            if current_word_idx >= 0:
-                sentence_idx = words[current_word_idx].get('sentence_index', 0)
-            else:
-                sentence_idx = -1
 
-            # Add entry: [word_index, sentence_index]
-            lookup.append([current_word_idx, sentence_idx])
+        # Run-length interval encoding (version 2.0) for new clients, in O(words)
+        intervals = lookup_intervals(words, num_entries, interval_ms, end_inclusive=True)
 
         # Create lookup table structure
         lookup_table = {
-            "version": "1.0",
+            "version": INTERVAL_LOOKUP_VERSION,
             "interval": interval_ms,
             "totalDurationMs": total_duration_ms,
-            "lookup": lookup
+            "intervals": intervals
         }
 
-        print(f"   ✅ Generated {len(lookup)} lookup entries")
-        print(f"      Coverage: 0ms to {total_duration_ms}ms")
-        print(f"      Size: ~{len(lookup) * 8 / 1024:.1f}KB")
+        # Keep the per-tick array for clients that predate interval lookups
+        if self.config.get('output', {}).get('include_legacy_lookup', True):
+            lookup_table["lookup"] = sample_lookup(words, num_entries, interval_ms, end_inclusive=True)
+
+        logger.info(f"   ✅ Generated {num_entries} lookup entries")
+        logger.info(f"      Coverage: 0ms to {total_duration_ms}ms")
+        if "lookup" in lookup_table:
+            logger.info(f"      Size: ~{num_entries * 8 / 1024:.1f}KB")
+        logger.info(f"      Intervals: {len(intervals['start_ms'])} ({len(intervals['start_ms']) * 12 / 1024:.1f}KB)")
 
         # Verify lookup table quality
-        valid_entries = sum(1 for entry in lookup if entry[0] >= 0)
-        coverage_percent = (valid_entries / len(lookup)) * 100 if lookup else 0
-        print(f"      Coverage: {coverage_percent:.1f}% of positions have active words")
+        valid_entries = active_ticks(intervals, interval_ms, num_entries)
+        coverage_percent = (valid_entries / num_entries) * 100 if num_entries else 0
+        logger.info(f"      Coverage: {coverage_percent:.1f}% of positions have active words")
 
         return lookup_table
 
@@ -249,15 +241,21 @@ class ElevenLabsCompleteProcessor:
         # Use enhanced detection if enabled
         if self.config.get('use_enhanced_detection', True):
             # Detect special structures in the text
-            structures = self.edge_handlers.detect_structures(text)
+            with self.instrumentation.stage('structure_detection') as stage:
+                structures = self.edge_handlers.detect_structures(text)
+                stage.count(structures=len(structures))
 
             # Apply enhanced sentence detection
-            sentences = self.edge_handlers.apply_enhanced_sentence_detection(
-                words, text, structures
-            )
+            with self.instrumentation.stage('sentence_detection') as stage:
+                sentences = self.edge_handlers.apply_enhanced_sentence_detection(
+                    words, text, structures
+                )
+                stage.count(sentences=len(sentences))
         else:
             # Fallback to original simple detection
-            sentences = self._simple_sentence_detection(words, text)
+            with self.instrumentation.stage('sentence_detection') as stage:
+                sentences = self._simple_sentence_detection(words, text)
+                stage.count(sentences=len(sentences))
 
         return sentences
 
@@ -349,7 +347,7 @@ class ElevenLabsCompleteProcessor:
     def extract_headers(self, text: str) -> List[str]:
         """Extract potential headers from text"""
         headers = []
-        lines = text.split('\n')
+        lines = self.edge_handlers.get_text_index(text).lines
 
         for line in lines:
             line = line.strip()
@@ -371,57 +369,15 @@ class ElevenLabsCompleteProcessor:
             return words, sentences
 
         # Extend each sentence's time boundaries to eliminate gaps
-        for i in range(len(sentences)):
-            if i < len(sentences) - 1:
-                # Extend current sentence end to next sentence start
-                next_sentence_start = sentences[i + 1]['start_ms']
-                current_sentence_end = sentences[i]['end_ms']
-
-                # Find the midpoint between sentences
-                midpoint = (current_sentence_end + next_sentence_start) // 2
-
-                # Extend current sentence to midpoint
-                sentences[i]['end_ms'] = midpoint
-                # Start next sentence from midpoint
-                sentences[i + 1]['start_ms'] = midpoint
+        close_sentence_gaps(sentences)
 
         # Now assign words to sentences based on the extended boundaries
-        for word in words:
-            word_mid = (word['start_ms'] + word['end_ms']) // 2
-
-            # Find which sentence this word belongs to
-            assigned = False
-            for i, sentence in enumerate(sentences):
-                if sentence['start_ms'] <= word_mid <= sentence['end_ms']:
-                    word['sentence_index'] = i
-                    assigned = True
-                    break
-
-            # If word falls outside all sentences (shouldn't happen after extension)
-            # assign it to the nearest sentence
-            if not assigned:
-                if word_mid < sentences[0]['start_ms']:
-                    word['sentence_index'] = 0
-                elif word_mid > sentences[-1]['end_ms']:
-                    word['sentence_index'] = len(sentences) - 1
-                else:
-                    # Find nearest sentence
-                    min_distance = float('inf')
-                    nearest_idx = 0
-                    for i, sentence in enumerate(sentences):
-                        distance = min(
-                            abs(word_mid - sentence['start_ms']),
-                            abs(word_mid - sentence['end_ms'])
-                        )
-                        if distance < min_distance:
-                            min_distance = distance
-                            nearest_idx = i
-                    word['sentence_index'] = nearest_idx
+        assign_words_to_sentences(words, sentences)
 
         # Verify no word has sentence_index = -1
         for word in words:
             if 'sentence_index' not in word or word['sentence_index'] < 0:
-                print(f"⚠️ Word '{word['word']}' at {word['start_ms']}ms had invalid sentence index, fixing...")
+                logger.warning(f"⚠️ Word '{word['word']}' at {word['start_ms']}ms had invalid sentence index, fixing...")
                 # Assign to sentence 0 as fallback
                 word['sentence_index'] = 0
 
@@ -429,26 +385,40 @@ class ElevenLabsCompleteProcessor:
 
     def process(self) -> Dict:
         """Process ElevenLabs data and create enhanced content JSON"""
+        stage = self.instrumentation.stage
+
         # Reconstruct text
-        full_text = self.reconstruct_text()
+        with stage('reconstruct') as record:
+            full_text = self.reconstruct_text()
+            record.count(characters=len(full_text))
 
         # Extract words with timing
-        words = self.extract_words_with_timing()
+        with stage('word_extraction') as record:
+            words = self.extract_words_with_timing()
+            record.count(words=len(words))
 
         # Eliminate gaps between words for smooth highlighting
-        words = self.eliminate_timing_gaps(words)
+        with stage('gap_elimination') as record:
+            words = self.eliminate_timing_gaps(words)
+            record.count(words=len(words))
 
         # Detect sentences
         sentences = self.detect_sentences(words, full_text)
 
         # Post-process to ensure continuous sentence coverage
-        words, sentences = self.ensure_continuous_sentence_coverage(words, sentences)
+        with stage('coverage') as record:
+            words, sentences = self.ensure_continuous_sentence_coverage(words, sentences)
+            record.count(words=len(words), sentences=len(sentences))
 
         # Extract paragraphs
-        paragraphs = self.extract_paragraphs(full_text)
+        with stage('paragraphs') as record:
+            paragraphs = self.extract_paragraphs(full_text)
+            record.count(paragraphs=len(paragraphs))
 
         # Extract headers
-        headers = self.extract_headers(full_text)
+        with stage('headers') as record:
+            headers = self.extract_headers(full_text)
+            record.count(headers=len(headers))
 
         # Create display text with paragraph breaks preserved
         # If we have original content with paragraphs, use its formatting
@@ -462,7 +432,9 @@ class ElevenLabsCompleteProcessor:
         total_duration_ms = int(self.end_times[-1] * 1000) if self.end_times else 0
 
         # Generate O(1) lookup table for performance
-        lookup_table = self.generate_lookup_table(words, sentences, total_duration_ms)
+        with stage('lookup') as record:
+            lookup_table = self.generate_lookup_table(words, sentences, total_duration_ms)
+            record.count(intervals=len(lookup_table['intervals']['start_ms']))
 
         # Build enhanced content JSON
         content = {
@@ -499,38 +471,56 @@ class ElevenLabsCompleteProcessor:
         lookup_table = content['timing'].pop('lookup_table', None)
 
         # Save main content without lookup table
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(content, f, indent=2, ensure_ascii=False)
-
-        print(f"\n✅ Saved enhanced content to: {output_path}")
-
-        # Save lookup table as separate file (for Supabase Storage)
-        if lookup_table:
-            from pathlib import Path
-            lookup_path = Path(output_path).parent / f"{Path(output_path).stem}_lookup.json"
-            with open(lookup_path, 'w', encoding='utf-8') as f:
-                json.dump(lookup_table, f, indent=2, ensure_ascii=False)
-            print(f"✅ Saved lookup table to: {lookup_path}")
-            print(f"   Entries: {len(lookup_table.get('lookup', []))}")
-            print(f"   Interval: {lookup_table.get('interval', 0)}ms")
-
-        print(f"\n📊 Summary:")
-        print(f"   Text: {content['metadata']['character_count']} characters")
-        print(f"   Words: {len(content['timing']['words'])}")
-        print(f"   Sentences: {len(content['timing']['sentences'])}")
-        print(f"   Paragraphs: {len(content['paragraphs'])}")
-        print(f"   Duration: {content['timing']['total_duration_ms'] / 1000:.1f} seconds")
-        print(f"   Duration: {content['timing']['total_duration_ms'] / 60000:.1f} minutes")
+        with self.instrumentation.stage('save'):
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(content, f, indent=2, ensure_ascii=False)
+
+            logger.info(f"\n✅ Saved enhanced content to: {output_path}")
+
+            # Save lookup table as separate file (for Supabase Storage)
+            if lookup_table:
+                lookup_path = Path(output_path).parent / f"{Path(output_path).stem}_lookup.json"
+                with open(lookup_path, 'w', encoding='utf-8') as f:
+                    json.dump(lookup_table, f, indent=2, ensure_ascii=False)
+                logger.info(f"✅ Saved lookup table to: {lookup_path}")
+                logger.info(f"   Entries: {len(lookup_table.get('lookup', []))}")
+                logger.info(f"   Intervals: {len(lookup_table['intervals']['start_ms'])}")
+                logger.info(f"   Interval: {lookup_table.get('interval', 0)}ms")
+
+                # Compact binary twin of the interval table (see lookup_table.py)
+                binary_path = lookup_path.with_suffix('.bin')
+                binary_size = write_binary_lookup(
+                    str(binary_path), lookup_table['intervals'], lookup_table['interval'],
+                    lookup_table['totalDurationMs'], len(content['timing']['words']),
+                    len(content['timing']['sentences'])
+                )
+                logger.info(f"✅ Saved binary lookup table to: {binary_path} ({binary_size:,} bytes)")
+
+                # Fixed-duration timing shards for progressive loading (see timing_shards.py)
+                shard_ms = shard_ms_from_config(self.config)
+                if shard_ms:
+                    shard_index = write_timing_shards(output_path, content['timing'], lookup_table['intervals'],
+                                                      lookup_table['interval'], shard_ms)
+                    logger.info(f"✅ Saved {len(shard_index['shards'])} timing shards of {shard_ms / 1000:g}s to: "
+                                f"{shard_directory(output_path)}")
+
+        logger.info(f"\n📊 Summary:")
+        logger.info(f"   Text: {content['metadata']['character_count']} characters")
+        logger.info(f"   Words: {len(content['timing']['words'])}")
+        logger.info(f"   Sentences: {len(content['timing']['sentences'])}")
+        logger.info(f"   Paragraphs: {len(content['paragraphs'])}")
+        logger.info(f"   Duration: {content['timing']['total_duration_ms'] / 1000:.1f} seconds")
+        logger.info(f"   Duration: {content['timing']['total_duration_ms'] / 60000:.1f} minutes")
 
         # Verify against original if provided
         if self.original_content:
             orig_text = self.original_content.get('full_text', '')
             if orig_text.strip() == content['display_text'].strip():
-                print("\n✅ Text matches original content perfectly!")
+                logger.info("\n✅ Text matches original content perfectly!")
             else:
-                print(f"\n⚠️ Text differs from original:")
-                print(f"   Original: {len(orig_text)} chars")
-                print(f"   Processed: {len(content['display_text'])} chars")
+                logger.warning(f"\n⚠️ Text differs from original:")
+                logger.warning(f"   Original: {len(orig_text)} chars")
+                logger.warning(f"   Processed: {len(content['display_text'])} chars")
 
 
 def main():
@@ -557,8 +547,12 @@ def main():
         default='config.json',
         help='Path to configuration file for edge case handling (default: config.json)'
     )
+    parser.add_argument('-q', '--quiet', action='store_true', help='Only show warnings')
+    add_shard_arguments(parser)
+    add_instrumentation_arguments(parser)
 
     args = parser.parse_args()
+    configure_logging(verbose=not args.quiet)
 
     # Determine output path
     if args.output:
@@ -572,24 +566,36 @@ def main():
     if args.config and Path(args.config).exists():
         with open(args.config, 'r') as f:
             config = json.load(f)
-            print(f"📋 Loaded configuration from: {args.config}")
+            logger.info(f"📋 Loaded configuration from: {args.config}")
+    try:
+        config = apply_shard_arguments(config, args)
+    except ValueError as e:
+        parser.error(str(e))
 
     # Process
+    instrumentation = instrumentation_from_args(args, Path(args.elevenlabs_json).stem)
     processor = ElevenLabsCompleteProcessor(
         args.elevenlabs_json,
         args.original_content,
-        config
+        config,
+        instrumentation
     )
     processor.save(str(output_path))
 
+    if args.timing_report:
+        instrumentation.write_jsonl(args.timing_report)
+        logger.info(f"⏱️ Appended stage timings to: {args.timing_report}")
+    instrumentation.close()
+
 
 if __name__ == '__main__':
     import sys
 
     if len(sys.argv) == 1:
         # Default test processing
-        print("🧪 Running test processing with complete ElevenLabs data...")
-        print("=" * 50)
+        configure_logging()
+        logger.info("🧪 Running test processing with complete ElevenLabs data...")
+        logger.info("=" * 50)
 
         processor = ElevenLabsCompleteProcessor(
             'Test_LO_Content/Risk Management and Insurance in Action.json',
@@ -7,21 +7,38 @@ This script handles the full ElevenLabs JSON format with character-level timing
 and converts it to word-level timing while preserving paragraph breaks from
 the original markdown content.
 
-Version: 3.0 - Paragraph preservation for proper display formatting
+Version: 3.5 - Lookup intervals come straight from the word times; the per-tick table is only sampled when written
 """
 
 import json
 import re
+from itertools import accumulate
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
-from difflib import SequenceMatcher
 from edge_case_handlers import EdgeCaseHandlers, StructureType
+from lookup_table import sample_lookup, lookup_intervals, active_ticks, write_binary_lookup, INTERVAL_LOOKUP_VERSION
+from alignment_loader import Alignment, load_alignment
+from paragraph_alignment import paragraph_breaks, display_offsets
+from sentence_coverage import close_sentence_gaps, assign_words_to_sentences
+from timing_track import TimingTrack
+from build_cache import BuildCache, DEFAULT_CACHE_DIR
+from precompress import output_options, variant_paths, write_variants, add_output_arguments, apply_output_arguments
+from timing_shards import (shard_ms_from_config, shard_directory, shard_paths, write_timing_shards,
+                           add_shard_arguments, apply_shard_arguments)
+from instrumentation import (Instrumentation, add_instrumentation_arguments, configure_logging, get_logger,
+                             instrumentation_from_args)
+
+logger = get_logger(__name__)
+
+# Bump whenever output changes for identical inputs; it is part of every cache key
+PROCESSOR_VERSION = "3.5"
 
 
 class ElevenLabsCompleteProcessorWithParagraphs:
     """Process complete ElevenLabs character-level timing to word-level with paragraph preservation"""
 
-    def __init__(self, elevenlabs_path: str, original_content_path: Optional[str] = None, config: Dict = None):
+    def __init__(self, elevenlabs_path: str, original_content_path: Optional[str] = None, config: Dict = None,
+                 cache: Optional[BuildCache] = None, instrumentation: Optional[Instrumentation] = None):
         """
         Initialize processor
 
@@ -29,17 +46,23 @@ class ElevenLabsCompleteProcessorWithParagraphs:
             elevenlabs_path: Path to ElevenLabs JSON with character timing
             original_content_path: Optional path to original content for formatting preservation
             config: Optional configuration for edge case handling
+            cache: Optional build cache consulted by process() and save()
+            instrumentation: Optional per-stage recorder (one is created if omitted)
         """
         self.elevenlabs_path = elevenlabs_path
         self.original_content_path = original_content_path
         self.config = config or {}
+        self.cache = cache
+        self.cache_key = None
+        self.cache_status = None
+        self.offset_mismatches = 0
+        self.instrumentation = instrumentation or Instrumentation(Path(elevenlabs_path).stem)
 
         # Initialize edge case handlers
         self.edge_handlers = EdgeCaseHandlers(config)
 
-        # Load ElevenLabs data
-        with open(elevenlabs_path, 'r', encoding='utf-8') as f:
-            self.elevenlabs_data = json.load(f)
+        # The ElevenLabs alignment is only loaded when needed (see load_alignment), so a cache hit skips it
+        self._alignment = None
 
         # Load original content if provided
         self.original_content = None
@@ -64,25 +87,41 @@ class ElevenLabsCompleteProcessorWithParagraphs:
                     # Remove markdown headers and clean up
                     self.original_paragraphs = [re.sub(r'^#+\s*', '', p) for p in self.original_paragraphs]
 
-        # Extract alignment data
-        self.alignment = self.elevenlabs_data.get('alignment', {})
-        self.characters = self.alignment.get('characters', [])
-        self.start_times = self.alignment.get('character_start_times_seconds', [])
-        self.end_times = self.alignment.get('character_end_times_seconds', [])
-
-        print(f"📊 Loaded ElevenLabs data:")
-        print(f"   Characters: {len(self.characters)}")
-        print(f"   Start times: {len(self.start_times)}")
-        print(f"   End times: {len(self.end_times)}")
         if self.original_paragraphs:
-            print(f"   Original paragraphs: {len(self.original_paragraphs)}")
+            logger.info(f"📄 Original paragraphs: {len(self.original_paragraphs)}")
+
+    def load_alignment(self) -> Alignment:
+        """Stream the ElevenLabs alignment into compact buffers on first use (audio payload is skipped)"""
+        if self._alignment is None:
+            with self.instrumentation.stage('load') as stage:
+                self._alignment = load_alignment(self.elevenlabs_path)
+                stage.count(characters=len(self._alignment.characters))
+
+            logger.info(f"📊 Loaded ElevenLabs data:")
+            logger.info(f"   Characters: {len(self._alignment.characters)}")
+            logger.info(f"   Start times: {len(self._alignment.start_times)}")
+            logger.info(f"   End times: {len(self._alignment.end_times)}")
+        return self._alignment
+
+    @property
+    def characters(self):
+        return self.load_alignment().characters
+
+    @property
+    def start_times(self):
+        return self.load_alignment().start_times
+
+    @property
+    def end_times(self):
+        return self.load_alignment().end_times
 
     def reconstruct_text_with_paragraphs(self) -> Tuple[str, List[str], List[int]]:
         """
         Reconstruct text with paragraph breaks preserved from original
 
         Returns:
-            Tuple of (full_text_with_breaks, paragraphs_list, paragraph_break_positions)
+            Tuple of (full_text_with_breaks, paragraphs_list, paragraph_break_positions),
+            where the break positions are raw text offsets where paragraphs after the first begin
         """
         # First reconstruct the raw text
         raw_text = ''.join(self.characters)
@@ -91,162 +130,70 @@ class ElevenLabsCompleteProcessorWithParagraphs:
             # No original paragraphs, return as single paragraph
             return raw_text, [raw_text], []
 
-        # Simple approach: Just split the raw text into roughly equal parts
-        # based on the number of original paragraphs, breaking at sentence boundaries
-        num_target_paragraphs = len(self.original_paragraphs)
-
-        # Find sentence ending positions in the raw text
-        sentence_ends = []
-        for i, char in enumerate(self.characters):
-            if i > 0 and char in '.!?' and i < len(self.characters) - 1:
-                # Check if next char is space or end
-                if i + 1 >= len(self.characters) or self.characters[i + 1].isspace():
-                    sentence_ends.append(i + 1)
-
-        if not sentence_ends:
-            # No sentence boundaries found, fall back to single paragraph
-            return raw_text, [raw_text], []
-
-        # Calculate ideal paragraph length
-        total_length = len(raw_text)
-        ideal_para_length = total_length / num_target_paragraphs
+        # Align the original paragraphs to the spoken text and break at the exact offsets
+        breaks = paragraph_breaks(raw_text, self.original_paragraphs)
 
-        # Build paragraphs by finding the best sentence boundaries
         paragraphs = []
         paragraph_break_positions = []
-        current_start = 0
-
-        for para_idx in range(num_target_paragraphs - 1):
-            # Find the target end position for this paragraph
-            target_end = int((para_idx + 1) * ideal_para_length)
-
-            # Find the closest sentence boundary to the target
-            best_boundary = None
-            min_distance = float('inf')
-
-            for boundary in sentence_ends:
-                if boundary > current_start:
-                    distance = abs(boundary - target_end)
-                    if distance < min_distance:
-                        min_distance = distance
-                        best_boundary = boundary
-                    # Stop searching if we've gone too far past the target
-                    if boundary > target_end + ideal_para_length / 2:
-                        break
-
-            if best_boundary and best_boundary > current_start:
-                # Extract paragraph
-                paragraph_text = raw_text[current_start:best_boundary].strip()
-                if paragraph_text:
-                    paragraphs.append(paragraph_text)
-                    paragraph_break_positions.append(current_start)
-                    current_start = best_boundary
-                    # Skip any whitespace after the boundary
-                    while current_start < len(raw_text) and raw_text[current_start].isspace():
-                        current_start += 1
-
-        # Add the final paragraph
-        if current_start < len(raw_text):
-            final_paragraph = raw_text[current_start:].strip()
-            if final_paragraph:
-                paragraphs.append(final_paragraph)
+        for start, end in zip([0] + breaks, breaks + [len(raw_text)]):
+            paragraph_text = raw_text[start:end].strip()
+            if paragraph_text:
+                if paragraphs:
+                    paragraph_break_positions.append(start)
+                paragraphs.append(paragraph_text)
 
         # Reconstruct with paragraph breaks
         full_text_with_breaks = '\n\n'.join(paragraphs)
 
         return full_text_with_breaks, paragraphs, paragraph_break_positions
 
-    def _find_raw_position(self, normalized_text: str, normalized_pos: int) -> int:
-        """Map a position in normalized text back to raw text position"""
-        if normalized_pos >= len(normalized_text):
-            return len(''.join(self.characters))
-
-        # Count actual characters up to the normalized position
-        char_count = 0
-        norm_count = 0
-        raw_pos = 0
-
-        for char in self.characters:
-            if char.strip():  # Non-whitespace
-                if norm_count >= normalized_pos:
-                    break
-                norm_count += 1
-            raw_pos += 1
-
-        return raw_pos
-
-    def extract_words_with_timing_and_paragraphs(self, full_text: str) -> List[Dict]:
-        """Extract words with timing from the full text with paragraph breaks"""
-        words = []
-        current_word = []
-        word_start_time = None
-        word_start_char_in_text = 0
-        char_position_in_original = 0
-        char_position_in_text = 0
-
-        # Process character by character
-        for i, char in enumerate(self.characters):
-            # Check if this position in the full_text is a paragraph break
-            if char_position_in_text < len(full_text):
-                # Skip over any \n\n in the full text that aren't in the original
-                while (char_position_in_text < len(full_text) - 1 and
-                       full_text[char_position_in_text:char_position_in_text+2] == '\n\n'):
-                    char_position_in_text += 2
-
-            if char.strip():  # Non-whitespace character
-                if word_start_time is None:
-                    word_start_time = self.start_times[i]
-                    word_start_char_in_text = char_position_in_text
-                current_word.append(char)
-            else:  # Whitespace
-                if current_word:
-                    # End of word
-                    word_text = ''.join(current_word)
-                    word_end_time = self.end_times[i - 1] if i > 0 else self.end_times[i]
-
-                    words.append({
-                        'word': word_text,
-                        'start_ms': int(word_start_time * 1000) if word_start_time else 0,
-                        'end_ms': int(word_end_time * 1000) if word_end_time else 0,
-                        'char_start': word_start_char_in_text,
-                        'char_end': char_position_in_text + len(word_text),
-                        'sentence_index': 0  # Will be updated later
-                    })
-
-                    current_word = []
-                    word_start_time = None
-
-            # Advance position in both original and text
-            char_position_in_original += 1
-            if char_position_in_text < len(full_text) and full_text[char_position_in_text] == char:
-                char_position_in_text += 1
-
-        # Add last word if exists
-        if current_word:
-            word_text = ''.join(current_word)
-            word_end_time = self.end_times[-1]
-
-            words.append({
-                'word': word_text,
-                'start_ms': int(word_start_time * 1000) if word_start_time else 0,
-                'end_ms': int(word_end_time * 1000) if word_end_time else 0,
-                'char_start': word_start_char_in_text,
-                'char_end': char_position_in_text + len(word_text),
-                'sentence_index': 0
-            })
-
-        # Now fix character positions by finding actual word positions in the text
-        for word_data in words:
-            word = word_data['word']
-            # Find this word in the text starting from expected position
-            search_start = max(0, word_data['char_start'] - 10)
-            search_end = min(len(full_text), word_data['char_start'] + len(word) + 10)
-            search_text = full_text[search_start:search_end]
-
-            if word in search_text:
-                word_pos = search_text.find(word)
-                word_data['char_start'] = search_start + word_pos
-                word_data['char_end'] = search_start + word_pos + len(word)
+    def extract_words_with_timing_and_paragraphs(self, full_text: str) -> TimingTrack:
+        """
+        Extract words with timing from the full text with paragraph breaks
+
+        Word char_start/char_end index full_text. They come from a map of every
+        ElevenLabs character to its position in full_text, built in one pass;
+        words whose offsets do not select their own text in full_text are
+        counted in self.offset_mismatches.
+        """
+        words = TimingTrack()
+        characters = self.characters
+        raw_text = ''.join(characters)
+        offsets = display_offsets(raw_text, full_text)
+        # Offset of each ElevenLabs character in raw_text (items may hold several characters)
+        raw_starts = range(len(raw_text)) if isinstance(characters, str) else \
+            list(accumulate((len(char) for char in characters), initial=0))
+
+        def add_word(first: int, last: int):
+            word_text = ''.join(characters[first:last + 1])
+            word_start_time = self.start_times[first]
+            word_end_time = self.end_times[last]
+            words.append(
+                word_text,
+                start_ms=int(word_start_time * 1000) if word_start_time else 0,
+                end_ms=int(word_end_time * 1000) if word_end_time else 0,
+                char_start=offsets[raw_starts[first]],
+                char_end=offsets[raw_starts[last] + len(characters[last]) - 1] + 1,
+                sentence_index=0  # Will be updated later
+            )
+
+        # Words are runs of non-whitespace characters
+        word_first = None
+        for i, char in enumerate(characters):
+            if char.strip():
+                if word_first is None:
+                    word_first = i
+            elif word_first is not None:
+                add_word(word_first, i - 1)
+                word_first = None
+        if word_first is not None:
+            add_word(word_first, len(characters) - 1)
+
+        self.offset_mismatches = sum(
+            1 for i in range(len(words))
+            if full_text[words.char_start[i]:words.char_end[i]] != words.word(i))
+        if self.offset_mismatches:
+            logger.warning(f"⚠️ {self.offset_mismatches} words do not match the display text at their offsets")
 
         return words
 
@@ -275,11 +222,11 @@ class ElevenLabsCompleteProcessorWithParagraphs:
                 words[i + 1]['start_ms'] = midpoint
 
         if gap_count > 0:
-            print(f"🔧 Eliminating timing gaps...")
-            print(f"   ✅ Eliminated {gap_count} gaps")
-            print(f"      Average gap: {total_gap_time / gap_count:.1f}ms")
-            print(f"      Max gap: {max_gap}ms")
-            print(f"      Total gap time: {total_gap_time}ms")
+            logger.info(f"🔧 Eliminating timing gaps...")
+            logger.info(f"   ✅ Eliminated {gap_count} gaps")
+            logger.info(f"      Average gap: {total_gap_time / gap_count:.1f}ms")
+            logger.info(f"      Max gap: {max_gap}ms")
+            logger.info(f"      Total gap time: {total_gap_time}ms")
 
         return words
 
@@ -289,10 +236,14 @@ class ElevenLabsCompleteProcessorWithParagraphs:
             return []
 
         # Use enhanced detection with edge case handlers
-        structures = self.edge_handlers.detect_structures(full_text)
-        sentences = self.edge_handlers.apply_enhanced_sentence_detection(
-            words, full_text, structures
-        )
+        with self.instrumentation.stage('structure_detection') as stage:
+            structures = self.edge_handlers.detect_structures(full_text)
+            stage.count(structures=len(structures))
+        with self.instrumentation.stage('sentence_detection') as stage:
+            sentences = self.edge_handlers.apply_enhanced_sentence_detection(
+                words, full_text, structures
+            )
+            stage.count(sentences=len(sentences))
 
         return sentences
 
@@ -302,56 +253,15 @@ class ElevenLabsCompleteProcessorWithParagraphs:
             return words, sentences
 
         # First, extend sentence timings to eliminate gaps
-        for i in range(len(sentences)):
-            if i < len(sentences) - 1:
-                # Extend current sentence end to next sentence start
-                next_sentence_start = sentences[i + 1]['start_ms']
-                current_sentence_end = sentences[i]['end_ms']
-
-                # Find the midpoint between sentences
-                midpoint = (current_sentence_end + next_sentence_start) // 2
-
-                # Extend current sentence to midpoint
-                sentences[i]['end_ms'] = midpoint
-                # Start next sentence from midpoint
-                sentences[i + 1]['start_ms'] = midpoint
+        close_sentence_gaps(sentences)
 
         # Now assign words to sentences based on the extended boundaries
-        for word in words:
-            word_mid = (word['start_ms'] + word['end_ms']) // 2
-
-            # Find which sentence this word belongs to
-            assigned = False
-            for i, sentence in enumerate(sentences):
-                if sentence['start_ms'] <= word_mid <= sentence['end_ms']:
-                    word['sentence_index'] = i
-                    assigned = True
-                    break
-
-            # If word falls outside all sentences, assign to nearest
-            if not assigned:
-                if word_mid < sentences[0]['start_ms']:
-                    word['sentence_index'] = 0
-                elif word_mid > sentences[-1]['end_ms']:
-                    word['sentence_index'] = len(sentences) - 1
-                else:
-                    # Find nearest sentence
-                    min_distance = float('inf')
-                    nearest_idx = 0
-                    for i, sentence in enumerate(sentences):
-                        distance = min(
-                            abs(word_mid - sentence['start_ms']),
-                            abs(word_mid - sentence['end_ms'])
-                        )
-                        if distance < min_distance:
-                            min_distance = distance
-                            nearest_idx = i
-                    word['sentence_index'] = nearest_idx
+        assign_words_to_sentences(words, sentences)
 
         # Verify no word has sentence_index = -1
         for word in words:
             if 'sentence_index' not in word or word['sentence_index'] < 0:
-                print(f"⚠️ Word '{word['word']}' at {word['start_ms']}ms had invalid sentence index, fixing...")
+                logger.warning(f"⚠️ Word '{word['word']}' at {word['start_ms']}ms had invalid sentence index, fixing...")
                 word['sentence_index'] = 0
 
         return words, sentences
@@ -360,8 +270,8 @@ class ElevenLabsCompleteProcessorWithParagraphs:
         """Extract potential headers from text"""
         headers = []
 
-        # Common header patterns
-        lines = text.split('\n')
+        # Common header patterns (line table shared with edge case detection)
+        lines = self.edge_handlers.get_text_index(text).lines
         for line in lines:
             line = line.strip()
             # Check if line looks like a header
@@ -374,65 +284,83 @@ class ElevenLabsCompleteProcessorWithParagraphs:
 
         return headers
 
-    def generate_lookup_table(self, words: List[Dict], sentences: List[Dict], total_duration_ms: int) -> Dict:
-        """Generate O(1) lookup table for performance"""
+    def generate_lookup_table(self, words: List[Dict], sentences: List[Dict],
+                              total_duration_ms: int) -> Tuple[Optional[List[List[int]]], Dict[str, List[int]]]:
+        """
+        Generate the O(1) lookup table at 10ms intervals
+
+        Returns:
+            (legacy per-tick [word_index, sentence_index] pairs, or None when
+            output.include_legacy_lookup is disabled, and the interval encoding
+            built straight from the word times)
+        """
         lookup_interval = 10  # 10ms intervals
-        lookup_table = {}
-
-        # Pre-build lookup table
-        for time_ms in range(0, total_duration_ms + lookup_interval, lookup_interval):
-            # Binary search for word at this time
-            word_idx = -1
-            left, right = 0, len(words) - 1
-            while left <= right:
-                mid = (left + right) // 2
-                if words[mid]['start_ms'] <= time_ms < words[mid]['end_ms']:
-                    word_idx = mid
-                    break
-                elif time_ms < words[mid]['start_ms']:
-                    right = mid - 1
-                else:
-                    left = mid + 1
-
-            # Find sentence index
-            sentence_idx = words[word_idx]['sentence_index'] if word_idx >= 0 else -1
-
-            lookup_table[time_ms] = {
-                'word_index': word_idx,
-                'sentence_index': sentence_idx
-            }
+        num_entries = len(range(0, total_duration_ms + lookup_interval, lookup_interval))
 
-        print(f"🚀 Generating O(1) lookup table (interval: {lookup_interval}ms)...")
-        print(f"   ✅ Generated {len(lookup_table)} lookup entries")
-        print(f"      Coverage: 0ms to {total_duration_ms}ms")
-        print(f"      Size: ~{len(lookup_table) * 16 / 1024:.1f}KB")
+        intervals = lookup_intervals(words, num_entries, lookup_interval, end_inclusive=False)
+
+        # Only sample every tick when the per-tick table is written (vectorized with NumPy when available)
+        lookup = None
+        if self.config.get('output', {}).get('include_legacy_lookup', True):
+            lookup = sample_lookup(words, num_entries, lookup_interval, end_inclusive=False)
+
+        logger.info(f"🚀 Generating O(1) lookup table (interval: {lookup_interval}ms)...")
+        logger.info(f"   ✅ Generated {num_entries} lookup entries")
+        logger.info(f"      Coverage: 0ms to {total_duration_ms}ms")
+        if lookup is not None:
+            logger.info(f"      Size: ~{num_entries * 16 / 1024:.1f}KB")
+        logger.info(f"      Intervals: {len(intervals['start_ms'])}")
 
         # Calculate coverage
-        covered_positions = sum(1 for entry in lookup_table.values() if entry['word_index'] >= 0)
-        coverage_percent = (covered_positions / len(lookup_table)) * 100
-        print(f"      Coverage: {coverage_percent:.1f}% of positions have active words")
+        covered_positions = active_ticks(intervals, lookup_interval, num_entries)
+        coverage_percent = (covered_positions / num_entries) * 100
+        logger.info(f"      Coverage: {coverage_percent:.1f}% of positions have active words")
 
-        return lookup_table
+        return lookup, intervals
 
     def process(self) -> Dict:
         """Process ElevenLabs data and create enhanced content JSON with paragraph preservation"""
+        # Reuse cached output when no input has changed
+        if self.cache:
+            self.cache_key = self.cache.lesson_key(self.elevenlabs_path, self.original_content_path, self.config)
+            cached = self.cache.get(self.cache_key)
+            if cached is not None:
+                self.cache_status = 'hit'
+                logger.info(f"♻️ Cache hit: {Path(self.elevenlabs_path).name} ({self.cache_key[:12]})")
+                return cached
+            self.cache_status = 'miss'
+            logger.info(f"🆕 Cache miss: {Path(self.elevenlabs_path).name} ({self.cache_key[:12]})")
+
+        self.load_alignment()
+        stage = self.instrumentation.stage
+
         # Reconstruct text with paragraph breaks
-        full_text, paragraphs, paragraph_break_positions = self.reconstruct_text_with_paragraphs()
+        with stage('reconstruct') as record:
+            full_text, paragraphs, paragraph_break_positions = self.reconstruct_text_with_paragraphs()
+            record.count(characters=len(full_text), paragraphs=len(paragraphs))
 
         # Extract words with timing, accounting for paragraph breaks
-        words = self.extract_words_with_timing_and_paragraphs(full_text)
+        with stage('word_extraction') as record:
+            words = self.extract_words_with_timing_and_paragraphs(full_text)
+            record.count(words=len(words), offset_mismatches=self.offset_mismatches)
 
         # Eliminate gaps between words for smooth highlighting
-        words = self.eliminate_timing_gaps(words)
+        with stage('gap_elimination') as record:
+            words = self.eliminate_timing_gaps(words)
+            record.count(words=len(words))
 
         # Detect sentences
         sentences = self.detect_sentences(words, full_text)
 
         # Post-process to ensure continuous sentence coverage
-        words, sentences = self.ensure_continuous_sentence_coverage(words, sentences)
+        with stage('coverage') as record:
+            words, sentences = self.ensure_continuous_sentence_coverage(words, sentences)
+            record.count(words=len(words), sentences=len(sentences))
 
         # Extract headers
-        headers = self.extract_headers(full_text)
+        with stage('headers') as record:
+            headers = self.extract_headers(full_text)
+            record.count(headers=len(headers))
 
         # Create display text - this is the text with proper paragraph formatting
         display_text = full_text  # Already has \n\n between paragraphs
@@ -441,7 +369,9 @@ class ElevenLabsCompleteProcessorWithParagraphs:
         total_duration_ms = int(self.end_times[-1] * 1000) if self.end_times else 0
 
         # Generate O(1) lookup table for performance
-        lookup_table = self.generate_lookup_table(words, sentences, total_duration_ms)
+        with stage('lookup') as record:
+            lookup_table, intervals = self.generate_lookup_table(words, sentences, total_duration_ms)
+            record.count(intervals=len(intervals['start_ms']))
 
         # Build enhanced content JSON
         content = {
@@ -461,12 +391,17 @@ class ElevenLabsCompleteProcessorWithParagraphs:
                 "language": "en"
             },
             "timing": {
-                "words": words,
+                "words": words.to_json_dicts(),
                 "sentences": sentences,
                 "total_duration_ms": total_duration_ms,
-                "lookup_table": lookup_table
+                "lookup_intervals": intervals
             }
         }
+        if lookup_table is not None:
+            content["timing"]["lookup_table"] = lookup_table
+
+        if self.cache:
+            self.cache.put(self.cache_key, content)
 
         return content
 
@@ -476,42 +411,110 @@ class ElevenLabsCompleteProcessorWithParagraphs:
             base_path = Path(self.elevenlabs_path).stem
             output_path = f"{base_path}_complete_with_paragraphs.json"
 
-        # Save main content (without lookup table for readability)
-        content_without_lookup = content.copy()
-        content_without_lookup['timing'] = content['timing'].copy()
-        content_without_lookup['timing'].pop('lookup_table', None)
-
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(content_without_lookup, f, indent=2, ensure_ascii=False)
-
-        # Save lookup table separately for performance
         lookup_path = output_path.replace('.json', '_lookup.json')
-        lookup_data = {
-            "version": "1.0",
-            "type": "lookup_table",
-            "interval_ms": 10,
-            "lookup_table": content['timing']['lookup_table']
-        }
-
-        with open(lookup_path, 'w', encoding='utf-8') as f:
-            json.dump(lookup_data, f, indent=2, ensure_ascii=False)
+        binary_path = lookup_path.replace('.json', '.bin')
+
+        # Optional minified JSON and precompressed variants (see precompress.py)
+        options = output_options(self.config)
+        codecs = options['codecs']
+        shard_ms = shard_ms_from_config(self.config)
+        outputs = [output_path, lookup_path, binary_path]
+        if shard_ms:
+            outputs += shard_paths(output_path, content['timing']['total_duration_ms'], shard_ms)
+        outputs += [variant for path in outputs for variant in variant_paths(path, codecs)]
+
+        # Skip writing when these exact outputs were already saved from the same inputs
+        if self.cache and self.cache_key and self.cache.is_output_current(output_path, self.cache_key, outputs):
+            logger.info(f"\n⏭️ Outputs up to date: {output_path}")
+            return output_path
+
+        compressed_sizes = {}
+
+        def write_json(path: str, data: Dict):
+            if options['minify']:
+                text = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+            else:
+                text = json.dumps(data, indent=2, ensure_ascii=False)
+            encoded = text.encode('utf-8')
+            with open(path, 'wb') as f:
+                f.write(encoded)
+            compressed_sizes[path] = write_variants(path, encoded, codecs)
+
+        with self.instrumentation.stage('save') as stage:
+            # Save main content (without lookup table for readability)
+            content_without_lookup = content.copy()
+            content_without_lookup['timing'] = content['timing'].copy()
+            content_without_lookup['timing'].pop('lookup_table', None)
+            content_without_lookup['timing'].pop('lookup_intervals', None)
+
+            write_json(output_path, content_without_lookup)
+
+            # Save lookup table separately for performance
+            lookup = content['timing'].get('lookup_table')
+            intervals = content['timing']['lookup_intervals']
+            lookup_data = {
+                "version": INTERVAL_LOOKUP_VERSION,
+                "type": "lookup_table",
+                "interval_ms": 10,
+                "intervals": intervals
+            }
 
-        print(f"\n✅ Saved enhanced content to: {output_path}")
-        print(f"✅ Saved lookup table to: {lookup_path}")
-        print(f"   Entries: {len(content['timing']['lookup_table'])}")
-        print(f"   Interval: 10ms")
+            # Keep the per-tick table for clients that predate interval lookups
+            # (keyed by time in ms, as earlier versions of this script wrote it)
+            if lookup is not None:
+                lookup_data["lookup_table"] = {
+                    tick * 10: {'word_index': word_idx, 'sentence_index': sentence_idx}
+                    for tick, (word_idx, sentence_idx) in enumerate(lookup)
+                }
+
+            write_json(lookup_path, lookup_data)
+
+            # Compact binary twin of the interval table (see lookup_table.py)
+            binary_size = write_binary_lookup(
+                binary_path, intervals, 10, content['timing']['total_duration_ms'],
+                len(content['timing']['words']), len(content['timing']['sentences'])
+            )
+            if codecs:
+                with open(binary_path, 'rb') as f:
+                    compressed_sizes[binary_path] = write_variants(binary_path, f.read(), codecs)
+            stage.count(intervals=len(intervals['start_ms']))
+
+            # Fixed-duration timing shards for progressive loading (see timing_shards.py)
+            shard_index = None
+            if shard_ms:
+                shard_index = write_timing_shards(output_path, content['timing'], intervals, 10, shard_ms,
+                                                  write_json)
+                stage.count(shards=len(shard_index['shards']))
+
+            logger.info(f"\n✅ Saved enhanced content to: {output_path}")
+            logger.info(f"✅ Saved lookup table to: {lookup_path}")
+            if lookup is not None:
+                logger.info(f"   Entries: {len(lookup)}")
+            logger.info(f"   Intervals: {len(intervals['start_ms'])}")
+            logger.info(f"   Interval: 10ms")
+            logger.info(f"✅ Saved binary lookup table to: {binary_path} ({binary_size:,} bytes)")
+            if shard_index:
+                logger.info(f"✅ Saved {len(shard_index['shards'])} timing shards of {shard_ms / 1000:g}s to: "
+                            f"{shard_directory(output_path)}")
+            for path, sizes in compressed_sizes.items():
+                if sizes and path in (output_path, lookup_path, binary_path):
+                    variants = ', '.join(f"{name} {size:,}" for name, size in sizes.items())
+                    logger.info(f"   Precompressed {Path(path).name}: {variants} bytes")
+
+        if self.cache and self.cache_key:
+            self.cache.record_output(output_path, self.cache_key)
 
         return output_path
 
     def validate(self, content: Dict) -> None:
         """Validate the processed content"""
-        print(f"\n📊 Summary:")
-        print(f"   Text: {content['metadata']['character_count']} characters")
-        print(f"   Words: {content['metadata']['word_count']}")
-        print(f"   Sentences: {len(content['timing']['sentences'])}")
-        print(f"   Paragraphs: {len(content['paragraphs'])}")
-        print(f"   Duration: {content['timing']['total_duration_ms'] / 1000:.1f} seconds")
-        print(f"   Duration: {content['timing']['total_duration_ms'] / 60000:.1f} minutes")
+        logger.info(f"\n📊 Summary:")
+        logger.info(f"   Text: {content['metadata']['character_count']} characters")
+        logger.info(f"   Words: {content['metadata']['word_count']}")
+        logger.info(f"   Sentences: {len(content['timing']['sentences'])}")
+        logger.info(f"   Paragraphs: {len(content['paragraphs'])}")
+        logger.info(f"   Duration: {content['timing']['total_duration_ms'] / 1000:.1f} seconds")
+        logger.info(f"   Duration: {content['timing']['total_duration_ms'] / 60000:.1f} minutes")
 
         # Verify text integrity
         if self.original_content:
@@ -519,18 +522,18 @@ class ElevenLabsCompleteProcessorWithParagraphs:
             orig_word_count = len(self.original_content.get('full_text', '').split())
             proc_word_count = content['metadata']['word_count']
             if abs(orig_word_count - proc_word_count) > orig_word_count * 0.1:
-                print(f"\n⚠️ Word count differs significantly from original:")
-                print(f"   Original: {orig_word_count} words")
-                print(f"   Processed: {proc_word_count} words")
+                logger.warning(f"\n⚠️ Word count differs significantly from original:")
+                logger.warning(f"   Original: {orig_word_count} words")
+                logger.warning(f"   Processed: {proc_word_count} words")
             else:
-                print("\n✅ Word count matches original content!")
+                logger.info("\n✅ Word count matches original content!")
 
         # Verify paragraph formatting
         if '\n\n' in content['display_text']:
             para_count = len(content['display_text'].split('\n\n'))
-            print(f"✅ Display text has {para_count} paragraphs with proper spacing")
+            logger.info(f"✅ Display text has {para_count} paragraphs with proper spacing")
         else:
-            print("⚠️ Display text does not have paragraph breaks")
+            logger.warning("⚠️ Display text does not have paragraph breaks")
 
 
 def main():
@@ -541,8 +544,15 @@ def main():
     parser.add_argument('-o', '--output', help='Output path for enhanced JSON (default: *_complete_with_paragraphs.json)')
     parser.add_argument('-c', '--original-content', help='Path to original content (JSON or MD) for paragraph preservation')
     parser.add_argument('--config', help='Path to configuration file for edge case handling (default: config.json)')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Build cache directory (default: ../.build_cache)')
+    parser.add_argument('--no-cache', action='store_true', help='Always reprocess, ignoring the build cache')
+    parser.add_argument('-q', '--quiet', action='store_true', help='Only show warnings')
+    add_output_arguments(parser)
+    add_shard_arguments(parser)
+    add_instrumentation_arguments(parser)
 
     args = parser.parse_args()
+    configure_logging(verbose=not args.quiet)
 
     # Load configuration
     config = {}
@@ -550,19 +560,32 @@ def main():
     if Path(config_path).exists():
         with open(config_path, 'r') as f:
             config = json.load(f)
-        print(f"📋 Loaded configuration from: {config_path}")
+        logger.info(f"📋 Loaded configuration from: {config_path}")
+    try:
+        config = apply_shard_arguments(apply_output_arguments(config, args), args)
+    except ValueError as e:
+        parser.error(str(e))
 
     # Process
+    cache = None if args.no_cache else BuildCache(PROCESSOR_VERSION, args.cache_dir)
+    instrumentation = instrumentation_from_args(args, Path(args.elevenlabs_json).stem)
     processor = ElevenLabsCompleteProcessorWithParagraphs(
         args.elevenlabs_json,
         args.original_content,
-        config
+        config,
+        cache,
+        instrumentation
     )
 
     content = processor.process()
     output_path = processor.save(content, args.output)
     processor.validate(content)
 
+    if args.timing_report:
+        instrumentation.write_jsonl(args.timing_report)
+        logger.info(f"⏱️ Appended stage timings to: {args.timing_report}")
+    instrumentation.close()
+
     return output_path
 
 
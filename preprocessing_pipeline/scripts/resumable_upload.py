@@ -0,0 +1,215 @@
+"""
+Resumable chunked Storage uploads for large audio files
+
+A single-request upload of a 100MB audiobook MP3 restarts from zero after
+any network error. This module uses Supabase Storage's resumable upload
+endpoint (the TUS 1.0.0 protocol) instead:
+
+    POST  /storage/v1/upload/resumable          create, returns Location
+    PATCH {Location}  Upload-Offset: n          append the next chunk
+    HEAD  {Location}                            ask how many bytes arrived
+
+After every chunk the upload's Location and offset are written to a local
+JSON state file, keyed by bucket and object path together with the file's
+size and modification time. A later run (after a crash or an interrupted
+batch) finds the entry, asks the server for its offset and sends only the
+rest. Transient failures within a run are retried the same way.
+
+TUS appends each upload's chunks strictly in order, so one file is always
+sent sequentially; parallel workers upload several files at once (see
+ResumableUploader.upload_files and bulk_upload.py).
+"""
+
+import base64
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from supabase_rest import SupabaseError, SupabaseRestClient
+
+# Supabase Storage expects 6MB chunks for resumable uploads (the last may be smaller)
+DEFAULT_CHUNK_SIZE = 6 * 1024 * 1024
+DEFAULT_STATE_FILE = '.upload_state.json'
+TUS_VERSION = '1.0.0'
+RESUMABLE_PATH = '/storage/v1/upload/resumable'
+
+
+class UploadState:
+    """Locally persisted progress of resumable uploads, shared by worker threads"""
+
+    def __init__(self, path: str = DEFAULT_STATE_FILE):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            return dict(entry) if entry else None
+
+    def put(self, key: str, entry: Dict):
+        with self._lock:
+            self._entries[key] = dict(entry, updated_at=datetime.now(timezone.utc).isoformat())
+            self._save()
+
+    def remove(self, key: str):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._save()
+
+    def _save(self):
+        # Write then rename, so an interrupted run never leaves a truncated state file
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+def _encode_metadata(values: Dict[str, str]) -> str:
+    return ','.join(f"{key} {base64.b64encode(value.encode('utf-8')).decode('ascii')}"
+                    for key, value in values.items())
+
+
+class ResumableUploader:
+    """Chunked, resumable uploads through a shared SupabaseRestClient"""
+
+    def __init__(self, client: SupabaseRestClient, state: Optional[UploadState] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, retries: int = 3, backoff_seconds: float = 1.0):
+        """
+        Args:
+            client: Shared Supabase client
+            state: Local progress store (default: .upload_state.json in the working directory)
+            chunk_size: Bytes per PATCH request
+            retries: Retries per chunk (consecutive failures, including the offset check
+                and creating the upload) before giving up
+            backoff_seconds: Delay before the first retry, doubled for each further one
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        self.client = client
+        self.state = state or UploadState()
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        # One upload per object at a time: concurrent uploads of the same object would share its saved state
+        self._object_locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def _server_offset(self, location: str) -> Optional[int]:
+        """Bytes the server has for an upload, or None if it no longer exists"""
+        try:
+            _, headers, _ = self.client.request('HEAD', self.client.path_for(location), headers={
+                'Tus-Resumable': TUS_VERSION, 'Cache-Control': 'no-store'})
+        except SupabaseError as e:
+            if e.status in (404, 410):
+                return None
+            raise
+        return int(headers['upload-offset'])
+
+    def _create(self, bucket: str, path: str, size: int, content_type: str) -> str:
+        _, headers, _ = self.client.request('POST', RESUMABLE_PATH, headers={
+            'Tus-Resumable': TUS_VERSION,
+            'Upload-Length': str(size),
+            'Upload-Metadata': _encode_metadata({
+                'bucketName': bucket, 'objectName': path, 'contentType': content_type, 'cacheControl': '3600'}),
+            'x-upsert': 'true'
+        })
+        return headers['location']
+
+    def upload_file(self, bucket: str, path: str, file_path: str,
+                    content_type: str = 'audio/mpeg') -> Tuple[str, Dict]:
+        """
+        Upload (or finish uploading) one file in chunks
+
+        Args:
+            bucket: Storage bucket
+            path: Object path inside the bucket
+            file_path: Local file
+            content_type: MIME type stored with the object
+
+        Returns:
+            (public URL, stats with bytes_sent, resumed_from, chunks and retries)
+        """
+        key = f"{bucket}/{path}"
+        with self._locks_lock:
+            lock = self._object_locks.setdefault(key, threading.Lock())
+        with lock:
+            return self._upload_file(key, bucket, path, file_path, content_type)
+
+    def _upload_file(self, key: str, bucket: str, path: str, file_path: str,
+                     content_type: str) -> Tuple[str, Dict]:
+        stat = os.stat(file_path)
+        size = stat.st_size
+        stats = {'size': size, 'bytes_sent': 0, 'resumed_from': None, 'chunks': 0, 'retries': 0}
+
+        entry = self.state.get(key)
+        # Only resume an upload of this exact file version
+        if not (entry and entry.get('size') == size and entry.get('mtime_ns') == stat.st_mtime_ns):
+            entry = None
+
+        offset = None  # Unknown until the server has been asked, at the start and after every failure
+        attempts = 0  # Consecutive failures of the current chunk
+        with open(file_path, 'rb') as f:
+            while offset is None or offset < size:
+                try:
+                    if offset is None:
+                        # The server may have stored part (or all) of the last chunk; continue from its offset
+                        offset = self._server_offset(entry['location']) if entry else None
+                        if offset is None:
+                            entry = {'location': self._create(bucket, path, size, content_type),
+                                     'size': size, 'mtime_ns': stat.st_mtime_ns}
+                            offset = 0
+                        if stats['resumed_from'] is None:
+                            stats['resumed_from'] = offset
+                        entry['offset'] = offset
+                        self.state.put(key, entry)
+                        if offset >= size:
+                            break
+                    f.seek(offset)
+                    chunk = f.read(self.chunk_size)
+                    _, headers, _ = self.client.request('PATCH', self.client.path_for(entry['location']), chunk, {
+                        'Tus-Resumable': TUS_VERSION,
+                        'Upload-Offset': str(offset),
+                        'Content-Type': 'application/offset+octet-stream'
+                    })
+                except (SupabaseError, OSError):
+                    if attempts >= self.retries:
+                        raise
+                    time.sleep(self.backoff_seconds * (2 ** attempts))
+                    attempts += 1
+                    stats['retries'] += 1
+                    offset = None
+                    continue
+
+                attempts = 0
+                offset = int(headers.get('upload-offset', offset + len(chunk)))
+                stats['bytes_sent'] += len(chunk)
+                stats['chunks'] += 1
+                entry['offset'] = offset
+                self.state.put(key, entry)
+
+        self.state.remove(key)
+        return self.client.public_url(bucket, path), stats
+
+    def upload_files(self, uploads: List[Tuple[str, str, str, str]], workers: int = 4) -> List[Tuple[str, Dict]]:
+        """
+        Upload several files concurrently, each in resumable chunks
+
+        Args:
+            uploads: (bucket, path, file_path, content_type) per file
+            workers: Files uploaded at the same time
+
+        Returns:
+            (public URL, stats) per upload, in input order
+        """
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            return list(executor.map(lambda upload: self.upload_file(*upload), uploads))
@@ -0,0 +1,96 @@
+"""
+Sentence Coverage for Audio Learning App Preprocessing Pipeline
+
+Shared by both processors' ensure_continuous_sentence_coverage(): closes the
+time gaps between sentences and assigns every word to the sentence containing
+its midpoint.
+
+After gap closing the sentence boundaries form one time-sorted sequence
+[s0, m0, m1, ..., e_last], so each word is placed with a bisect instead of
+scanning every sentence (O(words * log sentences) rather than
+O(words * sentences)). Boundaries that are not sorted fall back to the
+original linear scan, which keeps the assignment identical in every case.
+"""
+
+from bisect import bisect_left
+from typing import List, Dict
+
+
+def close_sentence_gaps(sentences: List[Dict]):
+    """Move each boundary between consecutive sentences to the midpoint of the gap"""
+    for i in range(len(sentences) - 1):
+        # Find the midpoint between sentences
+        midpoint = (sentences[i]['end_ms'] + sentences[i + 1]['start_ms']) // 2
+
+        # Extend current sentence to midpoint, start next sentence from midpoint
+        sentences[i]['end_ms'] = midpoint
+        sentences[i + 1]['start_ms'] = midpoint
+
+
+def assign_words_to_sentences(words: List[Dict], sentences: List[Dict]):
+    """
+    Set each word's sentence_index from its midpoint time
+
+    A word belongs to the first sentence with start_ms <= midpoint <= end_ms;
+    words outside every sentence go to the nearest one.
+
+    Args:
+        words: Word dictionaries with start_ms/end_ms (updated in place)
+        sentences: Sentence dictionaries after close_sentence_gaps()
+    """
+    if not words or not sentences:
+        return
+
+    boundaries = [sentences[0]['start_ms']] + [s['end_ms'] for s in sentences]
+    contiguous = all(s['start_ms'] == previous_end
+                     for s, previous_end in zip(sentences[1:], boundaries[1:]))
+    if not contiguous or any(a > b for a, b in zip(boundaries, boundaries[1:])):
+        _assign_linear(words, sentences)
+        return
+
+    first_start = boundaries[0]
+    last_end = boundaries[-1]
+    last_index = len(sentences) - 1
+    for word in words:
+        word_mid = (word['start_ms'] + word['end_ms']) // 2
+        if word_mid < first_start:
+            word['sentence_index'] = 0
+        elif word_mid > last_end:
+            word['sentence_index'] = last_index
+        else:
+            # First sentence whose end_ms >= word_mid
+            word['sentence_index'] = bisect_left(boundaries, word_mid, 1) - 1
+
+
+def _assign_linear(words: List[Dict], sentences: List[Dict]):
+    """Reference assignment: scan every sentence for every word"""
+    for word in words:
+        word_mid = (word['start_ms'] + word['end_ms']) // 2
+
+        # Find which sentence this word belongs to
+        assigned = False
+        for i, sentence in enumerate(sentences):
+            if sentence['start_ms'] <= word_mid <= sentence['end_ms']:
+                word['sentence_index'] = i
+                assigned = True
+                break
+
+        # If word falls outside all sentences, assign to nearest
+        if not assigned:
+            if word_mid < sentences[0]['start_ms']:
+                word['sentence_index'] = 0
+            elif word_mid > sentences[-1]['end_ms']:
+                word['sentence_index'] = len(sentences) - 1
+            else:
+                # Find nearest sentence
+                min_distance = float('inf')
+                nearest_idx = 0
+                for i, sentence in enumerate(sentences):
+                    distance = min(
+                        abs(word_mid - sentence['start_ms']),
+                        abs(word_mid - sentence['end_ms'])
+                    )
+                    if distance < min_distance:
+                        min_distance = distance
+                        nearest_idx = i
+                word['sentence_index'] = nearest_idx
@@ -0,0 +1,198 @@
+"""
+Minimal Supabase REST client for bulk uploads
+
+Talks to the PostgREST (/rest/v1) and Storage (/storage/v1) HTTP APIs
+directly with http.client, so one client can be shared by a thread pool:
+every worker thread keeps its own keep-alive connection and reuses it for
+all of its requests instead of reconnecting (and re-handshaking TLS) per
+call. Only the calls the upload scripts need are implemented:
+
+    upload_object()  POST /storage/v1/object/{bucket}/{path}   (x-upsert)
+    upsert_rows()    POST /rest/v1/{table}?on_conflict=...     (one request, many rows)
+    update_rows()    PATCH /rest/v1/{table}?col=eq.value        (some columns of existing rows)
+    select()         GET  /rest/v1/{table}?select=...&col=in.(...)
+
+Anything that speaks the same HTTP API works as a server, including a local
+stand-in for tests.
+"""
+
+import http.client
+import json
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import quote, urlencode, urlsplit
+
+
+class SupabaseError(Exception):
+    """Non-2xx response from Supabase"""
+
+    def __init__(self, method: str, path: str, status: int, body: bytes):
+        self.status = status
+        self.body = body
+        message = body.decode('utf-8', errors='replace')[:500]
+        super().__init__(f"{method} {path} failed with HTTP {status}: {message}")
+
+
+class SupabaseRestClient:
+    """One Supabase project connection, safe to share between threads"""
+
+    # Connection failures worth one retry on a fresh connection (server closed an idle keep-alive)
+    RECONNECT_ERRORS = (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+                        BrokenPipeError, ConnectionResetError)
+
+    def __init__(self, url: str, key: str, timeout: float = 60.0):
+        """
+        Args:
+            url: Project URL, e.g. https://<project>.supabase.co
+            key: API key sent as both apikey and bearer token
+            timeout: Socket timeout per request in seconds
+        """
+        parts = urlsplit(url.rstrip('/'))
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f"Invalid Supabase URL: {url}")
+
+        self.url = url.rstrip('/')
+        self.key = key
+        self.timeout = timeout
+        self._scheme = parts.scheme
+        self._host = parts.hostname
+        self._port = parts.port
+        self._base_path = parts.path
+        self._local = threading.local()
+        self._connections: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.request_count = 0
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            cls = http.client.HTTPSConnection if self._scheme == 'https' else http.client.HTTPConnection
+            connection = cls(self._host, self._port, timeout=self.timeout)
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+                self.connections_opened += 1
+        return connection
+
+    def _drop_connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Send one request on this thread's keep-alive connection
+
+        Args:
+            method: HTTP method
+            path: Path below the project URL, already quoted (e.g. /rest/v1/table?select=id)
+            body: Request body
+            headers: Extra headers (auth headers are added)
+
+        Returns:
+            (status, response headers with lowercase names, response body)
+
+        Raises:
+            SupabaseError: For non-2xx responses
+        """
+        all_headers = {'apikey': self.key, 'Authorization': f"Bearer {self.key}"}
+        all_headers.update(headers or {})
+        target = self._base_path + path
+
+        for attempt in range(2):
+            connection = self._connection()
+            try:
+                connection.request(method, target, body=body, headers=all_headers)
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except self.RECONNECT_ERRORS:
+                self._drop_connection()
+                if attempt:
+                    raise
+        with self._lock:
+            self.request_count += 1
+
+        if response.getheader('Connection', '').lower() == 'close':
+            self._drop_connection()
+        if not 200 <= response.status < 300:
+            raise SupabaseError(method, path, response.status, data)
+        return response.status, {k.lower(): v for k, v in response.getheaders()}, data
+
+    def path_for(self, url: str) -> str:
+        """Request path for an absolute or root-relative URL returned by the server (e.g. a Location header)"""
+        if url.startswith(self.url):
+            return url[len(self.url):]
+        if self._base_path and url.startswith(self._base_path):
+            return url[len(self._base_path):]
+        return url
+
+    # Storage
+
+    def upload_object(self, bucket: str, path: str, data: Union[bytes, bytearray],
+                      content_type: str = 'application/octet-stream', upsert: bool = True,
+                      headers: Optional[Dict[str, str]] = None) -> str:
+        """
+        Upload one Storage object
+
+        Returns:
+            The object's public URL
+        """
+        all_headers = {'Content-Type': content_type, 'x-upsert': 'true' if upsert else 'false'}
+        all_headers.update(headers or {})
+        self.request('POST', f"/storage/v1/object/{bucket}/{quote(path)}", bytes(data), all_headers)
+        return self.public_url(bucket, path)
+
+    def public_url(self, bucket: str, path: str) -> str:
+        """Public URL of a Storage object"""
+        return f"{self.url}/storage/v1/object/public/{bucket}/{quote(path)}"
+
+    # PostgREST
+
+    def upsert_rows(self, table: str, rows: List[Dict], on_conflict: str = 'id'):
+        """Insert or update many rows with a single request (rows must share the same keys)"""
+        if not rows:
+            return
+        body = json.dumps(rows, ensure_ascii=False).encode('utf-8')
+        self.request('POST', f"/rest/v1/{table}?{urlencode({'on_conflict': on_conflict})}", body, {
+            'Content-Type': 'application/json',
+            'Prefer': 'resolution=merge-duplicates,return=minimal'
+        })
+
+    def update_rows(self, table: str, values: Dict, filters: Dict[str, str]):
+        """Set columns on the rows matching filters (PostgREST syntax, e.g. {'id': 'eq.abc'})"""
+        if not filters:
+            raise ValueError("update_rows needs a filter; refusing to update every row")
+        body = json.dumps(values, ensure_ascii=False).encode('utf-8')
+        query = urlencode(filters, safe=',:>-()')
+        self.request('PATCH', f"/rest/v1/{table}?{query}", body, {
+            'Content-Type': 'application/json',
+            'Prefer': 'return=minimal'
+        })
+
+    def select(self, table: str, columns: str, filters: Optional[Dict[str, str]] = None) -> List[Dict]:
+        """
+        Read rows with a column projection
+
+        Args:
+            table: Table name
+            columns: PostgREST select list, e.g. "id,url:words->lookupTableBinary->>url"
+            filters: Column filters in PostgREST syntax, e.g. {'id': 'in.(a,b)'}
+
+        Returns:
+            Matching rows
+        """
+        query = urlencode({'select': columns, **(filters or {})}, safe=',:>-()')
+        _, _, data = self.request('GET', f"/rest/v1/{table}?{query}", headers={'Accept': 'application/json'})
+        return json.loads(data) if data else []
+
+    def close(self):
+        """Close every thread's connection"""
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Sharded Timing Output for Audio Learning App
+
+A player needs a lesson's timing before it can highlight anything, and for
+long lessons downloading and parsing the whole `timing.words` array delays
+the first highlight. With sharding on, save() also splits the timing into
+fixed-duration shards next to the enhanced JSON:
+
+    lesson_enhanced_shards/index.json       time range -> shard, global counts
+    lesson_enhanced_shards/shard_0000.json  [0s, 60s)
+    lesson_enhanced_shards/shard_0001.json  [60s, 120s)
+    ...
+
+The player reads the small index, fetches the shard for the current
+position (shard = position_ms // shard_ms) and loads the others lazily.
+
+Each shard is self-contained and keeps global indices:
+- words: every word that starts inside the shard; words[i] is global word
+  word_offset + i, and word.sentence_index is global
+- sentences: every sentence that overlaps the shard or owns one of its
+  words; sentences[j] is global sentence sentence_offset + j (a sentence
+  crossing a boundary appears in both shards)
+- lookup: the interval lookup (see lookup_table.py) restricted to the shard,
+  with global indices; find_interval() on it returns exactly what the full
+  table returns for any position inside the shard
+
+Sharding is off by default; enable it with "shard_seconds" in the "output"
+section of config.json or --shard-seconds.
+"""
+
+import json
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+SHARD_FORMAT_VERSION = "1.0"
+SHARD_INDEX_FILE = 'index.json'
+
+
+def shard_ms_from_config(config: Dict) -> int:
+    """Shard duration in ms from a processing config, or 0 when sharding is off"""
+    return int(float(config.get('output', {}).get('shard_seconds') or 0) * 1000)
+
+
+def shard_count(total_duration_ms: int, shard_ms: int) -> int:
+    """Number of shards for a lesson (always at least one)"""
+    return max(1, -(-total_duration_ms // shard_ms))
+
+
+def shard_directory(output_path: str) -> Path:
+    """Directory holding the shards of an enhanced JSON output"""
+    path = Path(output_path)
+    return path.with_name(f"{path.stem}_shards")
+
+
+def shard_file_name(shard_index: int) -> str:
+    return f"shard_{shard_index:04d}.json"
+
+
+def shard_paths(output_path: str, total_duration_ms: int, shard_ms: int) -> List[str]:
+    """Every file written for a lesson's shards: the index, then one file per shard"""
+    directory = shard_directory(output_path)
+    return [str(directory / SHARD_INDEX_FILE)] + [
+        str(directory / shard_file_name(i)) for i in range(shard_count(total_duration_ms, shard_ms))]
+
+
+def _slice_intervals(intervals: Dict[str, List[int]], start_ms: int, end_ms: int) -> Dict[str, List[int]]:
+    """Intervals active at any position in [start_ms, end_ms), the first one clamped to start_ms"""
+    starts = intervals['start_ms']
+    first = bisect_right(starts, start_ms) - 1
+    stop = bisect_left(starts, end_ms)
+    sliced = {'start_ms': [], 'word_index': [], 'sentence_index': []}
+    if first < 0:
+        # Nothing is active until the first interval starts
+        first = 0
+        if not starts or starts[0] > start_ms:
+            sliced = {'start_ms': [start_ms], 'word_index': [-1], 'sentence_index': [-1]}
+    for i in range(first, stop):
+        sliced['start_ms'].append(max(starts[i], start_ms))
+        sliced['word_index'].append(intervals['word_index'][i])
+        sliced['sentence_index'].append(intervals['sentence_index'][i])
+    return sliced
+
+
+def build_timing_shards(timing: Dict, intervals: Dict[str, List[int]], interval_ms: int,
+                        shard_ms: int) -> Tuple[Dict, List[Dict]]:
+    """
+    Split a lesson's timing into fixed-duration shards
+
+    Args:
+        timing: The content's timing section (words, sentences, total_duration_ms)
+        intervals: Interval lookup from lookup_table.encode_intervals()
+        interval_ms: Tick of the lookup the intervals were encoded from
+        shard_ms: Duration of each shard; the last one runs to the end of the lesson
+
+    Returns:
+        (index without file sizes, shards in time order)
+    """
+    if shard_ms <= 0:
+        raise ValueError("shard_ms must be positive")
+    words = timing['words']
+    sentences = timing['sentences']
+    total_duration_ms = timing['total_duration_ms']
+    count = shard_count(total_duration_ms, shard_ms)
+
+    word_starts = [word['start_ms'] for word in words]
+    sentence_starts = [sentence['start_ms'] for sentence in sentences]
+    sentence_ends = [sentence['end_ms'] for sentence in sentences]
+
+    shards = []
+    entries = []
+    for i in range(count):
+        start_ms = i * shard_ms
+        end_ms = total_duration_ms if i == count - 1 else (i + 1) * shard_ms
+        # Words belong to the shard they start in; the last shard also takes any stragglers
+        word_start = bisect_left(word_starts, start_ms) if i else 0
+        word_end = len(words) if i == count - 1 else bisect_left(word_starts, end_ms)
+
+        # Sentences overlapping the shard (plus the sentences of its words)
+        sentence_start = bisect_right(sentence_ends, start_ms) if i else 0
+        sentence_end = len(sentences) if i == count - 1 else bisect_left(sentence_starts, end_ms)
+        owners = [word['sentence_index'] for word in words[word_start:word_end] if word['sentence_index'] >= 0]
+        if owners:
+            sentence_start = min(sentence_start, min(owners))
+            sentence_end = max(sentence_end, max(owners) + 1)
+        sentence_end = max(sentence_end, sentence_start)
+
+        shards.append({
+            'version': SHARD_FORMAT_VERSION,
+            'type': 'timing_shard',
+            'shard_index': i,
+            'start_ms': start_ms,
+            'end_ms': end_ms,
+            'word_offset': word_start,
+            'sentence_offset': sentence_start,
+            'words': words[word_start:word_end],
+            'sentences': sentences[sentence_start:sentence_end],
+            'lookup': {
+                'interval_ms': interval_ms,
+                # The last shard's range includes total_duration_ms itself
+                'intervals': _slice_intervals(intervals, start_ms, end_ms + (i == count - 1))
+            }
+        })
+        entries.append({
+            'file': shard_file_name(i),
+            'start_ms': start_ms,
+            'end_ms': end_ms,
+            'word_start': word_start,
+            'word_count': word_end - word_start,
+            'sentence_start': sentence_start,
+            'sentence_count': sentence_end - sentence_start
+        })
+
+    index = {
+        'version': SHARD_FORMAT_VERSION,
+        'type': 'timing_shard_index',
+        'shard_ms': shard_ms,
+        'total_duration_ms': total_duration_ms,
+        'word_count': len(words),
+        'sentence_count': len(sentences),
+        'shards': entries
+    }
+    return index, shards
+
+
+def _write_indented(path: str, data: Dict):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def write_timing_shards(output_path: str, timing: Dict, intervals: Dict[str, List[int]], interval_ms: int,
+                        shard_ms: int, write: Optional[Callable[[str, Dict], None]] = None) -> Dict:
+    """
+    Write a lesson's shards and their index next to its enhanced JSON
+
+    Args:
+        output_path: The enhanced JSON output
+        timing, intervals, interval_ms, shard_ms: See build_timing_shards()
+        write: Writes one JSON document to a path (default: indented JSON)
+
+    Returns:
+        The index as written, with each shard's size in bytes
+    """
+    write = write or _write_indented
+    index, shards = build_timing_shards(timing, intervals, interval_ms, shard_ms)
+    directory = shard_directory(output_path)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    # Start from an empty set: an earlier run may have written more shards or other variants
+    for stale in [*directory.glob('shard_*.json*'), *directory.glob(f'{SHARD_INDEX_FILE}*')]:
+        stale.unlink()
+
+    for entry, shard in zip(index['shards'], shards):
+        path = directory / entry['file']
+        write(str(path), shard)
+        entry['size_bytes'] = path.stat().st_size
+    write(str(directory / SHARD_INDEX_FILE), index)
+    return index
+
+
+def add_shard_arguments(parser):
+    """Command line override for "shard_seconds" in the config's "output" section"""
+    parser.add_argument('--shard-seconds', type=float, metavar='SECONDS',
+                        help='Also write timing shards of this duration for progressive loading (0 = off)')
+
+
+def apply_shard_arguments(config: Dict, args) -> Dict:
+    """Fold --shard-seconds into a processing config (so it is part of the build cache key)"""
+    if args.shard_seconds is None:
+        return config
+    if args.shard_seconds < 0:
+        raise ValueError("--shard-seconds must not be negative")
+    return dict(config, output=dict(config.get('output', {}), shard_seconds=args.shard_seconds))
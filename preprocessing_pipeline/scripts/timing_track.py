@@ -0,0 +1,172 @@
+"""
+Columnar Word Timing Store for Audio Learning App Preprocessing Pipeline
+
+Holding every word as a 6-key dict costs several hundred bytes per word,
+which dominates memory on 100k+ word lessons. TimingTrack keeps the same
+data as parallel typed arrays plus a pool of distinct word strings:
+
+    word_ids        array('i')   index into word_pool
+    start_ms        array('i')
+    end_ms          array('i')
+    char_start      array('i')
+    char_end        array('i')
+    sentence_index  array('i')
+
+Indexing or iterating a track yields WordView objects: __slots__ views that
+read and write the columns and also accept the dict keys used throughout the
+pipeline (word['start_ms'], word.get('sentence_index', 0), ...), so
+eliminate_timing_gaps, sentence detection and coverage run unchanged.
+to_json_dicts() converts back to the word dicts of the output schema and is
+only called when content is serialized.
+"""
+
+from array import array
+from typing import Dict, Iterator, List
+
+WORD_KEYS = ('word', 'start_ms', 'end_ms', 'char_start', 'char_end', 'sentence_index')
+COLUMNS = WORD_KEYS[1:]
+
+
+def _column_property(name: str) -> property:
+    """Attribute access to one column at the view's index"""
+    def getter(self):
+        return getattr(self._track, name)[self._index]
+
+    def setter(self, value):
+        getattr(self._track, name)[self._index] = value
+
+    return property(getter, setter)
+
+
+class WordView:
+    """One word of a TimingTrack, readable as attributes or dict keys"""
+
+    __slots__ = ('_track', '_index')
+
+    def __init__(self, track: 'TimingTrack', index: int):
+        self._track = track
+        self._index = index
+
+    start_ms = _column_property('start_ms')
+    end_ms = _column_property('end_ms')
+    char_start = _column_property('char_start')
+    char_end = _column_property('char_end')
+    sentence_index = _column_property('sentence_index')
+
+    @property
+    def word(self) -> str:
+        return self._track.word_pool[self._track.word_ids[self._index]]
+
+    def __getitem__(self, key: str):
+        if key == 'word':
+            return self.word
+        if key in COLUMNS:
+            return getattr(self._track, key)[self._index]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value):
+        if key == 'word':
+            self._track.word_ids[self._index] = self._track.intern(value)
+        elif key in COLUMNS:
+            getattr(self._track, key)[self._index] = value
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in WORD_KEYS
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return WORD_KEYS
+
+    def to_dict(self) -> Dict:
+        return {key: self[key] for key in WORD_KEYS}
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (WordView, dict)):
+            return self.to_dict() == (other.to_dict() if isinstance(other, WordView) else other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"WordView({self.to_dict()})"
+
+
+class TimingTrack:
+    """Word timings stored as parallel typed arrays with a shared word-string pool"""
+
+    def __init__(self):
+        self.word_pool: List[str] = []
+        self._pool_ids: Dict[str, int] = {}
+        self.word_ids = array('i')
+        self.start_ms = array('i')
+        self.end_ms = array('i')
+        self.char_start = array('i')
+        self.char_end = array('i')
+        self.sentence_index = array('i')
+
+    def intern(self, word: str) -> int:
+        """Id of word in the pool, adding it if new"""
+        word_id = self._pool_ids.get(word)
+        if word_id is None:
+            word_id = len(self.word_pool)
+            self._pool_ids[word] = word_id
+            self.word_pool.append(word)
+        return word_id
+
+    def append(self, word: str, start_ms: int, end_ms: int, char_start: int, char_end: int,
+               sentence_index: int = 0):
+        """Add a word at the end of the track"""
+        self.word_ids.append(self.intern(word))
+        self.start_ms.append(start_ms)
+        self.end_ms.append(end_ms)
+        self.char_start.append(char_start)
+        self.char_end.append(char_end)
+        self.sentence_index.append(sentence_index)
+
+    @classmethod
+    def from_dicts(cls, words: List[Dict]) -> 'TimingTrack':
+        """Build a track from word dicts (missing sentence_index defaults to 0)"""
+        track = cls()
+        for w in words:
+            track.append(w['word'], w['start_ms'], w['end_ms'], w['char_start'], w['char_end'],
+                         w.get('sentence_index', 0))
+        return track
+
+    def __len__(self) -> int:
+        return len(self.word_ids)
+
+    def __getitem__(self, index: int) -> WordView:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('TimingTrack index out of range')
+        return WordView(self, index)
+
+    def __iter__(self) -> Iterator[WordView]:
+        for index in range(len(self)):
+            yield WordView(self, index)
+
+    def word(self, index: int) -> str:
+        return self.word_pool[self.word_ids[index]]
+
+    def to_json_dicts(self) -> List[Dict]:
+        """Word dicts in output schema order, for serialization"""
+        pool = self.word_pool
+        return [
+            {
+                'word': pool[word_id],
+                'start_ms': start,
+                'end_ms': end,
+                'char_start': char_start,
+                'char_end': char_end,
+                'sentence_index': sentence
+            }
+            for word_id, start, end, char_start, char_end, sentence in zip(
+                self.word_ids, self.start_ms, self.end_ms,
+                self.char_start, self.char_end, self.sentence_index)
+        ]
@@ -0,0 +1,339 @@
+"""
+Asynchronous TTS Client for Audio Learning App Content Generation
+
+Generating a course used to mean one blocking request per lesson, so total
+time was the sum of every synthesis round trip. AsyncTTSClient sends many
+requests at once with asyncio while staying inside the provider's limits:
+
+    concurrency      at most this many requests in flight (semaphore)
+    rate / burst     token bucket: sustained requests per second, and how
+                     many may start back to back
+    retries          429, 5xx, network errors and truncated or malformed
+                     bodies are retried with exponential backoff
+                     (Retry-After is honoured)
+    cache_dir        responses are stored on disk under a SHA-256 of
+                     (text, voice, model, speed), so re-runs never
+                     re-synthesize unchanged text
+
+Each HTTP call runs in a worker thread (urllib), keeping the client
+dependency-free; the event loop only coordinates. The default endpoint and
+payload are Speechify's /v1/audio/speech, as used by the generation scripts:
+
+    client = AsyncTTSClient(api_key, cache_dir='.tts_cache')
+    responses = asyncio.run(client.synthesize_all([TTSRequest(text) for text in texts]))
+
+For long audio, synthesize_to_file() never holds the response in memory: the
+body is parsed as it arrives (alignment_loader), base64 audio is decoded
+straight into the MP3 file, speech marks / alignment are kept, and the raw
+bytes are copied into the cache on the way through. The MP3 is written to
+"<audio_path>.tmp" and only renamed into place once the whole body parsed.
+"""
+
+import asyncio
+import codecs
+import hashlib
+import http.client
+import json
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from alignment_loader import Alignment, load_alignment
+
+DEFAULT_BASE_URL = 'https://api.sws.speechify.com'
+SPEECH_PATH = '/v1/audio/speech'
+DEFAULT_CACHE_DIR = '.tts_cache'
+
+# Statuses worth retrying: rate limited, or a transient server failure
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class TTSError(Exception):
+    """Synthesis failed and will not be retried (or retries ran out)"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass(frozen=True)
+class TTSRequest:
+    """One synthesis request; the cache key covers every field"""
+    text: str
+    voice: str = 'henry'
+    model: str = 'simba-turbo'
+    speed: float = 1.0
+
+    def cache_key(self) -> str:
+        identity = json.dumps([self.text, self.voice, self.model, self.speed], ensure_ascii=False)
+        return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+    def payload(self) -> Dict:
+        return {
+            'input': self.text,
+            'voice_id': self.voice,
+            'model': self.model,
+            'speed': self.speed,
+            'include_speech_marks': True,
+        }
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, holding at most `capacity`"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class ResponseCache:
+    """TTS responses on disk, one JSON file per request"""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR):
+        self.directory = Path(directory)
+
+    def path(self, request: TTSRequest) -> Path:
+        """File holding the raw response for request"""
+        key = request.cache_key()
+        return self.directory / key[:2] / f"{key}.json"
+
+    def temp_path(self, request: TTSRequest) -> Path:
+        """Partial file for a response being written; os.replace() it onto path() when complete"""
+        path = self.path(request)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+    def get(self, request: TTSRequest) -> Optional[Dict]:
+        path = self.path(request)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None  # unreadable entries are simply re-synthesized
+
+    def put(self, request: TTSRequest, response: Dict):
+        tmp = self.temp_path(request)
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(response, f)
+        os.replace(tmp, self.path(request))
+
+
+class _ResponseReader:
+    """Text view of an HTTP response for alignment_loader, copying raw bytes to a cache file"""
+
+    def __init__(self, response, sink=None):
+        self.response = response
+        self.sink = sink
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+
+    def read(self, size: int) -> str:
+        while True:
+            data = self.response.read(size)
+            if self.sink:
+                self.sink.write(data)
+            text = self.decoder.decode(data, final=not data)
+            # A read ending inside a multi-byte character decodes to ''; that is not the end
+            if text or not data:
+                return text
+
+
+def _load_alignment_to_file(source, audio_path: str) -> Alignment:
+    """load_alignment() into audio_path, which only appears once the whole response has parsed"""
+    tmp = f"{audio_path}.tmp"
+    try:
+        alignment = load_alignment(source, tmp)
+        if alignment.audio_path:
+            os.replace(tmp, audio_path)
+            alignment.audio_path = audio_path
+        return alignment
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+class AsyncTTSClient:
+    """Concurrent, rate-limited, retrying and cached TTS synthesis"""
+
+    def __init__(self, api_key: str, base_url: str = DEFAULT_BASE_URL, concurrency: int = 4,
+                 rate: float = 2.0, burst: Optional[float] = None, retries: int = 4,
+                 backoff_seconds: float = 1.0, timeout: float = 120.0, cache_dir: Optional[str] = DEFAULT_CACHE_DIR):
+        """
+        Args:
+            api_key: Bearer token for the TTS API
+            base_url: API root (a local mock server in tests)
+            concurrency: Maximum requests in flight
+            rate: Sustained requests per second
+            burst: Requests that may start back to back (default: max(1, rate))
+            retries: Retries after a retryable failure
+            backoff_seconds: First retry delay, doubled per attempt (with jitter)
+            timeout: Per-request timeout in seconds
+            cache_dir: Response cache directory, or None to disable caching
+        """
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = max(1, concurrency)
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.timeout = timeout
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        self.stats = {'requests': 0, 'cache_hits': 0, 'retries': 0}
+        self._semaphore = None
+        self._bucket = None
+
+    def _open(self, request: TTSRequest):
+        http_request = urllib.request.Request(
+            self.base_url + SPEECH_PATH,
+            data=json.dumps(request.payload()).encode('utf-8'),
+            headers={'Authorization': f'Bearer {self.api_key}', 'Content-Type': 'application/json'},
+            method='POST')
+        return urllib.request.urlopen(http_request, timeout=self.timeout)
+
+    def _post(self, request: TTSRequest) -> Dict:
+        """Blocking POST, run in a worker thread"""
+        with self._open(request) as response:
+            return json.loads(response.read())
+
+    def _post_to_file(self, request: TTSRequest, audio_path: str) -> Alignment:
+        """Blocking POST whose response is parsed as it arrives, run in a worker thread"""
+        tmp = self.cache.temp_path(request) if self.cache else None
+        try:
+            with self._open(request) as response:
+                if tmp is None:
+                    return _load_alignment_to_file(_ResponseReader(response), audio_path)
+                with open(tmp, 'wb') as sink:
+                    alignment = _load_alignment_to_file(_ResponseReader(response, sink), audio_path)
+            os.replace(tmp, self.cache.path(request))
+            return alignment
+        finally:
+            if tmp is not None and tmp.exists():
+                tmp.unlink()
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        retry_after = getattr(error, 'headers', None) and error.headers.get('Retry-After')
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.backoff_seconds * (2 ** attempt) * random.uniform(0.5, 1.0)
+
+    async def _send(self, call: Callable, *args):
+        """Run a blocking request under the concurrency and rate limits, retrying transient failures"""
+        # Created lazily so they belong to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._bucket = TokenBucket(self.rate, self.burst)
+
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                await self._bucket.acquire()
+                self.stats['requests'] += 1
+                try:
+                    return await asyncio.to_thread(call, *args)
+                except urllib.error.HTTPError as e:
+                    status = e.code
+                    error = e
+                    message = f"TTS API error {e.code}: {e.read().decode('utf-8', errors='replace')[:300]}"
+                except (urllib.error.URLError, http.client.HTTPException, TimeoutError, ConnectionError) as e:
+                    status = None
+                    error = e
+                    message = f"TTS request failed: {e}"
+                except ValueError as e:
+                    # Truncated or malformed body (JSONDecodeError, bad base64)
+                    status = None
+                    error = e
+                    message = f"TTS response could not be parsed: {e}"
+
+            if (status is not None and status not in RETRY_STATUSES) or attempt >= self.retries:
+                raise TTSError(message, status)
+            # Back off outside the semaphore so other requests can use the slot
+            await asyncio.sleep(self._retry_delay(attempt, error))
+            attempt += 1
+            self.stats['retries'] += 1
+
+    async def synthesize(self, request: TTSRequest) -> Dict:
+        """
+        Synthesize one request, from the cache when possible
+
+        Returns:
+            The API's JSON response (audio_data, speech_marks, ...)
+
+        Raises:
+            TTSError: On a non-retryable error, or when retries run out
+        """
+        if self.cache:
+            cached = self.cache.get(request)
+            if cached is not None:
+                self.stats['cache_hits'] += 1
+                return cached
+
+        response = await self._send(self._post, request)
+        if self.cache:
+            self.cache.put(request, response)
+        return response
+
+    async def synthesize_to_file(self, request: TTSRequest, audio_path: str) -> Alignment:
+        """
+        Synthesize one request, streaming its audio into audio_path
+
+        Args:
+            request: Text and voice settings
+            audio_path: MP3 file to write
+
+        Returns:
+            Alignment with speech_marks (Speechify) or character timings
+            (ElevenLabs-style alignment), and audio_bytes
+
+        Raises:
+            TTSError: On a non-retryable error, or when retries run out
+        """
+        if self.cache and self.cache.path(request).exists():
+            try:
+                alignment = await asyncio.to_thread(_load_alignment_to_file, str(self.cache.path(request)), audio_path)
+                self.stats['cache_hits'] += 1
+                return alignment
+            except ValueError:
+                pass  # unreadable entries are simply re-synthesized
+        return await self._send(self._post_to_file, request, audio_path)
+
+    async def synthesize_all(self, requests: List[TTSRequest], return_exceptions: bool = False) -> List:
+        """
+        Synthesize many requests concurrently
+
+        Args:
+            requests: Requests to synthesize
+            return_exceptions: Return a TTSError in place of failed responses instead of raising
+
+        Returns:
+            Responses in request order
+        """
+        return await asyncio.gather(*(self.synthesize(request) for request in requests),
+                                    return_exceptions=return_exceptions)
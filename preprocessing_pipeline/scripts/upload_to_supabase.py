@@ -13,13 +13,25 @@ from pathlib import Path
 from typing import Dict, Optional
 from supabase import create_client, Client
 from dotenv import load_dotenv
+from bulk_upload import (STORAGE_BUCKET, EXISTING_COLUMNS, attach_upload_hashes, audio_storage_name,
+                         build_learning_object_record, build_words_data, file_sha256, is_unchanged,
+                         lookup_binary_reference, lookup_storage_name, read_lookup_binary, sha256_hex)
+from precompress import CODEC_SUFFIXES
+from resumable_upload import DEFAULT_CHUNK_SIZE, DEFAULT_STATE_FILE, ResumableUploader, UploadState
+from supabase_rest import SupabaseRestClient
 
 # Load environment variables
 load_dotenv()
 
 class SupabaseUploader:
-    def __init__(self):
-        """Initialize Supabase client."""
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE, upload_state: str = DEFAULT_STATE_FILE):
+        """
+        Initialize Supabase client.
+
+        Args:
+            chunk_size: Audio files larger than this are uploaded in resumable chunks of this size
+            upload_state: File recording resumable upload progress between runs
+        """
         url = os.environ.get('SUPABASE_URL')
         key = os.environ.get('SUPABASE_ANON_KEY')
 
@@ -27,11 +39,14 @@ class SupabaseUploader:
             raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY must be set in environment")
 
         self.client: Client = create_client(url, key)
+        self.resumable = ResumableUploader(SupabaseRestClient(url, key), UploadState(upload_state), chunk_size)
         print(f"✅ Connected to Supabase: {url}")
 
     def upload_audio_file(self, audio_file_path: str, learning_object_id: str) -> tuple[str, int]:
         """
         Upload audio file to Supabase Storage.
+        Files larger than one chunk are uploaded resumably, so an interrupted
+        upload continues where it stopped when the script is run again.
 
         Returns:
             Tuple of (public_url, file_size_bytes)
@@ -42,22 +57,20 @@ class SupabaseUploader:
         file_size = os.path.getsize(audio_file_path)
 
         # Upload to course-audio bucket with proper path structure
-        bucket_name = 'course-audio'
-        # Create a clean filename from the original file
-        import os.path
-        base_name = os.path.basename(audio_file_path).replace(' ', '-').lower()
-        if not base_name.endswith('.mp3'):
-            base_name = f'{learning_object_id}.mp3'
-        # Build the path structure: courses/{course}/assignments/{assignment}/{filename}
-        # Default to CPCU 500 and Risk Management for now
-        file_name = f'courses/CPCU 500/assignments/Risk Management/{base_name}'
-
-        with open(audio_file_path, 'rb') as f:
-            result = self.client.storage.from_(bucket_name).upload(
-                path=file_name,
-                file=f,
-                file_options={"content-type": "audio/mpeg", "upsert": "true"}
-            )
+        bucket_name = STORAGE_BUCKET
+        file_name = audio_storage_name(audio_file_path, learning_object_id)
+
+        if file_size > self.resumable.chunk_size:
+            _, stats = self.resumable.upload_file(bucket_name, file_name, audio_file_path, 'audio/mpeg')
+            if stats['resumed_from']:
+                print(f"↪️ Resumed audio upload at {stats['resumed_from']:,} bytes")
+        else:
+            with open(audio_file_path, 'rb') as f:
+                result = self.client.storage.from_(bucket_name).upload(
+                    path=file_name,
+                    file=f,
+                    file_options={"content-type": "audio/mpeg", "upsert": "true"}
+                )
 
         # Get public URL
         public_url = self.client.storage.from_(bucket_name).get_public_url(file_name)
@@ -70,6 +83,50 @@ class SupabaseUploader:
 
         return public_url, file_size
 
+    def upload_lookup_binary(self, lookup_bin_path: str, learning_object_id: str,
+                             content_encoding: Optional[str] = None) -> Dict:
+        """
+        Upload a binary lookup table (see lookup_table.py) to Supabase Storage.
+
+        Args:
+            content_encoding: Upload the table's precompressed variant with this codec, if present
+
+        Returns:
+            Reference stored in the words JSONB in place of the inline table
+        """
+        data, stored, encoding = read_lookup_binary(lookup_bin_path, content_encoding)
+
+        file_name = lookup_storage_name(learning_object_id)
+        file_options = {"content-type": "application/octet-stream", "upsert": "true"}
+        if encoding:
+            file_options["content-encoding"] = encoding
+        self.client.storage.from_(STORAGE_BUCKET).upload(
+            path=file_name,
+            file=stored,
+            file_options=file_options
+        )
+        public_url = self.client.storage.from_(STORAGE_BUCKET).get_public_url(file_name)
+
+        reference = lookup_binary_reference(data, public_url, encoding)
+
+        print(f"✅ Uploaded binary lookup table to Storage")
+        print(f"   Path: {file_name}")
+        print(f"   Size: {len(data):,} bytes ({reference['intervalCount']} intervals)")
+        if encoding:
+            print(f"   Sent: {len(stored):,} bytes ({encoding})")
+
+        return reference
+
+    def fetch_upload_state(self, learning_object_id: str) -> Dict:
+        """
+        Upload hashes and Storage references already stored for a learning object
+
+        Returns:
+            The row's id, audio_url, lookup_binary and upload_hashes, or {} if it does not exist
+        """
+        result = self.client.table('learning_objects').select(EXISTING_COLUMNS).eq('id', learning_object_id).execute()
+        return result.data[0] if result.data else {}
+
     def upload_learning_object(
         self,
         learning_object_id: str,
@@ -78,11 +135,17 @@ class SupabaseUploader:
         title: str,
         order_index: int,
         audio_file_path: Optional[str] = None,
-        lookup_json_path: Optional[str] = None
+        lookup_json_path: Optional[str] = None,
+        lookup_bin_path: Optional[str] = None,
+        force: bool = False,
+        content_encoding: Optional[str] = None
     ) -> Dict:
         """
         Upload a learning object with enhanced timing data.
-        Lookup tables are stored separately in Supabase Storage.
+        Binary lookup tables are stored separately in Supabase Storage;
+        a JSON lookup table is only inlined when no binary is provided.
+        SHA-256 hashes of the inputs are stored in the row's metadata, and
+        uploads whose hashes match the stored ones are skipped.
 
         Args:
             learning_object_id: UUID of the learning object
@@ -92,27 +155,40 @@ class SupabaseUploader:
             order_index: Order within the assignment
             audio_url: Optional audio file URL (Supabase Storage)
             lookup_json_path: Optional path to separate lookup JSON file
+            lookup_bin_path: Optional path to binary lookup table (_lookup.bin)
+            force: Upload everything, even if the stored hashes match
+            content_encoding: Upload the lookup table's precompressed variant with this codec, if present
 
         Returns:
             The created/updated learning object record
         """
+        # What the server already has, to skip unchanged uploads
+        existing = {} if force else self.fetch_upload_state(learning_object_id)
+        stored_hashes = existing.get('upload_hashes') or {}
+        hashes = {'enhancedJson': file_sha256(enhanced_json_path)}
+        bytes_saved = 0
+
         # Load the enhanced JSON
         with open(enhanced_json_path, 'r') as f:
             enhanced_data = json.load(f)
 
-        # Extract timing data (without lookup table now)
-        timing = enhanced_data.get('timing', {})
-
         # Create words JSONB structure (new schema)
-        words_data = {
-            'words': timing.get('words', []),
-            'sentences': timing.get('sentences', []),
-            'totalDurationMs': timing.get('total_duration_ms', 0),
-            'createdAt': enhanced_data.get('metadata', {}).get('generated_at', '')
-        }
-
-        # Add lookup table to words_data if provided
-        if lookup_json_path and os.path.exists(lookup_json_path):
+        words_data = build_words_data(enhanced_data)
+
+        # Prefer the binary lookup table in Storage over inlining JSON into JSONB
+        if lookup_bin_path and os.path.exists(lookup_bin_path):
+            _, stored, _ = read_lookup_binary(lookup_bin_path, content_encoding)
+            hashes['lookup'] = sha256_hex(stored)
+            hashes['lookupPath'] = lookup_storage_name(learning_object_id)
+            if is_unchanged(stored_hashes, hashes, 'lookup') and existing.get('lookup_binary'):
+                words_data['lookupTableBinary'] = existing['lookup_binary']
+                bytes_saved += len(stored)
+                print(f"⏭️ Binary lookup table unchanged, skipping upload")
+            else:
+                words_data['lookupTableBinary'] = self.upload_lookup_binary(lookup_bin_path, learning_object_id,
+                                                                            content_encoding)
+        elif lookup_json_path and os.path.exists(lookup_json_path):
+            hashes['lookup'] = file_sha256(lookup_json_path)
             with open(lookup_json_path, 'r') as f:
                 lookup_data = json.load(f)
 
@@ -127,42 +203,39 @@ class SupabaseUploader:
         audio_url = None
         audio_size_bytes = 0
         if audio_file_path and os.path.exists(audio_file_path):
-            try:
-                audio_url, audio_size_bytes = self.upload_audio_file(audio_file_path, learning_object_id)
-            except Exception as e:
-                print(f"⚠️ Could not upload audio to Storage (RLS policy): {e}")
-                print(f"   Using fallback URL for audio file")
-                # Use a fallback URL pointing to the expected location
-                # Use the course-audio bucket path
-                import os.path
-                base_name = os.path.basename(audio_file_path).replace(' ', '-').lower()
-                if not base_name.endswith('.mp3'):
-                    base_name = f'{learning_object_id}.mp3'
-                audio_url = f"https://cmjdciktvfxiyapdseqn.supabase.co/storage/v1/object/public/course-audio/courses/CPCU 500/assignments/Risk Management/{base_name}"
+            audio_hashes = {'audio': file_sha256(audio_file_path),
+                            'audioPath': audio_storage_name(audio_file_path, learning_object_id)}
+            if is_unchanged(stored_hashes, audio_hashes, 'audio') and existing.get('audio_url'):
+                audio_url = existing['audio_url']
                 audio_size_bytes = os.path.getsize(audio_file_path)
+                hashes.update(audio_hashes)
+                bytes_saved += audio_size_bytes
+                print(f"⏭️ Audio unchanged, skipping upload")
+            else:
+                try:
+                    audio_url, audio_size_bytes = self.upload_audio_file(audio_file_path, learning_object_id)
+                    hashes.update(audio_hashes)
+                except Exception as e:
+                    print(f"⚠️ Could not upload audio to Storage (RLS policy): {e}")
+                    print(f"   Using fallback URL for audio file")
+                    # Use a fallback URL pointing to the expected location
+                    # Use the course-audio bucket path
+                    base_name = os.path.basename(audio_storage_name(audio_file_path, learning_object_id))
+                    audio_url = f"https://cmjdciktvfxiyapdseqn.supabase.co/storage/v1/object/public/course-audio/courses/CPCU 500/assignments/Risk Management/{base_name}"
+                    audio_size_bytes = os.path.getsize(audio_file_path)
 
         # Prepare the record with all required fields
-        record = {
-            'id': learning_object_id,
-            'assignment_id': assignment_id,
-            'course_id': 'e3d85ff7-cb25-4702-b2ba-813e8a24f16d',  # Test course ID
-            'title': title,
-            'display_text': enhanced_data.get('display_text', ''),
-            'order_index': order_index,
-            'total_duration_ms': timing.get('total_duration_ms', 0),
-            'words': words_data,  # JSONB field with embedded lookup table
-            'sentences': timing.get('sentences', []),  # Separate sentence timings field
-            'metadata': enhanced_data.get('metadata', {}),
-            'paragraphs': enhanced_data.get('paragraphs', []),
-            'headers': enhanced_data.get('headers', []),
-            'formatting': enhanced_data.get('formatting', {}),
-            'audio_url': audio_url or '',  # Required field
-            'audio_size_bytes': audio_size_bytes,  # Required field
-            'audio_format': 'mp3',
-            'audio_codec': 'mp3_128',
-            'content_version': '1.0',  # New versioning column
-            'preprocessing_source': 'elevenlabs-complete-with-paragraphs'  # Track preprocessing source
-        }
+        record = build_learning_object_record(
+            enhanced_data, learning_object_id, assignment_id, title, order_index,
+            words_data, audio_url, audio_size_bytes
+        )
+        row_size = attach_upload_hashes(record, hashes)
+
+        if hashes == stored_hashes:
+            bytes_saved += row_size
+            print(f"⏭️ Learning object unchanged, skipping row write: {title}")
+            print(f"   Saved: {bytes_saved:,} bytes")
+            return record
 
         # Upload to Supabase (upsert to handle updates)
         result = self.client.table('learning_objects').upsert(record).execute()
@@ -171,6 +244,8 @@ class SupabaseUploader:
         print(f"   ID: {learning_object_id}")
         print(f"   Words: {enhanced_data.get('metadata', {}).get('word_count', 0)}")
         print(f"   Duration: {record['total_duration_ms']}ms")
+        if bytes_saved:
+            print(f"   Saved: {bytes_saved:,} bytes (unchanged uploads skipped)")
 
         return result.data[0] if result.data else None
 
@@ -188,9 +263,16 @@ class SupabaseUploader:
 
         if result.data and len(result.data) > 0:
             words_data = result.data[0].get('words', {})
-            has_lookup = 'lookupTable' in words_data and words_data['lookupTable'] is not None
-
-            if has_lookup:
+            has_inline = words_data.get('lookupTable') is not None
+            has_binary = words_data.get('lookupTableBinary') is not None
+            has_lookup = has_inline or has_binary
+
+            if has_binary:
+                binary = words_data['lookupTableBinary']
+                print(f"✅ Verified binary lookup table for {learning_object_id}")
+                print(f"   URL: {binary.get('url', '')}")
+                print(f"   Intervals: {binary.get('intervalCount', 0)}")
+            elif has_inline:
                 lookup = words_data['lookupTable']
                 print(f"✅ Verified lookup table for {learning_object_id}")
                 print(f"   Entries: {len(lookup.get('lookup', []))}")
@@ -243,6 +325,32 @@ def main():
         '--lookup-json',
         help='Path to separate lookup JSON file (optional)'
     )
+    parser.add_argument(
+        '--lookup-bin',
+        help='Path to binary lookup table (_lookup.bin) to upload to Storage (optional)'
+    )
+    parser.add_argument(
+        '--chunk-size',
+        type=float,
+        default=DEFAULT_CHUNK_SIZE / 2 ** 20,
+        help='Chunk size in MB for resumable audio uploads; larger files are chunked (default: 6)'
+    )
+    parser.add_argument(
+        '--upload-state',
+        default=DEFAULT_STATE_FILE,
+        help=f'Resumable upload progress file (default: {DEFAULT_STATE_FILE})'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Re-upload audio, lookup table and row even if their hashes are unchanged'
+    )
+    parser.add_argument(
+        '--precompressed',
+        choices=list(CODEC_SUFFIXES),
+        metavar='CODEC',
+        help='Upload the lookup table precompressed with this codec (written by --precompress) with a matching Content-Encoding'
+    )
     parser.add_argument(
         '--verify-only',
         action='store_true',
@@ -252,7 +360,7 @@ def main():
     args = parser.parse_args()
 
     # Initialize uploader
-    uploader = SupabaseUploader()
+    uploader = SupabaseUploader(int(args.chunk_size * 2 ** 20), args.upload_state)
 
     if args.verify_only:
         # Just verify the lookup table exists
@@ -267,7 +375,10 @@ def main():
             title=args.title,
             order_index=args.order,
             audio_file_path=args.audio_file,
-            lookup_json_path=args.lookup_json
+            lookup_json_path=args.lookup_json,
+            lookup_bin_path=args.lookup_bin,
+            force=args.force,
+            content_encoding=args.precompressed
         )
 
         if result:
@@ -0,0 +1,107 @@
+"""
+Reference structure detection for tests: one scan per family
+
+EdgeCaseHandlers.detect_structures() finds every structure family with one
+combined regex. This module keeps the straightforward implementation it
+replaced: each family's own patterns (handlers.patterns) run one after
+another, lists line by line. multi_scan() must find exactly the
+same structures; the tests and benchmark_structure_scan.py compare the two.
+"""
+
+from pathlib import Path
+from typing import List
+
+from edge_case_handlers import EdgeCaseHandlers, StructureType, TextStructure
+
+TEST_CONTENT = Path(__file__).parent / 'test_content'
+
+
+def lesson_markdown() -> str:
+    """All test_content lesson markdown, in a stable order"""
+    return '\n\n'.join(path.read_text(encoding='utf-8') for path in sorted(TEST_CONTENT.glob('*/*.md')))
+
+
+def multi_scan(handlers: EdgeCaseHandlers, text: str) -> List[TextStructure]:
+    """Structures from each family's detector in turn, in the original detector order"""
+    structures = []
+    structures.extend(detect_lists(handlers, text))
+    structures.extend(detect_quotations(handlers, text))
+    structures.extend(detect_mathematical(handlers, text))
+    structures.extend(detect_urls_emails(handlers, text))
+    structures.extend(detect_structural_elements(handlers, text))
+    return structures
+
+
+def detect_lists(handlers: EdgeCaseHandlers, text: str) -> List[TextStructure]:
+    """Colon-introduced, numbered, bulleted and lettered list items"""
+    structures = []
+    index = handlers.get_text_index(text)
+    lines = index.lines
+
+    for i, line in enumerate(lines):
+        start_pos = index.line_starts[i]
+
+        # A capitalized line after a line ending in ':'
+        if i > 0 and lines[i-1].endswith(':'):
+            if line and line[0].isupper() and not line.endswith('.'):
+                structures.append(TextStructure(
+                    type=StructureType.COLON_LIST,
+                    start_pos=start_pos,
+                    end_pos=start_pos + len(line),
+                    content=line
+                ))
+
+        match = handlers.patterns['list_item'].match(line)
+        if match:
+            structures.append(TextStructure(
+                type=handlers.LIST_MARKER_TYPES[match.lastgroup],
+                start_pos=start_pos,
+                end_pos=start_pos + len(line),
+                content=line
+            ))
+
+    return structures
+
+
+def detect_quotations(handlers: EdgeCaseHandlers, text: str) -> List[TextStructure]:
+    """Paired quotations, then dialog markers"""
+    structures = []
+
+    quote_stack = []
+    for match in handlers.patterns['quote_start'].finditer(text):
+        quotation = handlers._pair_quote(text, quote_stack, match.group(), match.start())
+        if quotation:
+            structures.append(quotation)
+
+    for match in handlers.patterns['dialog_marker'].finditer(text):
+        structures.append(TextStructure(
+            type=StructureType.DIALOG,
+            start_pos=match.start(),
+            end_pos=match.end(),
+            content=match.group(),
+            metadata={'speaker': match.group(1)}
+        ))
+
+    return structures
+
+
+def detect_mathematical(handlers: EdgeCaseHandlers, text: str) -> List[TextStructure]:
+    """Equations, then formulas"""
+    return [TextStructure(type=StructureType.EQUATION, start_pos=match.start(), end_pos=match.end(),
+                          content=match.group())
+            for name in ('equation', 'formula') for match in handlers.patterns[name].finditer(text)]
+
+
+def detect_urls_emails(handlers: EdgeCaseHandlers, text: str) -> List[TextStructure]:
+    """URLs, then email addresses"""
+    return [TextStructure(type=structure_type, start_pos=match.start(), end_pos=match.end(),
+                          content=match.group())
+            for name, structure_type in (('url', StructureType.URL), ('email', StructureType.EMAIL))
+            for match in handlers.patterns[name].finditer(text)]
+
+
+def detect_structural_elements(handlers: EdgeCaseHandlers, text: str) -> List[TextStructure]:
+    """Headers, then figure/table captions (no MULTILINE flag: only at the start of the text)"""
+    return [TextStructure(type=StructureType.HEADER, start_pos=match.start(), end_pos=match.end(),
+                          content=match.group())
+            for name in ('header', 'figure_caption') for match in handlers.patterns[name].finditer(text)]
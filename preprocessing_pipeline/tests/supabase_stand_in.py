@@ -0,0 +1,233 @@
+"""
+Local HTTP stand-in for the Supabase APIs used by the upload scripts
+
+Implements just enough of Storage (object upload, resumable TUS uploads and
+public download, served with the uploaded Content-Encoding) and PostgREST (multi-row upsert, filtered PATCH, select with
+column projections and `in.()` filters) to exercise supabase_rest.SupabaseRestClient
+end to end. Every request is recorded so tests can assert on round trips and
+connection reuse.
+
+    with SupabaseStandIn() as server:
+        client = SupabaseRestClient(server.url, 'test-key')
+"""
+
+import base64
+import itertools
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+API_KEY = 'test-key'
+RESUMABLE_PATH = '/storage/v1/upload/resumable'
+
+
+def _project(row: Dict, columns: str) -> Dict:
+    """Apply a PostgREST select list such as "id,url:words->a->>b" to a row"""
+    projected = {}
+    for item in columns.split(','):
+        alias, _, path = item.rpartition(':')
+        steps = re.split(r'(->>|->)', path)
+        value = row.get(steps[0])
+        for arrow, key in zip(steps[1::2], steps[2::2]):
+            value = value.get(key) if isinstance(value, dict) else None
+            if arrow == '->>' and value is not None and not isinstance(value, str):
+                value = json.dumps(value)
+        projected[alias or steps[-1]] = value
+    return projected
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        with self.server.stand_in.lock:
+            self.server.stand_in.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: bytes = b'', content_type: str = 'application/json',
+               headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _resumable(self, method: str, path: str, body: bytes):
+        """TUS endpoints: create, append a chunk, report the offset"""
+        stand_in = self.server.stand_in
+        if method == 'POST':
+            metadata = {}
+            for pair in self.headers.get('Upload-Metadata', '').split(','):
+                key, _, value = pair.partition(' ')
+                metadata[key] = base64.b64decode(value).decode('utf-8')
+            upload_id = str(next(stand_in.upload_ids))
+            with stand_in.lock:
+                stand_in.uploads[upload_id] = {'length': int(self.headers['Upload-Length']),
+                                               'data': bytearray(), 'metadata': metadata}
+            return self._reply(201, headers={'Location': f"{stand_in.url}{RESUMABLE_PATH}/{upload_id}",
+                                             'Tus-Resumable': '1.0.0'})
+
+        upload = stand_in.uploads.get(path[len(RESUMABLE_PATH) + 1:])
+        if upload is None:
+            return self._reply(404, b'{"error":"upload not found"}')
+        if method == 'HEAD':
+            return self._reply(200, headers={'Upload-Offset': str(len(upload['data'])),
+                                             'Upload-Length': str(upload['length'])})
+        if int(self.headers['Upload-Offset']) != len(upload['data']):
+            return self._reply(409, b'{"error":"offset mismatch"}')
+        with stand_in.lock:
+            if stand_in.fail_patches_after is not None:
+                schedule = stand_in.fail_patches_after
+                counts = [schedule] if isinstance(schedule, int) else schedule
+                if counts[0] <= 0:
+                    stand_in.fail_patches_after = counts[1:] or None
+                    return self._reply(500, b'{"message":"injected failure"}')
+                stand_in.fail_patches_after = [counts[0] - 1] + counts[1:]
+            upload['data'] += body
+            if len(upload['data']) == upload['length']:
+                metadata = upload['metadata']
+                stand_in.objects[(metadata['bucketName'], metadata['objectName'])] = {
+                    'data': bytes(upload['data']), 'headers': {'Content-Type': metadata.get('contentType', '')}}
+        return self._reply(204, headers={'Upload-Offset': str(len(upload['data']))})
+
+    def _handle(self, method: str):
+        stand_in = self.server.stand_in
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        parts = urlsplit(self.path)
+        path = unquote(parts.path)
+        with stand_in.lock:
+            stand_in.requests.append({'method': method, 'path': path, 'query': parts.query,
+                                      'headers': dict(self.headers), 'size': len(body)})
+
+        if path.startswith('/storage/v1/object/public/'):
+            bucket, _, name = path[len('/storage/v1/object/public/'):].partition('/')
+            stored = stand_in.objects.get((bucket, name))
+            if stored is None:
+                return self._reply(404, b'{"error":"not found"}')
+            encoding = stored['headers'].get('Content-Encoding')
+            return self._reply(200, stored['data'], stored['headers'].get('Content-Type', ''),
+                               {'Content-Encoding': encoding} if encoding else None)
+
+        if self.headers.get('apikey') != API_KEY:
+            return self._reply(401, b'{"message":"Invalid API key"}')
+        for fail_path in stand_in.fail_paths:
+            if fail_path in f'{method} {path}':
+                return self._reply(500, b'{"message":"injected failure"}')
+        with stand_in.lock:
+            once = next((p for p in stand_in.fail_once if p in f'{method} {path}'), None)
+            if once is not None:
+                stand_in.fail_once.remove(once)
+        if once is not None:
+            return self._reply(500, b'{"message":"injected failure"}')
+
+        if path.startswith(RESUMABLE_PATH):
+            return self._resumable(method, path, body)
+
+        if method == 'POST' and path.startswith('/storage/v1/object/'):
+            bucket, _, name = path[len('/storage/v1/object/'):].partition('/')
+            with stand_in.lock:
+                if (bucket, name) in stand_in.objects and self.headers.get('x-upsert') != 'true':
+                    return self._reply(409, b'{"error":"Duplicate"}')
+                stand_in.objects[(bucket, name)] = {'data': body, 'headers': dict(self.headers)}
+            return self._reply(200, json.dumps({'Key': f'{bucket}/{name}'}).encode())
+
+        if path.startswith('/rest/v1/'):
+            table = stand_in.tables.setdefault(path[len('/rest/v1/'):], {})
+            query = dict(parse_qsl(parts.query))
+            if method == 'POST':
+                rows = json.loads(body)
+                key = query.get('on_conflict', 'id')
+                with stand_in.lock:
+                    for row in rows:
+                        table.setdefault(row[key], {}).update(row)
+                return self._reply(201)
+            rows = list(table.values())
+            for column, condition in query.items():
+                if column in ('select', 'on_conflict'):
+                    continue
+                if condition.startswith('in.('):
+                    wanted = set(condition[4:-1].split(','))
+                    rows = [r for r in rows if str(r.get(column)) in wanted]
+                elif condition.startswith('eq.'):
+                    rows = [r for r in rows if str(r.get(column)) == condition[3:]]
+            if method == 'PATCH':
+                values = json.loads(body)
+                with stand_in.lock:
+                    for row in rows:
+                        row.update(values)
+                return self._reply(204)
+            if method == 'GET':
+                rows = [_project(r, query.get('select', '*')) if query.get('select', '*') != '*' else r
+                        for r in rows]
+                return self._reply(200, json.dumps(rows).encode())
+
+        self._reply(404, b'{"error":"unsupported"}')
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PATCH(self):
+        self._handle('PATCH')
+
+    def do_HEAD(self):
+        self._handle('HEAD')
+
+
+class SupabaseStandIn:
+    """In-memory Supabase served on 127.0.0.1 from a background thread"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.objects: Dict[Tuple[str, str], Dict] = {}
+        self.tables: Dict[str, Dict] = {}
+        self.requests: List[Dict] = []
+        # Requests matching any of these substrings of "METHOD /path" get a 500
+        self.fail_paths: List[str] = []
+        # Like fail_paths, but each entry fails only the first request it matches
+        self.fail_once: List[str] = []
+        self.connections = 0
+        # Resumable uploads in progress; fail_patches_after=n accepts n more chunks, then fails one
+        # (a list of counts repeats that: [2, 3] fails the 3rd chunk request, then the 4th after it)
+        self.uploads: Dict[str, Dict] = {}
+        self.upload_ids = itertools.count(1)
+        self.fail_patches_after: Optional[Union[int, List[int]]] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def requests_to(self, method: str, prefix: str) -> List[Dict]:
+        """Recorded requests with this method whose path starts with prefix"""
+        return [r for r in self.requests if r['method'] == method and r['path'].startswith(prefix)]
+
+    def start(self) -> 'SupabaseStandIn':
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.stand_in = self
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'SupabaseStandIn':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
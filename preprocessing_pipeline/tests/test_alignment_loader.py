@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming ElevenLabs alignment loader
+"""
+
+import base64
+import io
+import json
+import os
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+import alignment_loader
+from alignment_loader import load_alignment
+from batch_process import discover_lessons
+
+TEST_CONTENT = Path(__file__).parent / 'test_content'
+
+
+def write_response(path: Path, characters, audio: bytes, indent=None, ensure_ascii=True):
+    """Write a raw ElevenLabs-style response with audio and both alignments"""
+    start = [round(i * 0.05, 3) for i in range(len(characters))]
+    end = [round(t + 0.05, 3) for t in start]
+    data = {
+        'audio_base64': base64.b64encode(audio).decode('ascii'),
+        'alignment': {
+            'characters': characters,
+            'character_start_times_seconds': start,
+            'character_end_times_seconds': end
+        },
+        'normalized_alignment': {'characters': characters, 'extra': [{'nested': ']}"'}, None, True]}
+    }
+    path.write_text(json.dumps(data, indent=indent, ensure_ascii=ensure_ascii), encoding='utf-8')
+    return start, end
+
+
+def test_matches_json_load_on_test_content():
+    for lesson in discover_lessons(str(TEST_CONTENT)):
+        with open(lesson.alignment_path, 'r', encoding='utf-8') as f:
+            expected = json.load(f)['alignment']
+        alignment = load_alignment(lesson.alignment_path, chunk_size=4096)
+
+        assert alignment.characters == ''.join(expected['characters'])
+        assert list(alignment.start_times) == expected['character_start_times_seconds']
+        assert list(alignment.end_times) == expected['character_end_times_seconds']
+
+
+def test_escapes_across_chunk_boundaries(tmp_path, monkeypatch):
+    rng = random.Random(5)
+    pool = ['a', ' ', '"', '\\', '\n', 'é', '’', ']', '{', ',', '😀']
+    for chunk_size in (1, 2, 3, 7, 64):
+        monkeypatch.setattr(alignment_loader, 'SCAN_WINDOW', rng.choice([1, 5, 1 << 16]))
+        characters = [rng.choice(pool) for _ in range(150)]
+        audio = os.urandom(rng.randint(0, 500))
+        path = tmp_path / f'response_{chunk_size}.json'
+        start, end = write_response(path, characters, audio, indent=rng.choice([None, 2]),
+                                    ensure_ascii=rng.random() < 0.5)
+
+        alignment = load_alignment(str(path), str(tmp_path / 'audio.mp3'), chunk_size=chunk_size)
+        assert alignment.characters == ''.join(characters)
+        assert list(alignment.start_times) == start
+        assert list(alignment.end_times) == end
+        assert (tmp_path / 'audio.mp3').read_bytes() == audio
+        assert alignment.audio_bytes == len(audio)
+
+
+def test_multi_character_entries_stay_a_list(tmp_path):
+    path = tmp_path / 'response.json'
+    write_response(path, ['Hel', 'lo', ' ', 'w'], b'')
+    assert load_alignment(str(path)).characters == ['Hel', 'lo', ' ', 'w']
+
+
+def test_audio_skipped_without_output_path(tmp_path):
+    path = tmp_path / 'response.json'
+    write_response(path, list('Hi there.'), os.urandom(10000))
+    alignment = load_alignment(str(path))
+    assert alignment.audio_path is None
+    assert alignment.characters == 'Hi there.'
+
+
+def test_speechify_response_from_stream(tmp_path):
+    audio = os.urandom(3000)
+    marks = [{'type': 'word', 'value': 'Hi', 'start': 0, 'end': 2, 'time': 0, 'end_time': 180},
+             {'type': 'sentence', 'value': 'Hi "there".', 'chunks': [{'value': 'there', 'time': 210.5}],
+              'flags': [True, False, None, -1.5e3]}]
+    text = json.dumps({'audio_data': base64.b64encode(audio).decode('ascii'), 'speech_marks': marks,
+                       'billable_characters_count': 11})
+    for chunk_size in (1, 5, 4096):
+        alignment = load_alignment(io.StringIO(text), str(tmp_path / 'audio.mp3'), chunk_size=chunk_size)
+        assert alignment.speech_marks == marks
+        assert (tmp_path / 'audio.mp3').read_bytes() == audio and alignment.audio_bytes == len(audio)
+    assert load_alignment(io.StringIO('{"speech_marks": []}')).speech_marks == []
+
+
+def test_rejects_truncated_file(tmp_path):
+    path = tmp_path / 'response.json'
+    write_response(path, list('Hi there.'), b'abc')
+    path.write_text(path.read_text()[:-40])
+    try:
+        load_alignment(str(path), chunk_size=16)
+    except ValueError as e:
+        assert 'Invalid alignment JSON' in str(e)
+    else:
+        raise AssertionError("truncated JSON was accepted")
+
+
+if __name__ == '__main__':
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Test lesson discovery and the process-pool batch runner"""
+
+import io
+import json
+import shutil
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from batch_process import discover_lessons, run_batch, MANIFEST_NAME
+
+TEST_CONTENT = Path(__file__).parent / 'test_content'
+SMALL_LESSON = 'The Vital Role of Risk Management and Insurance'
+
+
+def test_discover_test_content():
+    """The four test_content lessons are found, with audio where present"""
+    lessons = discover_lessons(str(TEST_CONTENT))
+
+    assert len(lessons) == 4
+    with_audio = {Path(l.alignment_path).stem for l in lessons if l.audio_path}
+    assert with_audio == {'Becoming a Key Player in the Insurance Value Chain', SMALL_LESSON}
+    # Previously generated *_enhanced.json outputs are not mistaken for input
+    assert all(not Path(l.alignment_path).stem.endswith('_enhanced') for l in lessons)
+
+
+def test_batch_writes_outputs_and_manifest(tmp_path):
+    """Good lessons are processed, broken ones are reported as failures"""
+    course = tmp_path / 'course'
+    shutil.copytree(TEST_CONTENT / SMALL_LESSON, course / 'lesson_1')
+    (course / 'lesson_2').mkdir()
+    (course / 'lesson_2' / 'broken.json').write_text('{not json')
+    (course / 'lesson_2' / 'broken.md').write_text('# Broken')
+
+    output = tmp_path / 'out'
+    with redirect_stdout(io.StringIO()):
+        manifest = run_batch(str(course), str(output), {}, workers=2)
+
+    assert manifest['lesson_count'] == 2
+    assert manifest['failure_count'] == 1
+    ok = [r for r in manifest['lessons'] if r['status'] == 'ok']
+    assert len(ok) == 1 and ok[0]['word_count'] > 0
+    assert Path(ok[0]['output']).exists()
+    assert Path(ok[0]['lookup_bin']).exists()
+    assert [stage['stage'] for stage in ok[0]['stages']][-1] == 'save'
+
+    saved = json.loads((output / MANIFEST_NAME).read_text())
+    assert saved['failure_count'] == 1
+    assert 'JSONDecodeError' in [r for r in saved['lessons'] if r['status'] == 'failed'][0]['error']
+
+
+if __name__ == '__main__':
+    import tempfile
+    test_discover_test_content()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_batch_writes_outputs_and_manifest(Path(tmp))
+    print("✅ All batch processing tests passed!")
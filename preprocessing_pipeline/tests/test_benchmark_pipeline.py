@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for the pipeline benchmark suite and its synthetic alignment generator
+"""
+
+import io
+import json
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from benchmark_pipeline import generate_lesson, run_stages, benchmark, STAGES
+from process_elevenlabs_complete_with_paragraphs import ElevenLabsCompleteProcessorWithParagraphs
+
+
+def test_generated_alignment_is_well_formed(tmp_path):
+    alignment_path, markdown_path = generate_lesson(tmp_path, 5, seed=1)
+    alignment = json.loads(alignment_path.read_text())['alignment']
+
+    characters = alignment['characters']
+    starts = alignment['character_start_times_seconds']
+    ends = alignment['character_end_times_seconds']
+    assert len(characters) == len(starts) == len(ends)
+    assert all(a <= b for a, b in zip(starts, ends))
+    assert all(b <= c for b, c in zip(ends, starts[1:]))
+    # Roughly five minutes of speech
+    assert 250 < ends[-1] < 500
+
+    text = ''.join(characters)
+    for marker in ('https://', '@example.com', 'e.g.', '"'):
+        assert marker in text
+    assert markdown_path.read_text().startswith('# Synthetic Lesson')
+
+
+def test_stages_match_process(tmp_path):
+    alignment_path, markdown_path = generate_lesson(tmp_path, 1, seed=2)
+    result = run_stages(alignment_path, markdown_path)
+    assert list(result['stages']) == STAGES
+
+    with redirect_stdout(io.StringIO()):
+        content = ElevenLabsCompleteProcessorWithParagraphs(str(alignment_path), str(markdown_path)).process()
+    assert result['words'] == content['metadata']['word_count']
+    assert result['sentences'] == len(content['timing']['sentences'])
+    assert result['duration_ms'] == content['timing']['total_duration_ms']
+
+
+def test_benchmark_records_memory():
+    result = benchmark(0.5, seed=3, track_memory=True)
+    assert result['peak_mb'] > 0
+    assert all('peak_mb' in stage and stage['seconds'] >= 0 for stage in result['stages'].values())
+
+
+if __name__ == '__main__':
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        test_generated_alignment_is_well_formed(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_stages_match_process(Path(tmp))
+    test_benchmark_records_memory()
+    print("✅ All benchmark suite tests passed")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Test the content-hash build cache used for incremental rebuilds"""
+
+import io
+import shutil
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from build_cache import BuildCache
+from process_elevenlabs_complete_with_paragraphs import ElevenLabsCompleteProcessorWithParagraphs, PROCESSOR_VERSION
+
+LESSON = 'The Vital Role of Risk Management and Insurance'
+LESSON_DIR = Path(__file__).parent / 'test_content' / LESSON
+
+
+def _copy_lesson(tmp_path):
+    shutil.copy(LESSON_DIR / f'{LESSON}.json', tmp_path / 'lesson.json')
+    shutil.copy(LESSON_DIR / f'{LESSON}.md', tmp_path / 'lesson.md')
+    return str(tmp_path / 'lesson.json'), str(tmp_path / 'lesson.md')
+
+
+def _run(alignment, original, cache, output, config=None):
+    with redirect_stdout(io.StringIO()):
+        processor = ElevenLabsCompleteProcessorWithParagraphs(alignment, original, config or {}, cache)
+        content = processor.process()
+        processor.save(content, output)
+    return processor, content
+
+
+def test_key_tracks_inputs_config_and_version(tmp_path):
+    """Any input, config or version change produces a new key"""
+    alignment, original = _copy_lesson(tmp_path)
+    cache = BuildCache('1.0', str(tmp_path / 'cache'))
+    key = cache.lesson_key(alignment, original, {})
+
+    assert cache.lesson_key(alignment, original, {}) == key
+    assert cache.lesson_key(alignment, original, {'output': {'include_legacy_lookup': False}}) != key
+    assert BuildCache('2.0', str(tmp_path / 'cache')).lesson_key(alignment, original, {}) != key
+
+    with open(original, 'a', encoding='utf-8') as f:
+        f.write('\nOne more paragraph.')
+    assert cache.lesson_key(alignment, original, {}) != key
+
+
+def test_second_run_hits_and_skips_writes(tmp_path):
+    """Unchanged lessons come from the cache and their outputs are not rewritten"""
+    alignment, original = _copy_lesson(tmp_path)
+    output = str(tmp_path / 'out_enhanced.json')
+    cache = BuildCache(PROCESSOR_VERSION, str(tmp_path / 'cache'))
+
+    first, content = _run(alignment, original, cache, output)
+    assert first.cache_status == 'miss'
+    mtime = Path(output).stat().st_mtime_ns
+
+    second, cached = _run(alignment, original, cache, output)
+    assert second.cache_status == 'hit'
+    # A hit never loads the alignment
+    assert second._alignment is None
+    assert 'load' not in [record.stage for record in second.instrumentation.records]
+    assert 'load' in [record.stage for record in first.instrumentation.records]
+    assert cached == content
+    assert Path(output).stat().st_mtime_ns == mtime
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Deleted artifacts are rewritten even on a cache hit
+    Path(output.replace('.json', '_lookup.bin')).unlink()
+    _run(alignment, original, cache, output)
+    assert Path(output.replace('.json', '_lookup.bin')).exists()
+
+
+def test_prune_removes_other_versions(tmp_path):
+    """prune() invalidates every processor version except the current one"""
+    old = BuildCache('0.9', str(tmp_path / 'cache'))
+    old.put('ab' * 32, {'version': 'old'})
+    current = BuildCache('1.0', str(tmp_path / 'cache'))
+    current.put('cd' * 32, {'version': 'current'})
+
+    assert current.prune() == 1
+    assert current.get('cd' * 32) == {'version': 'current'}
+    assert BuildCache('0.9', str(tmp_path / 'cache')).get('ab' * 32) is None
+
+
+if __name__ == '__main__':
+    import tempfile
+    for test in (test_key_tracks_inputs_config_and_version, test_second_run_hits_and_skips_writes,
+                 test_prune_removes_other_versions):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("✅ All build cache tests passed!")
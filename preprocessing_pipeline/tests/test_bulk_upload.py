@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Tests for the bulk course uploader against a local Supabase stand-in
+"""
+
+import io
+import json
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from bulk_upload import BulkUploader, load_course_manifest, run_upload, STORAGE_BUCKET, TABLE
+from supabase_rest import SupabaseRestClient, SupabaseError
+from process_elevenlabs_complete_with_paragraphs import ElevenLabsCompleteProcessorWithParagraphs
+from supabase_stand_in import SupabaseStandIn, API_KEY
+
+LESSON = Path(__file__).parent / 'test_content' / 'The Vital Role of Risk Management and Insurance'
+ALIGNMENT = LESSON / 'The Vital Role of Risk Management and Insurance.json'
+
+
+def write_course(directory: Path, lesson_count: int) -> Path:
+    """Process the small test lesson once and write a manifest that uploads it lesson_count times"""
+    processor = ElevenLabsCompleteProcessorWithParagraphs(str(ALIGNMENT), str(ALIGNMENT.with_suffix('.md')))
+    processor.save(processor.process(), str(directory / 'lesson_enhanced.json'))
+    (directory / 'lesson.mp3').write_bytes(bytes(range(256)) * 256)
+
+    lessons = []
+    for i in range(lesson_count):
+        lesson = {'id': f'00000000-0000-0000-0000-{i:012d}', 'title': f'Lesson {i}', 'order': i,
+                  'enhanced_json': 'lesson_enhanced.json', 'audio_file': 'lesson.mp3'}
+        # Alternate Storage-backed binary lookups and inline JSON lookups
+        if i % 2:
+            lesson['lookup_json'] = 'lesson_enhanced_lookup.json'
+        else:
+            lesson['lookup_bin'] = 'lesson_enhanced_lookup.bin'
+        lessons.append(lesson)
+
+    manifest_path = directory / 'course.json'
+    manifest_path.write_text(json.dumps({
+        'course_id': 'course-1', 'assignment_id': 'assignment-1', 'storage_prefix': 'courses/test', 'lessons': lessons
+    }))
+    return manifest_path
+
+
+def test_bulk_upload_reuses_connections_and_batches_rows(tmp_path):
+    manifest_path = write_course(tmp_path, 12)
+    with SupabaseStandIn() as server:
+        client = SupabaseRestClient(server.url, API_KEY)
+        results = BulkUploader(client, workers=4, batch_size=5).upload(load_course_manifest(str(manifest_path)))
+        client.close()
+
+    assert [r['status'] for r in results] == ['ok'] * 12
+    assert all(r['verified'] for r in results)
+    assert [r['title'] for r in results] == [f'Lesson {i}' for i in range(12)]
+
+    # 12 audio + 6 binary lookup uploads, 3 multi-row upserts, 1 upload hash read, 1 verification read
+    assert len(server.requests_to('POST', '/storage/v1/object/')) == 18
+    assert len(server.requests_to('POST', f'/rest/v1/{TABLE}')) == 3
+    reads = server.requests_to('GET', f'/rest/v1/{TABLE}')
+    assert len(reads) == 2
+    assert all('words,' not in read['query'] and 'lookupTableBinary' in read['query'] for read in reads)
+    # One keep-alive connection per pool thread plus the main thread
+    assert server.connections <= 5
+    assert client.request_count == len(server.requests)
+
+    rows = server.tables[TABLE]
+    assert len(rows) == 12
+    first = rows['00000000-0000-0000-0000-000000000000']
+    assert first['course_id'] == 'course-1' and first['assignment_id'] == 'assignment-1'
+    assert first['words']['lookupTableBinary']['url'].startswith(server.url)
+    assert first['audio_size_bytes'] == 65536
+    assert 'lookupTable' in rows['00000000-0000-0000-0000-000000000001']['words']
+    assert server.objects[(STORAGE_BUCKET, 'courses/test/lesson.mp3')]['data'] == (tmp_path / 'lesson.mp3').read_bytes()
+
+
+def test_failures_are_reported_per_lesson(tmp_path):
+    manifest_path = write_course(tmp_path, 4)
+    lessons = load_course_manifest(str(manifest_path))
+    lessons[3].enhanced_json = str(tmp_path / 'missing.json')
+
+    with SupabaseStandIn() as server:
+        # Audio uploads are rejected: lessons fall back to the expected public URL
+        server.fail_paths.append('lesson.mp3')
+        client = SupabaseRestClient(server.url, API_KEY)
+        results = BulkUploader(client, workers=2, batch_size=10).upload(lessons)
+
+    assert [r['status'] for r in results] == ['ok', 'ok', 'ok', 'failed']
+    assert 'FileNotFoundError' in results[3]['error']
+    assert all(r['warnings'] and r['verified'] for r in results[:3])
+    assert results[0]['audio_url'] == client.public_url(STORAGE_BUCKET, 'courses/test/lesson.mp3')
+    assert len(server.tables[TABLE]) == 3
+
+
+def test_run_upload_report_and_upsert_failure(tmp_path):
+    manifest_path = write_course(tmp_path, 3)
+    report_path = tmp_path / 'report.json'
+    with SupabaseStandIn() as server:
+        server.fail_paths.append(f'POST /rest/v1/{TABLE}')
+        client = SupabaseRestClient(server.url, API_KEY)
+        with redirect_stdout(io.StringIO()):
+            report = run_upload(str(manifest_path), client, workers=2, batch_size=2, report_path=str(report_path))
+
+    assert report['failure_count'] == 3
+    assert all(r['error'].startswith('Upsert failed') for r in report['lessons'])
+    assert json.loads(report_path.read_text())['lesson_count'] == 3
+
+
+def test_republish_skips_unchanged_uploads(tmp_path):
+    manifest_path = write_course(tmp_path, 4)
+    with SupabaseStandIn() as server:
+        client = SupabaseRestClient(server.url, API_KEY)
+        uploader = BulkUploader(client, workers=2, batch_size=10)
+        first = uploader.upload(load_course_manifest(str(manifest_path)))
+        assert all(r['skipped'] == [] and r['bytes_saved'] == 0 for r in first)
+        hashes = server.tables[TABLE][first[0]['id']]['metadata']['uploadHashes']
+        assert set(hashes) == {'enhancedJson', 'lookup', 'lookupPath', 'audio', 'audioPath', 'row'}
+
+        # Nothing changed: no Storage uploads and no row writes
+        writes = len(server.requests_to('POST', '/'))
+        second = uploader.upload(load_course_manifest(str(manifest_path)))
+        assert len(server.requests_to('POST', '/')) == writes
+        assert all(r['verified'] for r in second)
+        assert second[0]['skipped'] == ['lookup', 'audio', 'row']
+        assert second[1]['skipped'] == ['audio', 'row']
+        assert second[0]['bytes_uploaded'] == 0
+        assert second[0]['bytes_saved'] == first[0]['bytes_uploaded']
+
+        # New audio: only the audio is uploaded again, and the rows record its new hash
+        (tmp_path / 'lesson.mp3').write_bytes(b'new audio' * 1000)
+        third = uploader.upload(load_course_manifest(str(manifest_path)))
+        assert len(server.requests_to('POST', '/storage/v1/object/')) == 4 + 2 + 4
+        assert third[0]['skipped'] == ['lookup']
+        assert server.tables[TABLE][first[0]['id']]['audio_size_bytes'] == 9000
+
+        # --force ignores the stored hashes
+        forced = uploader.upload(load_course_manifest(str(manifest_path)), force=True)
+        assert all(r['skipped'] == [] for r in forced)
+
+
+def test_failed_audio_upload_is_retried(tmp_path):
+    manifest_path = write_course(tmp_path, 1)
+    with SupabaseStandIn() as server:
+        client = SupabaseRestClient(server.url, API_KEY)
+        uploader = BulkUploader(client)
+        server.fail_paths.append('lesson.mp3')
+        first = uploader.upload(load_course_manifest(str(manifest_path)))
+        assert first[0]['warnings'] and 'audio' not in first[0]['hashes']
+
+        server.fail_paths.clear()
+        second = uploader.upload(load_course_manifest(str(manifest_path)))
+        assert 'audio' not in second[0]['skipped'] and not second[0]['warnings']
+        assert (STORAGE_BUCKET, 'courses/test/lesson.mp3') in server.objects
+
+
+def test_client_raises_on_error_status():
+    with SupabaseStandIn() as server:
+        client = SupabaseRestClient(server.url, 'wrong-key')
+        with pytest.raises(SupabaseError) as error:
+            client.select(TABLE, 'id')
+    assert error.value.status == 401
+
+
+if __name__ == '__main__':
+    import tempfile
+    for test in (test_bulk_upload_reuses_connections_and_batches_rows, test_failures_are_reported_per_lesson,
+                 test_run_upload_report_and_upsert_failure, test_republish_skips_unchanged_uploads,
+                 test_failed_audio_upload_is_retried):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    test_client_raises_on_error_status()
+    print("✅ All bulk upload tests passed")
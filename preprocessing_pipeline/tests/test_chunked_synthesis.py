@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for chunked long-text synthesis: splitting, MP3 joining and alignment stitching
+"""
+
+import asyncio
+import json
+import math
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from chunked_synthesis import (split_for_synthesis, concatenate_mp3, mp3_frames,
+                               stitch_responses, synthesize_long_text)
+from alignment_loader import load_alignment
+from tts_client import AsyncTTSClient
+from test_tts_client import MockTTSServer
+
+# MPEG 1 Layer III, 128 kbps, 44.1 kHz: 417-byte frames of 1152 samples
+FRAME = b'\xff\xfb\x90\x64' + bytes(413)
+FRAME_SECONDS = 1152 / 44100
+
+LESSON = (
+    "Risk Management Basics\n\n"
+    "Dr. Smith opened the session early. Every organization faces risk. "
+    "The course covers several techniques, e.g. avoidance and transfer.\n\n"
+    "The main treatment options include:\n"
+    "Avoidance of the activity\n"
+    "Loss prevention and reduction\n"
+    "Transfer through insurance\n\n"
+    "As the manual puts it, \"Identify the exposure first. Then measure it. Only then treat it.\" "
+    "Visit https://example.com/risk.html for more. Each step builds on the last one.\n\n"
+    "Finally, review the program every year. Thank you for listening."
+)
+
+
+def mp3(frames: int, tag: bool = True) -> bytes:
+    """A fake MP3: optional ID3v2 tag, an Info header frame, then audio frames"""
+    id3 = b'ID3\x04\x00\x00\x00\x00\x00\x05' + bytes(5) if tag else b''
+    info = b'\xff\xfb\x90\x64' + bytes(32) + b'Info' + bytes(377)
+    return id3 + info + FRAME * frames
+
+
+def speech_audio(text: str) -> bytes:
+    # Enough frames to cover the mock's 300ms per word
+    return mp3(math.ceil(len(text.split()) * 0.3 / FRAME_SECONDS))
+
+
+def test_split_respects_structures():
+    spans = split_for_synthesis(LESSON, max_chars=120)
+    chunks = [LESSON[start:end] for start, end in spans]
+
+    # Chunks cover the text in order; only whitespace falls between them
+    assert spans[0][0] == 0 and spans[-1][1] == len(LESSON)
+    assert all(LESSON[a_end:b_start].isspace() for (_, a_end), (b_start, _) in zip(spans, spans[1:]))
+    assert all(chunk == chunk.strip() for chunk in chunks)
+
+    # The list stays with its introduction, the quotation and abbreviations are never cut
+    list_text = LESSON[LESSON.index('The main'):LESSON.index('insurance\n\n') + len('insurance')]
+    assert any(list_text in chunk for chunk in chunks)
+    assert any('"Identify the exposure first. Then measure it. Only then treat it."' in chunk for chunk in chunks)
+    assert not any(chunk.endswith(('Dr.', 'e.g.')) for chunk in chunks)
+    assert all(len(chunk) <= 120 for chunk in chunks)
+
+    assert split_for_synthesis(LESSON, max_chars=10_000) == [(0, len(LESSON))]
+
+
+def test_concatenate_mp3_drops_headers():
+    joined, durations = concatenate_mp3([mp3(10), mp3(5, tag=False), b'not audio'])
+    assert durations[:2] == [10 * FRAME_SECONDS, 5 * FRAME_SECONDS] and durations[2] is None
+    assert joined == FRAME * 15 + b'not audio'
+    assert len(list(mp3_frames(joined))) == 15
+
+
+def test_stitch_offsets_speech_marks():
+    text = "First chunk here.  Second one."
+    spans = [(0, 17), (19, 30)]
+    responses = [
+        {'audio_data': '', 'speech_marks': [{'type': 'word', 'value': 'First', 'start': 0, 'end': 5,
+                                             'time': 0, 'end_time': 400}]},
+        {'audio_data': '', 'speech_marks': [{'type': 'word', 'value': 'Second', 'start': 0, 'end': 6,
+                                             'time': 100, 'end_time': 500}]},
+    ]
+    result = stitch_responses(text, spans, responses)
+
+    assert ''.join(result.characters) == text
+    assert result.speech_marks[1]['start'] == 19 and result.speech_marks[1]['end'] == 25
+    # Without parseable audio, the first chunk lasts until its last timed character
+    second = result.start_times[19]
+    assert second == result.end_times[16] + 0.1
+    assert result.start_times == sorted(result.start_times)
+
+
+def test_long_text_end_to_end(tmp_path):
+    with MockTTSServer(audio=speech_audio) as server:
+        client = AsyncTTSClient('test-key', base_url=server.url, rate=1000, cache_dir=str(tmp_path / 'cache'))
+        result = asyncio.run(synthesize_long_text(client, LESSON, max_chars=150))
+        requests = len(server.payloads)
+
+        # Re-running only hits the cache
+        asyncio.run(synthesize_long_text(client, LESSON, max_chars=150))
+        assert len(server.payloads) == requests == len(result.spans) > 1
+
+    # One continuous recording
+    frames_per_chunk = [math.ceil(len(LESSON[s:e].split()) * 0.3 / FRAME_SECONDS) for s, e in result.spans]
+    assert len(list(mp3_frames(result.audio))) == sum(frames_per_chunk)
+
+    # Every word mark points at its word in the original text, in time order
+    assert [m['value'] for m in result.speech_marks] == LESSON.split()
+    assert all(LESSON[m['start']:m['end']] == m['value'] for m in result.speech_marks)
+    times = [m['time'] for m in result.speech_marks]
+    assert times == sorted(times)
+
+    # The second chunk starts after the first chunk's audio
+    second_start = result.spans[1][0]
+    assert result.start_times[second_start] >= frames_per_chunk[0] * FRAME_SECONDS - 1e-9
+
+    # The stitched alignment loads like an ElevenLabs response
+    path = tmp_path / 'alignment.json'
+    path.write_text(json.dumps(result.elevenlabs_response(include_audio=False)))
+    alignment = load_alignment(str(path))
+    assert alignment.characters == LESSON
+    assert list(alignment.end_times) == result.end_times
+
+
+if __name__ == '__main__':
+    import tempfile
+    test_split_respects_structures()
+    test_concatenate_mp3_drops_headers()
+    test_stitch_offsets_speech_marks()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_long_text_end_to_end(Path(tmp))
+    print("✅ All chunked synthesis tests passed")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for course download bundles and their publication by the bulk uploader
+"""
+
+import hashlib
+import io
+import json
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from course_bundle import (build_bundle, course_bundle_entries, read_bundle_index, read_bundle_entry,
+                           BUNDLE_HEADER, COMPRESSION_NONE, COMPRESSION_ZLIB, MANIFEST_ENTRY)
+from bulk_upload import load_course_manifest, run_upload, STORAGE_BUCKET, COURSES_TABLE, BUNDLE_COLUMN
+from supabase_rest import SupabaseRestClient
+from supabase_stand_in import SupabaseStandIn, API_KEY
+from test_bulk_upload import write_course
+
+BUNDLE_OBJECT = 'courses/test/course-1.bundle'
+
+
+def test_bundle_round_trip(tmp_path):
+    lessons = load_course_manifest(str(write_course(tmp_path, 3)))
+    summary = build_bundle(course_bundle_entries(lessons, 'course-1'), str(tmp_path / 'course.bundle'))
+    data = (tmp_path / 'course.bundle').read_bytes()
+    assert summary['size_bytes'] == len(data) and summary['sha256'] == hashlib.sha256(data).hexdigest()
+
+    entries = read_bundle_index(str(tmp_path / 'course.bundle'))
+    names = [entry.name for entry in entries]
+    lesson_0 = '00000000-0000-0000-0000-000000000000'
+    assert names[0] == MANIFEST_ENTRY and len(names) == summary['entry_count'] == 1 + 3 * 3
+    assert f'{lesson_0}/lookup.bin' in names and f'{lesson_0}/lookup.json' not in names
+
+    manifest = json.loads(read_bundle_entry(str(tmp_path / 'course.bundle'), entries[0]))
+    assert manifest['courseId'] == 'course-1'
+    assert [lesson['title'] for lesson in manifest['lessons']] == ['Lesson 0', 'Lesson 1', 'Lesson 2']
+    assert set(manifest['lessons'][1]['files']) == {'content', 'audio', 'lookup'}
+
+    sources = dict(course_bundle_entries(lessons, 'course-1')[1:])
+    by_name = {entry.name: entry for entry in entries}
+    for name, source in sources.items():
+        entry = by_name[name]
+        original = Path(source).read_bytes()
+        assert read_bundle_entry(str(tmp_path / 'course.bundle'), entry) == original
+        # Payloads can be sliced (or range-requested) straight out of the file
+        assert entry.offset % 8 == 0 and entry.offset >= BUNDLE_HEADER.size
+        if entry.compression == COMPRESSION_NONE:
+            assert data[entry.offset:entry.offset + entry.length] == original
+    assert by_name[f'{lesson_0}/audio.mp3'].compression == COMPRESSION_NONE
+    content = by_name[f'{lesson_0}/content.json']
+    assert content.compression == COMPRESSION_ZLIB and content.stored_length < content.length
+
+    # Same inputs, same bytes (so re-publishing can skip an unchanged bundle)
+    again = build_bundle(course_bundle_entries(lessons, 'course-1'), str(tmp_path / 'again.bundle'))
+    assert again['sha256'] == summary['sha256']
+    uncompressed = build_bundle(course_bundle_entries(lessons, 'course-1'), str(tmp_path / 'raw.bundle'),
+                                compress=False)
+    assert uncompressed['size_bytes'] > summary['size_bytes']
+
+
+def test_corrupt_entries_are_rejected(tmp_path):
+    path = tmp_path / 'small.bundle'
+    build_bundle([('a.txt', b'hello ' * 100), ('b.mp3', b'\xff\xfb' * 50)], str(path))
+    entries = read_bundle_index(str(path))
+    data = bytearray(path.read_bytes())
+    data[entries[1].offset + 3] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    assert read_bundle_entry(str(path), entries[0]) == b'hello ' * 100
+    with pytest.raises(ValueError):
+        read_bundle_entry(str(path), entries[1])
+    with pytest.raises(ValueError):
+        build_bundle([('a', b'1'), ('a', b'2')], str(tmp_path / 'dup.bundle'))
+    (tmp_path / 'not.bundle').write_bytes(b'PK\x03\x04' + bytes(40))
+    with pytest.raises(ValueError):
+        read_bundle_index(str(tmp_path / 'not.bundle'))
+
+
+def test_upload_publishes_and_records_bundle(tmp_path):
+    manifest_path = write_course(tmp_path, 2)
+    bundle_path = str(tmp_path / 'course.bundle')
+    with SupabaseStandIn() as server:
+        server.tables[COURSES_TABLE] = {'course-1': {'id': 'course-1', 'title': 'Test course'}}
+        with redirect_stdout(io.StringIO()):
+            report = run_upload(str(manifest_path), SupabaseRestClient(server.url, API_KEY), workers=2,
+                                bundle_path=bundle_path)
+
+        record = server.tables[COURSES_TABLE]['course-1'][BUNDLE_COLUMN]
+        published = server.objects[(STORAGE_BUCKET, BUNDLE_OBJECT)]['data']
+        assert published == Path(bundle_path).read_bytes()
+        assert record['sha256'] == hashlib.sha256(published).hexdigest()
+        assert record['sizeBytes'] == len(published) and record['lessonCount'] == 2
+        assert record['url'] == f"{server.url}/storage/v1/object/public/{STORAGE_BUCKET}/{BUNDLE_OBJECT}"
+        assert report['bundle']['recorded'] and not report['bundle']['skipped']
+
+        # Nothing changed: the bundle is neither uploaded nor recorded again
+        uploads = len(server.requests_to('POST', f'/storage/v1/object/{STORAGE_BUCKET}/{BUNDLE_OBJECT}'))
+        with redirect_stdout(io.StringIO()):
+            report = run_upload(str(manifest_path), SupabaseRestClient(server.url, API_KEY), bundle_path=bundle_path)
+        assert report['bundle']['skipped']
+        assert len(server.requests_to('POST', f'/storage/v1/object/{STORAGE_BUCKET}/{BUNDLE_OBJECT}')) == uploads
+        assert len(server.requests_to('PATCH', f'/rest/v1/{COURSES_TABLE}')) == 1
+
+
+def test_bundle_for_unknown_course_is_not_recorded(tmp_path):
+    manifest_path = write_course(tmp_path, 1)
+    with SupabaseStandIn() as server:
+        with redirect_stdout(io.StringIO()):
+            report = run_upload(str(manifest_path), SupabaseRestClient(server.url, API_KEY),
+                                bundle_path=str(tmp_path / 'course.bundle'))
+        assert (STORAGE_BUCKET, BUNDLE_OBJECT) in server.objects
+        assert report['bundle']['recorded'] is False
+        assert server.requests_to('PATCH', f'/rest/v1/{COURSES_TABLE}') == []
+
+
+if __name__ == '__main__':
+    import tempfile
+    for test in (test_bundle_round_trip, test_corrupt_entries_are_rejected,
+                 test_upload_publishes_and_records_bundle, test_bundle_for_unknown_course_is_not_recorded):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("✅ All course bundle tests passed")
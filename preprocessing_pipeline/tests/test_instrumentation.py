@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for per-stage instrumentation and the quiet-by-default pipeline logger
+"""
+
+import pstats
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from instrumentation import Instrumentation, configure_logging, read_jsonl
+from process_elevenlabs_complete_with_paragraphs import ElevenLabsCompleteProcessorWithParagraphs
+from benchmark_pipeline import STAGES
+
+LESSON = Path(__file__).parent / 'test_content' / 'The Vital Role of Risk Management and Insurance'
+ALIGNMENT = LESSON / 'The Vital Role of Risk Management and Insurance.json'
+
+
+def test_stage_records_time_and_counts(tmp_path):
+    instrumentation = Instrumentation('lesson')
+    with instrumentation.stage('build') as stage:
+        items = [str(i) for i in range(1000)]
+        stage.count(items=len(items))
+    with instrumentation.stage('empty'):
+        pass
+
+    first, second = instrumentation.report()
+    assert first['stage'] == 'build' and first['label'] == 'lesson'
+    assert first['counts'] == {'items': 1000}
+    assert first['wall_seconds'] >= 0 and first['cpu_seconds'] >= 0
+    assert 'allocated_mb' not in first and 'profile' not in first
+    assert second['counts'] == {}
+
+    path = tmp_path / 'timings.jsonl'
+    instrumentation.write_jsonl(str(path))
+    instrumentation.write_jsonl(str(path))
+    assert read_jsonl(str(path)) == instrumentation.report() * 2
+
+
+def test_stage_recorded_when_block_raises():
+    instrumentation = Instrumentation()
+    try:
+        with instrumentation.stage('failing'):
+            raise ValueError('boom')
+    except ValueError:
+        pass
+    assert [r.stage for r in instrumentation.records] == ['failing']
+
+
+def test_memory_and_profile_per_stage(tmp_path):
+    instrumentation = Instrumentation('a lesson/with path', trace_memory=True, profile_dir=str(tmp_path))
+    with instrumentation.stage('allocate'):
+        data = [bytes(1000) for _ in range(2000)]
+    instrumentation.close()
+
+    record = instrumentation.report()[0]
+    assert record['allocated_mb'] >= 2.0
+    assert record['retained_mb'] >= 2.0
+    assert Path(record['profile']).parent == tmp_path
+    assert pstats.Stats(record['profile']).total_calls > 0
+    del data
+
+
+def test_processor_records_every_stage_and_is_quiet(capsys):
+    instrumentation = Instrumentation(ALIGNMENT.stem)
+    processor = ElevenLabsCompleteProcessorWithParagraphs(
+        str(ALIGNMENT), str(ALIGNMENT.with_suffix('.md')), instrumentation=instrumentation)
+    content = processor.process()
+
+    assert capsys.readouterr().out == ''
+    records = {r['stage']: r for r in instrumentation.report()}
+    assert list(records) == STAGES
+    assert records['word_extraction']['counts']['words'] == content['metadata']['word_count']
+    assert records['sentence_detection']['counts']['sentences'] == len(content['timing']['sentences'])
+
+
+def test_configure_logging_restores_progress_output(capsys):
+    try:
+        configure_logging(verbose=True)
+        configure_logging(verbose=True)  # no duplicate handlers
+        ElevenLabsCompleteProcessorWithParagraphs(str(ALIGNMENT)).load_alignment()
+        out = capsys.readouterr().out
+        assert out.count('📊 Loaded ElevenLabs data:') == 1
+    finally:
+        configure_logging(verbose=False)
+
+
+if __name__ == '__main__':
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Test the binary (_lookup.bin) lookup table artifact"""
+
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from lookup_table import (
+    encode_intervals, encode_binary_lookup, decode_binary_lookup, write_binary_lookup,
+    BINARY_HEADER, FLAG_WIDE_SENTENCE_INDEX
+)
+from bulk_upload import read_lookup_binary
+
+
+def test_binary_round_trip(tmp_path):
+    """Header fields and interval arrays survive a write/read cycle"""
+    lookup = [[0, 0], [0, 0], [1, 0], [2, 1], [2, 1], [-1, -1]]
+    intervals = encode_intervals(lookup, 10)
+
+    path = tmp_path / 'lesson_lookup.bin'
+    size = write_binary_lookup(str(path), intervals, 10, 55, 3, 2)
+    data = path.read_bytes()
+
+    assert size == len(data) == BINARY_HEADER.size + len(intervals['start_ms']) * 10
+    decoded = decode_binary_lookup(data)
+    assert decoded['interval'] == 10
+    assert decoded['totalDurationMs'] == 55
+    assert decoded['word_count'] == 3
+    assert decoded['sentence_count'] == 2
+    assert decoded['intervals'] == intervals
+
+
+def test_layout_is_little_endian_and_aligned():
+    """int32 arrays start on a 4-byte boundary in little-endian order"""
+    intervals = {'start_ms': [0, 300], 'word_index': [0, 1], 'sentence_index': [0, 0]}
+    data = encode_binary_lookup(intervals, 10, 600, 2, 1)
+
+    assert data[:4] == b'ALUT'
+    assert BINARY_HEADER.size % 4 == 0
+    assert struct.unpack_from('<2i', data, BINARY_HEADER.size) == (0, 300)
+
+
+def test_wide_sentence_indices():
+    """Sentence indices beyond int16 switch to int32 storage"""
+    intervals = {'start_ms': [0, 10], 'word_index': [0, 40000], 'sentence_index': [0, 40000]}
+    data = encode_binary_lookup(intervals, 10, 20, 40001, 40001)
+
+    flags = BINARY_HEADER.unpack_from(data, 0)[2]
+    assert flags & FLAG_WIDE_SENTENCE_INDEX
+    assert decode_binary_lookup(data)['intervals'] == intervals
+
+
+def test_truncated_data_is_rejected(tmp_path):
+    """A table shorter than its header says raises instead of decoding short columns"""
+    intervals = {'start_ms': [0, 100, 200, 300], 'word_index': [0, 1, 2, 3], 'sentence_index': [0, 0, 1, 1]}
+    data = encode_binary_lookup(intervals, 10, 400, 4, 2)
+
+    for damaged in (data[:-8], data[:-1], data[:BINARY_HEADER.size], data[:10]):
+        with pytest.raises(ValueError, match='Truncated'):
+            decode_binary_lookup(damaged)
+
+    # The uploaders read tables through read_lookup_binary, which must refuse to publish them
+    path = tmp_path / 'lesson_lookup.bin'
+    path.write_bytes(data[:-8])
+    with pytest.raises(ValueError, match='Truncated'):
+        read_lookup_binary(str(path))
+
+
+if __name__ == '__main__':
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        test_binary_round_trip(Path(tmp))
+        test_truncated_data_is_rejected(Path(tmp))
+    test_layout_is_little_endian_and_aligned()
+    test_wide_sentence_indices()
+    print("✅ All binary lookup tests passed!")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Test the interval (version 2.0) lookup encoding against the legacy 10ms table"""
+
+import io
+import random
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from lookup_table import encode_intervals, decode_intervals, find_interval, lookup_intervals, sample_lookup, active_ticks
+from process_elevenlabs_complete_with_paragraphs import ElevenLabsCompleteProcessorWithParagraphs
+
+LESSON_DIR = Path(__file__).parent / 'test_content' / 'The Vital Role of Risk Management and Insurance'
+
+
+def test_encode_round_trip():
+    """Intervals expand back to the exact per-tick table"""
+    lookup = [[-1, -1], [0, 0], [0, 0], [1, 0], [1, 0], [1, 0], [2, 1], [-1, -1]]
+    intervals = encode_intervals(lookup, 10)
+
+    assert intervals['start_ms'] == [0, 10, 30, 60, 70]
+    assert decode_intervals(intervals, 10, len(lookup)) == lookup
+
+
+def test_binary_search_contract():
+    """find_interval(t) matches lookup[t // interval] between ticks too"""
+    lookup = [[0, 0], [0, 0], [1, 0], [2, 1], [2, 1]]
+    intervals = encode_intervals(lookup, 10)
+
+    for t in range(0, 50):
+        assert find_interval(intervals, t) == tuple(lookup[t // 10])
+    assert find_interval(intervals, -5) == (-1, -1)
+
+
+def test_intervals_match_lesson_lookup():
+    """Interval lookup agrees with the legacy table on a real lesson"""
+    alignment = LESSON_DIR / 'The Vital Role of Risk Management and Insurance.json'
+    with redirect_stdout(io.StringIO()):
+        processor = ElevenLabsCompleteProcessorWithParagraphs(str(alignment), str(alignment.with_suffix('.md')))
+        content = processor.process()
+
+    lookup = content['timing']['lookup_table']
+    intervals = encode_intervals(lookup, 10)
+
+    assert len(intervals['start_ms']) < len(lookup) // 10
+    for t in range(0, content['timing']['total_duration_ms'] + 1, 7):
+        assert find_interval(intervals, t) == tuple(lookup[t // 10])
+    assert content['timing']['lookup_intervals'] == intervals
+
+
+def test_intervals_from_word_times_match_sampling():
+    """lookup_intervals() equals run-length encoding the sampled table, under both activity rules"""
+    rng = random.Random(9)
+    for _ in range(3000):
+        words = []
+        start = rng.randint(-20, 30)
+        for _ in range(rng.randint(0, 8)):
+            # Mostly ordered, with gaps, overlaps, zero-length and out-of-order words
+            start += rng.randint(-10, 0) if rng.random() < 0.1 else rng.randint(0, 40)
+            words.append({'start_ms': start, 'end_ms': start + rng.randint(-15, 60),
+                          'sentence_index': rng.randint(0, 3)})
+        num_entries, interval_ms = rng.randint(0, 40), rng.choice([1, 5, 10])
+        for end_inclusive in (True, False):
+            lookup = sample_lookup(words, num_entries, interval_ms, end_inclusive, use_numpy=False)
+            intervals = lookup_intervals(words, num_entries, interval_ms, end_inclusive)
+            assert intervals == encode_intervals(lookup, interval_ms), (words, num_entries, interval_ms)
+            assert active_ticks(intervals, interval_ms, num_entries) == sum(1 for w, _ in lookup if w >= 0)
+
+
+def test_legacy_table_is_optional():
+    """Without the legacy table only the intervals are built, and they are unchanged"""
+    alignment = LESSON_DIR / 'The Vital Role of Risk Management and Insurance.json'
+    with redirect_stdout(io.StringIO()):
+        full = ElevenLabsCompleteProcessorWithParagraphs(str(alignment), str(alignment.with_suffix('.md'))).process()
+        compact = ElevenLabsCompleteProcessorWithParagraphs(
+            str(alignment), str(alignment.with_suffix('.md')), {'output': {'include_legacy_lookup': False}}).process()
+
+    assert 'lookup_table' not in compact['timing']
+    assert compact['timing']['lookup_intervals'] == full['timing']['lookup_intervals']
+
+
+if __name__ == '__main__':
+    test_encode_round_trip()
+    test_binary_search_contract()
+    test_intervals_match_lesson_lookup()
+    test_intervals_from_word_times_match_sampling()
+    test_legacy_table_is_optional()
+    print("✅ All interval lookup tests passed!")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Test that the NumPy lookup engine matches the pure-Python fallback exactly"""
+
+import io
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from lookup_table import sample_lookup
+
+np = pytest.importorskip('numpy')
+
+TEST_CONTENT = Path(__file__).parent / 'test_content'
+
+
+def _lesson_words(processor_name: str):
+    """Process a real lesson and return its gap-free words"""
+    alignment = TEST_CONTENT / 'Risk Management and Insurance in Action.json'
+    with redirect_stdout(io.StringIO()):
+        if processor_name == 'paragraphs':
+            from process_elevenlabs_complete_with_paragraphs import ElevenLabsCompleteProcessorWithParagraphs
+            processor = ElevenLabsCompleteProcessorWithParagraphs(str(alignment), str(alignment.with_suffix('.md')))
+        else:
+            from process_elevenlabs_complete import ElevenLabsCompleteProcessor
+            processor = ElevenLabsCompleteProcessor(str(alignment))
+        content = processor.process()
+    return content['timing']['words'], content['timing']['total_duration_ms']
+
+
+@pytest.mark.parametrize('processor_name,end_inclusive', [('complete', True), ('paragraphs', False)])
+def test_lesson_tables_identical(processor_name, end_inclusive):
+    """Both engines produce the same table for a full lesson"""
+    words, total_duration_ms = _lesson_words(processor_name)
+    num_entries = total_duration_ms // 10 + 2
+
+    vectorized = sample_lookup(words, num_entries, 10, end_inclusive, use_numpy=True)
+    fallback = sample_lookup(words, num_entries, 10, end_inclusive, use_numpy=False)
+    assert vectorized == fallback
+
+
+@pytest.mark.parametrize('end_inclusive', [True, False])
+def test_gaps_and_edges_identical(end_inclusive):
+    """Leading silence, gaps, zero-length words and trailing ticks match"""
+    words = [
+        {'word': 'a', 'start_ms': 25, 'end_ms': 60, 'sentence_index': 0},
+        {'word': 'b', 'start_ms': 60, 'end_ms': 60, 'sentence_index': 0},
+        {'word': 'c', 'start_ms': 60, 'end_ms': 95, 'sentence_index': 0},
+        {'word': 'd', 'start_ms': 140, 'end_ms': 200, 'sentence_index': 1},
+        {'word': 'e', 'start_ms': 200, 'end_ms': 230, 'sentence_index': 1},
+    ]
+    vectorized = sample_lookup(words, 30, 10, end_inclusive, use_numpy=True)
+    fallback = sample_lookup(words, 30, 10, end_inclusive, use_numpy=False)
+    assert vectorized == fallback
+    assert vectorized[0] == [-1, -1]
+
+
+@pytest.mark.parametrize('end_inclusive', [True, False])
+def test_unordered_words_fall_back(end_inclusive):
+    """Unsorted or overlapping words still yield the fallback's answer"""
+    words = [
+        {'word': 'a', 'start_ms': 0, 'end_ms': 80, 'sentence_index': 0},
+        {'word': 'b', 'start_ms': 50, 'end_ms': 120, 'sentence_index': 0},
+        {'word': 'c', 'start_ms': 40, 'end_ms': 150, 'sentence_index': 1},
+    ]
+    vectorized = sample_lookup(words, 20, 10, end_inclusive, use_numpy=True)
+    fallback = sample_lookup(words, 20, 10, end_inclusive, use_numpy=False)
+    assert vectorized == fallback
+
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for aligning original paragraphs to the narrated text
+"""
+
+import io
+import itertools
+import random
+import re
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from batch_process import discover_lessons
+from benchmark_paragraph_alignment import generate_lesson
+from paragraph_alignment import align_tokens, display_offsets, paragraph_breaks, tokenize
+from process_elevenlabs_complete_with_paragraphs import ElevenLabsCompleteProcessorWithParagraphs
+
+TEST_CONTENT = Path(__file__).parent / 'test_content'
+
+
+def words(text):
+    return re.findall(r'\w+', text.lower())
+
+
+def test_lessons_keep_original_paragraphs():
+    for lesson in discover_lessons(str(TEST_CONTENT)):
+        with redirect_stdout(io.StringIO()):
+            processor = ElevenLabsCompleteProcessorWithParagraphs(lesson.alignment_path, lesson.original_path)
+        full_text, paragraphs, break_positions = processor.reconstruct_text_with_paragraphs()
+        assert [words(p) for p in paragraphs] == [words(p) for p in processor.original_paragraphs]
+        assert full_text == '\n\n'.join(paragraphs)
+
+        raw_text = ''.join(processor.characters)
+        assert len(break_positions) == len(paragraphs) - 1
+        assert all(raw_text.startswith(p, i) for i, p in zip(break_positions, paragraphs[1:]))
+
+
+def test_noisy_narration():
+    # Without noise every break is exact
+    paragraphs, text, truth = generate_lesson(5000, noise=0)
+    assert paragraph_breaks(text, paragraphs) == truth
+
+    paragraphs, text, truth = generate_lesson(5000, noise=0.05)
+    breaks = paragraph_breaks(text, paragraphs)
+    assert breaks == sorted(set(breaks))
+    assert all(text[i - 1].isspace() and not text[i].isspace() for i in breaks)
+    assert len(set(breaks) & set(truth)) >= 0.9 * len(truth)
+
+
+def test_repeated_and_unmatched_text():
+    # No unique trigrams or tokens: the banded DP still aligns in order
+    text = 'la la la. la la la. la la la.'
+    assert paragraph_breaks(text, ['la la la.', 'la la la.', 'la la la.']) == [10, 20]
+
+    # A paragraph that was not narrated merges into its neighbours
+    text = 'First part here. Third part here.'
+    assert paragraph_breaks(text, ['First part here.', 'Skipped table', 'Third part here.']) == [17]
+    assert paragraph_breaks(text, []) == [] and paragraph_breaks('', ['Anything']) == []
+
+    mapping = align_tokens(tokenize('a b x c d')[0], tokenize('a b c y d')[0])
+    assert mapping == [0, 1, None, 2, 4]
+
+
+def test_repetitive_text_beyond_the_dp_budget():
+    # 20000 words from a 5-word vocabulary: no unique trigrams, far too long for the DP
+    rng = random.Random(3)
+    vocabulary = [f'w{i}' for i in range(5)]
+    paragraphs = [' '.join(rng.choices(vocabulary, k=rng.randint(20, 80))) + '.' for _ in range(400)]
+    truth = list(itertools.accumulate(len(p) + 1 for p in paragraphs[:-1]))
+    assert paragraph_breaks(' '.join(paragraphs), paragraphs) == truth
+
+    # Near-identical: a few substituted words
+    words = ' '.join(paragraphs).split(' ')
+    for i in rng.sample(range(len(words)), 40):
+        words[i] = 'zz' + ('.' if words[i].endswith('.') else '')
+    text = ' '.join(words)
+    counts = list(itertools.accumulate(len(p.split(' ')) for p in paragraphs[:-1]))
+    truth = [len(' '.join(words[:count])) + 1 for count in counts]
+    assert paragraph_breaks(text, paragraphs) == truth
+
+
+def test_word_offsets_index_display_text():
+    for lesson in discover_lessons(str(TEST_CONTENT)):
+        with redirect_stdout(io.StringIO()):
+            processor = ElevenLabsCompleteProcessorWithParagraphs(lesson.alignment_path, lesson.original_path)
+        full_text, _, _ = processor.reconstruct_text_with_paragraphs()
+        track = processor.extract_words_with_timing_and_paragraphs(full_text)
+        assert processor.offset_mismatches == 0
+        assert [full_text[s:e] for s, e in zip(track.char_start, track.char_end)] == \
+            [track.word(i) for i in range(len(track))]
+        assert all(e <= s for e, s in zip(track.char_end, track.char_start[1:]))
+
+    # Dropped whitespace maps to the next kept character; inserted breaks are skipped
+    assert display_offsets('  ab cd ', 'ab\n\ncd') == [0, 0, 0, 1, 2, 4, 5, 6]
+    assert display_offsets('ab\ncd', 'ab\n\ncd') == [0, 1, 2, 4, 5]
+
+
+if __name__ == '__main__':
+    test_lessons_keep_original_paragraphs()
+    test_noisy_narration()
+    test_repeated_and_unmatched_text()
+    test_repetitive_text_beyond_the_dp_budget()
+    test_word_offsets_index_display_text()
+    print("✅ All paragraph alignment tests passed")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for minified and precompressed outputs and their upload with Content-Encoding
+"""
+
+import gzip
+import io
+import json
+import sys
+import urllib.request
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from precompress import resolve_codecs, write_variants, CODECS
+from benchmark_compression import benchmark_artifact
+from build_cache import BuildCache
+from bulk_upload import run_upload, STORAGE_BUCKET, TABLE
+from process_elevenlabs_complete_with_paragraphs import ElevenLabsCompleteProcessorWithParagraphs, PROCESSOR_VERSION
+from supabase_rest import SupabaseRestClient
+from supabase_stand_in import SupabaseStandIn, API_KEY
+from test_bulk_upload import ALIGNMENT, write_course
+
+LOOKUP_OBJECT = 'courses/test/00000000-0000-0000-0000-000000000000_lookup.bin'
+
+
+def save(tmp_path: Path, name: str, config=None, cache=None) -> Path:
+    processor = ElevenLabsCompleteProcessorWithParagraphs(str(ALIGNMENT), str(ALIGNMENT.with_suffix('.md')),
+                                                          config, cache)
+    with redirect_stdout(io.StringIO()):
+        processor.save(processor.process(), str(tmp_path / f'{name}.json'))
+    return tmp_path / f'{name}.json'
+
+
+def test_minified_and_precompressed_outputs(tmp_path):
+    plain = save(tmp_path, 'plain')
+    assert not list(tmp_path.glob('*.gz'))
+
+    config = {'output': {'minify': True, 'precompress': ['gzip']}}
+    packed = save(tmp_path, 'packed', config)
+    for suffix in ('.json', '_lookup.json', '_lookup.bin'):
+        plain_file = Path(str(plain).replace('.json', suffix))
+        packed_file = Path(str(packed).replace('.json', suffix))
+        variant = gzip.decompress(Path(str(packed_file) + '.gz').read_bytes())
+        assert variant == packed_file.read_bytes()
+        if suffix == '_lookup.bin':
+            assert packed_file.read_bytes() == plain_file.read_bytes()
+        else:
+            # Same data, fewer bytes
+            assert json.loads(packed_file.read_bytes()) == json.loads(plain_file.read_bytes())
+            assert packed_file.stat().st_size < plain_file.stat().st_size
+            assert b'\n' not in packed_file.read_bytes()
+
+    # Variants are part of the cached outputs: a missing one is written again
+    cache = BuildCache(PROCESSOR_VERSION, str(tmp_path / 'cache'))
+    cached = save(tmp_path, 'cached', config, cache)
+    variant = Path(str(cached) + '.gz')
+    variant.unlink()
+    save(tmp_path, 'cached', config, BuildCache(PROCESSOR_VERSION, str(tmp_path / 'cache')))
+    assert variant.exists()
+
+
+def test_codecs_are_validated(monkeypatch):
+    with pytest.raises(ValueError, match='Unknown codec'):
+        resolve_codecs(['lzma'])
+    monkeypatch.delitem(CODECS, 'br', raising=False)
+    with pytest.raises(ValueError, match='pip install brotli'):
+        resolve_codecs(['gzip', 'br'])
+    assert [codec.name for codec in resolve_codecs(['gzip'])] == ['gzip']
+
+
+def test_benchmark_round_trips_every_codec():
+    data = json.dumps({'lookup': [[i // 7, i // 50] for i in range(2000)]}).encode('utf-8')
+    results = benchmark_artifact(data, repeats=1)
+    assert {r['codec'] for r in results} == set(CODECS)
+    assert all(r['bytes'] < len(data) and r['ratio'] > 1 for r in results)
+
+
+def test_upload_with_content_encoding(tmp_path):
+    manifest_path = write_course(tmp_path, 2)
+    lookup_bin = tmp_path / 'lesson_enhanced_lookup.bin'
+    write_variants(str(lookup_bin), lookup_bin.read_bytes(), resolve_codecs(['gzip']))
+    with SupabaseStandIn() as server:
+        with redirect_stdout(io.StringIO()):
+            run_upload(str(manifest_path), SupabaseRestClient(server.url, API_KEY), content_encoding='gzip')
+
+        stored = server.objects[(STORAGE_BUCKET, LOOKUP_OBJECT)]
+        assert stored['headers']['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(stored['data']) == lookup_bin.read_bytes()
+        reference = server.tables[TABLE]['00000000-0000-0000-0000-000000000000']['words']['lookupTableBinary']
+        assert reference['contentEncoding'] == 'gzip' and reference['sizeBytes'] == lookup_bin.stat().st_size
+
+        # Served precompressed, with the header a client needs to decode it
+        with urllib.request.urlopen(reference['url']) as response:
+            assert response.headers['Content-Encoding'] == 'gzip'
+            assert gzip.decompress(response.read()) == lookup_bin.read_bytes()
+
+        # Switching back to plain uploads replaces the object even though the table is unchanged
+        with redirect_stdout(io.StringIO()):
+            run_upload(str(manifest_path), SupabaseRestClient(server.url, API_KEY))
+        stored = server.objects[(STORAGE_BUCKET, LOOKUP_OBJECT)]
+        assert stored['data'] == lookup_bin.read_bytes() and 'Content-Encoding' not in stored['headers']
+
+
+if __name__ == '__main__':
+    import tempfile
+    test_benchmark_round_trips_every_codec()
+    for test in (test_minified_and_precompressed_outputs, test_upload_with_content_encoding):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("✅ All precompression tests passed")
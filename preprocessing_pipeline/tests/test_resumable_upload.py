@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Tests for resumable chunked Storage uploads against a local Supabase stand-in
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from resumable_upload import ResumableUploader, UploadState
+from supabase_rest import SupabaseRestClient, SupabaseError
+from bulk_upload import BulkUploader, load_course_manifest
+from supabase_stand_in import SupabaseStandIn, API_KEY, RESUMABLE_PATH
+from test_bulk_upload import write_course
+
+CHUNK = 64 * 1024
+
+
+def audio_file(directory: Path, size: int = 5 * CHUNK + 1000, name: str = 'book.mp3') -> Path:
+    path = directory / name
+    path.write_bytes(os.urandom(size))
+    return path
+
+
+def test_upload_in_chunks(tmp_path):
+    path = audio_file(tmp_path)
+    state_path = tmp_path / 'state.json'
+    with SupabaseStandIn() as server:
+        uploader = ResumableUploader(SupabaseRestClient(server.url, API_KEY), UploadState(str(state_path)), CHUNK)
+        url, stats = uploader.upload_file('course-audio', 'courses/test/book.mp3', str(path))
+
+        assert server.objects[('course-audio', 'courses/test/book.mp3')]['data'] == path.read_bytes()
+        assert len(server.requests_to('PATCH', RESUMABLE_PATH)) == stats['chunks'] == 6
+        assert stats['bytes_sent'] == path.stat().st_size and stats['resumed_from'] == 0
+        assert url == f"{server.url}/storage/v1/object/public/course-audio/courses/test/book.mp3"
+    # Finished uploads leave nothing to resume
+    assert json.loads(state_path.read_text()) == {}
+
+
+def test_interrupted_upload_resumes_from_saved_offset(tmp_path):
+    path = audio_file(tmp_path)
+    state_path = tmp_path / 'state.json'
+    with SupabaseStandIn() as server:
+        server.fail_patches_after = 2
+        uploader = ResumableUploader(SupabaseRestClient(server.url, API_KEY), UploadState(str(state_path)),
+                                     CHUNK, retries=0)
+        with pytest.raises(SupabaseError):
+            uploader.upload_file('course-audio', 'book.mp3', str(path))
+        entry = json.loads(state_path.read_text())['course-audio/book.mp3']
+        assert entry['offset'] == 2 * CHUNK
+
+        # A new run (fresh client and state) continues from the server's offset
+        uploader = ResumableUploader(SupabaseRestClient(server.url, API_KEY), UploadState(str(state_path)), CHUNK)
+        _, stats = uploader.upload_file('course-audio', 'book.mp3', str(path))
+
+        assert stats['resumed_from'] == 2 * CHUNK
+        assert stats['bytes_sent'] == path.stat().st_size - 2 * CHUNK
+        assert len(server.requests_to('POST', RESUMABLE_PATH)) == 1
+        assert server.objects[('course-audio', 'book.mp3')]['data'] == path.read_bytes()
+
+
+def test_failed_chunk_is_retried_within_a_run(tmp_path):
+    path = audio_file(tmp_path)
+    with SupabaseStandIn() as server:
+        server.fail_patches_after = 3
+        uploader = ResumableUploader(SupabaseRestClient(server.url, API_KEY), UploadState(str(tmp_path / 's.json')),
+                                     CHUNK, retries=2, backoff_seconds=0)
+        _, stats = uploader.upload_file('course-audio', 'book.mp3', str(path))
+
+        assert stats['retries'] == 1
+        assert stats['bytes_sent'] == path.stat().st_size
+        assert server.objects[('course-audio', 'book.mp3')]['data'] == path.read_bytes()
+
+
+def test_retry_budget_is_per_chunk(tmp_path):
+    path = audio_file(tmp_path)
+    with SupabaseStandIn() as server:
+        # Three spread-out blips, each within a one-retry budget
+        server.fail_patches_after = [1, 1, 1]
+        # The offset check after a failure can fail too; it is retried like the chunk
+        server.fail_once = ['HEAD ' + RESUMABLE_PATH]
+        uploader = ResumableUploader(SupabaseRestClient(server.url, API_KEY), UploadState(str(tmp_path / 's.json')),
+                                     CHUNK, retries=2, backoff_seconds=0)
+        _, stats = uploader.upload_file('course-audio', 'book.mp3', str(path))
+
+        assert stats['retries'] == 4
+        assert server.objects[('course-audio', 'book.mp3')]['data'] == path.read_bytes()
+
+        server.fail_patches_after = [1, 1, 1]
+        uploader = ResumableUploader(SupabaseRestClient(server.url, API_KEY), UploadState(str(tmp_path / 't.json')),
+                                     CHUNK, retries=1, backoff_seconds=0)
+        _, stats = uploader.upload_file('course-audio', 'book2.mp3', str(path))
+        assert stats['retries'] == 3
+
+
+def test_create_and_resume_are_retried(tmp_path):
+    path = audio_file(tmp_path)
+    with SupabaseStandIn() as server:
+        uploader = ResumableUploader(SupabaseRestClient(server.url, API_KEY), UploadState(str(tmp_path / 's.json')),
+                                     CHUNK, retries=3, backoff_seconds=0)
+
+        # A blip on the create is retried like a chunk
+        server.fail_once = ['POST ' + RESUMABLE_PATH]
+        _, stats = uploader.upload_file('course-audio', 'other.mp3', str(path))
+        assert stats['retries'] == 1 and stats['resumed_from'] == 0
+        assert server.objects[('course-audio', 'other.mp3')]['data'] == path.read_bytes()
+
+        # So is a blip on the first offset check of a resumed upload
+        server.fail_patches_after = 2
+        uploader.retries = 0
+        with pytest.raises(SupabaseError):
+            uploader.upload_file('course-audio', 'book.mp3', str(path))
+        uploader.retries = 3
+        server.fail_once = ['HEAD ' + RESUMABLE_PATH]
+        _, stats = uploader.upload_file('course-audio', 'book.mp3', str(path))
+        assert stats['retries'] == 1 and stats['resumed_from'] == 2 * CHUNK
+        assert server.objects[('course-audio', 'book.mp3')]['data'] == path.read_bytes()
+
+
+def test_changed_file_starts_a_new_upload(tmp_path):
+    path = audio_file(tmp_path)
+    state_path = tmp_path / 'state.json'
+    with SupabaseStandIn() as server:
+        server.fail_patches_after = 1
+        uploader = ResumableUploader(SupabaseRestClient(server.url, API_KEY), UploadState(str(state_path)),
+                                     CHUNK, retries=0)
+        with pytest.raises(SupabaseError):
+            uploader.upload_file('course-audio', 'book.mp3', str(path))
+
+        path = audio_file(tmp_path, 3 * CHUNK)
+        _, stats = uploader.upload_file('course-audio', 'book.mp3', str(path))
+        assert stats['resumed_from'] == 0
+        assert len(server.requests_to('POST', RESUMABLE_PATH)) == 2
+        assert server.objects[('course-audio', 'book.mp3')]['data'] == path.read_bytes()
+
+
+def test_parallel_files_and_bulk_uploader(tmp_path):
+    paths = [audio_file(tmp_path, CHUNK * (i + 1) - i, f'part_{i}.mp3') for i in range(4)]
+    manifest_path = write_course(tmp_path, 2)
+    with SupabaseStandIn() as server:
+        client = SupabaseRestClient(server.url, API_KEY)
+        resumable = ResumableUploader(client, UploadState(str(tmp_path / 'state.json')), CHUNK)
+        results = resumable.upload_files([('course-audio', p.name, str(p), 'audio/mpeg') for p in paths], workers=3)
+        assert [stats['chunks'] for _, stats in results] == [1, 2, 3, 4]
+        assert all(server.objects[('course-audio', p.name)]['data'] == p.read_bytes() for p in paths)
+
+        # The 64KB test audio is at the threshold, so the bulk uploader sends it in chunks
+        uploaded = BulkUploader(client, workers=2, resumable=resumable, resumable_threshold=CHUNK).upload(
+            load_course_manifest(str(manifest_path)))
+        assert all(r['status'] == 'ok' and r['verified'] for r in uploaded)
+        assert len(server.requests_to('POST', RESUMABLE_PATH)) == 4 + 2
+        assert server.objects[('course-audio', 'courses/test/lesson.mp3')]['data'] == (tmp_path / 'lesson.mp3').read_bytes()
+
+
+if __name__ == '__main__':
+    import tempfile
+    for test in (test_upload_in_chunks, test_interrupted_upload_resumes_from_saved_offset,
+                 test_failed_chunk_is_retried_within_a_run, test_retry_budget_is_per_chunk,
+                 test_create_and_resume_are_retried,
+                 test_changed_file_starts_a_new_upload, test_parallel_files_and_bulk_uploader):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("✅ All resumable upload tests passed")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Golden tests for bisect word-to-sentence assignment
+
+The bisect assignment must give exactly the sentence indices of the
+original linear scan, on every test_content lesson and on random timing.
+"""
+
+import copy
+import io
+import random
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from batch_process import discover_lessons
+from process_elevenlabs_complete import ElevenLabsCompleteProcessor
+from process_elevenlabs_complete_with_paragraphs import ElevenLabsCompleteProcessorWithParagraphs
+from sentence_coverage import close_sentence_gaps, assign_words_to_sentences, _assign_linear
+from benchmark_sentence_coverage import run_benchmark
+
+TEST_CONTENT = Path(__file__).parent / 'test_content'
+
+
+def capture_coverage_inputs(processor_class, *args):
+    """Run a processor, recording the words/sentences passed to ensure_continuous_sentence_coverage"""
+    captured = []
+
+    class Recording(processor_class):
+        def ensure_continuous_sentence_coverage(self, words, sentences):
+            captured.append((copy.deepcopy(words), copy.deepcopy(sentences)))
+            result = super().ensure_continuous_sentence_coverage(words, sentences)
+            captured.append(copy.deepcopy(result[0]))
+            return result
+
+    with redirect_stdout(io.StringIO()):
+        Recording(*args).process()
+    (words, sentences), assigned = captured
+    return words, sentences, assigned
+
+
+def linear_reference(words, sentences):
+    close_sentence_gaps(sentences)
+    _assign_linear(words, sentences)
+    return [w['sentence_index'] for w in words]
+
+
+def test_golden_test_content():
+    lessons = discover_lessons(str(TEST_CONTENT))
+    assert len(lessons) == 4
+
+    for lesson in lessons:
+        for processor_class, args in [
+            (ElevenLabsCompleteProcessorWithParagraphs, (lesson.alignment_path, lesson.original_path)),
+            (ElevenLabsCompleteProcessor, (lesson.alignment_path,)),
+        ]:
+            words, sentences, assigned = capture_coverage_inputs(processor_class, *args)
+            assert [w['sentence_index'] for w in assigned] == linear_reference(words, sentences), \
+                f"{processor_class.__name__} differs on {lesson.name}"
+
+
+def test_random_timing_matches_linear_scan():
+    rng = random.Random(3)
+    for _ in range(300):
+        words = []
+        for _ in range(rng.randint(1, 40)):
+            start = rng.randint(0, 2000)
+            words.append({'start_ms': start, 'end_ms': start + rng.randint(0, 300)})
+        sentences = []
+        for _ in range(rng.randint(1, 8)):
+            start = rng.randint(-100, 2200)
+            sentences.append({'start_ms': start, 'end_ms': start + rng.randint(-50, 500)})
+        # Mostly sorted, sometimes not, to exercise the fallback
+        if rng.random() < 0.8:
+            sentences.sort(key=lambda s: s['start_ms'])
+
+        expected_words = copy.deepcopy(words)
+        expected = linear_reference(expected_words, copy.deepcopy(sentences))
+
+        close_sentence_gaps(sentences)
+        assign_words_to_sentences(words, sentences)
+        assert [w['sentence_index'] for w in words] == expected
+
+
+def test_benchmark_reports_no_mismatches():
+    result = run_benchmark(word_count=3000)
+    assert result['mismatches'] == 0
+    assert result['sentences'] > 100
+
+
+if __name__ == '__main__':
+    test_golden_test_content()
+    test_random_timing_matches_linear_scan()
+    test_benchmark_reports_no_mismatches()
+    print("✅ All sentence coverage tests passed")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for the sorted-interval StructureIndex used by sentence detection
+"""
+
+import io
+import random
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from edge_case_handlers import EdgeCaseHandlers, StructureIndex, StructureType, TextStructure, STRUCTURE_PRECEDENCE
+from structure_oracle import multi_scan, lesson_markdown
+
+
+def make_structure(structure_type: StructureType, start: int, end: int) -> TextStructure:
+    return TextStructure(type=structure_type, start_pos=start, end_pos=end, content='')
+
+
+def test_later_structure_wins_overlap():
+    numbered = make_structure(StructureType.NUMBERED_LIST, 0, 20)
+    quotation = make_structure(StructureType.QUOTATION, 5, 10)
+    index = StructureIndex([numbered, quotation])
+
+    assert index.find(4) is numbered
+    assert index.find(5) is quotation
+    assert index.find(9) is quotation
+    assert index.find(10) is numbered
+    assert index.find(20) is None
+    assert index.find(-1) is None
+    assert [(start, end) for start, end, _ in index.segments()] == [(0, 5), (5, 10), (10, 20)]
+
+
+def test_matches_per_character_map():
+    rng = random.Random(11)
+    types = list(StructureType)
+    for _ in range(500):
+        structures = []
+        for _ in range(rng.randint(0, 10)):
+            start = rng.randint(0, 50)
+            structures.append(make_structure(rng.choice(types), start, start + rng.randint(0, 15)))
+
+        # The map sentence detection used to build: later structures overwrite earlier ones
+        expected = {}
+        for structure in structures:
+            for position in range(structure.start_pos, structure.end_pos):
+                expected[position] = structure
+
+        index = StructureIndex(structures)
+        for position in range(-1, 70):
+            assert index.find(position) is expected.get(position)
+
+
+def test_size_independent_of_span_length():
+    structures = [make_structure(StructureType.QUOTATION, i * 100000, (i + 1) * 100000) for i in range(10)]
+    assert len(StructureIndex(structures)) == 10
+
+
+def test_split_list_items_resolves_duplicates():
+    with redirect_stdout(io.StringIO()):
+        handlers = EdgeCaseHandlers()
+    text = 'Options:\nA) Avoid\nB) Transfer'
+    structures = handlers.detect_structures(text)
+
+    segments = handlers.split_list_items(text, structures)
+    assert [segment[0] for segment in segments] == ['Options:\n', 'A) Avoid', '\n', 'B) Transfer']
+
+
+def random_documents(count: int, seed: int):
+    rng = random.Random(seed)
+    tokens = ['a', 'B', ' ', '\n', ':', ':\n', '.', '1', '23', '+', '=', '- ', '1. ', 'b) ', '• ', '"', "'",
+              '@', 'x@y.com', 'a.b@c.d.ef', 'www.a.b', 'https://q.r/s', 'Chapter 2: ', 'Figure 3.', '\t',
+              'Bob: "', 'A = b c', 'Note:\n', 'Item', '5\n- 3 items', 'Table 4:\n\n']
+    for _ in range(count):
+        yield ''.join(rng.choice(tokens) for _ in range(rng.randint(0, 40)))
+
+
+def signature(structures):
+    return sorted((s.type.value, s.start_pos, s.end_pos, s.content, str(s.metadata)) for s in structures)
+
+
+def test_single_pass_matches_family_detectors():
+    with redirect_stdout(io.StringIO()):
+        handlers = EdgeCaseHandlers()
+    for text in [lesson_markdown(), *random_documents(3000, seed=14)]:
+        structures = handlers.detect_structures(text)
+        assert signature(structures) == signature(multi_scan(handlers, text)), text
+        assert [s.start_pos for s in structures] == sorted(s.start_pos for s in structures)
+
+
+def test_precedence_matches_detector_order():
+    """Sorted structures + STRUCTURE_PRECEDENCE resolve overlaps like the family-ordered list"""
+    with redirect_stdout(io.StringIO()):
+        handlers = EdgeCaseHandlers()
+    for text in random_documents(1000, seed=15):
+        old = StructureIndex(multi_scan(handlers, text))
+        new = StructureIndex(handlers.detect_structures(text), STRUCTURE_PRECEDENCE)
+        for position in range(len(text) + 1):
+            old_owner, new_owner = old.find(position), new.find(position)
+            assert (old_owner and old_owner.type) == (new_owner and new_owner.type), (text, position)
+
+
+if __name__ == '__main__':
+    test_later_structure_wins_overlap()
+    test_matches_per_character_map()
+    test_size_independent_of_span_length()
+    test_split_list_items_resolves_duplicates()
+    test_single_pass_matches_family_detectors()
+    test_precedence_matches_detector_order()
+    print("✅ All structure index tests passed")
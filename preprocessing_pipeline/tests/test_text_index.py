@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-document TextIndex behind the quote, code and colon checks
+"""
+
+import io
+import random
+import re
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from edge_case_handlers import EdgeCaseHandlers, LIST_STRUCTURE_TYPES, StructureType
+from benchmark_text_index import LegacyChecks, run_benchmark
+
+
+def make_handlers() -> EdgeCaseHandlers:
+    with redirect_stdout(io.StringIO()):
+        return EdgeCaseHandlers()
+
+
+def test_quote_parity_matches_counting():
+    handlers = make_handlers()
+    text = 'He said "stop; now" and \'left\'; then: done'
+    for position in range(-2, len(text) + 2):
+        before = text[:position]
+        expected = (before.count('"') + before.count("'")) % 2 == 1
+        assert handlers.is_within_quotes(text, position) == expected
+
+
+def test_checks_match_legacy_on_random_text():
+    handlers = make_handlers()
+    legacy = LegacyChecks(handlers)
+    rng = random.Random(7)
+    alphabet = list('ab AB\n"\';:.(){}1 ') + ['if (x) {', 'for(i)', ' One Two Three Four Five', '10:30']
+
+    for _ in range(300):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        handlers.detect_structures(text)
+        for position in range(len(text)):
+            assert handlers.is_within_code(text, position) == legacy.is_within_code(text, position)
+            assert handlers.should_break_at_semicolon(text, position) == legacy.should_break_at_semicolon(text, position)
+            assert handlers.should_break_at_colon(text, position) == legacy.should_break_at_colon(text, position)
+
+
+def test_index_built_once_per_document():
+    handlers = make_handlers()
+    text = 'Options: Avoid; Reduce; "Transfer; Retain".'
+    handlers.detect_structures(text)
+    index = handlers.text_index
+
+    handlers.should_break_at_semicolon(text, text.index(';'))
+    handlers.should_break_at_colon(text, text.index(':'))
+    assert handlers.text_index is index
+
+    other = 'A different document; with a semicolon.'
+    handlers.should_break_at_semicolon(other, other.index(';'))
+    assert handlers.text_index is not index
+    assert handlers.text_index.text is other
+
+
+def test_line_table_offsets():
+    handlers = make_handlers()
+    text = 'Intro:\nFirst item\n\n1. One\n- Two\nb) Three'
+    index = handlers.get_text_index(text)
+    assert index.lines == text.split('\n')
+    for line, start in zip(index.lines, index.line_starts):
+        assert text[start:start + len(line)] == line
+
+
+def test_detect_lists_single_pass():
+    handlers = make_handlers()
+    text = 'Intro:\nFirst item\n\n1. One\n- Two\nb) Three'
+    found = [(s.type, text[s.start_pos:s.end_pos]) for s in handlers.detect_structures(text)
+             if s.type in LIST_STRUCTURE_TYPES]
+    assert found == [
+        (StructureType.COLON_LIST, 'First item'),
+        (StructureType.NUMBERED_LIST, '1. One'),
+        (StructureType.BULLETED_LIST, '- Two'),
+        (StructureType.LETTERED_LIST, 'b) Three'),
+    ]
+
+
+def test_structural_elements_at_text_start():
+    handlers = make_handlers()
+    text = 'Chapter 1:\n\nRisk\nSome text.\nTable 2. Losses by year'
+    found = [text[s.start_pos:s.end_pos] for s in handlers.detect_structures(text)
+             if s.type is StructureType.HEADER]
+    assert found == ['Chapter 1:\n\n']
+
+
+def test_caption_list_items_keep_list_breaks():
+    handlers = make_handlers()
+    text = 'We track these areas:\nFigure 1: Loss ratios by line of business\nTable 2: Claims by region'
+    words = [{'word': m.group(), 'start_ms': i * 100, 'end_ms': i * 100 + 90,
+              'char_start': m.start(), 'char_end': m.end()}
+             for i, m in enumerate(re.finditer(r'\S+', text))]
+    sentences = handlers.apply_enhanced_sentence_detection(words, text, handlers.detect_structures(text))
+
+    # The caption line is a colon list item first: every word in it ends a sentence
+    assert [s['text'] for s in sentences[:4]] == ['We track these areas:', 'Figure', '1:', 'Loss']
+    assert sentences[1]['break_reason'] == 'list_colon_list'
+
+
+def test_benchmark_agrees_with_legacy():
+    result = run_benchmark(target_chars=20000)
+    assert result['chars'] == 20000
+    assert result['mismatches'] == 0
+
+
+if __name__ == '__main__':
+    test_quote_parity_matches_counting()
+    test_checks_match_legacy_on_random_text()
+    test_index_built_once_per_document()
+    test_line_table_offsets()
+    test_detect_lists_single_pass()
+    test_structural_elements_at_text_start()
+    test_caption_list_items_keep_list_breaks()
+    test_benchmark_agrees_with_legacy()
+    print("✅ All text index tests passed")
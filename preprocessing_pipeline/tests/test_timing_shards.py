@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for fixed-duration timing shards
+"""
+
+import gzip
+import io
+import json
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from batch_process import discover_lessons
+from lookup_table import encode_intervals, find_interval
+from process_elevenlabs_complete_with_paragraphs import ElevenLabsCompleteProcessorWithParagraphs
+from timing_shards import build_timing_shards, shard_directory, SHARD_INDEX_FILE
+
+TEST_CONTENT = Path(__file__).parent / 'test_content'
+
+
+def processed_lessons():
+    for lesson in discover_lessons(str(TEST_CONTENT)):
+        with redirect_stdout(io.StringIO()):
+            processor = ElevenLabsCompleteProcessorWithParagraphs(lesson.alignment_path, lesson.original_path)
+            yield processor.process()
+
+
+def test_shards_partition_timing_with_global_indices():
+    for content in processed_lessons():
+        timing = content['timing']
+        intervals = encode_intervals(timing['lookup_table'], 10)
+        total = timing['total_duration_ms']
+        for shard_ms in (7000, 60000, total + 1):
+            index, shards = build_timing_shards(timing, intervals, 10, shard_ms)
+            assert len(shards) == len(index['shards']) == max(1, -(-total // shard_ms))
+
+            # Every word lands in exactly one shard, in order
+            assert [w for shard in shards for w in shard['words']] == timing['words']
+            for entry, shard in zip(index['shards'], shards):
+                assert entry['word_start'] == shard['word_offset'] and entry['word_count'] == len(shard['words'])
+                offset = shard['sentence_offset']
+                assert shard['sentences'] == timing['sentences'][offset:offset + entry['sentence_count']]
+                # Each shard holds the sentences its words belong to
+                for word in shard['words']:
+                    assert offset <= word['sentence_index'] < offset + len(shard['sentences'])
+
+            # A shard's lookup answers exactly like the full table for positions inside it
+            for t in range(0, total + 1, 5):
+                shard = shards[min(t // shard_ms, len(shards) - 1)]
+                assert shard['start_ms'] <= t
+                assert find_interval(shard['lookup']['intervals'], t) == find_interval(intervals, t)
+
+
+def test_save_writes_shards(tmp_path):
+    content = next(processed_lessons())
+    lesson = discover_lessons(str(TEST_CONTENT))[0]
+
+    def save(config):
+        processor = ElevenLabsCompleteProcessorWithParagraphs(lesson.alignment_path, lesson.original_path, config)
+        with redirect_stdout(io.StringIO()):
+            processor.save(content, str(tmp_path / 'lesson.json'))
+        return shard_directory(str(tmp_path / 'lesson.json'))
+
+    directory = save({'output': {'shard_seconds': 20, 'precompress': ['gzip']}})
+    index = json.loads((directory / SHARD_INDEX_FILE).read_text())
+    assert len(index['shards']) > 2
+    for entry in index['shards']:
+        shard = directory / entry['file']
+        assert entry['size_bytes'] == shard.stat().st_size
+        assert gzip.decompress(Path(f'{shard}.gz').read_bytes()) == shard.read_bytes()
+
+    # Longer shards replace the old set; nothing stale is left behind
+    save({'output': {'shard_seconds': 3600}})
+    assert sorted(p.name for p in directory.iterdir()) == ['index.json', 'shard_0000.json']
+
+
+if __name__ == '__main__':
+    import tempfile
+    test_shards_partition_timing_with_global_indices()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_save_writes_shards(Path(tmp))
+    print("✅ All timing shard tests passed")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar TimingTrack word store
+"""
+
+import copy
+import io
+import json
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from timing_track import TimingTrack, WordView, WORD_KEYS
+from lookup_table import sample_lookup
+from sentence_coverage import close_sentence_gaps, assign_words_to_sentences
+
+WORDS = [
+    {'word': 'The', 'start_ms': 0, 'end_ms': 120, 'char_start': 0, 'char_end': 3, 'sentence_index': 0},
+    {'word': 'test.', 'start_ms': 150, 'end_ms': 400, 'char_start': 4, 'char_end': 9, 'sentence_index': 0},
+    {'word': 'The', 'start_ms': 600, 'end_ms': 700, 'char_start': 10, 'char_end': 13, 'sentence_index': 1},
+    {'word': 'end.', 'start_ms': 720, 'end_ms': 900, 'char_start': 14, 'char_end': 18, 'sentence_index': 1},
+]
+
+
+def test_round_trip_and_word_pool():
+    track = TimingTrack.from_dicts(WORDS)
+    assert len(track) == 4
+    assert track.to_json_dicts() == WORDS
+    assert list(json.loads(json.dumps(track.to_json_dicts()))[0].keys()) == list(WORD_KEYS)
+    # Repeated words share one pool entry
+    assert track.word_pool == ['The', 'test.', 'end.']
+
+
+def test_views_read_and_write_columns():
+    track = TimingTrack.from_dicts(WORDS)
+    view = track[1]
+    assert isinstance(view, WordView)
+    assert view['word'] == 'test.' and view.word == 'test.'
+    assert view.get('sentence_index', 5) == 0
+    assert view.get('missing', 'default') == 'default'
+    assert 'char_end' in view
+
+    view['end_ms'] = 500
+    view.sentence_index = 3
+    assert track.end_ms[1] == 500
+    assert track[-3]['sentence_index'] == 3
+    assert track[1] == {**WORDS[1], 'end_ms': 500, 'sentence_index': 3}
+
+    try:
+        track[4]
+    except IndexError:
+        pass
+    else:
+        raise AssertionError("index past the end was accepted")
+
+
+def test_pipeline_helpers_accept_track():
+    dict_words = copy.deepcopy(WORDS)
+    track = TimingTrack.from_dicts(WORDS)
+    for words in (dict_words, track):
+        sentences = [{'start_ms': 0, 'end_ms': 400}, {'start_ms': 600, 'end_ms': 900}]
+        close_sentence_gaps(sentences)
+        assign_words_to_sentences(words, sentences)
+    assert track.to_json_dicts() == dict_words
+
+    for use_numpy in (True, False):
+        assert (sample_lookup(track, 95, 10, end_inclusive=False, use_numpy=use_numpy) ==
+                sample_lookup(dict_words, 95, 10, end_inclusive=False, use_numpy=False))
+
+
+def test_processor_serializes_plain_dicts():
+    from process_elevenlabs_complete_with_paragraphs import ElevenLabsCompleteProcessorWithParagraphs
+
+    lesson = Path(__file__).parent / 'test_content' / 'The Vital Role of Risk Management and Insurance'
+    alignment = lesson / 'The Vital Role of Risk Management and Insurance.json'
+    with redirect_stdout(io.StringIO()):
+        processor = ElevenLabsCompleteProcessorWithParagraphs(str(alignment), str(alignment.with_suffix('.md')))
+        content = processor.process()
+
+    words = content['timing']['words']
+    assert isinstance(words, list) and all(isinstance(w, dict) for w in words)
+    assert len(words) == content['metadata']['word_count']
+
+
+if __name__ == '__main__':
+    test_round_trip_and_word_pool()
+    test_views_read_and_write_columns()
+    test_pipeline_helpers_accept_track()
+    test_processor_serializes_plain_dicts()
+    print("✅ All timing track tests passed")
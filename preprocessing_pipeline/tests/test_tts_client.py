@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Tests for the async TTS client against a local mock TTS server
+"""
+
+import asyncio
+import base64
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+from tts_client import AsyncTTSClient, TTSRequest, TTSError, TokenBucket, SPEECH_PATH
+
+
+class MockTTSServer:
+    """Speechify-style /v1/audio/speech endpoint that records load and can fail on demand"""
+
+    def __init__(self, delay: float = 0.0, audio=None):
+        self.delay = delay
+        self.audio = audio or (lambda text: text.encode('utf-8'))
+        self.payloads = []
+        self.failures = []  # statuses returned (in order) before succeeding
+        self.truncated = 0  # successful responses cut short (with a matching Content-Length) first
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with mock._lock:
+                    mock.payloads.append(payload)
+                    status = mock.failures.pop(0) if mock.failures else 200
+                    mock.in_flight += 1
+                    mock.max_in_flight = max(mock.max_in_flight, mock.in_flight)
+                time.sleep(mock.delay)
+                with mock._lock:
+                    mock.in_flight -= 1
+
+                if self.path != SPEECH_PATH or self.headers['Authorization'] != 'Bearer test-key':
+                    status = 401
+                if status == 200:
+                    words = re.finditer(r'\S+', payload['input'])
+                    body = json.dumps({
+                        'audio_data': base64.b64encode(mock.audio(payload['input'])).decode('ascii'),
+                        'speech_marks': [{'type': 'word', 'value': w.group(), 'start': w.start(), 'end': w.end(),
+                                          'time': i * 300, 'end_time': i * 300 + 250}
+                                         for i, w in enumerate(words)]
+                    }).encode('utf-8')
+                    with mock._lock:
+                        if mock.truncated:
+                            mock.truncated -= 1
+                            body = body[:len(body) // 2]
+                else:
+                    body = json.dumps({'error': f'status {status}'}).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                if status == 429:
+                    self.send_header('Retry-After', '0')
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def client_for(server, tmp_path, **kwargs):
+    options = dict(concurrency=4, rate=1000, retries=3, backoff_seconds=0.01,
+                   cache_dir=str(tmp_path / 'cache') if tmp_path else None)
+    options.update(kwargs)
+    return AsyncTTSClient('test-key', base_url=server.url, **options)
+
+
+def test_concurrency_is_bounded():
+    texts = [f"Lesson number {i}." for i in range(9)]
+    with MockTTSServer(delay=0.1) as server:
+        client = client_for(server, None, concurrency=3)
+        started = time.monotonic()
+        responses = asyncio.run(client.synthesize_all([TTSRequest(t) for t in texts]))
+        elapsed = time.monotonic() - started
+
+    assert [base64.b64decode(r['audio_data']).decode() for r in responses] == texts
+    assert server.max_in_flight == 3
+    # Three waves of 0.1s instead of nine sequential requests
+    assert elapsed < 0.8
+    assert client.stats['requests'] == 9
+
+
+def test_rate_limited_and_failed_requests_are_retried(tmp_path):
+    with MockTTSServer() as server:
+        server.failures = [429, 503]
+        client = client_for(server, tmp_path, concurrency=1)
+        response = asyncio.run(client.synthesize(TTSRequest('Retry me.')))
+
+    assert response['speech_marks'][0]['value'] == 'Retry'
+    assert client.stats == {'requests': 3, 'cache_hits': 0, 'retries': 2}
+
+
+def test_client_errors_are_not_retried(tmp_path):
+    with MockTTSServer() as server:
+        server.failures = [400]
+        client = client_for(server, tmp_path)
+        with pytest.raises(TTSError) as error:
+            asyncio.run(client.synthesize(TTSRequest('Bad request.')))
+
+    assert error.value.status == 400
+    assert len(server.payloads) == 1 and client.stats['retries'] == 0
+
+
+def test_retries_run_out(tmp_path):
+    with MockTTSServer() as server:
+        server.failures = [500] * 5
+        client = client_for(server, tmp_path, retries=2)
+        results = asyncio.run(client.synthesize_all([TTSRequest('Never works.')], return_exceptions=True))
+
+    assert isinstance(results[0], TTSError) and results[0].status == 500
+    assert len(server.payloads) == 3
+
+
+def test_cache_skips_unchanged_text(tmp_path):
+    texts = ['First lesson.', 'Second lesson.']
+    with MockTTSServer() as server:
+        first = asyncio.run(client_for(server, tmp_path).synthesize_all([TTSRequest(t) for t in texts]))
+
+        # A fresh client (a re-run) with the same cache makes no requests
+        client = client_for(server, tmp_path)
+        second = asyncio.run(client.synthesize_all([TTSRequest(t) for t in texts]))
+        assert second == first
+        assert client.stats['cache_hits'] == 2 and len(server.payloads) == 2
+
+        # Any change to text, voice, model or speed is a new request
+        asyncio.run(client.synthesize_all([TTSRequest('First lesson.', speed=1.25),
+                                           TTSRequest('Second lesson.', voice='george')]))
+        assert len(server.payloads) == 4
+        assert {p['voice_id'] for p in server.payloads[2:]} == {'henry', 'george'}
+
+
+def test_streaming_response_to_file(tmp_path):
+    text = 'Stream this long lesson straight to disk.'
+    audio = bytes(range(256)) * 400 + 'é'.encode('utf-8')
+    with MockTTSServer(audio=lambda _: audio) as server:
+        client = client_for(server, tmp_path)
+        alignment = asyncio.run(client.synthesize_to_file(TTSRequest(text), str(tmp_path / 'a.mp3')))
+        assert (tmp_path / 'a.mp3').read_bytes() == audio and alignment.audio_bytes == len(audio)
+        assert [m['value'] for m in alignment.speech_marks] == text.split()
+
+        # The raw body was cached on the way through; both entry points reuse it
+        again = asyncio.run(client.synthesize_to_file(TTSRequest(text), str(tmp_path / 'b.mp3')))
+        response = asyncio.run(client.synthesize(TTSRequest(text)))
+        assert len(server.payloads) == 1 and client.stats['cache_hits'] == 2
+        assert (tmp_path / 'b.mp3').read_bytes() == audio and again.speech_marks == alignment.speech_marks
+        assert base64.b64decode(response['audio_data']) == audio
+        assert list((tmp_path / 'cache').rglob('*.tmp')) == []
+
+        # Without a cache nothing but the audio file is written
+        client = client_for(server, None)
+        alignment = asyncio.run(client.synthesize_to_file(TTSRequest(text), str(tmp_path / 'c.mp3')))
+        assert (tmp_path / 'c.mp3').read_bytes() == audio and len(alignment.speech_marks) == 7
+
+
+def test_truncated_stream_is_retried_and_leaves_no_partial_audio(tmp_path):
+    text = 'A response that is cut off halfway.'
+    audio = bytes(range(256)) * 100
+    with MockTTSServer(audio=lambda _: audio) as server:
+        server.truncated = 1
+        client = client_for(server, tmp_path)
+        alignment = asyncio.run(client.synthesize_to_file(TTSRequest(text), str(tmp_path / 'a.mp3')))
+        assert (tmp_path / 'a.mp3').read_bytes() == audio and alignment.audio_path == str(tmp_path / 'a.mp3')
+        assert client.stats['retries'] == 1
+
+        # Out of retries: a TTSError, and no empty or partial MP3 at the final path
+        server.truncated = 1
+        client = client_for(server, None, retries=0)
+        with pytest.raises(TTSError):
+            asyncio.run(client.synthesize_to_file(TTSRequest(text), str(tmp_path / 'b.mp3')))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['a.mp3', 'cache']
+    assert list((tmp_path / 'cache').rglob('*.tmp')) == []
+
+
+def test_token_bucket_limits_rate():
+    async def take(bucket, n):
+        for _ in range(n):
+            await bucket.acquire()
+
+    bucket = TokenBucket(rate=50, capacity=1)
+    started = time.monotonic()
+    asyncio.run(take(bucket, 6))
+    # One token up front, then one every 20ms
+    assert time.monotonic() - started >= 0.09
+
+
+if __name__ == '__main__':
+    import tempfile
+    test_concurrency_is_bounded()
+    test_token_bucket_limits_rate()
+    for test in (test_rate_limited_and_failed_requests_are_retried, test_client_errors_are_not_retried,
+                 test_retries_run_out, test_cache_skips_unchanged_text, test_streaming_response_to_file,
+                 test_truncated_stream_is_retried_and_leaves_no_partial_audio):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("✅ All TTS client tests passed")
@@ -2,21 +2,31 @@
 """
 Standalone script to generate test MP3 files using Speechify API
 
-Usage: python3 scripts/generate_test_audio_standalone.py
+Usage: python3 scripts/generate_test_audio_standalone.py [--concurrency 4] [--rate 2] [--no-cache]
+                                                         [--max-chars 2000]
 
 This script will:
-1. Call Speechify API to generate audio for test content
+1. Call Speechify API to generate audio for all test content concurrently
+   (rate limited, retried, and cached in .tts_cache/ so re-runs skip
+   unchanged text). With --max-chars, longer texts are synthesized as
+   concurrent chunks and stitched back together
 2. Save MP3 files to assets/test_content/
 3. Extract and save word timings
 4. Create content.json and timing.json files
 """
 
 import os
+import sys
 import json
-import base64
-import requests
+import asyncio
+import argparse
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'preprocessing_pipeline' / 'scripts'))
+
+from tts_client import AsyncTTSClient, TTSRequest, DEFAULT_CACHE_DIR
+from chunked_synthesis import StitchedSynthesis, synthesize_long_text
+
 # Load API key from .env file
 def load_api_key():
     env_path = Path('.env')
@@ -108,7 +118,116 @@ test_contents = [
     },
 ]
 
+async def synthesize_contents(client, contents, max_chars, output_dir):
+    """Synthesize every content concurrently, chunking texts longer than max_chars"""
+    async def synthesize(content):
+        if max_chars and len(content['text']) > max_chars:
+            return await synthesize_long_text(client, content['text'], max_chars=max_chars)
+        # Audio is decoded into audio.mp3 while the response streams in
+        content_dir = output_dir / content['id']
+        content_dir.mkdir(parents=True, exist_ok=True)
+        return await client.synthesize_to_file(TTSRequest(content['text']), str(content_dir / 'audio.mp3'))
+
+    return await asyncio.gather(*(synthesize(content) for content in contents), return_exceptions=True)
+
+
+def write_outputs(content, speech_marks, content_dir):
+    """Write content.json and timing.json for one API response"""
+    # Create content.json
+    content_json = {
+        'version': '1.0',
+        'displayText': content['text'],
+        'paragraphs': content['paragraphs'],
+        'metadata': {
+            'wordCount': len(content['text'].split()),
+            'characterCount': len(content['text']),
+            'estimatedReadingTime': f"{len(content['text'].split()) // 200 + 1} minutes",
+            'language': 'en',
+        },
+    }
+
+    content_file = content_dir / 'content.json'
+    with open(content_file, 'w') as f:
+        json.dump(content_json, f, indent=2)
+    print('   ✅ Saved content.json')
+
+    # Process word timings
+    if speech_marks is not None:
+        words = []
+        sentences = []
+
+        word_index = 0
+        current_sentence_start = 0
+        current_sentence_text = ''
+        sentence_start_ms = 0
+
+        for mark in speech_marks:
+            if mark.get('type') == 'word':
+                word = {
+                    'word': mark['value'],
+                    'startMs': mark['time'],
+                    'endMs': mark.get('end_time', mark['time'] + 200),
+                    'charStart': mark.get('start', 0),
+                    'charEnd': mark.get('end', 0),
+                }
+                words.append(word)
+
+                current_sentence_text += f"{mark['value']} "
+
+                # Detect sentence boundary
+                if any(mark['value'].endswith(p) for p in ['.', '!', '?']):
+                    sentences.append({
+                        'text': current_sentence_text.strip(),
+                        'startMs': sentence_start_ms,
+                        'endMs': mark.get('end_time', mark['time'] + 200),
+                        'wordStartIndex': current_sentence_start,
+                        'wordEndIndex': word_index,
+                        'charStart': words[current_sentence_start]['charStart'] if current_sentence_start < len(words) else 0,
+                        'charEnd': mark.get('end', 0),
+                    })
+
+                    current_sentence_start = word_index + 1
+                    current_sentence_text = ''
+                    sentence_start_ms = mark.get('end_time', mark['time']) + 350
+
+                word_index += 1
+
+        # Handle remaining text as final sentence
+        if current_sentence_text.strip():
+            sentences.append({
+                'text': current_sentence_text.strip(),
+                'startMs': sentence_start_ms,
+                'endMs': words[-1]['endMs'] if words else 0,
+                'wordStartIndex': current_sentence_start,
+                'wordEndIndex': len(words) - 1,
+                'charStart': words[current_sentence_start]['charStart'] if current_sentence_start < len(words) else 0,
+                'charEnd': words[-1]['charEnd'] if words else len(content['text']),
+            })
+
+        # Create timing.json
+        timing_json = {
+            'version': '1.0',
+            'words': words,
+            'sentences': sentences,
+            'totalDurationMs': words[-1]['endMs'] if words else 0,
+        }
+
+        timing_file = content_dir / 'timing.json'
+        with open(timing_file, 'w') as f:
+            json.dump(timing_json, f, indent=2)
+        print(f'   ✅ Saved timing.json ({len(words)} words, {len(sentences)} sentences)')
+
+
 def main():
+    parser = argparse.ArgumentParser(description='Generate test audio with the Speechify API')
+    parser.add_argument('--concurrency', type=int, default=4, help='Requests in flight (default: 4)')
+    parser.add_argument('--rate', type=float, default=2.0, help='Requests started per second (default: 2)')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help=f'Response cache (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--no-cache', action='store_true', help='Always call the API')
+    parser.add_argument('--max-chars', type=int, default=0,
+                        help='Synthesize longer texts in chunks of about this many characters (default: one request)')
+    args = parser.parse_args()
+
     print('🎙️ Speechify Test Audio Generator')
     print('=' * 50)
 
@@ -121,146 +240,44 @@ def main():
 
     print('✅ API key loaded from .env')
 
-    # API configuration
-    base_url = 'https://api.sws.speechify.com'
-    headers = {
-        'Authorization': f'Bearer {api_key}',
-        'Content-Type': 'application/json',
-    }
+    client = AsyncTTSClient(api_key, concurrency=args.concurrency, rate=args.rate, timeout=120,
+                            cache_dir=None if args.no_cache else args.cache_dir)
 
     # Create output directory
     output_dir = Path('assets/test_content/learning_objects')
     output_dir.mkdir(parents=True, exist_ok=True)
     print(f'📁 Output directory: {output_dir}')
 
+    # Call Speechify API for every test content at once
+    print(f'🌐 Calling Speechify API for {len(test_contents)} items (concurrency {args.concurrency})...')
+    responses = asyncio.run(synthesize_contents(client, test_contents, args.max_chars, output_dir))
+    print(f"   {client.stats['requests']} requests, {client.stats['cache_hits']} cached, {client.stats['retries']} retries")
+
     # Process each test content
-    for content in test_contents:
+    for content, data in zip(test_contents, responses):
         print(f"\n📝 Processing: {content['title']}")
         print(f"   Text length: {len(content['text'])} characters")
 
         try:
+            if isinstance(data, Exception):
+                raise data
+
             # Create content directory
             content_dir = output_dir / content['id']
             content_dir.mkdir(parents=True, exist_ok=True)
 
-            # Call Speechify API
-            print('   🌐 Calling Speechify API...')
-
-            payload = {
-                'input': content['text'],
-                'voice_id': 'henry',
-                'model': 'simba-turbo',
-                'speed': 1.0,
-                'include_speech_marks': True,
-            }
-
-            response = requests.post(
-                f'{base_url}/v1/audio/speech',
-                headers=headers,
-                json=payload,
-                timeout=120
-            )
-
-            if response.status_code == 200:
-                data = response.json()
-
-                # Save MP3 file
-                if 'audio_data' in data:
-                    audio_bytes = base64.b64decode(data['audio_data'])
-                    audio_file = content_dir / 'audio.mp3'
-                    with open(audio_file, 'wb') as f:
-                        f.write(audio_bytes)
-                    print(f'   ✅ Saved audio.mp3 ({len(audio_bytes)} bytes)')
-
-                # Create content.json
-                content_json = {
-                    'version': '1.0',
-                    'displayText': content['text'],
-                    'paragraphs': content['paragraphs'],
-                    'metadata': {
-                        'wordCount': len(content['text'].split()),
-                        'characterCount': len(content['text']),
-                        'estimatedReadingTime': f"{len(content['text'].split()) // 200 + 1} minutes",
-                        'language': 'en',
-                    },
-                }
-
-                content_file = content_dir / 'content.json'
-                with open(content_file, 'w') as f:
-                    json.dump(content_json, f, indent=2)
-                print('   ✅ Saved content.json')
-
-                # Process word timings
-                if 'speech_marks' in data:
-                    speech_marks = data['speech_marks']
-                    words = []
-                    sentences = []
-
-                    word_index = 0
-                    current_sentence_start = 0
-                    current_sentence_text = ''
-                    sentence_start_ms = 0
-
-                    for mark in speech_marks:
-                        if mark.get('type') == 'word':
-                            word = {
-                                'word': mark['value'],
-                                'startMs': mark['time'],
-                                'endMs': mark.get('end_time', mark['time'] + 200),
-                                'charStart': mark.get('start', 0),
-                                'charEnd': mark.get('end', 0),
-                            }
-                            words.append(word)
-
-                            current_sentence_text += f"{mark['value']} "
-
-                            # Detect sentence boundary
-                            if any(mark['value'].endswith(p) for p in ['.', '!', '?']):
-                                sentences.append({
-                                    'text': current_sentence_text.strip(),
-                                    'startMs': sentence_start_ms,
-                                    'endMs': mark.get('end_time', mark['time'] + 200),
-                                    'wordStartIndex': current_sentence_start,
-                                    'wordEndIndex': word_index,
-                                    'charStart': words[current_sentence_start]['charStart'] if current_sentence_start < len(words) else 0,
-                                    'charEnd': mark.get('end', 0),
-                                })
-
-                                current_sentence_start = word_index + 1
-                                current_sentence_text = ''
-                                sentence_start_ms = mark.get('end_time', mark['time']) + 350
-
-                            word_index += 1
-
-                    # Handle remaining text as final sentence
-                    if current_sentence_text.strip():
-                        sentences.append({
-                            'text': current_sentence_text.strip(),
-                            'startMs': sentence_start_ms,
-                            'endMs': words[-1]['endMs'] if words else 0,
-                            'wordStartIndex': current_sentence_start,
-                            'wordEndIndex': len(words) - 1,
-                            'charStart': words[current_sentence_start]['charStart'] if current_sentence_start < len(words) else 0,
-                            'charEnd': words[-1]['charEnd'] if words else len(content['text']),
-                        })
-
-                    # Create timing.json
-                    timing_json = {
-                        'version': '1.0',
-                        'words': words,
-                        'sentences': sentences,
-                        'totalDurationMs': words[-1]['endMs'] if words else 0,
-                    }
-
-                    timing_file = content_dir / 'timing.json'
-                    with open(timing_file, 'w') as f:
-                        json.dump(timing_json, f, indent=2)
-                    print(f'   ✅ Saved timing.json ({len(words)} words, {len(sentences)} sentences)')
-
-                print(f"   ✅ Complete: {content['id']}")
-            else:
-                print(f'   ❌ API error: {response.status_code}')
-                print(f'   Response: {response.text}')
+            if isinstance(data, StitchedSynthesis):
+                # Character alignment for process_elevenlabs_complete_with_paragraphs.py
+                with open(content_dir / 'alignment.json', 'w') as f:
+                    json.dump(data.elevenlabs_response(include_audio=False), f)
+                print(f'   ✅ Stitched {len(data.spans)} chunks, saved alignment.json')
+                (content_dir / 'audio.mp3').write_bytes(data.audio)
+                print(f'   ✅ Saved audio.mp3 ({len(data.audio)} bytes)')
+            elif data.audio_path:
+                print(f'   ✅ Saved audio.mp3 ({data.audio_bytes} bytes)')
+
+            write_outputs(content, data.speech_marks, content_dir)
+            print(f"   ✅ Complete: {content['id']}")
 
         except Exception as e:
             print(f'   ❌ Error: {e}')
@@ -4,11 +4,16 @@ Generate test MP3 and JSON files using Speechify API
 """
 
 import os
+import sys
 import json
-import base64
-import requests
+import shutil
+import asyncio
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'preprocessing_pipeline' / 'scripts'))
+
+from tts_client import AsyncTTSClient, TTSRequest, TTSError
+
 # Load API key
 def load_api_key():
     env_path = Path('.env')
@@ -45,36 +50,19 @@ def main():
     # Call Speechify API
     print('🌐 Calling Speechify API...')
 
-    headers = {
-        'Authorization': f'Bearer {api_key}',
-        'Content-Type': 'application/json',
-    }
-
-    payload = {
-        'input': test_content['text'],
-        'voice_id': 'henry',
-        'model': 'simba-turbo',
-        'speed': 1.0,
-        'include_speech_marks': True,
-    }
-
-    response = requests.post(
-        'https://api.sws.speechify.com/v1/audio/speech',
-        headers=headers,
-        json=payload,
-        timeout=60
-    )
-
-    if response.status_code == 200:
-        data = response.json()
-
-        # Save MP3
-        if 'audio_data' in data:
-            audio_bytes = base64.b64decode(data['audio_data'])
-            audio_file = output_dir / 'audio.mp3'
-            with open(audio_file, 'wb') as f:
-                f.write(audio_bytes)
-            print(f'✅ Saved audio.mp3 ({len(audio_bytes):,} bytes)')
+    # Cached in .tts_cache/, so re-running with unchanged text makes no API call
+    # The response is parsed as it arrives, with the audio decoded straight into audio.mp3
+    client = AsyncTTSClient(api_key, timeout=60)
+    request = TTSRequest(test_content['text'])
+    try:
+        data = asyncio.run(client.synthesize_to_file(request, str(output_dir / 'audio.mp3')))
+    except TTSError as e:
+        data = None
+        print(f'❌ {e}')
+
+    if data is not None:
+        if data.audio_path:
+            print(f'✅ Saved audio.mp3 ({data.audio_bytes:,} bytes)')
 
         # Create content.json
         content_json = {
@@ -94,8 +82,8 @@ def main():
         print('✅ Saved content.json')
 
         # Process timing data
-        if 'speech_marks' in data:
-            speech_marks = data['speech_marks']
+        if data.speech_marks is not None:
+            speech_marks = data.speech_marks
             words = []
             sentences = []
 
@@ -154,14 +142,9 @@ def main():
         print(f'\n✅ Test content generated successfully!')
         print(f'📁 Files saved to: {output_dir}')
 
-        # Also save raw response for debugging
-        with open(output_dir / 'raw_response.json', 'w') as f:
-            json.dump(data, f, indent=2)
+        # Also save raw response for debugging (the cached copy of the response body)
+        shutil.copyfile(client.cache.path(request), output_dir / 'raw_response.json')
         print('📄 Raw API response saved for debugging')
 
-    else:
-        print(f'❌ API error: {response.status_code}')
-        print(response.text)
-
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,15 @@
+-- Migration: Record per-course download bundles
+-- Date: 2025-12-01
+-- Purpose: Let the app download a whole course as one indexed archive
+
+-- Step 1: Add the bundle record to courses
+ALTER TABLE public.courses
+ADD COLUMN IF NOT EXISTS download_bundle jsonb NULL;
+
+-- Step 2: Add comment explaining the structure
+COMMENT ON COLUMN public.courses.download_bundle IS
+  'Latest course bundle from bulk_upload.py --bundle: {url, path, sha256, sizeBytes, formatVersion, lessonCount, entryCount, publishedAt}';
+
+-- Note: The bundle itself is stored in Supabase Storage at
+-- course-audio/{storage_prefix}/{course_id}.bundle (format: preprocessing_pipeline/scripts/course_bundle.py)
+-- Clients compare sha256 with their downloaded copy to decide whether to fetch it again